@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Async pdftotext runner - many PDFs in flight without a process pool
+
+Each call launches `pdftotext` with asyncio's subprocess API under a shared
+semaphore, streams its stdout and stops reading (and kills the process) once
+enough text has arrived. Waiting on a subprocess costs no Python memory, so a
+small VM can keep several conversions going at once.
+"""
+
+import asyncio
+import codecs
+import contextlib
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from run_metrics import count
+
+CHUNK_SIZE = 64 * 1024
+
+
+async def _read_capped(stream: asyncio.StreamReader, max_chars: int) -> str:
+    """Decode stdout as it arrives, stopping once max_chars have been read"""
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    parts: List[str] = []
+    total = 0
+    while total < max_chars:
+        chunk = await stream.read(CHUNK_SIZE)
+        if not chunk:
+            parts.append(decoder.decode(b'', final=True))
+            break
+        text = decoder.decode(chunk)
+        parts.append(text)
+        total += len(text)
+    return ''.join(parts)[:max_chars]
+
+
+async def pdftotext(
+    pdf_path: Path,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    max_pages: int = 10,
+    max_chars: int = 50000,
+    timeout: float = 30,
+) -> str:
+    """
+    Async equivalent of extract_text_from_pdf - same limits, same failure text.
+    Pass semaphore=None when the caller already holds a slot.
+    """
+    async with semaphore or contextlib.nullcontext():
+        try:
+            process = await asyncio.create_subprocess_exec(
+                'pdftotext', '-l', str(max_pages), str(pdf_path), '-',
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+        except Exception as e:
+            return f"[PDF extraction failed: {e}]"
+        count('subprocesses')
+
+        try:
+            return await asyncio.wait_for(_read_capped(process.stdout, max_chars), timeout)
+        except Exception as e:
+            return f"[PDF extraction failed: {e!r}]"
+        finally:
+            # Either we have all we need or we gave up - don't wait for the rest
+            if process.returncode is None:
+                try:
+                    process.kill()
+                except ProcessLookupError:
+                    pass
+            await process.wait()
+
+
+async def gather_projects(
+    projects: List[Dict[str, Any]],
+    process: Callable[[Dict[str, Any], asyncio.Semaphore], Awaitable[Dict[str, Any]]],
+    concurrency: int = 4,
+    on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+    order: Optional[List[int]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Run process(project, semaphore) for every project at once and return results
+    in manifest order. The semaphore bounds how many pdftotext processes run
+    at the same time; on_result(index, result) fires as each project finishes.
+
+    Semaphore waiters are served first-come first-served, so `order` (e.g.
+    longest first) decides which projects get the first slots.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    if order is None:
+        order = list(range(len(projects)))
+
+    async def run(index: int, project: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            result = await process(project, semaphore)
+        except Exception as e:
+            result = {
+                'project_name': project.get('project_name', 'Unknown'),
+                'error': str(e)
+            }
+        if on_result:
+            on_result(index, result)
+        return result
+
+    tasks = {i: asyncio.ensure_future(run(i, projects[i])) for i in order}
+    return await asyncio.gather(*(tasks[i] for i in range(len(projects))))
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Per-stage extraction benchmark
+
+Runs each extraction stage of extract_training_data_final over a corpus and
+reports docs/s, MB/s, p50/p95 per-file latency and peak RSS per stage:
+
+    stat           stat + magic-byte sniff
+    stage          copy to the temp directory
+    text_extract   script PDF -> text
+    featurize      text -> script features
+    budget_scan    budget file -> total
+    schedule_scan  schedule file -> shoot days
+
+Every stage runs in its own fresh process so its peak RSS is its own.
+Library imports count towards a stage's RSS but not its latencies: one file
+per format is read untimed first. By default the corpus is generated with a
+fixed seed, so runs on different commits read identical bytes. Results are written as JSON;
+--compare prints the change against an earlier result file.
+
+    python3 benchmarks/bench_extract.py --size medium
+    python3 benchmarks/bench_extract.py --manifest training_data_extract.json
+    python3 benchmarks/bench_extract.py --compare benchmarks/results/extract-abc123.json
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+sys.path.insert(0, str(REPO_ROOT))
+
+STAGES = ['stat', 'stage', 'text_extract', 'featurize', 'budget_scan', 'schedule_scan']
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _run_item(driver, stage: str, item: str) -> Any:
+    path = Path(item)
+    if stage == 'stat':
+        from extraction_pipeline import sniff_format
+        return sniff_format(path)
+    if stage == 'stage':
+        return str(driver.copy_to_temp(path))
+    if stage == 'text_extract':
+        return driver.extract_text_from_pdf(path, max_pages=20, staged=True)
+    if stage == 'featurize':
+        return driver.extract_features_from_script(item)
+    if stage == 'budget_scan':
+        return driver.extract_budget(path, staged=True)
+    return driver.extract_from_schedule(path, staged=True)
+
+
+def run_stage(stage: str, items: List[str], warmup: int) -> Dict[str, Any]:
+    """Worker process: time one stage over every item, then report peak RSS"""
+    import warnings
+    warnings.filterwarnings('ignore')
+    import extract_training_data_final as driver
+
+    baseline = peak_rss_mb()
+    # Warm up on each file format, so first-use imports (pandas, pdfminer) aren't timed
+    by_format: Dict[str, List[str]] = {}
+    for item in items:
+        by_format.setdefault(Path(item).suffix.lower() if stage != 'featurize' else '', []).append(item)
+    for item in [i for group in by_format.values() for i in group[:warmup]]:
+        try:
+            _run_item(driver, stage, item)
+        except Exception:
+            pass
+    latencies = []
+    outputs = []
+    errors = 0
+    for item in items:
+        started = time.perf_counter()
+        try:
+            output = _run_item(driver, stage, item)
+        except Exception:
+            output = None
+            errors += 1
+        latencies.append(time.perf_counter() - started)
+        if isinstance(output, dict) and output.get('error'):
+            errors += 1
+        outputs.append(output)
+    return {'latencies': latencies, 'errors': errors, 'baseline_rss_mb': baseline,
+            'peak_rss_mb': peak_rss_mb(), 'outputs': outputs}
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))]
+
+
+def summarise(latencies: List[float], total_bytes: int, errors: int,
+              baseline: float, peak: float) -> Dict[str, Any]:
+    seconds = sum(latencies)
+    return {
+        'docs': len(latencies),
+        'bytes': total_bytes,
+        'seconds': round(seconds, 4),
+        'docs_per_sec': round(len(latencies) / seconds, 2) if seconds else None,
+        'mb_per_sec': round(total_bytes / (1024 * 1024) / seconds, 3) if seconds else None,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'max_ms': round(max(latencies, default=0) * 1000, 2),
+        'errors': errors,
+        'baseline_rss_mb': round(baseline, 1),
+        'peak_rss_mb': round(peak, 1),
+    }
+
+
+def corpus_files(manifest: Path) -> Dict[str, List[str]]:
+    """Unique script / budget / schedule paths a manifest points at"""
+    from extract_training_data_final import plan_project_files
+    with open(manifest) as f:
+        projects = json.load(f).get('projects', [])
+    files: Dict[str, List[str]] = {'script': [], 'budget': [], 'schedule': []}
+    for project in projects:
+        for kind, path in plan_project_files(project):
+            if str(path) not in files[kind]:
+                files[kind].append(str(path))
+    return files
+
+
+def run_benchmark(manifest: Path, warmup: int = 1) -> Dict[str, Dict[str, Any]]:
+    files = corpus_files(manifest)
+    all_files = [p for kind in files.values() for p in kind]
+    sizes = {p: os.path.getsize(p) for p in all_files}
+    scripts = [p for p in files['script'] if p.lower().endswith('.pdf')]
+
+    # spawn: every stage starts from a clean interpreter, nothing inherited
+    context = multiprocessing.get_context('spawn')
+
+    def stage(name: str, items: List[str]) -> Dict[str, Any]:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            return pool.submit(run_stage, name, items, warmup).result()
+
+    results: Dict[str, Dict[str, Any]] = {}
+    staged_dirs = set()
+    try:
+        for name in ('stat', 'stage'):
+            run = stage(name, all_files)
+            results[name] = summarise(run['latencies'], sum(sizes.values()), run['errors'],
+                                      run['baseline_rss_mb'], run['peak_rss_mb'])
+        staged = dict(zip(all_files, run['outputs']))
+        staged_dirs = {str(Path(p).parent.parent) for p in staged.values() if p and p not in sizes}
+
+        run = stage('text_extract', [staged[p] for p in scripts])
+        results['text_extract'] = summarise(run['latencies'], sum(sizes[p] for p in scripts), run['errors'],
+                                            run['baseline_rss_mb'], run['peak_rss_mb'])
+        texts = [t for t in run['outputs'] if isinstance(t, str)]
+
+        run = stage('featurize', texts)
+        results['featurize'] = summarise(run['latencies'], sum(len(t.encode()) for t in texts), run['errors'],
+                                         run['baseline_rss_mb'], run['peak_rss_mb'])
+
+        for name, kind in (('budget_scan', 'budget'), ('schedule_scan', 'schedule')):
+            run = stage(name, [staged[p] for p in files[kind]])
+            results[name] = summarise(run['latencies'], sum(sizes[p] for p in files[kind]), run['errors'],
+                                      run['baseline_rss_mb'], run['peak_rss_mb'])
+    finally:
+        for directory in staged_dirs:
+            if Path(directory).name.startswith('production_data_'):
+                shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ''
+
+
+def print_table(stages: Dict[str, Dict[str, Any]], baseline: Optional[Dict[str, Any]] = None) -> None:
+    print(f"{'stage':<14} {'docs':>5} {'docs/s':>9} {'MB/s':>8} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'peak MB':>8} {'err':>4}" + ('   vs baseline' if baseline else ''))
+    for name in STAGES:
+        s = stages.get(name)
+        if not s:
+            continue
+        line = (f"{name:<14} {s['docs']:>5} {s['docs_per_sec'] or 0:>9.1f} {s['mb_per_sec'] or 0:>8.2f} "
+                f"{s['p50_ms']:>9.2f} {s['p95_ms']:>9.2f} {s['peak_rss_mb']:>8.1f} {s['errors']:>4}")
+        before = (baseline or {}).get(name)
+        if before and before.get('docs_per_sec') and s['docs_per_sec']:
+            speedup = s['docs_per_sec'] / before['docs_per_sec']
+            line += f"   {speedup:.2f}x docs/s, p95 {before['p95_ms']:.1f} → {s['p95_ms']:.1f} ms"
+        print(line)
+
+
+def main():
+    from extractor.synthetic import SIZES, generate_corpus, spec_for
+
+    parser = argparse.ArgumentParser(description='Per-stage extraction benchmark')
+    parser.add_argument('--manifest', type=Path, help='benchmark a real manifest instead of a synthetic corpus')
+    parser.add_argument('--size', choices=sorted(SIZES), default='small')
+    parser.add_argument('--projects', type=int, default=0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--corpus-dir', type=Path, help='keep the generated corpus here (default: temp dir)')
+    parser.add_argument('--warmup', type=int, default=1, help='untimed files per stage and file format')
+    parser.add_argument('--output', type=Path, help='result file (default: benchmarks/results/extract-<rev>.json)')
+    parser.add_argument('--compare', type=Path, help='earlier result file to compare against')
+    args = parser.parse_args()
+
+    corpus_info: Dict[str, Any]
+    temp_corpus = None
+    if args.manifest:
+        manifest = args.manifest
+        corpus_info = {'manifest': str(manifest)}
+    else:
+        spec = spec_for(args.size, args.projects)
+        corpus_dir = args.corpus_dir or Path(tempfile.mkdtemp(prefix='bench_corpus_'))
+        temp_corpus = None if args.corpus_dir else corpus_dir
+        manifest = generate_corpus(corpus_dir, spec, args.seed)
+        corpus_info = {'synthetic': args.size, 'seed': args.seed, 'projects': spec.projects}
+
+    try:
+        print(f"🏁 Benchmarking stages on {manifest}")
+        stages = run_benchmark(manifest, args.warmup)
+    finally:
+        if temp_corpus:
+            shutil.rmtree(temp_corpus, ignore_errors=True)
+
+    revision = git_revision()
+    report = {
+        'benchmark': 'extract-stages',
+        'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'revision': revision,
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'corpus': corpus_info,
+        'stages': stages,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f).get('stages')
+    print_table(stages, baseline)
+
+    output = args.output or RESULTS_DIR / f"extract-{revision or 'local'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 {output}")
+
+
+if __name__ == '__main__':
+    main()
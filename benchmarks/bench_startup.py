@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the extractor modules
+
+Imports each module in a fresh interpreter several times and reports the
+median import time, plus any heavy parsing library that got loaded as a side
+effect (importing an extractor should load none of them). Each run is
+appended to benchmarks/startup_history.json (created on the first run, and
+not checked in - the timings are only comparable on the same machine) so
+regressions show up over time.
+
+    python3 benchmarks/bench_startup.py            # measure and record
+    python3 benchmarks/bench_startup.py --check    # also fail on regressions
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+HISTORY_FILE = Path(__file__).resolve().parent / 'startup_history.json'
+MAX_HISTORY = 200
+
+MODULES = [
+    'extract_training_data_final',
+    'extract_with_pdftotext',
+    'extraction_pipeline',
+    'async_pdftotext',
+    'page_diff',
+    'extractor',
+]
+HEAVY_MODULES = ['pandas', 'pdfplumber', 'pdfminer', 'openpyxl', 'xlrd', 'numpy']
+
+# Run in the child: time the import alone, then list what it dragged in
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds,
+                  'heavy': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module: str, repeats: int) -> Dict[str, Any]:
+    """Median in-process import time and whole-interpreter wall time over `repeats` runs"""
+    import_times: List[float] = []
+    wall_times: List[float] = []
+    heavy: List[str] = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, '-c', _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=REPO_ROOT, capture_output=True, text=True,
+        )
+        wall_times.append(time.perf_counter() - started)
+        if proc.returncode != 0:
+            return {'module': module, 'error': proc.stderr.strip().splitlines()[-1:]}
+        probe = json.loads(proc.stdout.strip().splitlines()[-1])
+        import_times.append(probe['seconds'])
+        heavy = probe['heavy']
+    return {
+        'module': module,
+        'import_ms': round(statistics.median(import_times) * 1000, 1),
+        'process_ms': round(statistics.median(wall_times) * 1000, 1),
+        'heavy_imports': heavy,
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ''
+
+
+def load_history() -> List[Dict[str, Any]]:
+    try:
+        with open(HISTORY_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure extractor module import time')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--check', action='store_true',
+                        help='exit 1 on heavy imports or if a module got slower than --tolerance')
+    parser.add_argument('--tolerance', type=float, default=1.5,
+                        help='allowed slowdown vs. the previous recorded run (ratio)')
+    parser.add_argument('--no-record', action='store_true', help="don't append to the history file")
+    args = parser.parse_args()
+
+    history = load_history()
+    previous = {r['module']: r for r in history[-1]['results']} if history else {}
+
+    results = []
+    failures = []
+    print(f"{'module':<32} {'import':>9} {'process':>9}  heavy imports")
+    for module in MODULES:
+        result = measure(module, args.repeats)
+        results.append(result)
+        if 'error' in result:
+            print(f"{module:<32} ❌ {' '.join(result['error'])}")
+            failures.append(f"{module}: import failed")
+            continue
+        heavy = ', '.join(result['heavy_imports']) or '-'
+        print(f"{module:<32} {result['import_ms']:>7.1f}ms {result['process_ms']:>7.1f}ms  {heavy}")
+        if result['heavy_imports']:
+            failures.append(f"{module}: loads {heavy} at import")
+        before = previous.get(module, {}).get('import_ms')
+        if before and result['import_ms'] > before * args.tolerance:
+            failures.append(f"{module}: {before}ms → {result['import_ms']}ms")
+
+    if not args.no_record:
+        history.append({
+            'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'revision': git_revision(),
+            'python': sys.version.split()[0],
+            'results': results,
+        })
+        with open(HISTORY_FILE, 'w') as f:
+            json.dump(history[-MAX_HISTORY:], f, indent=2)
+        print(f"\n💾 {HISTORY_FILE.relative_to(REPO_ROOT)}")
+
+    if failures:
+        print("\n⚠️  Startup regressions:")
+        for failure in failures:
+            print(f"  {failure}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
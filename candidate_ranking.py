@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Candidate ranking - choose between several budget or schedule files for a project
+
+Every candidate is extracted, then ranked by how much we trust the result:
+  1. it produced a number at all
+  2. budgets: a total read off a "Grand Total"-style row beats the
+     largest-number-on-the-sheet heuristic
+  3. format: .xlsx > .xls > .pdf (spreadsheets keep their cell structure)
+  4. most recent revision, from the date / R2 / v3 in the filename, then mtime
+"""
+
+import re
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+FORMAT_RANK = {'.xlsx': 2, '.xls': 1, '.pdf': 0}
+
+# Row labels that mark a budget total, strongest first
+TOTAL_LABELS = [
+    ('grand total', 3),
+    ('total budget', 2),
+    ('total cost', 2),
+    ('budget total', 2),
+    ('production total', 2),
+    ('total', 1),
+]
+SUBTOTAL_LABELS = ['subtotal', 'sub total', 'sub-total']
+
+MONTHS = {m: i for i, m in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], 1)}
+
+# In text, only money-shaped numbers - a £ sign or thousands separators - so a
+# year or a PO / reference number on a total row isn't read as the amount
+_AMOUNT = re.compile(r'£\s*(\d+(?:,\d{3})*(?:\.\d{2})?)|(\d{1,3}(?:,\d{3})+(?:\.\d{2})?)')
+_REVISION = re.compile(r'(?:^|[^a-z])(?:r|v|rev|revision|version)[\s._-]?(\d{1,2})(?![0-9])', re.I)
+_DATE_DMY = re.compile(r'(?<!\d)(\d{1,2})[._-](\d{1,2})[._-](\d{2}|\d{4})(?!\d)')
+_DATE_ISO = re.compile(r'(?<!\d)(\d{4})[._-](\d{1,2})[._-](\d{1,2})(?!\d)')
+_DATE_TEXT = re.compile(r'(?<!\d)(\d{1,2})[\s._-]?([a-z]{3})[a-z]*[\s._-]?(\d{2}|\d{4})(?!\d)', re.I)
+_COPY = re.compile(r'^copy of |\(\d+\)$', re.I)
+
+
+def _amounts_in_cell(cell: Any) -> List[float]:
+    if isinstance(cell, bool):
+        return []
+    if isinstance(cell, (int, float)):
+        # NaN != NaN, so pandas' empty cells drop out here
+        return [float(cell)] if cell == cell and 1000 < cell < 10000000 else []
+    amounts = []
+    for pounds, separated in _AMOUNT.findall(str(cell)):
+        try:
+            amount = float((pounds or separated).replace(',', ''))
+        except ValueError:
+            continue
+        if 1000 < amount < 10000000:
+            amounts.append(amount)
+    return amounts
+
+
+def labelled_total(rows: Iterable[Sequence[Any]]) -> Optional[Tuple[float, str]]:
+    """
+    Find the total on a row labelled like a total ("GRAND TOTAL", "Total Budget" ...).
+    Rows are sequences of cell values; for PDF text pass each line as a one-cell row.
+    Returns (amount, label) for the strongest label seen, largest amount on ties.
+    """
+    best: Optional[Tuple[int, float, str]] = None
+    for row in rows:
+        cells = [c for c in row if c is not None]
+        if not cells:
+            continue
+        text = ' '.join(str(c) for c in cells).lower()
+        if 'total' not in text or any(s in text for s in SUBTOTAL_LABELS):
+            continue
+        label, strength = next(((l, s) for l, s in TOTAL_LABELS if l in text), (None, 0))
+        if not label:
+            continue
+        amounts = [a for c in cells for a in _amounts_in_cell(c)]
+        if amounts and (best is None or (strength, max(amounts)) > best[:2]):
+            best = (strength, max(amounts), label)
+    if best is None:
+        return None
+    return best[1], best[2]
+
+
+def _parse_year(year: str) -> int:
+    return int(year) + 2000 if len(year) == 2 else int(year)
+
+
+def filename_date(stem: str) -> Optional[date]:
+    """Latest plausible date written into a filename (25.05.23, 2023-05-25, 19APR21)"""
+    found = []
+    for d, m, y in _DATE_DMY.findall(stem):
+        found.append((_parse_year(y), int(m), int(d)))
+    for y, m, d in _DATE_ISO.findall(stem):
+        found.append((int(y), int(m), int(d)))
+    for d, mon, y in _DATE_TEXT.findall(stem):
+        if mon.lower() in MONTHS:
+            found.append((_parse_year(y), MONTHS[mon.lower()], int(d)))
+    dates = []
+    for y, m, d in found:
+        try:
+            dates.append(date(y, m, d))
+        except ValueError:
+            continue
+    return max(dates) if dates else None
+
+
+def revision_key(path: Path) -> Tuple[date, int, int, float]:
+    """Sort key for 'most recent revision': filename date, revision number, not-a-copy, mtime"""
+    stem = path.stem
+    revisions = [int(n) for n in _REVISION.findall(stem)]
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        mtime = 0.0
+    return (
+        filename_date(stem) or date.min,
+        max(revisions) if revisions else 0,
+        0 if _COPY.search(stem.strip()) else 1,
+        mtime,
+    )
+
+
+def candidate_key(kind: str, path: Path, data: Dict[str, Any]) -> Tuple:
+    """Confidence sort key for one extracted candidate - higher is better"""
+    if kind == 'budget':
+        found = 1 if data.get('total_gbp') else 0
+        labelled = 1 if data.get('method') == 'label' else 0
+    else:
+        found = 1 if data.get('shoot_days') else 0
+        labelled = 0
+    return (found, labelled, FORMAT_RANK.get(path.suffix.lower(), -1), revision_key(path))
+
+
+def pick_best(kind: str, candidates: List[Tuple[Path, Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Pick the most trustworthy of a project's extracted candidates. When there was a
+    choice, the winner is tagged with its file name and how many were compared.
+    """
+    if not candidates:
+        return {}
+    if len(candidates) == 1:
+        return candidates[0][1]
+    path, data = max(candidates, key=lambda c: candidate_key(kind, c[0], c[1]))
+    return {**data, 'file': path.name, 'candidates': len(candidates)}
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Columnar (Arrow / Parquet) output of extraction results
+
+The same results as training_data_complete.json, one row per project with a
+flat, typed schema instead of nested dicts, so analysis and calibration can
+read just the columns they need:
+
+    project_name, client          string
+    complete                      bool
+    techniques, locations         list<string>
+    estimated_shots, shoot_days   int32
+    total_gbp, budget_per_day     float64
+    ...                           (see FIELDS)
+
+.parquet files are zstd-compressed Parquet; .arrow / .feather files are
+uncompressed Arrow IPC, which pyarrow can memory-map and read without
+copying (pyarrow.ipc.open_file(pyarrow.memory_map(path)).read_all()).
+
+pyarrow is only imported when a table is built - the column extraction
+itself is plain Python.
+"""
+
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from lazy_modules import lazy_import
+
+pa = lazy_import('pyarrow')
+pq = lazy_import('pyarrow.parquet')
+feather = lazy_import('pyarrow.feather')
+
+REQUIRED_LIBRARIES = ['pyarrow']
+PARQUET_SUFFIXES = ('.parquet', '.pq')
+ARROW_SUFFIXES = ('.arrow', '.feather', '.ipc')
+
+Getter = Callable[[Dict[str, Any]], Any]
+
+
+def _get(section: str, key: str) -> Getter:
+    return lambda r: (r.get(section) or {}).get(key)
+
+
+def _budget_per_day(r: Dict[str, Any]) -> Optional[float]:
+    total = (r.get('budget_data') or {}).get('total_gbp')
+    days = (r.get('schedule_data') or {}).get('shoot_days')
+    return round(total / days, 2) if total and days else None
+
+
+# (column, type, value from a result) - types are the keys of _ARROW_TYPES
+FIELDS: Sequence[Tuple[str, str, Getter]] = (
+    ('project_name', 'string', lambda r: r.get('project_name')),
+    ('client', 'string', lambda r: r.get('client')),
+    ('complete', 'bool', lambda r: r.get('complete')),
+    ('techniques', 'strings', lambda r: (r.get('script_features') or {}).get('techniques', [])),
+    ('locations', 'strings', lambda r: (r.get('script_features') or {}).get('locations', [])),
+    ('estimated_shots', 'int32', _get('script_features', 'estimated_shots')),
+    ('text_length', 'int64', _get('script_features', 'text_length')),
+    ('has_children', 'bool', _get('script_features', 'has_children')),
+    ('has_animals', 'bool', _get('script_features', 'has_animals')),
+    ('has_vehicles', 'bool', _get('script_features', 'has_vehicles')),
+    ('total_gbp', 'float64', _get('budget_data', 'total_gbp')),
+    ('budget_method', 'string', _get('budget_data', 'method')),
+    ('budget_source', 'string', _get('budget_data', 'source')),
+    ('budget_file', 'string', _get('budget_data', 'file')),
+    ('budget_candidates', 'int32', _get('budget_data', 'candidates')),
+    ('shoot_days', 'int32', _get('schedule_data', 'shoot_days')),
+    ('call_times_found', 'int32', _get('schedule_data', 'call_times_found')),
+    ('setup_mentions', 'int32', _get('schedule_data', 'setup_mentions')),
+    ('budget_per_day', 'float64', _budget_per_day),
+    ('revision_family', 'string', _get('script_revision', 'family')),
+    ('superseded_by', 'string', _get('script_revision', 'superseded_by')),
+    ('error', 'string', lambda r: r.get('error')),
+)
+
+_ARROW_TYPES: Dict[str, Callable[[], Any]] = {
+    'string': lambda: pa.string(),
+    'bool': lambda: pa.bool_(),
+    'int32': lambda: pa.int32(),
+    'int64': lambda: pa.int64(),
+    'float64': lambda: pa.float64(),
+    'strings': lambda: pa.list_(pa.string()),
+}
+
+_PYTHON_TYPES: Dict[str, Callable[[Any], Any]] = {
+    'string': str, 'bool': bool, 'int32': int, 'int64': int, 'float64': float,
+    'strings': lambda v: [str(s) for s in v],
+}
+
+
+def columns(results: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """Column name -> values, one per result, coerced to the column's type (None stays null)"""
+    out: Dict[str, List[Any]] = {}
+    for name, kind, get in FIELDS:
+        coerce = _PYTHON_TYPES[kind]
+        values = []
+        for result in results:
+            value = get(result)
+            values.append(None if value is None else coerce(value))
+        out[name] = values
+    return out
+
+
+def schema() -> Any:
+    return pa.schema([pa.field(name, _ARROW_TYPES[kind]()) for name, kind, _ in FIELDS])
+
+
+def to_table(results: List[Dict[str, Any]]) -> Any:
+    return pa.Table.from_pydict(columns(results), schema=schema())
+
+
+def write_columnar(path: Path, results: List[Dict[str, Any]]) -> int:
+    """Write Parquet or Arrow IPC depending on the suffix; returns the number of rows"""
+    suffix = path.suffix.lower()
+    if suffix not in PARQUET_SUFFIXES + ARROW_SUFFIXES:
+        raise ValueError(f"{path}: expected one of {', '.join(PARQUET_SUFFIXES + ARROW_SUFFIXES)}")
+    table = to_table(results)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if suffix in PARQUET_SUFFIXES:
+        pq.write_table(table, str(path), compression='zstd')
+    else:
+        # Uncompressed so readers can memory-map it
+        feather.write_feather(table, str(path), compression='uncompressed')
+    return table.num_rows
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Comparable past projects by nearest-neighbour search over feature vectors
+
+    python3 -m extractor comparables --results training_data_complete.json   (update the index)
+    python3 -m extractor comparables --like "Toyota Corolla 25" [-k 5]
+    python3 -m extractor comparables --script new_script.pdf --shoot-type UK
+
+Each extracted project becomes a fixed-length vector - one column per
+technique, location type, talent / vehicle flag and shoot type (UK / EU /
+US / Other, from training-data.overrides.json), plus the shot count on a
+log scale - scaled to unit length, so a dot product is the cosine
+similarity. The index is a directory:
+
+    vectors.f32   the float32 matrix, one row per project, memory-mapped
+                  read-only when queried (nothing is loaded up front)
+    index.json    the columns, and per row: project, client, budget,
+                  shoot days, shoot type and a digest of its features
+
+A query is one matrix-vector product and an argpartition: well under a
+millisecond for thousands of projects. Updates are incremental - new
+projects are appended to the matrix and changed ones rewritten in place;
+only projects dropping out (a failed re-extraction, a superseded script
+revision) or a change of columns rewrite the whole file.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from json_output import read_json, write_json
+from lazy_modules import lazy_import
+from ts_codegen import DATA_DIR, OVERRIDES_FILE, SECTIONS, TECHNIQUE_FEATURES, name_key
+
+np = lazy_import('numpy')
+
+INDEX_DIR = 'comparables'
+MATRIX_FILE = 'vectors.f32'
+META_FILE = 'index.json'
+INDEX_VERSION = 1
+
+LOCATIONS = ['studio', 'outdoor', 'indoor']
+FLAGS = ['has_children', 'has_animals', 'has_vehicles']
+SHOOT_TYPES = [shoot_type for shoot_type, _ in SECTIONS]
+# Relative pull of each group of columns on the similarity
+WEIGHTS = {'technique': 1.0, 'location': 0.5, 'flag': 1.0, 'shots': 1.0, 'shoot_type': 1.0}
+# Shot counts are scaled by log1p(shots) / log1p(SHOTS_SCALE), capped at 1
+SHOTS_SCALE = 200
+
+
+def columns() -> List[str]:
+    return ([f'technique:{t}' for t in TECHNIQUE_FEATURES] + [f'location:{l}' for l in LOCATIONS] +
+            [f'flag:{f}' for f in FLAGS] + ['shots'] + [f'shoot_type:{s}' for s in SHOOT_TYPES])
+
+
+def vector(features: Dict[str, Any], shoot_type: Optional[str] = None) -> Any:
+    """A project's unit-length feature vector (all zeros if it has no features)"""
+    techniques = set(features.get('techniques', []))
+    locations = set(features.get('locations', []))
+    shots = features.get('estimated_shots') or 0
+    values = ([WEIGHTS['technique'] * (t in techniques) for t in TECHNIQUE_FEATURES] +
+              [WEIGHTS['location'] * (l in locations) for l in LOCATIONS] +
+              [WEIGHTS['flag'] * bool(features.get(f)) for f in FLAGS] +
+              [WEIGHTS['shots'] * min(np.log1p(shots) / np.log1p(SHOTS_SCALE), 1.0)] +
+              [WEIGHTS['shoot_type'] * (s == shoot_type) for s in SHOOT_TYPES])
+    v = np.array(values, dtype=np.float32)
+    norm = np.linalg.norm(v)
+    return v / norm if norm else v
+
+
+def shoot_types(data_dir: Path = DATA_DIR) -> Dict[str, str]:
+    """Shoot type by project name (and alias) from the training-data overrides"""
+    path = data_dir / OVERRIDES_FILE
+    types: Dict[str, str] = {}
+    if path.exists():
+        for override in read_json(path).get('projects', []):
+            if override.get('shootType'):
+                for name in [override.get('projectName', '')] + list(override.get('aliases', [])):
+                    types.setdefault(name_key(name), override['shootType'])
+    return types
+
+
+def _row(result: Dict[str, Any], types: Dict[str, str]) -> Optional[Tuple[Dict[str, Any], Any]]:
+    """(metadata, vector) for an indexable result, None for one that isn't"""
+    if result.get('error') or (result.get('script_revision') or {}).get('superseded_by'):
+        return None
+    features = result.get('script_features') or {}
+    if not features:
+        return None
+    name = result.get('project_name', 'Unknown')
+    shoot_type = types.get(name_key(name))
+    v = vector(features, shoot_type)
+    total = (result.get('budget_data') or {}).get('total_gbp')
+    days = (result.get('schedule_data') or {}).get('shoot_days')
+    meta = {
+        'project_name': name,
+        'client': result.get('client') or '',
+        'total_gbp': total,
+        'shoot_days': days,
+        'shoot_type': shoot_type,
+        # Budget and days aren't in the vector but are served with it
+        'digest': hashlib.sha1(v.tobytes() + json.dumps([total, days]).encode()).hexdigest()[:16],
+    }
+    return meta, v
+
+
+def update_index(directory: Path, results: List[Dict[str, Any]],
+                 data_dir: Path = DATA_DIR) -> Dict[str, int]:
+    """
+    Bring the index in directory up to date with results: append new
+    projects, rewrite changed rows in place, drop projects that no longer
+    qualify. Projects not in results are kept; one that appears more than
+    once is indexed as its last result.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    matrix_path, meta_path = directory / MATRIX_FILE, directory / META_FILE
+    cols = columns()
+    meta = read_json(meta_path) if meta_path.exists() else {}
+    rows: List[Dict[str, Any]] = meta.get('rows', [])
+    if meta.get('version') != INDEX_VERSION or meta.get('columns') != cols or not matrix_path.exists():
+        rows = []
+    position = {(r['project_name'], r['client']): i for i, r in enumerate(rows)}
+
+    types = shoot_types(data_dir)
+    appended: List[Tuple[Dict[str, Any], Any]] = []
+    changed: List[Tuple[int, Dict[str, Any], Any]] = []
+    dropped = set()
+    # A project listed twice in one batch is indexed once: the last result wins
+    latest = {(r.get('project_name', 'Unknown'), r.get('client') or ''): r for r in results}
+    for key, result in latest.items():
+        entry = _row(result, types)
+        i = position.get(key)
+        if entry is None:
+            if i is not None:
+                dropped.add(i)
+        elif i is None:
+            position[key] = len(rows) + len(appended)
+            appended.append(entry)
+        elif rows[i]['digest'] != entry[0]['digest']:
+            changed.append((i, *entry))
+
+    width = len(cols) * 4
+    if dropped or not rows:
+        # Rewrite: the surviving rows (changed ones updated), then the additions
+        old = _open_matrix(matrix_path, len(rows), len(cols))
+        updates = {i: (m, v) for i, m, v in changed}
+        new_rows, vectors = [], []
+        for i in range(len(rows)):
+            if i not in dropped:
+                m, v = updates.get(i, (rows[i], old[i]))
+                new_rows.append(m)
+                vectors.append(v)
+        new_rows += [m for m, _ in appended]
+        vectors += [v for _, v in appended]
+        matrix = np.array(vectors, dtype=np.float32).reshape(len(vectors), len(cols))
+        del old
+        tmp = matrix_path.with_suffix('.tmp')
+        matrix.tofile(tmp)
+        tmp.replace(matrix_path)
+        rows = new_rows
+    else:
+        with open(matrix_path, 'r+b') as f:
+            for i, m, v in changed:
+                f.seek(i * width)
+                f.write(v.astype(np.float32).tobytes())
+                rows[i] = m
+            # Rows past the last recorded one are from an interrupted update
+            f.truncate(len(rows) * width)
+            f.seek(len(rows) * width)
+            for m, v in appended:
+                f.write(v.astype(np.float32).tobytes())
+                rows.append(m)
+    write_json(meta_path, {'version': INDEX_VERSION, 'columns': cols, 'rows': rows}, 'compact')
+    return {'rows': len(rows), 'added': len(appended), 'changed': len(changed), 'dropped': len(dropped)}
+
+
+def _open_matrix(path: Path, n: int, d: int) -> Any:
+    if n == 0:
+        return np.zeros((0, d), dtype=np.float32)
+    return np.memmap(path, dtype=np.float32, mode='r', shape=(n, d))
+
+
+class ComparablesIndex:
+    """Read-only view of an index directory; the matrix is memory-mapped, not loaded"""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        meta = read_json(self.directory / META_FILE)
+        if meta.get('version') != INDEX_VERSION:
+            raise ValueError(f'{self.directory}: index version {meta.get("version")}, expected {INDEX_VERSION}')
+        self.columns: List[str] = meta['columns']
+        self.rows: List[Dict[str, Any]] = meta['rows']
+        self.matrix = _open_matrix(self.directory / MATRIX_FILE, len(self.rows), len(self.columns))
+        self._by_name = {name_key(r['project_name']): i for i, r in enumerate(self.rows)}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def query(self, v: Any, k: int = 5, exclude: Sequence[int] = ()) -> List[Dict[str, Any]]:
+        """The k rows most similar to v, best first, with their similarity and budget per day"""
+        if not self.rows:
+            return []
+        scores = self.matrix @ np.asarray(v, dtype=np.float32)
+        if exclude:
+            scores[list(exclude)] = -np.inf
+        k = min(k, len(self.rows) - len(exclude))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        matches = []
+        for i in top.tolist():
+            row = {key: value for key, value in self.rows[i].items() if key != 'digest'}
+            total, days = row['total_gbp'], row['shoot_days']
+            row['budget_per_day'] = round(total / days) if total and days else None
+            row['similarity'] = round(float(scores[i]), 4)
+            matches.append(row)
+        return matches
+
+    def like(self, project_name: str, k: int = 5) -> List[Dict[str, Any]]:
+        """Comparables for an indexed project (itself left out)"""
+        i = self._by_name.get(name_key(project_name))
+        if i is None:
+            raise KeyError(project_name)
+        return self.query(np.array(self.matrix[i]), k, exclude=[i])
+
+    def for_features(self, features: Dict[str, Any], shoot_type: Optional[str] = None,
+                     k: int = 5) -> List[Dict[str, Any]]:
+        """Comparables for a new script's features"""
+        return self.query(vector(features, shoot_type), k)
+
+
+def budget_range(matches: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Min / median / max budget per day across comparables that have one"""
+    per_day = np.array([m['budget_per_day'] for m in matches if m.get('budget_per_day')], dtype=np.float64)
+    if not per_day.size:
+        return None
+    return {'min': int(per_day.min()), 'median': int(np.median(per_day)), 'max': int(per_day.max()),
+            'samples': int(per_day.size)}
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Per-day cost bands calibrated from extraction results
+
+    python3 -m extractor calibrate --results training_data_complete.json [--resamples 1000]
+
+Every project with a budget total and shoot days gives a cost per shoot
+day. Against it this fits, in one vectorized pass with numpy:
+
+    bands     the 25th / 50th / 75th percentile of £/day (lean / standard /
+              ambitious) per complexity tier (simple ... very_complex),
+              counted from the techniques and child talent - the drivers
+              the app's estimator has for a script
+    drivers   £/day each script feature adds - techniques, locations, child
+              and animal talent, vehicles, shoot days - by least squares and
+              by median (quantile) regression
+
+with bootstrap intervals for all of them: the resamples are drawn at once
+as a (resamples x projects) count matrix, so the fits are batched matrix
+products rather than a Python loop - a few seconds for thousands of
+projects, a fraction of one for the current corpus.
+
+`codegen` writes the result into the generated block of
+src/lib/cost/constants.ts (CALIBRATED_COST_BANDS, DAY_RATE_DRIVERS) next
+to the hand-set bands, which it leaves alone. Tiers with fewer than
+MIN_SAMPLES projects get no band. Earlier script revisions and failed
+projects are not counted.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from lazy_modules import lazy_import
+from ts_codegen import complexity_tier, replace_block, ts_value
+
+np = lazy_import('numpy')
+
+COST_DIR = Path(__file__).resolve().parent / 'src' / 'lib' / 'cost'
+TS_FILE = 'constants.ts'
+
+# Lean / standard / ambitious
+QUANTILES = {'lean': 0.25, 'standard': 0.5, 'ambitious': 0.75}
+TIERS = ['simple', 'standard', 'complex', 'very_complex']
+# (driver, value from a result's script features and shoot days)
+DRIVERS = [
+    ('baseline', lambda f, days: 1.0),
+    ('techniques', lambda f, days: len(f.get('techniques', []))),
+    ('locations', lambda f, days: len(f.get('locations', []))),
+    ('children', lambda f, days: float(bool(f.get('has_children')))),
+    ('animals', lambda f, days: float(bool(f.get('has_animals')))),
+    ('vehicles', lambda f, days: float(bool(f.get('has_vehicles')))),
+    ('shootDays', lambda f, days: days),
+]
+# What a tier counts: getScriptCostDrivers in estimator.ts has no animal or
+# vehicle input, so ts_codegen.complexity_for's count would put projects in
+# tiers the app never looks up
+TIER_DRIVERS = ['techniques', 'children']
+MIN_SAMPLES = 3
+RESAMPLES = 1000
+CONFIDENCE = 0.9
+IRLS_ITERATIONS = 30
+# £/day - an order below the £100 the drivers are written to
+IRLS_TOLERANCE = 10.0
+
+
+def gather(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """£/day, the driver matrix and the complexity tier of every usable project"""
+    tier_columns = [i for i, (name, _) in enumerate(DRIVERS) if name in TIER_DRIVERS]
+    per_day, rows, tiers = [], [], []
+    for result in results:
+        if result.get('error') or (result.get('script_revision') or {}).get('superseded_by'):
+            continue
+        total = (result.get('budget_data') or {}).get('total_gbp')
+        days = (result.get('schedule_data') or {}).get('shoot_days')
+        if not total or not days or days <= 0:
+            continue
+        features = result.get('script_features') or {}
+        per_day.append(total / days)
+        rows.append([value(features, days) for _, value in DRIVERS])
+        tiers.append(complexity_tier(sum(int(rows[-1][i]) for i in tier_columns)))
+    return {
+        'per_day': np.array(per_day, dtype=np.float64),
+        'X': np.array(rows, dtype=np.float64).reshape(len(rows), len(DRIVERS)),
+        'tiers': np.array(tiers, dtype=object),
+    }
+
+
+def _weighted_lstsq(X: Any, y: Any, weights: Any) -> Any:
+    """Least squares for a stack of row weightings: weights (B, n) -> coefficients (B, p)"""
+    p = X.shape[1]
+    # X'WX for every row of weights as one matrix product with the rows' outer
+    # products (upper triangle only - it's symmetric)
+    upper = np.triu_indices(p)
+    products = weights @ (X[:, upper[0]] * X[:, upper[1]])
+    xtx = np.empty((weights.shape[0], p, p))
+    xtx[:, upper[0], upper[1]] = products
+    xtx[:, upper[1], upper[0]] = products
+    xty = weights @ (X * y[:, None])
+    # A touch of ridge keeps resamples that miss a rare feature solvable
+    ridge = 1e-9 * np.trace(xtx, axis1=1, axis2=2)[:, None, None] * np.eye(p)
+    return np.linalg.solve(xtx + ridge, xty[..., None])[..., 0]
+
+
+def _quantile_regression(X: Any, y: Any, counts: Any, q: float) -> Any:
+    """Quantile regression by iteratively reweighted least squares, batched over the resamples"""
+    beta = _weighted_lstsq(X, y, counts)
+    floor = 1e-6 * max(float(np.abs(y).mean()), 1.0)
+    for _ in range(IRLS_ITERATIONS):
+        residuals = y[None, :] - beta @ X.T
+        check = np.where(residuals >= 0, q, 1 - q)
+        previous, beta = beta, _weighted_lstsq(X, y, counts * check / np.maximum(np.abs(residuals), floor))
+        if np.abs(beta - previous).max() <= IRLS_TOLERANCE:
+            break
+    return beta
+
+
+def _interval(samples: Any, axis: int = 0) -> Tuple[Any, Any]:
+    tail = (1 - CONFIDENCE) / 2
+    return np.quantile(samples, tail, axis=axis), np.quantile(samples, 1 - tail, axis=axis)
+
+
+def calibrate(gathered: Dict[str, Any], resamples: int = RESAMPLES, seed: int = 0) -> Dict[str, Any]:
+    """Bands per tier and driver coefficients, each with a bootstrap interval"""
+    y, X, tiers = gathered['per_day'], gathered['X'], gathered['tiers']
+    n = y.size
+    rng = np.random.default_rng(seed)
+    report: Dict[str, Any] = {'projects': int(n), 'resamples': resamples, 'confidence': CONFIDENCE,
+                              'bands': {}, 'drivers': {}, 'too_few': {}}
+
+    levels = np.array(list(QUANTILES.values()))
+    for tier in TIERS:
+        values = y[tiers == tier]
+        if values.size < MIN_SAMPLES:
+            if values.size:
+                report['too_few'][tier] = int(values.size)
+            continue
+        # Resample the tier's values: (resamples, n_tier) -> quantiles (levels, resamples)
+        boot = np.quantile(values[rng.integers(0, values.size, (resamples, values.size))], levels, axis=1)
+        low, high = _interval(boot, axis=1)
+        point = np.quantile(values, levels)
+        report['bands'][tier] = {
+            **{name: float(point[i]) for i, name in enumerate(QUANTILES)},
+            'samples': int(values.size),
+            'interval': {name: [float(low[i]), float(high[i])] for i, name in enumerate(QUANTILES)},
+        }
+
+    # Features every project shares can't be fitted - leave them out rather than report a 0
+    active = [0] + [j for j in range(1, X.shape[1]) if n and np.ptp(X[:, j]) > 0]
+    report['unobserved'] = [DRIVERS[j][0] for j in range(1, X.shape[1]) if j not in active]
+    X = X[:, active]
+    # One driver per column needs more projects than columns to say anything
+    if n > X.shape[1]:
+        # How often each project is drawn in each resample: (resamples, n)
+        draws = rng.integers(0, n, (resamples, n)) + np.arange(resamples)[:, None] * n
+        counts = np.bincount(draws.ravel(), minlength=resamples * n).reshape(resamples, n).astype(np.float64)
+        ones = np.ones((1, n))
+        least_squares = _weighted_lstsq(X, y, ones)[0]
+        median = _quantile_regression(X, y, ones, 0.5)[0]
+        low, high = _interval(_weighted_lstsq(X, y, counts))
+        median_low, median_high = _interval(_quantile_regression(X, y, counts, 0.5))
+        for i, name in enumerate(DRIVERS[j][0] for j in active):
+            report['drivers'][name] = {
+                'leastSquares': float(least_squares[i]), 'median': float(median[i]),
+                'interval': [float(low[i]), float(high[i])],
+                'medianInterval': [float(median_low[i]), float(median_high[i])],
+            }
+    return report
+
+
+def _round(value: float, step: int) -> int:
+    return int(np.floor(value / step + 0.5)) * step
+
+
+def render(report: Dict[str, Any]) -> str:
+    """The generated block: bands to the nearest £1k, drivers to the nearest £100"""
+    lines = [f"// {report['projects']} projects with a budget and shoot days; "
+             f"{int(report['confidence'] * 100)}% bootstrap intervals ({report['resamples']} resamples)",
+             'export const CALIBRATED_COST_BANDS: Record<string, CalibratedCostBand> = {']
+    for tier, band in report['bands'].items():
+        entry = {name: _round(band[name], 1000) for name in QUANTILES}
+        entry['samples'] = band['samples']
+        entry['interval'] = {name: [_round(v, 1000) for v in band['interval'][name]] for name in QUANTILES}
+        lines.append(f'  {tier}: {ts_value(entry)},')
+    lines += ['};', '', 'export const DAY_RATE_DRIVERS: Record<string, CostDriver> = {']
+    for name, driver in report['drivers'].items():
+        entry = {key: ([_round(v, 100) for v in value] if isinstance(value, list) else _round(value, 100))
+                 for key, value in driver.items()}
+        lines.append(f'  {name}: {ts_value(entry)},')
+    lines.append('};')
+    return '\n'.join(lines) + '\n'
+
+
+def generate(results: List[Dict[str, Any]], cost_dir: Path = COST_DIR, check: bool = False,
+             resamples: int = RESAMPLES, seed: int = 0) -> Dict[str, Any]:
+    """
+    Recalibrate the block in constants.ts. A run with no usable projects
+    leaves the file as it is.
+    """
+    report = calibrate(gather(results), resamples, seed)
+    path = cost_dir / TS_FILE
+    source = path.read_text()
+    if not report['bands'] and not report['drivers']:
+        return {**report, 'stale' if check else 'written': []}
+    updated = replace_block(source, render(report), path)
+    changed = [str(path)] if updated != source else []
+    if changed and not check:
+        path.write_text(updated)
+    return {**report, 'stale' if check else 'written': changed}
+
+
+def describe(report: Dict[str, Any]) -> List[str]:
+    """The report as aligned text lines, for the calibrate command"""
+    lines = [f"{report['projects']} projects, {report['resamples']} resamples, "
+             f"{int(report['confidence'] * 100)}% intervals"]
+    if report['bands']:
+        lines.append(f"{'tier':<14}{'n':>4}" + ''.join(f'{name:>26}' for name in QUANTILES))
+        for tier, band in report['bands'].items():
+            cells = ''.join(f"{band[name]:>10,.0f} [{band['interval'][name][0]:>6,.0f}-"
+                            f"{band['interval'][name][1]:<6,.0f}]" for name in QUANTILES)
+            lines.append(f"{tier:<14}{band['samples']:>4}{cells}")
+    for tier, samples in report['too_few'].items():
+        lines.append(f'{tier:<14}{samples:>4}  (fewer than {MIN_SAMPLES} projects - no band)')
+    if report['drivers']:
+        lines.append(f"{'driver':<14}{'least squares':>28}{'median':>28}")
+        for name, d in report['drivers'].items():
+            lines.append(f"{name:<14}{d['leastSquares']:>10,.0f} [{d['interval'][0]:>7,.0f}, {d['interval'][1]:>7,.0f}]"
+                         f"{d['median']:>10,.0f} [{d['medianInterval'][0]:>7,.0f}, {d['medianInterval'][1]:>7,.0f}]")
+    if report['unobserved']:
+        lines.append(f"the same for every project (not fitted): {', '.join(report['unobserved'])}")
+    return lines
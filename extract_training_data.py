@@ -11,6 +11,8 @@ from pathlib import Path
 from typing import Dict, Any
 import re
 
+from json_output import write_json
+
 # Simple text extraction - no heavy libraries
 def extract_text_from_pdf_simple(pdf_path: Path, max_pages: int = 5) -> str:
     """Extract text using pdftotext if available, otherwise skip"""
@@ -202,9 +204,7 @@ def main():
             results.append(result)
             
             # Save incrementally
-            output_path = output_dir / "training_data_partial.json"
-            with open(output_path, 'w') as f:
-                json.dump(results, f, indent=2)
+            write_json(output_dir / "training_data_partial.json", results, 'compact')
                 
         except Exception as e:
             print(f"  ✗ Failed: {e}")
@@ -218,9 +218,7 @@ def main():
     print("EXTRACTION COMPLETE")
     print(f"{'='*60}")
     
-    output_path = output_dir / "training_data_complete.json"
-    with open(output_path, 'w') as f:
-        json.dump(results, f, indent=2)
+    output_path = write_json(output_dir / "training_data_complete.json", results)
     
     print(f"\nSaved to: {output_path}")
     
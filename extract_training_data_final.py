@@ -4,57 +4,110 @@ Production data extractor - FINAL VERSION
 Copies files from iCloud to temp directory first to avoid file locking issues
 """
 
+import argparse
+import copy
 import json
 import os
 import sys
 import shutil
 import tempfile
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
 import re
 import warnings
-warnings.filterwarnings('ignore')
-
-try:
-    import pdfplumber
-    import pandas as pd
-    LIBRARIES_OK = True
-except ImportError as e:
-    print(f"❌ Missing libraries: {e}")
-    print("Run: pip3 install pdfplumber pandas openpyxl xlrd")
-    LIBRARIES_OK = False
-    sys.exit(1)
-
-# Create temp directory for file copies
-TEMP_DIR = Path(tempfile.mkdtemp(prefix='production_data_'))
-print(f"📁 Temp directory: {TEMP_DIR}")
+from contextlib import closing
+from functools import partial
 
+import columnar_output
+import comparables
+import cost_calibration
+import schedule_patterns
+import ts_codegen
+from candidate_ranking import labelled_total, pick_best
+from extractor.backends import ROW_READERS, ROWS, TEXT, Backend, choose_backend
+from extractor.bench import saved_throughput
+from extraction_cost import CostModel, EtaTracker, format_duration, longest_first, project_costs
+from extraction_pipeline import run_pipeline
+from file_dedup import DedupIndex
+from json_output import FORMATS, write_json, write_results
+from lazy_modules import require
+from page_diff import PageCache, extract_pages_incremental
+from revision_index import RevisionIndex, script_signature
+from run_metrics import (REPORT_FILE, STAGES, FileMetrics, RunReport, count, make_span, recording,
+                         set_profiler, set_tracing, stage, stat_file, timed, tracing)
+from schedule_parser import iter_sheet_rows, parse_schedule
+from script_features import (SCRIPT_SCAN_VERSION, extract_features_from_script, scan_script_text,
+                             scene_headings, script_features_from_scan)
+from stage_profiler import PROFILE_DIR, Profiler, profile_index
+from prom_textfile import TextfileExporter
+from results_store import STORE_FILE, ResultsStore
+from text_index import collecting, collecting_pages, keep_page
+from trace_events import write_trace
+
+REQUIRED_LIBRARIES = ['pdfplumber', 'pandas', 'openpyxl', 'xlrd']
+# Backends (extractor.backends) to read with, preferred first when there's
+# no bench report; page-level
+# reuse (page_diff) reads scripts with pdfplumber whatever this says
+PDF_READERS = ('pdfplumber', 'pdftotext')
+
+# Temp directory for file copies - created on first copy so parser
+# worker processes that import this module don't each make one
+TEMP_DIR: Optional[Path] = None
+
+def get_temp_dir() -> Path:
+    """Return the temp directory, creating it on first use"""
+    global TEMP_DIR
+    if TEMP_DIR is None:
+        TEMP_DIR = Path(tempfile.mkdtemp(prefix='production_data_'))
+        print(f"📁 Temp directory: {TEMP_DIR}")
+    return TEMP_DIR
+
+@timed('stage')
 def copy_to_temp(source_path: Path) -> Path:
     """Copy file to temp directory to avoid iCloud locking"""
     try:
-        temp_path = TEMP_DIR / source_path.name
+        # One subdirectory per copy so same-named files from different
+        # projects can be staged at the same time
+        temp_path = Path(tempfile.mkdtemp(dir=get_temp_dir())) / source_path.name
         shutil.copy2(source_path, temp_path)
         return temp_path
     except Exception as e:
         print(f"      ⚠️ Copy failed: {e}")
         return source_path
 
-def extract_text_from_pdf(pdf_path: Path, max_pages: int = 10, max_chars: int = 50000) -> str:
-    """Extract text from PDF using pdfplumber"""
+def remove_temp_copy(temp_path: Path) -> None:
+    """Delete a copy made by copy_to_temp once it has been parsed"""
+    if TEMP_DIR is not None and temp_path.parent.parent == TEMP_DIR:
+        shutil.rmtree(temp_path.parent, ignore_errors=True)
+
+def reader_for(path: Path, capability: str, prefer: Tuple[str, ...]) -> Backend:
+    """
+    The backend to read a file with (extractor.backends): the fastest by a
+    saved bench report, else the first available of prefer
+    """
+    backend = choose_backend(path.suffix, capability, throughput=saved_throughput(), prefer=prefer)
+    if backend is None:
+        raise RuntimeError(f'no reader for {path.suffix} installed')
+    return backend
+
+def extract_text_from_pdf(pdf_path: Path, max_pages: int = 10, max_chars: int = 50000, staged: bool = False) -> str:
+    """Extract text from PDF, a page at a time, with the reader reader_for picks"""
     try:
-        # Copy to temp first
-        temp_path = copy_to_temp(pdf_path)
+        # Copy to temp first, unless the pipeline already did
+        temp_path = pdf_path if staged else copy_to_temp(pdf_path)
+        backend = reader_for(temp_path, TEXT, PDF_READERS)
         
         text_parts = []
-        with pdfplumber.open(temp_path) as pdf:
-            pages_to_read = min(len(pdf.pages), max_pages)
-            
-            for i, page in enumerate(pdf.pages[:pages_to_read]):
-                if len(''.join(text_parts)) > max_chars:
+        total = 0
+        with stage('text_extract'), closing(backend.read_pages(temp_path, max_pages)) as pages:
+            for i, page_text in enumerate(pages):
+                if total > max_chars:
                     break
-                page_text = page.extract_text()
+                count('pages_parsed')
+                keep_page(i + 1, page_text)
                 if page_text:
                     text_parts.append(page_text)
+                    total += len(page_text)
         
         full_text = '\n'.join(text_parts)
         return full_text[:max_chars]
@@ -62,87 +115,59 @@ def extract_text_from_pdf(pdf_path: Path, max_pages: int = 10, max_chars: int =
     except Exception as e:
         return f"[PDF extraction failed: {e}]"
 
-def extract_features_from_script(text: str) -> Dict[str, Any]:
-    """Extract key features from script text"""
-    text_lower = text.lower()
-    
-    techniques = []
-    technique_keywords = {
-        'moco': ['moco', 'motion control', 'mo-co'],
-        'drone': ['drone', 'aerial', 'uav'],
-        'tracking': ['tracking shot', 'tracking', 'dolly track'],
-        'vfx': ['vfx', 'visual effects', 'green screen', 'greenscreen', 'cgi'],
-        'night_shoot': ['night shoot', 'night exterior', 'night int', 'night ext'],
-        'underwater': ['underwater', 'submerged'],
-        'crane': ['crane shot', 'crane', 'jib'],
-        'steadicam': ['steadicam', 'steadi'],
-        'handheld': ['handheld', 'hand held'],
-        'slow_motion': ['slow motion', 'slow-motion', 'high speed', 'phantom'],
-        'time_lapse': ['time lapse', 'time-lapse', 'timelapse']
-    }
-    
-    for tech, keywords in technique_keywords.items():
-        if any(kw in text_lower for kw in keywords):
-            techniques.append(tech)
-    
-    locations = []
-    if 'studio' in text_lower or 'sound stage' in text_lower:
-        locations.append('studio')
-    if any(word in text_lower for word in ['exterior', 'ext.', 'outdoor', 'location']):
-        locations.append('outdoor')
-    if 'interior' in text_lower or 'int.' in text_lower:
-        locations.append('indoor')
-    
-    shot_patterns = [
-        r'shot\s+\d+',
-        r'scene\s+\d+',
-        r'sc\.\s*\d+',
-        r'\d+\s*\.\s*(?:int|ext)'
-    ]
+def extract_script(script_path: Path, staged: bool = False,
+                   page_cache: Optional[Path] = None) -> Tuple[Dict[str, Any], str, Dict[str, int]]:
+    """
+    Extract script features, returning (features, text, page stats). With a
+    page_cache directory, only pages not seen in an earlier revision are
+    parsed and scanned.
+    """
+    if page_cache is None:
+        text = extract_text_from_pdf(script_path, max_pages=20, staged=staged)
+        return extract_features_from_script(text), text, {}
     
-    all_shots = []
-    for pattern in shot_patterns:
-        matches = re.findall(pattern, text_lower)
-        all_shots.extend(matches)
-    
-    estimated_shots = len(set(all_shots)) if all_shots else None
-    
-    has_children = any(word in text_lower for word in ['child', 'kid', 'baby', 'infant'])
-    has_animals = any(word in text_lower for word in ['dog', 'cat', 'horse', 'animal'])
-    has_vehicles = any(word in text_lower for word in ['car', 'vehicle', 'truck', 'motorcycle'])
-    
-    return {
-        'techniques': techniques,
-        'locations': locations,
-        'estimated_shots': estimated_shots,
-        'has_children': has_children,
-        'has_animals': has_animals,
-        'has_vehicles': has_vehicles,
-        'text_length': len(text)
-    }
+    temp_path = script_path if staged else copy_to_temp(script_path)
+    try:
+        with stage('text_extract'):
+            text, scan, stats = extract_pages_incremental(
+                temp_path, scan_script_text, PageCache(page_cache, SCRIPT_SCAN_VERSION),
+                max_pages=20, max_chars=50000)
+    except Exception as e:
+        text = f"[PDF extraction failed: {e}]"
+        return extract_features_from_script(text), text, {}
+    count('pages_parsed', stats.parsed)
+    return script_features_from_scan(scan, len(text)), text, stats.as_dict()
+
+def sheet_text(rows: List[Tuple[Any, ...]]) -> str:
+    """A sheet as text for the search index - one line per row"""
+    return '\n'.join(' '.join(str(v) for v in row if v is not None) for row in rows)
 
-def extract_from_excel_budget(budget_path: Path) -> Dict[str, Any]:
-    """Extract budget data from Excel (.xls or .xlsx) using pandas"""
+def extract_from_excel_budget(budget_path: Path, staged: bool = False) -> Dict[str, Any]:
+    """Extract budget data from Excel (.xls or .xlsx) with the first available of ROW_READERS"""
     try:
         # Copy to temp first to avoid iCloud locking
-        temp_path = copy_to_temp(budget_path)
+        temp_path = budget_path if staged else copy_to_temp(budget_path)
         
         # Try to read the file
         try:
-            df = pd.read_excel(temp_path, sheet_name=0, header=None)
+            backend = reader_for(temp_path, ROWS, ROW_READERS)
+            rows = list(backend.read_rows(temp_path))
         except Exception as e:
             return {'total_gbp': None, 'error': f'read error: {str(e)[:50]}'}
+        count('cells_scanned', sum(len(row) for row in rows))
+        if collecting():
+            keep_page(1, sheet_text(rows))
         
         amounts = []
         
         # Iterate through all cells
-        for col in df.columns:
-            for val in df[col]:
-                if pd.isna(val):
+        for row in rows:
+            for val in row:
+                if val is None:
                     continue
                 
                 # Check if numeric
-                if isinstance(val, (int, float)):
+                if isinstance(val, (int, float)) and not isinstance(val, bool):
                     if 10000 < val < 10000000:
                         amounts.append(float(val))
                 
@@ -157,11 +182,23 @@ def extract_from_excel_budget(budget_path: Path) -> Dict[str, Any]:
                         except:
                             pass
         
+        # A "Grand Total" row beats the largest number on the sheet
+        labelled = labelled_total(rows)
+        if labelled:
+            return {
+                'total_gbp': round(labelled[0], 2),
+                'source': f'{budget_path.suffix}_{backend.name}',
+                'method': 'label',
+                'label': labelled[1],
+                'amounts_found': len(amounts)
+            }
+        
         if amounts:
             total = max(amounts)
             return {
                 'total_gbp': round(total, 2),
-                'source': f'{budget_path.suffix}_pandas',
+                'source': f'{budget_path.suffix}_{backend.name}',
+                'method': 'max',
                 'amounts_found': len(amounts)
             }
         
@@ -170,10 +207,10 @@ def extract_from_excel_budget(budget_path: Path) -> Dict[str, Any]:
     except Exception as e:
         return {'total_gbp': None, 'error': f'parse error: {str(e)[:50]}'}
 
-def extract_from_pdf_budget(budget_path: Path) -> Dict[str, Any]:
+def extract_from_pdf_budget(budget_path: Path, staged: bool = False) -> Dict[str, Any]:
     """Extract budget data from PDF"""
     try:
-        text = extract_text_from_pdf(budget_path, max_pages=15)
+        text = extract_text_from_pdf(budget_path, max_pages=15, staged=staged)
         
         gbp_matches = re.findall(r'£\s*([\d,]+(?:\.\d{2})?)', text)
         
@@ -186,11 +223,22 @@ def extract_from_pdf_budget(budget_path: Path) -> Dict[str, Any]:
             except:
                 pass
         
+        labelled = labelled_total([line] for line in text.splitlines())
+        if labelled:
+            return {
+                'total_gbp': round(labelled[0], 2),
+                'source': 'pdf_extracted',
+                'method': 'label',
+                'label': labelled[1],
+                'amounts_found': len(amounts)
+            }
+        
         if amounts:
             total = max(amounts)
             return {
                 'total_gbp': round(total, 2),
                 'source': 'pdf_extracted',
+                'method': 'max',
                 'amounts_found': len(amounts)
             }
         
@@ -199,54 +247,80 @@ def extract_from_pdf_budget(budget_path: Path) -> Dict[str, Any]:
     except Exception as e:
         return {'total_gbp': None, 'error': f'PDF error: {str(e)[:50]}'}
 
-def extract_from_schedule(schedule_path: Path) -> Dict[str, Any]:
-    """Extract schedule data from PDF or Excel"""
+def _kept(rows: Iterator[str], lines: List[str]) -> Iterator[str]:
+    for row in rows:
+        lines.append(row)
+        yield row
+
+@timed('schedule_scan')
+def extract_from_schedule(schedule_path: Path, staged: bool = False) -> Dict[str, Any]:
+    """Extract schedule data from PDF or Excel, row by row"""
     try:
         if schedule_path.suffix.lower() in ['.xlsx', '.xls']:
             # Copy to temp first
-            temp_path = copy_to_temp(schedule_path)
+            temp_path = schedule_path if staged else copy_to_temp(schedule_path)
             
             try:
-                df = pd.read_excel(temp_path, sheet_name=0, header=None)
-                text_parts = []
-                for col in df.columns:
-                    for val in df[col]:
-                        if not pd.isna(val):
-                            text_parts.append(str(val))
-                text = ' '.join(text_parts)
+                rows = iter_sheet_rows(temp_path)
+                if not collecting():
+                    return parse_schedule(rows)
+                # The search index gets the sheet as one page, a line per row
+                lines: List[str] = []
+                data = parse_schedule(_kept(rows, lines))
+                keep_page(1, '\n'.join(lines))
+                return data
             except Exception as e:
                 return {'shoot_days': None, 'error': f'read error: {str(e)[:50]}'}
         else:
             # PDF schedule
-            text = extract_text_from_pdf(schedule_path, max_pages=20)
-        
-        text_lower = text.lower()
-        
-        # Count day references
-        day_matches = re.findall(r'day\s+(\d+)', text_lower)
-        shoot_day_matches = re.findall(r'shoot\s+day\s+(\d+)', text_lower)
-        
-        all_days = day_matches + shoot_day_matches
-        shoot_days = max([int(d) for d in all_days]) if all_days else None
-        
-        # Look for call times
-        call_time_matches = re.findall(r'call[:\s]+(\d{1,2})[:\.](\d{2})', text_lower)
-        
-        # Count setups
-        setup_mentions = len(re.findall(r'setup|set[\s-]up', text_lower))
-        
-        return {
-            'shoot_days': shoot_days,
-            'call_times_found': len(call_time_matches),
-            'setup_mentions': setup_mentions,
-            'text_length': len(text)
-        }
+            text = extract_text_from_pdf(schedule_path, max_pages=20, staged=staged)
+            return parse_schedule(text.splitlines())
         
     except Exception as e:
         return {'shoot_days': None, 'error': f'parse error: {str(e)[:50]}'}
 
-def process_project(project: Dict[str, Any], base_path: Path) -> Dict[str, Any]:
-    """Process a single project"""
+def read_once(kind: str, path: Path, read: Callable[[Path], Dict[str, Any]],
+              dedup: Optional[DedupIndex] = None,
+              extracted: Optional[Dict[Tuple[str, str], Any]] = None,
+              ) -> Tuple[Dict[str, Any], Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Read one file, returning (data, metrics, pages). extracted holds the
+    (kind, content key) pairs the run reads more than once (see
+    DedupIndex.repeated), each None until its first read; later references
+    get a copy of that read, their metrics marked duplicate_of, as in the
+    pipeline.
+    """
+    key = (kind, dedup.key(path)) if dedup is not None and extracted is not None else None
+    if extracted and extracted.get(key) is not None:
+        first, data, pages = extracted[key]
+        return copy.deepcopy(data), FileMetrics(kind, str(path), duplicate_of=str(first)).as_dict(), pages
+    with recording(kind, path) as metrics, collecting_pages() as pages:
+        stat_file(path)
+        data = read(path)
+    metrics.error = data.get('error')
+    if extracted is not None and key in extracted:
+        extracted[key] = (path, copy.deepcopy(data), pages)
+    return data, metrics.as_dict(), pages
+
+def read_script(script_path: Path, page_cache: Optional[Path] = None) -> Dict[str, Any]:
+    """A script's features plus what the run keeps from its text, for process_project"""
+    features, text, page_stats = extract_script(script_path, page_cache=page_cache)
+    return {
+        'script_features': features,
+        '_script_signature': script_signature(text),
+        '_scenes': scene_headings(text),
+        '_page_stats': page_stats,
+        'error': script_error(text),
+    }
+
+def process_project(project: Dict[str, Any], base_path: Path, page_cache: Optional[Path] = None,
+                    dedup: Optional[DedupIndex] = None,
+                    extracted: Optional[Dict[Tuple[str, str], Any]] = None) -> Dict[str, Any]:
+    """
+    Process a single project. With dedup and a shared extracted dict,
+    content read for an earlier project (or an earlier file of this one) is
+    reused rather than read again.
+    """
     project_name = project.get('project_name', 'Unknown')
     print(f"\n{'='*60}")
     print(f"📦 {project_name}")
@@ -260,6 +334,8 @@ def process_project(project: Dict[str, Any], base_path: Path) -> Dict[str, Any]:
         'budget_data': {},
         'schedule_data': {}
     }
+    file_metrics = []
+    documents = []
     
     files = project.get('files', {})
     
@@ -270,8 +346,16 @@ def process_project(project: Dict[str, Any], base_path: Path) -> Dict[str, Any]:
             script_path = Path(script_file['path'])
             if script_path.exists():
                 print(f"  📄 {script_path.name}")
-                text = extract_text_from_pdf(script_path, max_pages=20)
-                result['script_features'] = extract_features_from_script(text)
+                script, metrics, pages = read_once('script', script_path,
+                                                   partial(read_script, page_cache=page_cache),
+                                                   dedup, extracted)
+                file_metrics.append(metrics)
+                documents.append({'kind': 'script', 'path': str(script_path), 'pages': pages})
+                result['script_features'] = script['script_features']
+                result['_script_signature'] = script['_script_signature']
+                result['_scenes'] = script['_scenes']
+                # A reused read parsed no pages
+                result['_page_stats'] = {} if 'duplicate_of' in metrics else script['_page_stats']
                 if result['script_features']['text_length'] > 0:
                     print(f"     ✓ {result['script_features']['text_length']} chars", end='')
                     if result['script_features']['techniques']:
@@ -279,77 +363,251 @@ def process_project(project: Dict[str, Any], base_path: Path) -> Dict[str, Any]:
                     else:
                         print()
     
-    # Process budget
-    if 'budget' in files:
-        budget_file = files['budget']
-        if isinstance(budget_file, dict) and 'path' in budget_file:
-            budget_path = Path(budget_file['path'])
-            if budget_path.exists():
-                print(f"  💰 {budget_path.name}")
-                ext = budget_path.suffix.lower()
-                if ext in ['.xls', '.xlsx']:
-                    result['budget_data'] = extract_from_excel_budget(budget_path)
-                else:
-                    result['budget_data'] = extract_from_pdf_budget(budget_path)
-                
-                if result['budget_data'].get('total_gbp'):
-                    print(f"     ✓ £{result['budget_data']['total_gbp']:,.2f}")
-                elif result['budget_data'].get('error'):
-                    print(f"     ⚠️  {result['budget_data']['error']}")
-                    
-        elif isinstance(budget_file, list):
-            for bf in budget_file:
-                if isinstance(bf, dict) and 'path' in bf:
-                    budget_path = Path(bf['path'])
-                    if budget_path.exists():
-                        print(f"  💰 {budget_path.name}")
-                        ext = budget_path.suffix.lower()
-                        if ext in ['.xls', '.xlsx']:
-                            result['budget_data'] = extract_from_excel_budget(budget_path)
-                        else:
-                            result['budget_data'] = extract_from_pdf_budget(budget_path)
-                        
-                        if result['budget_data'].get('total_gbp'):
-                            print(f"     ✓ £{result['budget_data']['total_gbp']:,.2f}")
-                            break
-                        elif result['budget_data'].get('error'):
-                            print(f"     ⚠️  {result['budget_data']['error']}")
+    # Process budget and schedule - extract every candidate, keep the most trustworthy
+    candidates = {'budget': [], 'schedule': []}
+    for kind, path in plan_project_files(project):
+        if kind == 'budget':
+            print(f"  💰 {path.name}")
+            data, metrics, pages = read_once(kind, path, extract_budget, dedup, extracted)
+            if data.get('total_gbp'):
+                print(f"     ✓ £{data['total_gbp']:,.2f}")
+            elif data.get('error'):
+                print(f"     ⚠️  {data['error']}")
+        elif kind == 'schedule':
+            print(f"  📅 {path.name}")
+            data, metrics, pages = read_once(kind, path, extract_from_schedule, dedup, extracted)
+            if data.get('shoot_days'):
+                print(f"     ✓ {data['shoot_days']} days")
+        else:
+            continue
+        file_metrics.append(metrics)
+        documents.append({'kind': kind, 'path': str(path), 'pages': pages})
+        candidates[kind].append((path, data))
     
-    # Process schedule
-    if 'schedule' in files:
-        schedule_file = files['schedule']
-        if isinstance(schedule_file, dict) and 'path' in schedule_file:
-            schedule_path = Path(schedule_file['path'])
-            if schedule_path.exists():
-                print(f"  📅 {schedule_path.name}")
-                result['schedule_data'] = extract_from_schedule(schedule_path)
-                if result['schedule_data'].get('shoot_days'):
-                    print(f"     ✓ {result['schedule_data']['shoot_days']} days")
-                    
-        elif isinstance(schedule_file, list):
-            for sf in schedule_file:
-                if isinstance(sf, dict) and 'path' in sf and sf.get('exists', False):
-                    schedule_path = Path(sf['path'])
-                    if schedule_path.exists():
-                        print(f"  📅 {schedule_path.name}")
-                        result['schedule_data'] = extract_from_schedule(schedule_path)
-                        if result['schedule_data'].get('shoot_days'):
-                            print(f"     ✓ {result['schedule_data']['shoot_days']} days")
-                            break
+    if candidates['budget']:
+        result['budget_data'] = pick_best('budget', candidates['budget'])
+    if candidates['schedule']:
+        result['schedule_data'] = pick_best('schedule', candidates['schedule'])
+    result['_metrics'] = file_metrics
+    result['_documents'] = documents
     
     print(f"  ✅ Done")
     return result
 
-def main():
-    if not LIBRARIES_OK:
-        return
-    
+def script_error(text: str) -> Optional[str]:
+    """The failure extract_text_from_pdf reports in place of text, if any"""
+    return text[1:-1] if text.startswith('[PDF extraction failed') else None
+
+@timed('budget_scan')
+def extract_budget(budget_path: Path, staged: bool = False) -> Dict[str, Any]:
+    """Dispatch a budget file to the Excel or PDF reader"""
+    if budget_path.suffix.lower() in ['.xls', '.xlsx']:
+        return extract_from_excel_budget(budget_path, staged=staged)
+    return extract_from_pdf_budget(budget_path, staged=staged)
+
+# --- Pipelined extraction -------------------------------------------------
+# Same selection rules as process_project, split into plan / parse / assemble
+# so extraction_pipeline can overlap file staging with parsing. All budget
+# and schedule candidates are parsed side by side and ranked afterwards.
+
+def plan_project_files(project: Dict[str, Any]) -> List[Tuple[str, Path]]:
+    """List the (kind, path) pairs process_project would read, in manifest order"""
+    files = project.get('files', {})
+    planned = []
+
+    script_file = files.get('script')
+    if isinstance(script_file, dict) and 'path' in script_file:
+        planned.append(('script', Path(script_file['path'])))
+
+    budget_file = files.get('budget')
+    if isinstance(budget_file, dict) and 'path' in budget_file:
+        planned.append(('budget', Path(budget_file['path'])))
+    elif isinstance(budget_file, list):
+        planned.extend(('budget', Path(bf['path'])) for bf in budget_file
+                       if isinstance(bf, dict) and 'path' in bf)
+
+    schedule_file = files.get('schedule')
+    if isinstance(schedule_file, dict) and 'path' in schedule_file:
+        planned.append(('schedule', Path(schedule_file['path'])))
+    elif isinstance(schedule_file, list):
+        planned.extend(('schedule', Path(sf['path'])) for sf in schedule_file
+                       if isinstance(sf, dict) and 'path' in sf and sf.get('exists', False))
+
+    return [(kind, path) for kind, path in planned if path.exists()]
+
+def extract_staged_file(kind: str, staged_path: Path, page_cache: Optional[Path] = None,
+                        profiler: Optional[Profiler] = None, trace: bool = False) -> Dict[str, Any]:
+    """Parse one already-staged file (runs in a pipeline worker process)"""
+    # Spawned workers don't inherit main()'s warning filter, profiler or tracing
+    warnings.filterwarnings('ignore')
+    if profiler is not None:
+        set_profiler(profiler)
+    set_tracing(trace)
+    with recording(kind, staged_path) as metrics, collecting_pages() as pages:
+        if kind == 'script':
+            features, text, page_stats = extract_script(staged_path, staged=True, page_cache=page_cache)
+            # MinHash here too, while the text is in hand; the writer pops it
+            data = {**features, '_signature': script_signature(text), '_scenes': scene_headings(text),
+                    '_page_stats': page_stats}
+            metrics.error = script_error(text)
+        elif kind == 'budget':
+            data = extract_budget(staged_path, staged=True)
+        else:
+            data = extract_from_schedule(staged_path, staged=True)
+    if kind != 'script':
+        metrics.error = data.get('error')
+    return {**data, '_metrics': metrics.as_dict(), '_pages': pages}
+
+def outcome_metrics(outcome: Any, parsed: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """A pipeline file's metrics: stat and stage from the prefetcher, the rest from the worker"""
+    metrics = FileMetrics.from_dict(parsed) if parsed else FileMetrics(outcome.job.kind, '')
+    metrics.path = str(outcome.job.path)
+    metrics.error = metrics.error or outcome.error
+    if outcome.duplicate_of is not None:
+        return FileMetrics(outcome.job.kind, metrics.path, duplicate_of=str(outcome.duplicate_of)).as_dict()
+    metrics.add_stage('stat', outcome.stat_seconds)
+    if outcome.stage_seconds:
+        metrics.add_stage('stage', outcome.stage_seconds)
+    metrics.add('bytes_read', outcome.size)
+    if tracing() and outcome.started:
+        metrics.spans[:0] = [
+            make_span('stage', 'stat', outcome.started, outcome.stat_seconds, outcome.thread),
+            make_span('stage', 'stage', outcome.started + outcome.stat_seconds, outcome.stage_seconds,
+                      outcome.thread),
+        ]
+    return metrics.as_dict()
+
+def assemble_project_result(project: Dict[str, Any], outcomes: List[Any]) -> Dict[str, Any]:
+    """Build a project result from its pipeline outcomes, ranking candidates like process_project"""
+    result = {
+        'project_name': project.get('project_name', 'Unknown'),
+        'client': project.get('client', ''),
+        'complete': project.get('complete', False),
+        'script_features': {},
+        'budget_data': {},
+        'schedule_data': {}
+    }
+
+    failed = {
+        'script': lambda error: {'text_length': 0, 'error': error},
+        'budget': lambda error: {'total_gbp': None, 'error': error},
+        'schedule': lambda error: {'shoot_days': None, 'error': error},
+    }
+    by_kind: Dict[str, List[Tuple[Path, Dict[str, Any]]]] = {'script': [], 'budget': [], 'schedule': []}
+    file_metrics = []
+    documents = []
+    for outcome in outcomes:
+        if outcome.error is None:
+            # Copy - deduplicated files share one data dict
+            data = dict(outcome.data)
+            parsed = data.pop('_metrics', None)
+            pages = data.pop('_pages', [])
+        else:
+            data, parsed, pages = failed[outcome.job.kind](outcome.error), None, []
+        file_metrics.append(outcome_metrics(outcome, parsed))
+        documents.append({'kind': outcome.job.kind, 'path': str(outcome.job.path), 'pages': pages})
+        by_kind[outcome.job.kind].append((outcome.job.path, data))
+
+    if by_kind['script']:
+        features = dict(by_kind['script'][0][1])
+        result['_script_signature'] = features.pop('_signature', None)
+        result['_scenes'] = features.pop('_scenes', [])
+        result['_page_stats'] = features.pop('_page_stats', {})
+        result['script_features'] = features
+    if by_kind['budget']:
+        result['budget_data'] = pick_best('budget', by_kind['budget'])
+    if by_kind['schedule']:
+        result['schedule_data'] = pick_best('schedule', by_kind['schedule'])
+    result['_metrics'] = file_metrics
+    result['_documents'] = documents
+
+    return result
+
+def print_project_result(result: Dict[str, Any]) -> None:
+    """One-block summary of a finished project (pipeline mode prints after the fact)"""
+    print(f"📦 {result['project_name']}")
+    features = result.get('script_features', {})
+    if features.get('text_length'):
+        techniques = ', '.join(features.get('techniques', []))
+        print(f"  📄 ✓ {features['text_length']} chars" + (f" | {techniques}" if techniques else ''))
+    budget = result.get('budget_data', {})
+    if budget.get('total_gbp'):
+        print(f"  💰 ✓ £{budget['total_gbp']:,.2f}")
+    elif budget.get('error'):
+        print(f"  💰 ⚠️  {budget['error']}")
+    schedule = result.get('schedule_data', {})
+    if schedule.get('shoot_days'):
+        print(f"  📅 ✓ {schedule['shoot_days']} days")
+
+def main(argv: Optional[List[str]] = None):
+    if not require(REQUIRED_LIBRARIES, "pip3 install pdfplumber pandas openpyxl xlrd"):
+        sys.exit(1)
+    warnings.filterwarnings('ignore')
+
     # Paths - use local reference-data folder instead of iCloud
     base_path = Path.home() / "clawd/reference-data"
     icloud_path_prefix = str(Path.home() / "Library/Mobile Documents/com~apple~CloudDocs/Henry-ClientDocs/reference-data")
     local_path_prefix = str(base_path)
-    manifest_path = base_path / "training_data_extract.json"
-    output_dir = Path.home() / "clawd/projects/Production Script Platform/production-feasibility-engine/training-data"
+
+    parser = argparse.ArgumentParser(description='Extract training data from production files')
+    parser.add_argument('--manifest', type=Path, default=base_path / "training_data_extract.json")
+    parser.add_argument('--output-dir', type=Path,
+                        default=Path.home() / "clawd/projects/Production Script Platform/production-feasibility-engine/training-data")
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1),
+                        help='parser processes; 1 runs the original one-file-at-a-time loop')
+    parser.add_argument('--skip-superseded', action='store_true',
+                        help='leave earlier revisions of a script out of the output')
+    parser.add_argument('--io-workers', type=int, default=4,
+                        help='threads staging files ahead of the parsers')
+    parser.add_argument('--no-page-cache', action='store_true',
+                        help='re-parse every script page instead of reusing unchanged pages')
+    parser.add_argument('--run-report', type=Path,
+                        help=f'per-file, per-stage timings and counters (default: OUTPUT_DIR/{REPORT_FILE})')
+    parser.add_argument('--profile', nargs='*', metavar='STAGE|FILE_GLOB',
+                        help=f"cProfile matching files (all if no glob), whole or just these stages "
+                             f"({', '.join(STAGES)}); pstats and collapsed stacks go to OUTPUT_DIR/{PROFILE_DIR}")
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='with --profile, also trace allocations with tracemalloc')
+    parser.add_argument('--metrics-textfile', type=Path, metavar='PATH',
+                        help='keep a Prometheus textfile (e.g. <node-exporter textfile dir>/extractor.prom) '
+                             'up to date during and after the run')
+    parser.add_argument('--metrics-interval', type=float, default=30.0,
+                        help='seconds between textfile updates during the run')
+    parser.add_argument('--trace', type=Path, metavar='PATH',
+                        help='write a trace-event timeline (chrome://tracing, Perfetto) of projects, '
+                             'files and stages per worker')
+    parser.add_argument('--store', type=Path, metavar='PATH',
+                        help=f'SQLite database the results and page text (for python3 -m extractor search) '
+                             f'are upserted into as each project finishes (default: OUTPUT_DIR/{STORE_FILE})')
+    parser.add_argument('--no-store', action='store_true',
+                        help="don't write the SQLite store")
+    parser.add_argument('--json-format', action='append', choices=FORMATS,
+                        help='training_data_complete.json as pretty (default) or compact JSON, and/or '
+                             'training_data_complete.ndjson (repeatable, e.g. ndjson + pretty)')
+    parser.add_argument('--codegen', action='store_true',
+                        help=f'regenerate {ts_codegen.TS_FILE}, {ts_codegen.JSON_FILE} and {schedule_patterns.TS_FILE} in '
+                             f'src/lib/data from the results (keeping {ts_codegen.OVERRIDES_FILE}), '
+                             f'and recalibrate the cost bands in src/lib/cost/{cost_calibration.TS_FILE}')
+    parser.add_argument('--comparables', type=Path, metavar='DIR',
+                        help='add the projects to the comparable-projects index in DIR (updated in place; '
+                             "query with 'python3 -m extractor comparables --index DIR')")
+    parser.add_argument('--columnar', type=Path, metavar='PATH',
+                        help='also write the results as a flat, typed table: .parquet (Parquet) or '
+                             '.arrow/.feather (Arrow IPC, memory-mappable); needs pyarrow')
+    args = parser.parse_args(argv)
+    json_formats = list(dict.fromkeys(args.json_format or ['pretty']))
+    if {'pretty', 'compact'} <= set(json_formats):
+        parser.error("--json-format: pretty and compact both write training_data_complete.json")
+    if args.columnar:
+        # Find out now, not after the run
+        suffixes = columnar_output.PARQUET_SUFFIXES + columnar_output.ARROW_SUFFIXES
+        if args.columnar.suffix.lower() not in suffixes:
+            parser.error(f"--columnar: expected a {', '.join(suffixes)} file")
+        if not require(columnar_output.REQUIRED_LIBRARIES, "pip3 install pyarrow"):
+            sys.exit(1)
+
+    manifest_path = args.manifest
+    output_dir = args.output_dir
 
     output_dir.mkdir(parents=True, exist_ok=True)
 
@@ -376,46 +634,228 @@ def main():
     print(f"📊 {len(projects)} projects\n")
     
     results = []
-    
+    revisions = RevisionIndex()
+    # Script pages keyed by content hash - a new revision only re-parses what changed
+    page_cache = None if args.no_page_cache else output_dir / 'page_cache'
+    page_totals = {'pages_parsed': 0, 'pages_reused': 0}
+    run_report = RunReport(workers=args.workers)
+    set_tracing(args.trace is not None)
+    exporter = None
+    if args.metrics_textfile:
+        exporter = TextfileExporter(args.metrics_textfile, run_report,
+                                    None if args.no_page_cache else page_totals, args.metrics_interval)
+        exporter.tick()
+    profiler = None
+    if args.profile is not None:
+        profiler = Profiler(output_dir / PROFILE_DIR,
+                            stages=[t for t in args.profile if t in STAGES],
+                            files=[t for t in args.profile if t not in STAGES],
+                            memory=args.profile_memory)
+        set_profiler(profiler)
+        print(f"🔬 Profiling {', '.join(args.profile) or 'every file'} → {profiler.directory}")
+
+    store = None if args.no_store else ResultsStore(args.store or output_dir / STORE_FILE)
+    # Store row id by manifest index, and the manifest index by (project_name, client)
+    store_ids: Dict[int, int] = {}
+    stored: Dict[Tuple[str, str], int] = {}
+    collisions: List[Tuple[int, int]] = []
+
+    def store_project(index, result, *rows):
+        # A second project with the same name and client would replace the
+        # first one's row (the JSON keeps both) - keep the first, report it
+        key = (result.get('project_name', 'Unknown'), result.get('client') or '')
+        if key in stored:
+            collisions.append((index, stored[key]))
+            return
+        stored[key] = index
+        store_ids[index] = store.upsert_project(result, *rows)
+
+    def record(index, result):
+        # Into the run report, then the store - one transaction per project
+        scenes = result.pop('_scenes', [])
+        documents = result.pop('_documents', [])
+        run_report.add_project(index, result)
+        if store:
+            store_project(index, result, run_report.projects[-1]['files'], scenes, documents)
+        if exporter:
+            exporter.tick()
+
+    def count_pages(result):
+        for key, pages in result.pop('_page_stats', {}).items():
+            page_totals[key] += pages
+
+    def index_revision(index, result):
+        # Near-duplicate scripts (R1 / R2 / R3 ...) are grouped as they stream in
+        signature = result.pop('_script_signature', None)
+        if signature is None:
+            return
+        script_path = next((path for kind, path in plans[index] if kind == 'script'), None)
+        matches = revisions.add(str(index), signature, script_path)
+        if matches:
+            other, similarity = matches[0]
+            print(f"  🔁 Revision of {projects[int(other)].get('project_name', 'Unknown')} ({similarity:.0%} similar)")
+
+    def save_checkpoint(i):
+        # Save checkpoint every 5
+        if i % 5 == 0:
+            # Compact - the whole list is rewritten every few projects
+            write_json(output_dir / "training_data_checkpoint.json", results, 'compact')
+            print(f"\n💾 Checkpoint")
+
+    # Predict each project's cost from earlier runs' timings; the pipeline
+    # starts the most expensive ones first so no big deck runs alone at the end
+    plans = [plan_project_files(p) for p in projects]
+    # Identical files (copies, shared budgets) are extracted once and fanned out
+    dedup = DedupIndex(path for plan in plans for _, path in plan)
+    cost_model = CostModel.load(output_dir)
+    costs, profiles = project_costs(cost_model, plans, dedup.key)
+    eta = EtaTracker(sum(costs), workers=args.workers)
+    print(f"🔮 Predicted work: {format_duration(sum(costs))} "
+          f"({sum(cost_model.samples.values())} timings on record)")
+
+    def on_file(outcome):
+        profile = profiles[str(outcome.job.path)]
+        eta.advance(cost_model.predict(profile))
+        if outcome.error is None:
+            cost_model.record(profile, outcome.job.kind, outcome.seconds)
+
+    def record_timings(result):
+        # The sequential path's on_file: every file actually read, from its metrics
+        for metrics in result.get('_metrics', []):
+            if 'duplicate_of' not in metrics and 'error' not in metrics:
+                cost_model.record(profiles[metrics['path']], metrics['kind'], sum(metrics['stages'].values()))
+
     try:
-        for i, project in enumerate(projects, 1):
-            print(f"\n[{i}/{len(projects)}]", end=' ')
-            try:
-                result = process_project(project, base_path)
+        if args.workers > 1:
+            print(f"⚙️  Pipeline: {args.io_workers} staging threads, {args.workers} parser processes")
+            pipeline = run_pipeline(
+                projects,
+                plan=plan_project_files,
+                stage=copy_to_temp,
+                parse=partial(extract_staged_file, page_cache=page_cache, profiler=profiler,
+                              trace=args.trace is not None),
+                assemble=assemble_project_result,
+                unstage=remove_temp_copy,
+                io_workers=args.io_workers,
+                cpu_workers=args.workers,
+                order=longest_first(costs),
+                on_file=on_file,
+                dedupe_key=dedup.key,
+            )
+            for index, result in pipeline:
+                i = index + 1
+                print(f"\n[{i}/{len(projects)}]", end=' ')
+                print_project_result(result)
+                index_revision(index, result)
+                count_pages(result)
+                record(index, result)
+                print(f"  {eta.describe()}")
                 results.append(result)
-                
-                # Save checkpoint every 5
-                if i % 5 == 0:
-                    checkpoint_path = output_dir / "training_data_checkpoint.json"
-                    with open(checkpoint_path, 'w') as f:
-                        json.dump(results, f, indent=2)
-                    print(f"\n💾 Checkpoint")
-                    
-            except Exception as e:
-                print(f"\n❌ Failed: {e}")
-                results.append({
-                    'project_name': project.get('project_name', 'Unknown'),
-                    'error': str(e)
-                })
-    
+                save_checkpoint(i)
+        else:
+            # Content read more than once is kept from its first read until the end of the run
+            extracted: Dict[Tuple[str, str], Any] = dict.fromkeys(
+                dedup.repeated(f for plan in plans for f in plan))
+            for i, project in enumerate(projects, 1):
+                print(f"\n[{i}/{len(projects)}]", end=' ')
+                try:
+                    result = process_project(project, base_path, page_cache, dedup, extracted)
+                    record_timings(result)
+                    index_revision(i - 1, result)
+                    count_pages(result)
+                    record(i - 1, result)
+                    results.append(result)
+                    eta.advance(costs[i - 1])
+                    print(f"  {eta.describe()}")
+                    save_checkpoint(i)
+
+                except Exception as e:
+                    print(f"\n❌ Failed: {e}")
+                    results.append({
+                        'project_name': project.get('project_name', 'Unknown'),
+                        'error': str(e)
+                    })
+                    if store:
+                        store_project(i - 1, {**results[-1], 'client': project.get('client', '')})
+        cost_model.save(output_dir)
+
+    except BaseException:
+        # Interrupted or crashed - the textfile says the run is over, without a success time
+        if exporter:
+            exporter.finish(succeeded=False)
+        raise
     finally:
         # Cleanup temp directory
-        print(f"\n\n🧹 Cleaning up temp directory...")
-        try:
-            shutil.rmtree(TEMP_DIR)
-        except:
-            pass
+        if TEMP_DIR is not None:
+            print(f"\n\n🧹 Cleaning up temp directory...")
+            shutil.rmtree(TEMP_DIR, ignore_errors=True)
+    
+    # Tag revision families; the latest revision is the one that counts
+    families = revisions.families()
+    superseded = set()
+    for family in families:
+        latest = int(family.latest)
+        latest_name = projects[latest].get('project_name', 'Unknown')
+        for member in map(int, family.members):
+            results[member]['script_revision'] = {
+                'family': latest_name,
+                'latest': member == latest,
+                'revisions': len(family.members)
+            }
+            if member != latest:
+                results[member]['script_revision']['superseded_by'] = latest_name
+                superseded.add(member)
+            if store and member in store_ids:
+                store.set_revision(store_ids[member], results[member])
     
     # Final save
     print(f"\n{'='*60}")
     print("✅ EXTRACTION COMPLETE")
     print(f"{'='*60}")
     
-    output_path = output_dir / "training_data_complete.json"
-    with open(output_path, 'w') as f:
-        json.dump(results, f, indent=2)
+    if args.skip_superseded:
+        output = [r for i, r in enumerate(results) if i not in superseded]
+    else:
+        output = results
+    for output_path in write_results(output_dir, "training_data_complete", output, json_formats):
+        print(f"\n💾 {output_path}")
+    if args.columnar:
+        rows = columnar_output.write_columnar(args.columnar, output)
+        print(f"🧮 {args.columnar} ({rows} rows)")
+    if args.comparables:
+        indexed = comparables.update_index(args.comparables, results)
+        print(f"🧭 {args.comparables}: {indexed['rows']} projects ({indexed['added']} added, "
+              f"{indexed['changed']} changed)")
+    if args.codegen:
+        generated = ts_codegen.generate(results)
+        print(f"🧬 {ts_codegen.TS_FILE}: {generated['projects']} projects "
+              f"({generated['extracted_only']} new from extraction)")
+        patterns = schedule_patterns.generate(results)
+        print(f"🗓️  {schedule_patterns.TS_FILE}: {patterns['schedules']} schedules")
+        calibration = cost_calibration.generate(results)
+        print(f"📐 {cost_calibration.TS_FILE}: {len(calibration['bands'])} cost bands from {calibration['projects']} projects")
+    if store:
+        store.close()
+        print(f"🗄️  {store.path}")
+        for index, first in collisions:
+            print(f"  ⚠️  Not stored: project {index + 1} ({projects[index].get('project_name', 'Unknown')}) "
+                  f"has the name and client of project {first + 1}")
     
-    print(f"\n💾 {output_path}")
+    run_report_path = args.run_report or output_dir / REPORT_FILE
+    run_report.save(run_report_path)
+    print(f"⏱️  {run_report_path} ({run_report.describe()})")
+    if profiler:
+        profiles = profile_index(run_report.projects)
+        profiler.directory.mkdir(parents=True, exist_ok=True)
+        with open(profiler.directory / 'index.json', 'w') as f:
+            json.dump(profiles, f, indent=2)
+        print(f"🔬 {sum(len(p['profiles']) for p in profiles)} profiles in {profiler.directory}")
+    if args.trace:
+        events = write_trace(args.trace, run_report.projects, run_report.started)
+        print(f"🧵 {args.trace} ({events} trace events)")
+    if exporter:
+        exporter.finish()
+        print(f"📈 {args.metrics_textfile}")
     
     # Stats
     successful = sum(1 for r in results if 'error' not in r)
@@ -429,6 +869,18 @@ def main():
     print(f"  Scripts: {with_script}")
     print(f"  Budgets: {with_budget}")
     print(f"  Schedules: {with_schedule}")
+    print(f"  {dedup.report(f for plan in plans for f in plan).describe()}")
+    for group in dedup.duplicates():
+        print(f"    = {' | '.join(Path(p).name for p in group)}")
+    if page_cache and sum(page_totals.values()):
+        pages_read = sum(page_totals.values())
+        print(f"  📄 Page cache: {page_totals['pages_reused']} of {pages_read} script pages reused")
+    if families:
+        action = 'left out' if args.skip_superseded else 'tagged superseded'
+        print(f"  🔁 Script revisions: {len(families)} families, {len(superseded)} earlier revisions {action}")
+        for family in families:
+            names = [projects[int(m)].get('project_name', 'Unknown') for m in family.members]
+            print(f"    latest {projects[int(family.latest)].get('project_name', 'Unknown')} ← {', '.join(names)}")
     
     # Sample budgets
     budgets_found = [r for r in results if r.get('budget_data', {}).get('total_gbp')]
@@ -11,6 +11,9 @@ from pathlib import Path
 from typing import Dict, Any, Optional
 import re
 import warnings
+
+from json_output import write_json
+
 warnings.filterwarnings('ignore')
 
 try:
@@ -344,9 +347,7 @@ def main():
             
             # Save incrementally (every 5 projects)
             if i % 5 == 0:
-                output_path = output_dir / "training_data_partial.json"
-                with open(output_path, 'w') as f:
-                    json.dump(results, f, indent=2)
+                write_json(output_dir / "training_data_partial.json", results, 'compact')
                 print(f"  💾 Saved checkpoint at {i} projects")
                 
         except Exception as e:
@@ -363,9 +364,7 @@ def main():
     print("✅ EXTRACTION COMPLETE")
     print(f"{'='*60}")
     
-    output_path = output_dir / "training_data_complete.json"
-    with open(output_path, 'w') as f:
-        json.dump(results, f, indent=2)
+    output_path = write_json(output_dir / "training_data_complete.json", results)
     
     print(f"\n💾 Saved to: {output_path}")
     
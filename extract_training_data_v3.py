@@ -11,6 +11,9 @@ from pathlib import Path
 from typing import Dict, Any, Optional
 import re
 import warnings
+
+from json_output import write_json
+
 warnings.filterwarnings('ignore')
 
 try:
@@ -418,9 +421,7 @@ def main():
             
             # Save checkpoint every 5 projects
             if i % 5 == 0:
-                checkpoint_path = output_dir / "training_data_checkpoint.json"
-                with open(checkpoint_path, 'w') as f:
-                    json.dump(results, f, indent=2)
+                write_json(output_dir / "training_data_checkpoint.json", results, 'compact')
                 print(f"\n  💾 Checkpoint saved")
                 
         except Exception as e:
@@ -437,9 +438,7 @@ def main():
     print("✅ EXTRACTION COMPLETE")
     print(f"{'='*60}")
     
-    output_path = output_dir / "training_data_complete.json"
-    with open(output_path, 'w') as f:
-        json.dump(results, f, indent=2)
+    output_path = write_json(output_dir / "training_data_complete.json", results)
     
     print(f"\n💾 Saved: {output_path}")
     
@@ -10,6 +10,11 @@ from pathlib import Path
 from typing import Dict, Any, Optional
 import re
 import warnings
+
+from json_output import write_json
+from schedule_parser import iter_sheet_rows, parse_schedule
+from script_features import extract_features_from_script
+
 warnings.filterwarnings('ignore')
 
 try:
@@ -42,65 +47,6 @@ def extract_text_from_pdf(pdf_path: Path, max_pages: int = 10, max_chars: int =
     except Exception as e:
         return f"[PDF extraction failed: {e}]"
 
-def extract_features_from_script(text: str) -> Dict[str, Any]:
-    """Extract key features from script text"""
-    text_lower = text.lower()
-    
-    techniques = []
-    technique_keywords = {
-        'moco': ['moco', 'motion control', 'mo-co'],
-        'drone': ['drone', 'aerial', 'uav'],
-        'tracking': ['tracking shot', 'tracking', 'dolly track'],
-        'vfx': ['vfx', 'visual effects', 'green screen', 'greenscreen', 'cgi'],
-        'night_shoot': ['night shoot', 'night exterior', 'night int', 'night ext'],
-        'underwater': ['underwater', 'submerged'],
-        'crane': ['crane shot', 'crane', 'jib'],
-        'steadicam': ['steadicam', 'steadi'],
-        'handheld': ['handheld', 'hand held'],
-        'slow_motion': ['slow motion', 'slow-motion', 'high speed', 'phantom'],
-        'time_lapse': ['time lapse', 'time-lapse', 'timelapse']
-    }
-    
-    for tech, keywords in technique_keywords.items():
-        if any(kw in text_lower for kw in keywords):
-            techniques.append(tech)
-    
-    locations = []
-    if 'studio' in text_lower or 'sound stage' in text_lower:
-        locations.append('studio')
-    if any(word in text_lower for word in ['exterior', 'ext.', 'outdoor', 'location']):
-        locations.append('outdoor')
-    if 'interior' in text_lower or 'int.' in text_lower:
-        locations.append('indoor')
-    
-    shot_patterns = [
-        r'shot\s+\d+',
-        r'scene\s+\d+',
-        r'sc\.\s*\d+',
-        r'\d+\s*\.\s*(?:int|ext)'
-    ]
-    
-    all_shots = []
-    for pattern in shot_patterns:
-        matches = re.findall(pattern, text_lower)
-        all_shots.extend(matches)
-    
-    estimated_shots = len(set(all_shots)) if all_shots else None
-    
-    has_children = any(word in text_lower for word in ['child', 'kid', 'baby', 'infant'])
-    has_animals = any(word in text_lower for word in ['dog', 'cat', 'horse', 'animal'])
-    has_vehicles = any(word in text_lower for word in ['car', 'vehicle', 'truck', 'motorcycle'])
-    
-    return {
-        'techniques': techniques,
-        'locations': locations,
-        'estimated_shots': estimated_shots,
-        'has_children': has_children,
-        'has_animals': has_animals,
-        'has_vehicles': has_vehicles,
-        'text_length': len(text)
-    }
-
 def extract_from_excel_budget(budget_path: Path) -> Dict[str, Any]:
     """Extract budget data from Excel (.xls or .xlsx) using pandas"""
     try:
@@ -180,47 +126,16 @@ def extract_from_pdf_budget(budget_path: Path) -> Dict[str, Any]:
         return {'total_gbp': None, 'error': f'PDF parse error: {str(e)}'}
 
 def extract_from_schedule(schedule_path: Path) -> Dict[str, Any]:
-    """Extract schedule data from PDF or Excel"""
+    """Extract schedule data from PDF or Excel, row by row"""
     try:
         if schedule_path.suffix.lower() in ['.xlsx', '.xls']:
             print(f"    Reading Excel schedule: {schedule_path.name}...")
-            try:
-                df = pd.read_excel(schedule_path, sheet_name=0, header=None)
-                # Convert all cells to string and join
-                text_parts = []
-                for col in df.columns:
-                    for val in df[col]:
-                        if not pd.isna(val):
-                            text_parts.append(str(val))
-                text = ' '.join(text_parts)
-            except Exception as e:
-                print(f"      Warning: {e}")
-                return {'shoot_days': None, 'error': f'Excel read error: {str(e)}'}
+            rows = iter_sheet_rows(schedule_path)
         else:
             # PDF schedule
-            text = extract_text_from_pdf(schedule_path, max_pages=20)
-        
-        text_lower = text.lower()
-        
-        # Count day references
-        day_matches = re.findall(r'day\s+(\d+)', text_lower)
-        shoot_day_matches = re.findall(r'shoot\s+day\s+(\d+)', text_lower)
-        
-        all_days = day_matches + shoot_day_matches
-        shoot_days = max([int(d) for d in all_days]) if all_days else None
-        
-        # Look for call times
-        call_time_matches = re.findall(r'call[:\s]+(\d{1,2})[:\.](\d{2})', text_lower)
-        
-        # Count setups
-        setup_mentions = len(re.findall(r'setup|set[\s-]up', text_lower))
+            rows = extract_text_from_pdf(schedule_path, max_pages=20).splitlines()
         
-        return {
-            'shoot_days': shoot_days,
-            'call_times_found': len(call_time_matches),
-            'setup_mentions': setup_mentions,
-            'text_length': len(text)
-        }
+        return parse_schedule(rows)
         
     except Exception as e:
         return {'shoot_days': None, 'error': f'Schedule parse error: {str(e)}'}
@@ -348,9 +263,7 @@ def main():
             
             # Save checkpoint every 5
             if i % 5 == 0:
-                checkpoint_path = output_dir / "training_data_checkpoint.json"
-                with open(checkpoint_path, 'w') as f:
-                    json.dump(results, f, indent=2)
+                write_json(output_dir / "training_data_checkpoint.json", results, 'compact')
                 print(f"\n💾 Checkpoint")
                 
         except Exception as e:
@@ -365,9 +278,7 @@ def main():
     print("✅ EXTRACTION COMPLETE")
     print(f"{'='*60}")
     
-    output_path = output_dir / "training_data_complete.json"
-    with open(output_path, 'w') as f:
-        json.dump(results, f, indent=2)
+    output_path = write_json(output_dir / "training_data_complete.json", results)
     
     print(f"\n💾 {output_path}")
     
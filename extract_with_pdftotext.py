@@ -3,171 +3,94 @@
 Production data extractor v3 - Uses pdftotext to avoid iCloud file locks
 """
 
+import argparse
+import asyncio
+import copy
 import json
-import subprocess
 import sys
+import time
+from functools import partial
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, List, Optional, Tuple
 import re
 import warnings
-warnings.filterwarnings('ignore')
 
-try:
-    import openpyxl
-    HAS_OPENPYXL = True
-except ImportError:
-    HAS_OPENPYXL = False
-    print("Warning: openpyxl not available, Excel parsing disabled")
+from async_pdftotext import gather_projects, pdftotext
+from candidate_ranking import labelled_total, pick_best
+from extraction_cost import CostModel, EtaTracker, format_duration, longest_first, project_costs
+from extractor.backends import ROW_READERS, ROWS, TEXT, TIME_READERS, Backend, choose_backend
+from extractor.bench import saved_throughput
+from file_dedup import DedupIndex
+from json_output import FORMATS, write_json, write_results
+from run_metrics import count
+from script_features import extract_features_from_script
 
-try:
-    import xlrd
-    HAS_XLRD = True
-except ImportError:
-    HAS_XLRD = False
-    print("Warning: xlrd not available, old .xls parsing disabled")
+# Backends (extractor.backends) to read with, preferred first when there's
+# no bench report - pdfplumber only when pdftotext isn't installed
+PDF_READERS = ('pdftotext', 'pdfplumber')
+# Budget sheets are read this far down
+MAX_BUDGET_ROWS = 200
+
+def reader_for(path: Path, capability: str, prefer: Tuple[str, ...]) -> Backend:
+    """The backend to read a file with: the fastest by a saved bench report, else preferred ones first"""
+    backend = choose_backend(path.suffix, capability, throughput=saved_throughput(), prefer=prefer)
+    if backend is None:
+        raise RuntimeError(f'no reader for {path.suffix} installed')
+    return backend
 
 def extract_text_from_pdf(pdf_path: Path, max_pages: int = 10) -> str:
-    """Extract text from PDF using pdftotext command"""
+    """Extract text from PDF with the first available of PDF_READERS (pdftotext)"""
     try:
-        result = subprocess.run(
-            ['pdftotext', '-l', str(max_pages), str(pdf_path), '-'],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        return result.stdout[:50000]  # Limit to 50k chars
+        backend = reader_for(pdf_path, TEXT, PDF_READERS)
+        if backend.executables:
+            count('subprocesses')
+        return backend.read_text(pdf_path, max_pages)[:50000]  # Limit to 50k chars
     except Exception as e:
         return f"[PDF extraction failed: {e}]"
 
-def extract_features_from_script(text: str) -> Dict[str, Any]:
-    """Extract key features from script text"""
-    text_lower = text.lower()
-    
-    # Technique detection
-    techniques = []
-    technique_keywords = {
-        'moco': ['moco', 'motion control', 'mo-co'],
-        'drone': ['drone', 'aerial', 'uav'],
-        'tracking': ['tracking shot', 'tracking', 'dolly track'],
-        'vfx': ['vfx', 'visual effects', 'green screen', 'greenscreen', 'cgi'],
-        'night_shoot': ['night shoot', 'night exterior', 'night int', 'night ext'],
-        'underwater': ['underwater', 'submerged'],
-        'crane': ['crane shot', 'crane', 'jib'],
-        'steadicam': ['steadicam', 'steadi'],
-        'handheld': ['handheld', 'hand held'],
-        'slow_motion': ['slow motion', 'slow-motion', 'high speed', 'phantom'],
-        'time_lapse': ['time lapse', 'time-lapse', 'timelapse']
-    }
-    
-    for tech, keywords in technique_keywords.items():
-        if any(kw in text_lower for kw in keywords):
-            techniques.append(tech)
-    
-    # Location detection
-    locations = []
-    if 'studio' in text_lower or 'sound stage' in text_lower:
-        locations.append('studio')
-    if any(word in text_lower for word in ['exterior', 'ext.', 'outdoor', 'location']):
-        locations.append('outdoor')
-    if 'interior' in text_lower or 'int.' in text_lower:
-        locations.append('indoor')
-    
-    # Shot/scene count
-    shot_patterns = [
-        r'shot\s+\d+',
-        r'scene\s+\d+',
-        r'sc\.\s*\d+',
-    ]
-    
-    all_shots = []
-    for pattern in shot_patterns:
-        matches = re.findall(pattern, text_lower)
-        all_shots.extend(matches)
-    
-    estimated_shots = len(set(all_shots)) if all_shots else None
-    
-    # Talent detection
-    has_children = any(word in text_lower for word in ['child', 'kid', 'baby', 'infant'])
-    has_animals = any(word in text_lower for word in ['dog', 'cat', 'horse', 'animal'])
-    has_vehicles = any(word in text_lower for word in ['car', 'vehicle', 'truck', 'motorcycle'])
-    
-    return {
-        'techniques': techniques,
-        'locations': locations,
-        'estimated_shots': estimated_shots,
-        'has_children': has_children,
-        'has_animals': has_animals,
-        'has_vehicles': has_vehicles,
-        'text_length': len(text)
-    }
+def budget_total(amounts: list, rows: list, source: str) -> Optional[Dict[str, Any]]:
+    """Prefer the amount on a "Grand Total"-style row, else the largest amount found"""
+    labelled = labelled_total(rows)
+    if labelled:
+        return {
+            'total_gbp': round(labelled[0], 2),
+            'source': source,
+            'method': 'label',
+            'label': labelled[1],
+            'amounts_found': len(amounts)
+        }
+    if amounts:
+        return {
+            'total_gbp': round(max(amounts), 2),
+            'source': source,
+            'method': 'max',
+            'amounts_found': len(amounts)
+        }
+    return None
 
-def extract_from_xlsx_budget(budget_path: Path) -> Dict[str, Any]:
-    """Extract budget from .xlsx file"""
-    if not HAS_OPENPYXL:
-        return {'total_gbp': None, 'error': 'openpyxl not installed'}
+def extract_from_sheet_budget(budget_path: Path) -> Dict[str, Any]:
+    """Extract budget from an .xlsx / .xls file with the first available of ROW_READERS"""
+    source = budget_path.suffix.lower().lstrip('.')
+    try:
+        backend = reader_for(budget_path, ROWS, ROW_READERS)
+    except RuntimeError as e:
+        return {'total_gbp': None, 'error': str(e)}
     
     try:
-        print(f"    Reading .xlsx: {budget_path.name}...")
-        wb = openpyxl.load_workbook(budget_path, read_only=True, data_only=True)
-        sheet = wb.active
-        
+        print(f"    Reading .{source}: {budget_path.name}...")
         amounts = []
-        for row in sheet.iter_rows(max_row=200, values_only=True):
+        rows = []
+        for row in backend.read_rows(budget_path, MAX_BUDGET_ROWS):
             if not row:
                 continue
+            rows.append(row)
             for cell in row:
                 if cell is None:
                     continue
                 
-                cell_str = str(cell)
-                
-                # GBP pattern
-                gbp_matches = re.findall(r'£\s*([\d,]+(?:\.\d{2})?)', cell_str)
-                for m in gbp_matches:
-                    try:
-                        amount = float(m.replace(',', ''))
-                        if 1000 < amount < 10000000:
-                            amounts.append(amount)
-                    except:
-                        pass
-                
-                # Numeric cell
-                if isinstance(cell, (int, float)) and 10000 < cell < 10000000:
-                    amounts.append(cell)
-        
-        wb.close()
-        
-        if amounts:
-            return {
-                'total_gbp': round(max(amounts), 2),
-                'source': 'xlsx',
-                'amounts_found': len(amounts)
-            }
-        
-        return {'total_gbp': None, 'note': 'No amounts in xlsx'}
-        
-    except Exception as e:
-        return {'total_gbp': None, 'error': f'xlsx: {str(e)[:100]}'}
-
-def extract_from_xls_budget(budget_path: Path) -> Dict[str, Any]:
-    """Extract budget from old .xls file"""
-    if not HAS_XLRD:
-        return {'total_gbp': None, 'error': 'xlrd not installed'}
-    
-    try:
-        print(f"    Reading .xls: {budget_path.name}...")
-        wb = xlrd.open_workbook(budget_path)
-        sheet = wb.sheet_by_index(0)
-        
-        amounts = []
-        for row_idx in range(min(200, sheet.nrows)):
-            for col_idx in range(sheet.ncols):
-                cell = sheet.cell(row_idx, col_idx)
-                
-                # Check text cells for GBP
-                if cell.ctype == xlrd.XL_CELL_TEXT:
-                    text = str(cell.value)
-                    gbp_matches = re.findall(r'£\s*([\d,]+(?:\.\d{2})?)', text)
+                # GBP pattern in text cells
+                if isinstance(cell, str):
+                    gbp_matches = re.findall(r'£\s*([\d,]+(?:\.\d{2})?)', cell)
                     for m in gbp_matches:
                         try:
                             amount = float(m.replace(',', ''))
@@ -176,28 +99,22 @@ def extract_from_xls_budget(budget_path: Path) -> Dict[str, Any]:
                         except:
                             pass
                 
-                # Check numeric cells
-                if cell.ctype == xlrd.XL_CELL_NUMBER:
-                    if 10000 < cell.value < 10000000:
-                        amounts.append(cell.value)
-        
-        if amounts:
-            return {
-                'total_gbp': round(max(amounts), 2),
-                'source': 'xls',
-                'amounts_found': len(amounts)
-            }
+                # Numeric cell
+                elif isinstance(cell, (int, float)) and not isinstance(cell, bool) and 10000 < cell < 10000000:
+                    amounts.append(cell)
         
-        return {'total_gbp': None, 'note': 'No amounts in xls'}
+        return budget_total(amounts, rows, source) or {'total_gbp': None, 'note': f'No amounts in {source}'}
         
     except Exception as e:
-        return {'total_gbp': None, 'error': f'xls: {str(e)[:100]}'}
+        return {'total_gbp': None, 'error': f'{source}: {str(e)[:100]}'}
 
 def extract_from_pdf_budget(budget_path: Path) -> Dict[str, Any]:
     """Extract budget from PDF"""
+    return budget_from_pdf_text(extract_text_from_pdf(budget_path, max_pages=15))
+
+def budget_from_pdf_text(text: str) -> Dict[str, Any]:
+    """Find the budget total in text pulled out of a PDF"""
     try:
-        text = extract_text_from_pdf(budget_path, max_pages=15)
-        
         # Find GBP amounts
         gbp_matches = re.findall(r'£\s*([\d,]+(?:\.\d{2})?)', text)
         
@@ -210,14 +127,8 @@ def extract_from_pdf_budget(budget_path: Path) -> Dict[str, Any]:
             except:
                 pass
         
-        if amounts:
-            return {
-                'total_gbp': round(max(amounts), 2),
-                'source': 'pdf',
-                'amounts_found': len(amounts)
-            }
-        
-        return {'total_gbp': None, 'note': 'No GBP in PDF'}
+        rows = [[line] for line in text.splitlines()]
+        return budget_total(amounts, rows, 'pdf') or {'total_gbp': None, 'note': 'No GBP in PDF'}
         
     except Exception as e:
         return {'total_gbp': None, 'error': f'pdf: {str(e)[:100]}'}
@@ -228,127 +139,243 @@ def extract_from_schedule(schedule_path: Path) -> Dict[str, Any]:
         ext = schedule_path.suffix.lower()
         
         if ext in ['.xlsx', '.xls']:
-            if ext == '.xlsx' and HAS_OPENPYXL:
-                wb = openpyxl.load_workbook(schedule_path, read_only=True, data_only=True)
-                sheet = wb.active
-                text_parts = []
-                for row in sheet.iter_rows(max_row=100, values_only=True):
-                    if row:
-                        text_parts.append(' '.join([str(c) for c in row if c]))
-                text = '\n'.join(text_parts)
-                wb.close()
-            elif ext == '.xls' and HAS_XLRD:
-                wb = xlrd.open_workbook(schedule_path)
-                sheet = wb.sheet_by_index(0)
-                text_parts = []
-                for row_idx in range(min(100, sheet.nrows)):
-                    row = [str(sheet.cell(row_idx, col_idx).value) for col_idx in range(sheet.ncols)]
-                    text_parts.append(' '.join(row))
-                text = '\n'.join(text_parts)
-            else:
-                return {'shoot_days': None, 'error': f'Cannot read {ext}'}
+            backend = reader_for(schedule_path, ROWS, TIME_READERS)
+            text = '\n'.join(' '.join([str(c) for c in row if c])
+                             for row in backend.read_rows(schedule_path, 100) if row)
         else:
             # PDF
             text = extract_text_from_pdf(schedule_path, max_pages=20)
         
-        text_lower = text.lower()
-        
-        # Count days
-        day_matches = re.findall(r'day\s+(\d+)', text_lower)
-        shoot_day_matches = re.findall(r'shoot\s+day\s+(\d+)', text_lower)
-        all_days = day_matches + shoot_day_matches
-        shoot_days = max([int(d) for d in all_days]) if all_days else None
-        
-        # Call times
-        call_times = re.findall(r'call[:\s]+(\d{1,2})[:\.](\d{2})', text_lower)
-        
-        return {
-            'shoot_days': shoot_days,
-            'call_times_found': len(call_times)
-        }
+        return schedule_from_text(text)
         
     except Exception as e:
         return {'shoot_days': None, 'error': f'{str(e)[:100]}'}
 
-def process_project(project: Dict[str, Any]) -> Dict[str, Any]:
-    """Process a single project"""
-    project_name = project.get('project_name', 'Unknown')
-    print(f"\nProcessing: {project_name}")
+def schedule_from_text(text: str) -> Dict[str, Any]:
+    """Shoot days and call times from schedule text"""
+    text_lower = text.lower()
+    
+    # Count days
+    day_matches = re.findall(r'day\s+(\d+)', text_lower)
+    shoot_day_matches = re.findall(r'shoot\s+day\s+(\d+)', text_lower)
+    all_days = day_matches + shoot_day_matches
+    shoot_days = max([int(d) for d in all_days]) if all_days else None
+    
+    # Call times
+    call_times = re.findall(r'call[:\s]+(\d{1,2})[:\.](\d{2})', text_lower)
     
-    result = {
-        'project_name': project_name,
+    return {
+        'shoot_days': shoot_days,
+        'call_times_found': len(call_times)
+    }
+
+def select_project_files(project: Dict[str, Any]) -> Dict[str, List[Path]]:
+    """List the files to read per kind - the script, and every existing budget / schedule candidate"""
+    files = project.get('files', {})
+    selected = {}
+    
+    script_file = files.get('script')
+    if isinstance(script_file, dict) and 'path' in script_file:
+        if Path(script_file['path']).exists():
+            selected['script'] = [Path(script_file['path'])]
+    
+    for kind in ['budget', 'schedule']:
+        entry = files.get(kind)
+        if isinstance(entry, dict) and 'path' in entry:
+            candidates = [entry]
+        elif isinstance(entry, list):
+            # Schedule lists carry an 'exists' flag from the manifest builder
+            candidates = [f for f in entry if isinstance(f, dict) and 'path' in f
+                          and (kind == 'budget' or f.get('exists', False))]
+        else:
+            candidates = []
+        paths = [Path(c['path']) for c in candidates if Path(c['path']).exists()]
+        if paths:
+            selected[kind] = paths
+    
+    return selected
+
+def extract_budget(budget_path: Path) -> Dict[str, Any]:
+    """Dispatch a budget file to the reader for its extension"""
+    if budget_path.suffix.lower() in ['.xlsx', '.xls']:
+        return extract_from_sheet_budget(budget_path)
+    return extract_from_pdf_budget(budget_path)
+
+def new_result(project: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'project_name': project.get('project_name', 'Unknown'),
         'client': project.get('client', ''),
         'complete': project.get('complete', False),
         'script_features': {},
         'budget_data': {},
         'schedule_data': {}
     }
+
+def read_script(script_path: Path) -> Dict[str, Any]:
+    return extract_features_from_script(extract_text_from_pdf(script_path, max_pages=20))
+
+def process_project(project: Dict[str, Any], dedup: Optional[DedupIndex] = None,
+                    extracted: Optional[Dict[Tuple[str, str], Any]] = None) -> Dict[str, Any]:
+    """
+    Process a single project. extracted holds the (kind, content key) pairs
+    the run reads more than once (see DedupIndex.repeated), each None until
+    its first read; later references get a copy of that read.
+    """
+    project_name = project.get('project_name', 'Unknown')
+    print(f"\nProcessing: {project_name}")
     
-    files = project.get('files', {})
+    result = new_result(project)
+    selected = select_project_files(project)
+    
+    def read_once(kind: str, path: Path, read: Callable[[Path], Dict[str, Any]]) -> Dict[str, Any]:
+        key = (kind, dedup.key(path)) if dedup is not None and extracted is not None else None
+        if extracted and extracted.get(key) is not None:
+            return copy.deepcopy(extracted[key][1])
+        data = read(path)
+        if extracted is not None and key in extracted:
+            extracted[key] = (path, copy.deepcopy(data))
+        return data
     
     # Script
-    if 'script' in files:
-        script_file = files['script']
-        if isinstance(script_file, dict) and 'path' in script_file:
-            script_path = Path(script_file['path'])
-            if script_path.exists():
-                print(f"  📄 Script: {script_path.name}")
-                text = extract_text_from_pdf(script_path, max_pages=20)
-                result['script_features'] = extract_features_from_script(text)
-    
-    # Budget
-    if 'budget' in files:
-        budget_file = files['budget']
-        if isinstance(budget_file, dict) and 'path' in budget_file:
-            budget_path = Path(budget_file['path'])
-            if budget_path.exists():
-                print(f"  💰 Budget: {budget_path.name}")
-                ext = budget_path.suffix.lower()
-                if ext == '.xlsx':
-                    result['budget_data'] = extract_from_xlsx_budget(budget_path)
-                elif ext == '.xls':
-                    result['budget_data'] = extract_from_xls_budget(budget_path)
-                else:
-                    result['budget_data'] = extract_from_pdf_budget(budget_path)
-        elif isinstance(budget_file, list):
-            for bf in budget_file:
-                if isinstance(bf, dict) and 'path' in bf:
-                    budget_path = Path(bf['path'])
-                    if budget_path.exists():
-                        print(f"  💰 Budget: {budget_path.name}")
-                        ext = budget_path.suffix.lower()
-                        if ext == '.xlsx':
-                            result['budget_data'] = extract_from_xlsx_budget(budget_path)
-                        elif ext == '.xls':
-                            result['budget_data'] = extract_from_xls_budget(budget_path)
-                        else:
-                            result['budget_data'] = extract_from_pdf_budget(budget_path)
-                        break
+    if 'script' in selected:
+        script_path = selected['script'][0]
+        print(f"  📄 Script: {script_path.name}")
+        result['script_features'] = read_once('script', script_path, read_script)
+    
+    # Budget - every candidate, then keep the most trustworthy
+    budgets = []
+    for budget_path in selected.get('budget', []):
+        print(f"  💰 Budget: {budget_path.name}")
+        budgets.append((budget_path, read_once('budget', budget_path, extract_budget)))
+    if budgets:
+        result['budget_data'] = pick_best('budget', budgets)
     
     # Schedule
-    if 'schedule' in files:
-        schedule_file = files['schedule']
-        if isinstance(schedule_file, dict) and 'path' in schedule_file:
-            schedule_path = Path(schedule_file['path'])
-            if schedule_path.exists():
-                print(f"  📅 Schedule: {schedule_path.name}")
-                result['schedule_data'] = extract_from_schedule(schedule_path)
-        elif isinstance(schedule_file, list):
-            for sf in schedule_file:
-                if isinstance(sf, dict) and 'path' in sf and sf.get('exists', False):
-                    schedule_path = Path(sf['path'])
-                    if schedule_path.exists():
-                        print(f"  📅 Schedule: {schedule_path.name}")
-                        result['schedule_data'] = extract_from_schedule(schedule_path)
-                        break
+    schedules = []
+    for schedule_path in selected.get('schedule', []):
+        print(f"  📅 Schedule: {schedule_path.name}")
+        schedules.append((schedule_path, read_once('schedule', schedule_path, extract_from_schedule)))
+    if schedules:
+        result['schedule_data'] = pick_best('schedule', schedules)
     
     print(f"  ✅ Done")
     return result
 
-def main():
+# --- Async driver ---------------------------------------------------------
+# Each file holds one concurrency slot while it is read: pdftotext runs as an
+# asyncio subprocess, the Excel readers (and a PDF backend other than
+# pdftotext) are plain Python on the default thread pool.
+
+async def pdf_text_async(pdf_path: Path, max_pages: int) -> str:
+    try:
+        backend = reader_for(pdf_path, TEXT, PDF_READERS)
+    except RuntimeError as e:
+        return f"[PDF extraction failed: {e}]"
+    if backend.name == 'pdftotext':
+        return await pdftotext(pdf_path, max_pages=max_pages)
+    return await asyncio.to_thread(extract_text_from_pdf, pdf_path, max_pages)
+
+async def extract_budget_async(budget_path: Path) -> Dict[str, Any]:
+    if budget_path.suffix.lower() in ['.xlsx', '.xls']:
+        return await asyncio.to_thread(extract_budget, budget_path)
+    return budget_from_pdf_text(await pdf_text_async(budget_path, max_pages=15))
+
+async def extract_schedule_async(schedule_path: Path) -> Dict[str, Any]:
+    if schedule_path.suffix.lower() in ['.xlsx', '.xls']:
+        return await asyncio.to_thread(extract_from_schedule, schedule_path)
+    return schedule_from_text(await pdf_text_async(schedule_path, max_pages=20))
+
+async def extract_script_async(script_path: Path) -> Dict[str, Any]:
+    text = await pdf_text_async(script_path, max_pages=20)
+    return extract_features_from_script(text)
+
+ASYNC_READERS = {
+    'script': ('script_features', extract_script_async),
+    'budget': ('budget_data', extract_budget_async),
+    'schedule': ('schedule_data', extract_schedule_async),
+}
+
+async def process_project_async(project: Dict[str, Any], semaphore: asyncio.Semaphore,
+                                on_file: Optional[Callable[[str, Path, float], None]] = None,
+                                dedup: Optional[DedupIndex] = None,
+                                shared_reads: Optional[Dict[Any, asyncio.Future]] = None) -> Dict[str, Any]:
+    """
+    process_project with every file read concurrently - script, all budget and all
+    schedule candidates - so picking the best candidate costs the slowest read, not the sum.
+    
+    With a DedupIndex and a shared_reads dict (one per run), identical files referenced
+    by several projects are read once and every project gets a copy of the result.
+    """
+    result = new_result(project)
+    selected = select_project_files(project)
+    
+    async def read(kind: str, path: Path) -> Dict[str, Any]:
+        async with semaphore:
+            started = time.perf_counter()
+            data = await ASYNC_READERS[kind][1](path)
+            # Timed inside the slot so queueing doesn't count as extraction time
+            if on_file:
+                on_file(kind, path, time.perf_counter() - started)
+            return data
+    
+    async def read_once(kind: str, path: Path) -> Dict[str, Any]:
+        if dedup is None or shared_reads is None:
+            return await read(kind, path)
+        key = (kind, dedup.key(path))
+        if key not in shared_reads:
+            shared_reads[key] = asyncio.ensure_future(read(kind, path))
+        # A copy each, so assembling one project can't change another's data
+        return copy.deepcopy(await shared_reads[key])
+    
+    reads = [(kind, path) for kind in ASYNC_READERS for path in selected.get(kind, [])]
+    extracted = await asyncio.gather(*(read_once(kind, path) for kind, path in reads))
+    
+    for kind, (key, _) in ASYNC_READERS.items():
+        candidates = [(path, data) for (k, path), data in zip(reads, extracted) if k == kind]
+        if kind == 'script' and candidates:
+            result[key] = candidates[0][1]
+        elif candidates:
+            result[key] = pick_best(kind, candidates)
+    
+    return result
+
+def print_project_result(i: int, total: int, result: Dict[str, Any]) -> None:
+    """One line per finished project - async results arrive out of order"""
+    parts = []
+    if result.get('script_features', {}).get('text_length'):
+        parts.append(f"📄 {result['script_features']['text_length']} chars")
+    if result.get('budget_data', {}).get('total_gbp'):
+        parts.append(f"💰 £{result['budget_data']['total_gbp']:,.0f}")
+    if result.get('schedule_data', {}).get('shoot_days'):
+        parts.append(f"📅 {result['schedule_data']['shoot_days']} days")
+    if result.get('error'):
+        parts.append(f"❌ {result['error']}")
+    print(f"[{i}/{total}] {result.get('project_name', 'Unknown')}: {' | '.join(parts) or '-'}")
+
+def main(argv: Optional[List[str]] = None):
     base_path = Path.home() / "Library/Mobile Documents/com~apple~CloudDocs/Henry-ClientDocs/reference-data"
-    manifest_path = base_path / "training_data_extract.json"
-    output_dir = Path.home() / "clawd/projects/Production Script Platform/production-feasibility-engine/training-data"
+    
+    parser = argparse.ArgumentParser(description='Extract training data with pdftotext')
+    parser.add_argument('--manifest', type=Path, default=base_path / "training_data_extract.json")
+    parser.add_argument('--output-dir', type=Path,
+                        default=Path.home() / "clawd/projects/Production Script Platform/production-feasibility-engine/training-data")
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help='pdftotext processes allowed at once; 1 runs the original sequential loop')
+    parser.add_argument('--json-format', action='append', choices=FORMATS,
+                        help='training_data_complete.json as pretty (default) or compact JSON, and/or '
+                             'training_data_complete.ndjson (repeatable)')
+    args = parser.parse_args(argv)
+    json_formats = list(dict.fromkeys(args.json_format or ['pretty']))
+    if {'pretty', 'compact'} <= set(json_formats):
+        parser.error("--json-format: pretty and compact both write training_data_complete.json")
+    
+    warnings.filterwarnings('ignore')
+    for ext in ('.xlsx', '.xls'):
+        if choose_backend(ext, ROWS) is None:
+            print(f"Warning: no reader for {ext} installed, {ext} budgets disabled")
+    
+    manifest_path = args.manifest
+    output_dir = args.output_dir
     
     output_dir.mkdir(parents=True, exist_ok=True)
     
@@ -362,34 +389,70 @@ def main():
     
     results = []
     
-    for i, project in enumerate(projects, 1):
-        print(f"\n[{i}/{len(projects)}]", end=' ')
-        try:
-            result = process_project(project)
-            results.append(result)
-            
-            if i % 5 == 0:
-                output_path = output_dir / "training_data_partial.json"
-                with open(output_path, 'w') as f:
-                    json.dump(results, f, indent=2)
+    # Predicted cost per project from earlier runs' timings - big decks start first
+    plans = [[(kind, path) for kind, paths in select_project_files(p).items() for path in paths]
+             for p in projects]
+    # Identical files (copies, shared budgets) are read once and shared
+    dedup = DedupIndex(path for plan in plans for _, path in plan)
+    cost_model = CostModel.load(output_dir)
+    costs, profiles = project_costs(cost_model, plans, dedup.key)
+    eta = EtaTracker(sum(costs), workers=args.concurrency)
+    print(f"🔮 Predicted work: {format_duration(sum(costs))} "
+          f"({sum(cost_model.samples.values())} timings on record)")
+    
+    if args.concurrency > 1:
+        finished: Dict[int, Dict[str, Any]] = {}
+        
+        def on_file(kind: str, path: Path, seconds: float) -> None:
+            cost_model.record(profiles[str(path)], kind, seconds)
+        
+        def on_result(index: int, result: Dict[str, Any]) -> None:
+            finished[index] = result
+            eta.advance(costs[index])
+            print_project_result(index + 1, len(projects), result)
+            print(f"  {eta.describe()}")
+            if len(finished) % 5 == 0:
+                write_json(output_dir / "training_data_partial.json",
+                           [finished[i] for i in sorted(finished)], 'compact')
                 print(f"  💾 Checkpoint saved")
+        
+        results = asyncio.run(gather_projects(
+            projects,
+            partial(process_project_async, on_file=on_file, dedup=dedup, shared_reads={}),
+            args.concurrency,
+            on_result,
+            order=longest_first(costs),
+        ))
+        cost_model.save(output_dir)
+    else:
+        # Content read more than once is kept from its first read until the end of the run
+        extracted: Dict[Tuple[str, str], Any] = dict.fromkeys(
+            dedup.repeated(f for plan in plans for f in plan))
+        for i, project in enumerate(projects, 1):
+            print(f"\n[{i}/{len(projects)}]", end=' ')
+            try:
+                result = process_project(project, dedup, extracted)
+                results.append(result)
+                eta.advance(costs[i - 1])
+                print(f"  {eta.describe()}")
                 
-        except Exception as e:
-            print(f"  ❌ Failed: {e}")
-            results.append({
-                'project_name': project.get('project_name', 'Unknown'),
-                'error': str(e)
-            })
+                if i % 5 == 0:
+                    write_json(output_dir / "training_data_partial.json", results, 'compact')
+                    print(f"  💾 Checkpoint saved")
+                    
+            except Exception as e:
+                print(f"  ❌ Failed: {e}")
+                results.append({
+                    'project_name': project.get('project_name', 'Unknown'),
+                    'error': str(e)
+                })
     
     print(f"\n\n{'='*60}")
     print("✅ EXTRACTION COMPLETE")
     print(f"{'='*60}")
     
-    output_path = output_dir / "training_data_complete.json"
-    with open(output_path, 'w') as f:
-        json.dump(results, f, indent=2)
-    
-    print(f"\n💾 Saved: {output_path}")
+    for output_path in write_results(output_dir, "training_data_complete", results, json_formats):
+        print(f"\n💾 Saved: {output_path}")
     
     # Summary
     successful = sum(1 for r in results if 'error' not in r)
@@ -403,6 +466,9 @@ def main():
     print(f"  Scripts: {with_script}")
     print(f"  Budgets: {with_budget}")
     print(f"  Schedules: {with_schedule}")
+    print(f"  {dedup.report(f for plan in plans for f in plan).describe()}")
+    for group in dedup.duplicates():
+        print(f"    = {' | '.join(Path(p).name for p in group)}")
     
     # Sample budgets
     budgets_found = [r for r in results if r.get('budget_data', {}).get('total_gbp')]
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Extraction cost model - predicts how long each file will take to extract
+
+Predictions come from a per-format least-squares fit of
+seconds ~ a + b * MB + c * pages over timings recorded on previous runs
+(extraction_timings.json next to the output). With too few samples for a
+format we fall back to rough priors, so the first run still gets a sensible
+longest-first ordering and an ETA.
+"""
+
+import json
+import re
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+TIMINGS_FILE = 'extraction_timings.json'
+MAX_RECORDS = 2000
+
+# Pages beyond this are never read (the extractors stop at 15-20 pages)
+PAGE_CAP = 20
+
+# Seconds = base + per_mb * MB + per_page * pages, before any timings exist
+PRIOR_COEFFICIENTS = {
+    'pdf': (0.2, 0.15, 0.15),
+    'xlsx': (0.5, 1.5, 0.0),
+    'xls': (0.3, 1.0, 0.0),
+}
+DEFAULT_COEFFICIENTS = (0.3, 0.5, 0.1)
+
+_PDF_PAGE = re.compile(rb'/Type\s*/Page(?![a-zA-Z])')
+
+
+def count_pdf_pages(path: Path, max_bytes: int = 32 * 1024 * 1024) -> Optional[int]:
+    """Count page objects in the raw PDF - cheap, but misses pages hidden in object streams"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read(max_bytes)
+    except OSError:
+        return None
+    pages = len(_PDF_PAGE.findall(data))
+    return pages or None
+
+
+@dataclass
+class FileProfile:
+    """What the model knows about a file before extracting it"""
+    path: str
+    file_format: str
+    size: int
+    pages: Optional[int] = None
+
+    @property
+    def mb(self) -> float:
+        return self.size / (1024 * 1024)
+
+
+def profile_file(path: Path, known_pages: Optional[Dict[Tuple[str, int], int]] = None) -> FileProfile:
+    """Build a FileProfile from stat() and, for PDFs, a page count (cached from earlier runs)"""
+    try:
+        size = path.stat().st_size
+    except OSError:
+        size = 0
+    file_format = path.suffix.lower().lstrip('.') or 'unknown'
+    pages = None
+    if file_format == 'pdf' and size:
+        pages = (known_pages or {}).get((str(path), size))
+        if pages is None:
+            pages = count_pdf_pages(path)
+    return FileProfile(str(path), file_format, size, pages)
+
+
+def _solve_3x3(a: List[List[float]], b: List[float]) -> Optional[List[float]]:
+    """Gaussian elimination with partial pivoting; None if singular"""
+    m = [row[:] + [rhs] for row, rhs in zip(a, b)]
+    for col in range(3):
+        pivot = max(range(col, 3), key=lambda r: abs(m[r][col]))
+        if abs(m[pivot][col]) < 1e-12:
+            return None
+        m[col], m[pivot] = m[pivot], m[col]
+        for r in range(3):
+            if r != col:
+                factor = m[r][col] / m[col][col]
+                for c in range(col, 4):
+                    m[r][c] -= factor * m[col][c]
+    return [m[i][3] / m[i][i] for i in range(3)]
+
+
+def fit_coefficients(samples: Sequence[Tuple[float, float, float]]) -> Optional[Tuple[float, float, float]]:
+    """Least-squares fit of seconds ~ a + b*mb + c*pages from (mb, pages, seconds) samples"""
+    if len(samples) < 3:
+        return None
+    ata = [[0.0] * 3 for _ in range(3)]
+    aty = [0.0] * 3
+    for mb, pages, seconds in samples:
+        x = (1.0, mb, pages)
+        for i in range(3):
+            aty[i] += x[i] * seconds
+            for j in range(3):
+                ata[i][j] += x[i] * x[j]
+    # Tiny ridge term keeps all-PDFs-have-1-page corpora solvable
+    for i in range(1, 3):
+        ata[i][i] += 1e-6
+    solved = _solve_3x3(ata, aty)
+    if solved is None:
+        return None
+    # Negative slopes are noise on small samples - clamp to the prior's sign
+    return (max(solved[0], 0.0), max(solved[1], 0.0), max(solved[2], 0.0))
+
+
+class CostModel:
+    """Per-format linear model of extraction seconds, learned from recorded timings"""
+
+    def __init__(self, records: Optional[List[Dict[str, Any]]] = None):
+        self.records: List[Dict[str, Any]] = list(records or [])
+        self.coefficients: Dict[str, Tuple[float, float, float]] = dict(PRIOR_COEFFICIENTS)
+        self.samples: Dict[str, int] = {}
+        self._fit()
+
+    @classmethod
+    def load(cls, directory: Path) -> 'CostModel':
+        path = directory / TIMINGS_FILE
+        if not path.exists():
+            return cls()
+        try:
+            with open(path) as f:
+                return cls(json.load(f))
+        except (OSError, ValueError):
+            return cls()
+
+    def save(self, directory: Path) -> None:
+        with open(directory / TIMINGS_FILE, 'w') as f:
+            json.dump(self.records[-MAX_RECORDS:], f, indent=2)
+
+    def _fit(self) -> None:
+        by_format: Dict[str, List[Tuple[float, float, float]]] = {}
+        for r in self.records:
+            pages = min(r.get('pages') or 0, PAGE_CAP)
+            by_format.setdefault(r['file_format'], []).append(
+                (r['size'] / (1024 * 1024), pages, r['seconds'])
+            )
+        for file_format, samples in by_format.items():
+            self.samples[file_format] = len(samples)
+            fitted = fit_coefficients(samples)
+            if fitted:
+                self.coefficients[file_format] = fitted
+
+    def known_pages(self) -> Dict[Tuple[str, int], int]:
+        """(path, size) -> page count seen on earlier runs, so we don't rescan big PDFs"""
+        return {(r['path'], r['size']): r['pages'] for r in self.records if r.get('pages')}
+
+    def predict(self, profile: FileProfile) -> float:
+        base, per_mb, per_page = self.coefficients.get(profile.file_format, DEFAULT_COEFFICIENTS)
+        pages = min(profile.pages or 0, PAGE_CAP)
+        return base + per_mb * profile.mb + per_page * pages
+
+    def record(self, profile: FileProfile, kind: str, seconds: float) -> None:
+        self.records.append({**asdict(profile), 'kind': kind, 'seconds': round(seconds, 4),
+                             'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S')})
+
+
+def longest_first(costs: Sequence[float]) -> List[int]:
+    """LPT order: indices of the most expensive projects first (ties keep manifest order)"""
+    return sorted(range(len(costs)), key=lambda i: -costs[i])
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{(seconds % 3600) // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class EtaTracker:
+    """ETA from predicted costs, rescaled by how fast the run is actually going"""
+
+    def __init__(self, predicted_total: float, workers: int = 1):
+        self.predicted_total = predicted_total
+        self.predicted_done = 0.0
+        self.workers = max(workers, 1)
+        self.started = time.perf_counter()
+
+    def advance(self, predicted_cost: float) -> None:
+        self.predicted_done += predicted_cost
+
+    def eta(self) -> float:
+        remaining = max(self.predicted_total - self.predicted_done, 0.0)
+        elapsed = time.perf_counter() - self.started
+        if self.predicted_done > 0 and elapsed > 0:
+            return remaining * elapsed / self.predicted_done
+        return remaining / self.workers
+
+    def describe(self) -> str:
+        return f"⏱️  ETA {format_duration(self.eta())}"
+
+
+def project_costs(model: CostModel, plans: Iterable[List[Tuple[str, Path]]],
+                  dedupe_key: Optional[Callable[[Path], str]] = None,
+                  ) -> Tuple[List[float], Dict[str, FileProfile]]:
+    """
+    Predicted seconds per project, plus the profile of every planned file.
+    With dedupe_key, repeat reads of the same content are free.
+    """
+    known = model.known_pages()
+    profiles: Dict[str, FileProfile] = {}
+    seen = set()
+    costs = []
+    for plan in plans:
+        total = 0.0
+        for kind, path in plan:
+            key = str(path)
+            if key not in profiles:
+                profiles[key] = profile_file(Path(path), known)
+            if dedupe_key:
+                content = (kind, dedupe_key(Path(path)))
+                if content in seen:
+                    continue
+                seen.add(content)
+            total += model.predict(profiles[key])
+        costs.append(total)
+    return costs, profiles
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Staged extraction pipeline - overlaps slow file reads with parsing
+
+Stage 1 (thread pool):  stat, sniff and stage each file into the temp dir
+Stage 2 (process pool): run the PDF / Excel parsers on the staged copy
+Stage 3 (caller):       collect parse results and emit projects in manifest order
+
+Bounded queues sit between the stages, so a slow parser holds back the
+prefetchers instead of letting staged copies pile up on disk or in memory.
+Fed in some other order (longest first), projects finished ahead of an
+earlier one wait in stage 3; a window on how many may wait keeps that
+bounded too.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Leading bytes of the formats we parse; anything else is 'unknown'
+FILE_SIGNATURES = [
+    (b'%PDF', 'pdf'),
+    (b'PK\x03\x04', 'xlsx'),
+    (b'\xd0\xcf\x11\xe0', 'xls'),
+]
+
+_DONE = object()
+
+
+@dataclass
+class FileJob:
+    """One file to extract, in the order the manifest lists it"""
+    project_index: int
+    kind: str  # 'script' | 'budget' | 'schedule'
+    path: Path
+    seq: int = 0  # position in the plan, so outcomes can be put back in order
+
+
+@dataclass
+class StagedFile:
+    """A file after stage 1 - staged copy plus what we learned from sniffing it"""
+    job: FileJob
+    staged_path: Optional[Path]
+    size: int
+    file_format: str
+    error: Optional[str] = None
+    seconds: float = 0.0  # staging
+    stat_seconds: float = 0.0
+    started: float = 0.0  # time.time() the prefetch began
+    thread: Tuple[int, int, str] = (0, 0, '')  # pid, thread id and name of the prefetcher
+
+
+@dataclass
+class FileOutcome:
+    """A file after stage 2 - parser output, or why there is none"""
+    job: FileJob
+    data: Optional[Dict[str, Any]]
+    file_format: str
+    error: Optional[str] = None
+    size: int = 0
+    seconds: float = 0.0  # staging + parsing
+    stat_seconds: float = 0.0
+    stage_seconds: float = 0.0
+    duplicate_of: Optional[Path] = None  # outcome copied from this file's read (same content)
+    started: float = 0.0
+    thread: Tuple[int, int, str] = (0, 0, '')
+
+
+def sniff_format(path: Path) -> str:
+    """Identify a file from its first bytes; zero-byte files are usually undownloaded iCloud stubs"""
+    with open(path, 'rb') as f:
+        head = f.read(8)
+    if not head:
+        return 'empty'
+    for signature, file_format in FILE_SIGNATURES:
+        if head.startswith(signature):
+            return file_format
+    return 'unknown'
+
+
+def prefetch_file(job: FileJob, stage: Callable[[Path], Path]) -> StagedFile:
+    """Stage 1: stat + sniff the source, then copy it somewhere the parser can read it safely"""
+    current = threading.current_thread()
+    where = {'started': time.time(), 'thread': (os.getpid(), current.native_id, current.name)}
+    started = time.perf_counter()
+    try:
+        size = job.path.stat().st_size
+        file_format = sniff_format(job.path)
+    except OSError as e:
+        return StagedFile(job, None, 0, 'missing', f'stat failed: {str(e)[:50]}', **where)
+    stat_seconds = time.perf_counter() - started
+
+    if file_format == 'empty':
+        return StagedFile(job, None, 0, file_format, 'empty file (not downloaded?)',
+                          stat_seconds=stat_seconds, **where)
+
+    started = time.perf_counter()
+    try:
+        staged_path = stage(job.path)
+    except Exception as e:
+        return StagedFile(job, None, size, file_format, f'staging failed: {str(e)[:50]}',
+                          stat_seconds=stat_seconds, **where)
+    return StagedFile(job, staged_path, size, file_format,
+                      seconds=time.perf_counter() - started, stat_seconds=stat_seconds, **where)
+
+
+def timed_parse(parse: Callable[[str, Path], Dict[str, Any]], kind: str, path: Path) -> Tuple[Dict[str, Any], float]:
+    """Stage 2 body: run the parser in the worker and report how long it took"""
+    started = time.perf_counter()
+    data = parse(kind, path)
+    return data, time.perf_counter() - started
+
+
+def _put(q: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    """Blocking put that gives up once the consumer has gone away"""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q: queue.Queue, stop: threading.Event) -> Any:
+    """Blocking get that returns _DONE once the pipeline is being torn down"""
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _DONE
+
+
+def _resolved(value: Any) -> Future:
+    future: Future = Future()
+    future.set_result(value)
+    return future
+
+
+def run_pipeline(
+    projects: List[Dict[str, Any]],
+    plan: Callable[[Dict[str, Any]], List[Tuple[str, Path]]],
+    stage: Callable[[Path], Path],
+    parse: Callable[[str, Path], Dict[str, Any]],
+    assemble: Callable[[Dict[str, Any], List[FileOutcome]], Dict[str, Any]],
+    unstage: Optional[Callable[[Path], None]] = None,
+    io_workers: int = 4,
+    cpu_workers: Optional[int] = None,
+    max_pending: int = 8,
+    order: Optional[List[int]] = None,
+    reorder_window: int = 32,
+    on_file: Optional[Callable[[FileOutcome], None]] = None,
+    dedupe_key: Optional[Callable[[Path], str]] = None,
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Run every project's files through the three stages.
+
+    plan(project) lists (kind, path) pairs to read, stage/unstage make and remove the
+    temp copy, parse(kind, staged_path) runs in a worker process (so it must be a
+    module-level function) and assemble(project, outcomes) builds the result dict.
+
+    Yields (project_index, result) strictly in manifest order. At most `max_pending`
+    files wait between each pair of stages, which caps staged copies on disk.
+
+    `order` is the sequence of project indices to feed in (e.g. longest first); the
+    output order doesn't change. Projects that finish ahead of an earlier one are
+    held until it's done: once more than `reorder_window` are waiting, the feed
+    takes the earliest project not yet fed instead, until they have drained - so
+    the reordering can't hold the whole run in memory. on_file(outcome) is called
+    as each file finishes.
+
+    With dedupe_key(path) -> content key, only the first read of each (kind, key)
+    goes through the stages; later references get a copy of its outcome.
+    """
+    if order is None:
+        order = list(range(len(projects)))
+    all_jobs = [
+        FileJob(index, kind, Path(path))
+        for index in order
+        for kind, path in plan(projects[index])
+    ]
+    for seq, job in enumerate(all_jobs):
+        job.seq = seq
+    remaining = [0] * len(projects)
+    for job in all_jobs:
+        remaining[job.project_index] += 1
+
+    jobs: List[FileJob] = []
+    leaders: Dict[Tuple[str, str], FileJob] = {}
+    followers: Dict[int, List[FileJob]] = {}
+    for job in all_jobs:
+        key = (job.kind, dedupe_key(job.path)) if dedupe_key else None
+        if key is not None and key in leaders:
+            followers[id(leaders[key])].append(job)
+            continue
+        if key is not None:
+            leaders[key] = job
+        followers[id(job)] = []
+        jobs.append(job)
+
+    # Each project's files to read, projects in feed order
+    to_feed: Dict[int, List[FileJob]] = {}
+    for job in jobs:
+        to_feed.setdefault(job.project_index, []).append(job)
+    # Parse outcomes of projects not yet emitted, by project index
+    outcomes: Dict[int, List[FileOutcome]] = {}
+
+    prefetched: queue.Queue = queue.Queue(maxsize=max_pending)
+    parsed: queue.Queue = queue.Queue(maxsize=max_pending)
+    stop = threading.Event()
+
+    io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix='prefetch')
+    cpu_pool = ProcessPoolExecutor(max_workers=cpu_workers)
+
+    def feed():
+        try:
+            waiting = list(to_feed)
+            while waiting:
+                index = min(waiting) if len(outcomes) > reorder_window else waiting[0]
+                waiting.remove(index)
+                for job in to_feed[index]:
+                    if not _put(prefetched, io_pool.submit(prefetch_file, job, stage), stop):
+                        return
+        finally:
+            _put(prefetched, _DONE, stop)
+
+    def dispatch():
+        try:
+            while True:
+                item = _get(prefetched, stop)
+                if item is _DONE:
+                    break
+                staged = item.result()
+                if staged.error:
+                    future = _resolved((None, 0.0))
+                else:
+                    future = cpu_pool.submit(timed_parse, parse, staged.job.kind, staged.staged_path)
+                if not _put(parsed, (staged, future), stop):
+                    return
+        finally:
+            _put(parsed, _DONE, stop)
+
+    threads = [
+        threading.Thread(target=feed, name='pipeline-feed', daemon=True),
+        threading.Thread(target=dispatch, name='pipeline-dispatch', daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+
+    next_index = 0
+
+    def finish(index: int) -> Dict[str, Any]:
+        done = sorted(outcomes.pop(index, []), key=lambda o: o.job.seq)
+        return assemble(projects[index], done)
+
+    try:
+        while True:
+            # Emit every project whose files are all in, holding later ones back
+            # until the earlier ones (which may have been fed in later) catch up
+            while next_index < len(projects) and remaining[next_index] == 0:
+                yield next_index, finish(next_index)
+                next_index += 1
+
+            item = parsed.get()
+            if item is _DONE:
+                break
+
+            staged, future = item
+            parse_seconds = 0.0
+            try:
+                data, parse_seconds = future.result()
+                error = staged.error
+            except BrokenProcessPool:
+                raise
+            except Exception as e:
+                data, error = None, f'parse failed: {str(e)[:50]}'
+            finally:
+                if unstage and staged.staged_path and staged.staged_path != staged.job.path:
+                    unstage(staged.staged_path)
+
+            outcome = FileOutcome(staged.job, data, staged.file_format, error,
+                                  staged.size, staged.seconds + parse_seconds,
+                                  staged.stat_seconds, staged.seconds,
+                                  started=staged.started, thread=staged.thread)
+            if on_file:
+                on_file(outcome)
+
+            # Fan the result out to every other reference to the same content
+            copies = [FileOutcome(job, data, staged.file_format, error, staged.size,
+                                  duplicate_of=staged.job.path)
+                      for job in followers.pop(id(staged.job), [])]
+            for finished in [outcome] + copies:
+                index = finished.job.project_index
+                outcomes.setdefault(index, []).append(finished)
+                remaining[index] -= 1
+
+        while next_index < len(projects):
+            yield next_index, finish(next_index)
+            next_index += 1
+
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=5)
+        io_pool.shutdown(wait=True, cancel_futures=True)
+        cpu_pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Script extraction as a long-running local service
+
+    python3 -m extractor serve [--socket /tmp/extractor.sock | --port 8765] [--workers N]
+
+The same script features and scene headings the batch drivers produce, for
+one uploaded PDF at a time, without a cold start per upload: the worker
+processes are started - and have imported the driver and pdfplumber and
+scanned a warm-up page - before the first request, and stay up. Pages
+already seen (an earlier revision of the same script, the same script
+uploaded twice) come from the shared page cache instead of being parsed
+again.
+
+    POST /script     body: the PDF bytes
+                     -> {"script_features": {...}, "scenes": [...], "pages": {...},
+                         "seconds": 0.41, "worker": 1234}
+    GET  /health     -> {"status": "ok", "workers": 4, "requests": 12, ...}
+
+Errors come back as {"error": "..."} with a 4xx / 5xx status - a PDF no
+text could be read from is a 422. It listens
+on a Unix socket or on 127.0.0.1 only - there is no authentication, so it
+is not for exposing beyond the machine. `python3 -m extractor load` drives
+it with concurrent clients and reports latency percentiles.
+"""
+
+import http.client
+import importlib
+import json
+import multiprocessing
+import os
+import shutil
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from extractor.backends import TEXT
+from json_output import dumps
+
+DEFAULT_PORT = 8765
+MAX_UPLOAD = 50 * 1024 * 1024
+REQUEST_TIMEOUT = 120.0
+WARM_TEXT = 'SCENE 1. INT. KITCHEN - DAY\nA child and a dog. Drone shot over the car.\n'
+
+Address = Union[str, Tuple[str, int]]
+
+# --- Worker processes ---------------------------------------------------------------
+
+_driver: Any = None
+_page_cache: Optional[Path] = None
+_upload_dir: Optional[Path] = None
+_barrier: Any = None
+
+
+class ExtractionFailed(Exception):
+    """The upload is a PDF, but no script text could be read from it"""
+
+
+def _warm(page_cache: Optional[str], upload_dir: str, barrier: Any) -> None:
+    """Pool initializer: import and exercise everything a request needs, once per worker"""
+    global _driver, _page_cache, _upload_dir, _barrier
+    _driver = importlib.import_module('extract_training_data_final')
+    # The parsing library loads here, not on the first upload
+    for module in _driver.reader_for(Path('warm.pdf'), TEXT, _driver.PDF_READERS).requires:
+        importlib.import_module(module)
+    _driver.extract_features_from_script(WARM_TEXT)
+    _driver.scene_headings(WARM_TEXT)
+    _page_cache = Path(page_cache) if page_cache else None
+    _upload_dir = Path(upload_dir)
+    _barrier = barrier
+
+
+def _ready() -> int:
+    # Held until every worker has one, so each of them has to start
+    _barrier.wait(REQUEST_TIMEOUT)
+    return os.getpid()
+
+
+def extract_upload(data: bytes) -> Dict[str, Any]:
+    """Features and scene headings of one PDF (runs in a worker)"""
+    started = time.perf_counter()
+    path = _upload_dir / f'{uuid.uuid4().hex}.pdf'
+    path.write_bytes(data)
+    try:
+        features, text, stats = _driver.extract_script(path, staged=True, page_cache=_page_cache)
+        scenes = _driver.scene_headings(text)
+    finally:
+        path.unlink()
+    error = _driver.script_error(text)
+    if error or not text.strip():
+        raise ExtractionFailed(error or 'no text in the PDF (a scan?)')
+    return {
+        'script_features': features,
+        'scenes': scenes,
+        'pages': stats,
+        'seconds': round(time.perf_counter() - started, 4),
+        'worker': os.getpid(),
+    }
+
+
+# --- Server -------------------------------------------------------------------------
+
+class ExtractionService:
+    """The warm worker pool plus the counters /health reports"""
+
+    def __init__(self, workers: int = 2, page_cache: Optional[Path] = None,
+                 timeout: float = REQUEST_TIMEOUT):
+        self.workers = workers
+        self.timeout = timeout
+        self.page_cache = page_cache
+        # Uploads are written here for the workers to read, and removed after
+        self.upload_dir = tempfile.mkdtemp(prefix='extraction_service_')
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_warm,
+                                        initargs=(str(page_cache) if page_cache else None, self.upload_dir,
+                                                  multiprocessing.Barrier(workers)))
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0, 'in_flight': 0, 'busy_seconds': 0.0}
+
+    def warm_up(self) -> float:
+        """Start every worker now rather than on the first uploads; returns the seconds it took"""
+        started = time.perf_counter()
+        # Results only come back from processes that have run the initializer,
+        # and none comes back until all of them are up
+        pids = set(f.result() for f in [self.pool.submit(_ready) for _ in range(self.workers)])
+        self.stats['worker_pids'] = sorted(pids)
+        return time.perf_counter() - started
+
+    def extract(self, data: bytes) -> Dict[str, Any]:
+        with self.lock:
+            self.stats['requests'] += 1
+            self.stats['in_flight'] += 1
+        try:
+            result = self.pool.submit(extract_upload, data).result(timeout=self.timeout)
+        except BaseException:
+            with self.lock:
+                self.stats['errors'] += 1
+            raise
+        finally:
+            with self.lock:
+                self.stats['in_flight'] -= 1
+        with self.lock:
+            self.stats['busy_seconds'] += result['seconds']
+        return result
+
+    def health(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = dict(self.stats)
+        return {'status': 'ok', 'workers': self.workers, 'uptime': round(time.time() - self.started, 1),
+                'page_cache': str(self.page_cache) if self.page_cache else None, **stats}
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        shutil.rmtree(self.upload_dir, ignore_errors=True)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = 'extraction-service/1'
+    protocol_version = 'HTTP/1.1'  # keep-alive, so clients reuse connections
+
+    @property
+    def service(self) -> ExtractionService:
+        return self.server.service
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port)
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _reply(self, status: int, body: Dict[str, Any]) -> None:
+        data = dumps(body)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        if self.path.rstrip('/') == '/health':
+            self._reply(200, self.service.health())
+        else:
+            self._reply(404, {'error': f'no such endpoint: GET {self.path}'})
+
+    def do_POST(self) -> None:
+        if self.path.rstrip('/') != '/script':
+            self._reply(404, {'error': f'no such endpoint: POST {self.path}'})
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        if length <= 0:
+            self._reply(411, {'error': 'send the PDF as the request body, with a Content-Length'})
+            return
+        if length > MAX_UPLOAD:
+            self._reply(413, {'error': f'upload over {MAX_UPLOAD // (1024 * 1024)} MB'})
+            self.close_connection = True
+            return
+        data = self.rfile.read(length)
+        if not data.startswith(b'%PDF'):
+            self._reply(415, {'error': 'not a PDF'})
+            return
+        try:
+            self._reply(200, self.service.extract(data))
+        except FutureTimeout:
+            self._reply(504, {'error': f'extraction took over {self.service.timeout:.0f}s'})
+        except ExtractionFailed as e:
+            self._reply(422, {'error': str(e)[:200]})
+        except Exception as e:
+            self._reply(500, {'error': f'{type(e).__name__}: {str(e)[:200]}'})
+
+
+class _TCPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(service: ExtractionService, address: Address, verbose: bool = False) -> socketserver.BaseServer:
+    """An HTTP server for the service on a Unix socket path or a (host, port)"""
+    if isinstance(address, str):
+        if os.path.exists(address):
+            os.unlink(address)  # left over from a previous run
+        server = _UnixServer(address, _Handler)
+    else:
+        if address[0] not in ('127.0.0.1', 'localhost', '::1'):
+            raise ValueError(f'{address[0]}: the service only listens on the loopback interface')
+        server = _TCPServer(address, _Handler)
+    server.service = service
+    server.verbose = verbose
+    return server
+
+
+def describe_address(address: Address) -> str:
+    return f'unix:{address}' if isinstance(address, str) else f'http://{address[0]}:{address[1]}'
+
+
+# --- Client -------------------------------------------------------------------------
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float = REQUEST_TIMEOUT):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class ServiceClient:
+    """One keep-alive connection to the service (not thread-safe - one per thread)"""
+
+    def __init__(self, address: Address, timeout: float = REQUEST_TIMEOUT):
+        if isinstance(address, str):
+            self.connection: http.client.HTTPConnection = _UnixConnection(address, timeout)
+        else:
+            self.connection = http.client.HTTPConnection(address[0], address[1], timeout=timeout)
+
+    def _request(self, method: str, path: str, body: Optional[bytes] = None) -> Tuple[int, Dict[str, Any]]:
+        headers = {'Content-Type': 'application/pdf'} if body is not None else {}
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+        except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+            # The server closed an idle keep-alive connection - reconnect once
+            self.connection.close()
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+        return response.status, json.loads(response.read() or b'{}')
+
+    def extract(self, data: bytes) -> Tuple[int, Dict[str, Any]]:
+        return self._request('POST', '/script', data)
+
+    def health(self) -> Dict[str, Any]:
+        return self._request('GET', '/health')[1]
+
+    def close(self) -> None:
+        self.connection.close()
@@ -0,0 +1,16 @@
+"""
+Production data extraction - backend registry, benchmarks and CLI
+
+Run `python3 -m extractor --help`. The drivers (extract_training_data_final,
+extract_with_pdftotext) and their helper modules live alongside this package.
+"""
+
+from .backends import (BACKENDS, PAGE_LIMIT, ROW_READERS, ROWS, STREAMING, TEXT, TIME_READERS, Backend,
+                       backends_for, choose_backend, get_backend, register)
+from .bench import load_throughput, run_bench, saved_throughput
+
+__all__ = [
+    'BACKENDS', 'PAGE_LIMIT', 'ROW_READERS', 'ROWS', 'STREAMING', 'TEXT', 'TIME_READERS', 'Backend',
+    'backends_for', 'choose_backend', 'get_backend', 'register', 'load_throughput', 'run_bench',
+    'saved_throughput',
+]
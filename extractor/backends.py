@@ -0,0 +1,229 @@
+"""
+Backend registry - every library we can read a file format with
+
+Each backend declares what it can do: the file formats it reads, whether it
+natively yields text (PDF readers) or rows of cells (spreadsheet readers),
+whether it honours a page limit, whether it streams, and what it needs
+installed. Drivers ask the registry for a backend per format, out of the
+ones they accept; with benchmark results from `python3 -m extractor bench`,
+the fastest available one wins, otherwise the first in the driver's order.
+
+Every backend can produce both shapes: text backends give one-cell rows per
+line (what labelled_total expects for PDFs), row backends give space-joined
+rows as text. PDF backends also read a page at a time (read_pages), which
+is how the drivers stop early and hand pages to the search index.
+"""
+
+import io
+import shutil
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Optional, Sequence, Tuple
+
+from lazy_modules import lazy_import
+
+from .xlsx_stream import iter_xlsx_rows
+
+pdfplumber = lazy_import('pdfplumber')
+pd = lazy_import('pandas')
+openpyxl = lazy_import('openpyxl')
+xlrd = lazy_import('xlrd')
+
+Row = Tuple[Any, ...]
+
+# Capability names
+TEXT = 'text'            # yields text natively
+ROWS = 'rows'            # yields rows of cells natively
+PAGE_LIMIT = 'page_limit'  # stops reading after max_pages
+STREAMING = 'streaming'  # memory doesn't grow with file size
+
+# Spreadsheet readers in the order the drivers prefer them, most faithful
+# first: openpyxl and xlrd return times and dates as such, the stdlib
+# streamer as serial numbers, and pandas loads the whole sheet
+ROW_READERS = ('openpyxl', 'xlrd', 'xlsx-stream', 'pandas')
+# The ones that give a schedule's call times as times, not serial numbers
+TIME_READERS = ('openpyxl', 'xlrd', 'pandas')
+
+
+@dataclass(frozen=True)
+class Backend:
+    name: str
+    formats: FrozenSet[str]           # lower-case suffixes: '.pdf', '.xlsx', '.xls'
+    capabilities: FrozenSet[str]
+    description: str
+    requires: Tuple[str, ...] = ()    # Python modules
+    executables: Tuple[str, ...] = ()  # programs on PATH
+    text_reader: Optional[Callable[[Path, int], str]] = field(default=None, repr=False)
+    page_reader: Optional[Callable[[Path, int], Iterator[str]]] = field(default=None, repr=False)
+    row_reader: Optional[Callable[[Path, Optional[int]], Iterator[Row]]] = field(default=None, repr=False)
+
+    def missing(self) -> List[str]:
+        """What isn't installed for this backend (empty if it's usable)"""
+        missing = [m for m in self.requires if not lazy_import(m).available]
+        missing += [e for e in self.executables if shutil.which(e) is None]
+        return missing
+
+    @property
+    def available(self) -> bool:
+        return not self.missing()
+
+    def supports(self, file_format: str, capability: Optional[str] = None) -> bool:
+        return file_format.lower() in self.formats and (capability is None or capability in self.capabilities)
+
+    def read_text(self, path: Path, max_pages: int = 20, max_rows: Optional[int] = None) -> str:
+        if self.text_reader:
+            return self.text_reader(path, max_pages)
+        return '\n'.join(' '.join(str(c) for c in row if c not in (None, ''))
+                         for row in self.row_reader(path, max_rows))
+
+    def read_pages(self, path: Path, max_pages: int = 20) -> Iterator[str]:
+        """Text a page at a time (a backend without pages gives its text as one)"""
+        if self.page_reader:
+            return self.page_reader(path, max_pages)
+        return iter([self.read_text(path, max_pages)])
+
+    def read_rows(self, path: Path, max_rows: Optional[int] = None, max_pages: int = 20) -> Iterator[Row]:
+        if self.row_reader:
+            return self.row_reader(path, max_rows)
+        lines = self.text_reader(path, max_pages).split('\n')
+        return iter([(line,) for line in lines[:max_rows]])
+
+
+# --- Readers ----------------------------------------------------------------
+
+def _pdftotext_text(path: Path, max_pages: int) -> str:
+    result = subprocess.run(['pdftotext', '-l', str(max_pages), str(path), '-'],
+                            capture_output=True, text=True, timeout=30)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip()[:100] or f'pdftotext exit {result.returncode}')
+    return result.stdout
+
+
+def _pdftotext_pages(path: Path, max_pages: int) -> Iterator[str]:
+    # pdftotext ends every page with a form feed
+    yield from _pdftotext_text(path, max_pages).split('\f')[:max_pages]
+
+
+def _pdfplumber_pages(path: Path, max_pages: int) -> Iterator[str]:
+    with pdfplumber.open(path) as pdf:
+        for page in pdf.pages[:max_pages]:
+            yield page.extract_text() or ''
+
+
+def _pdfplumber_text(path: Path, max_pages: int) -> str:
+    return '\n'.join(_pdfplumber_pages(path, max_pages))
+
+
+def _openpyxl_rows(path: Path, max_rows: Optional[int]) -> Iterator[Row]:
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from wb.worksheets[0].iter_rows(max_row=max_rows, values_only=True)
+    finally:
+        wb.close()
+
+
+def _xlrd_value(cell: Any, datemode: int) -> Any:
+    if cell.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK):
+        return None
+    if cell.ctype == xlrd.XL_CELL_DATE:
+        # As openpyxl and pandas give them - a serial number would pass for an amount
+        try:
+            value = xlrd.xldate_as_datetime(cell.value, datemode)
+        except (ValueError, OverflowError):
+            return cell.value
+        return value.time() if cell.value < 1 else value
+    return cell.value
+
+
+def _xlrd_rows(path: Path, max_rows: Optional[int]) -> Iterator[Row]:
+    # xlrd chats on stdout about old BIFF versions - keep that out of reports
+    wb = xlrd.open_workbook(path, on_demand=True, logfile=io.StringIO())
+    try:
+        sheet = wb.sheet_by_index(0)
+        for row_idx in range(sheet.nrows if max_rows is None else min(max_rows, sheet.nrows)):
+            yield tuple(_xlrd_value(cell, wb.datemode) for cell in sheet.row(row_idx))
+    finally:
+        wb.release_resources()
+
+
+def _pandas_rows(path: Path, max_rows: Optional[int]) -> Iterator[Row]:
+    df = pd.read_excel(path, sheet_name=0, header=None, nrows=max_rows)
+    for row in df.itertuples(index=False, name=None):
+        # NaN != NaN - empty cells come back as None like the other readers
+        yield tuple(None if v != v else v for v in row)
+
+
+# --- Registry ---------------------------------------------------------------
+
+BACKENDS: Dict[str, Backend] = {}
+
+
+def register(backend: Backend) -> Backend:
+    BACKENDS[backend.name] = backend
+    return backend
+
+
+register(Backend(
+    'pdftotext', frozenset({'.pdf'}), frozenset({TEXT, PAGE_LIMIT, STREAMING}),
+    'poppler pdftotext subprocess - fast, reading-order text',
+    executables=('pdftotext',), text_reader=_pdftotext_text, page_reader=_pdftotext_pages,
+))
+register(Backend(
+    'pdfplumber', frozenset({'.pdf'}), frozenset({TEXT, PAGE_LIMIT}),
+    'pdfplumber layout analysis - slower, no external binary',
+    requires=('pdfplumber',), text_reader=_pdfplumber_text, page_reader=_pdfplumber_pages,
+))
+register(Backend(
+    'xlsx-stream', frozenset({'.xlsx'}), frozenset({ROWS, STREAMING}),
+    'stdlib zip + iterparse, one row at a time (dates as serial numbers)',
+    row_reader=iter_xlsx_rows,
+))
+register(Backend(
+    'openpyxl', frozenset({'.xlsx'}), frozenset({ROWS, STREAMING}),
+    'openpyxl read-only mode',
+    requires=('openpyxl',), row_reader=_openpyxl_rows,
+))
+register(Backend(
+    'xlrd', frozenset({'.xls'}), frozenset({ROWS}),
+    'xlrd for legacy .xls workbooks',
+    requires=('xlrd',), row_reader=_xlrd_rows,
+))
+register(Backend(
+    'pandas', frozenset({'.xlsx', '.xls'}), frozenset({ROWS}),
+    'pandas.read_excel (loads the whole sheet; uses openpyxl / xlrd underneath)',
+    requires=('pandas',), row_reader=_pandas_rows,
+))
+
+
+def get_backend(name: str) -> Backend:
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"unknown backend '{name}' (have: {', '.join(BACKENDS)})") from None
+
+
+def backends_for(file_format: str, capability: Optional[str] = None,
+                 available_only: bool = True) -> List[Backend]:
+    """Backends that read this format (in registration order)"""
+    return [b for b in BACKENDS.values()
+            if b.supports(file_format, capability) and (b.available or not available_only)]
+
+
+def choose_backend(file_format: str, capability: Optional[str] = None,
+                   throughput: Optional[Dict[str, Dict[str, float]]] = None,
+                   prefer: Sequence[str] = ()) -> Optional[Backend]:
+    """
+    Pick a backend for a format out of the available ones in prefer (any
+    available one if none of those is): the best measured MB/s for the format
+    (from bench results) if any of them was measured, else the first in
+    prefer order, else the first registered.
+    """
+    available = backends_for(file_format, capability)
+    candidates = [b for name in prefer for b in available if b.name == name] or available
+    if not candidates:
+        return None
+    measured = (throughput or {}).get(file_format.lower(), {})
+    if any(b.name in measured for b in candidates):
+        return max(candidates, key=lambda b: measured.get(b.name, -1.0))
+    return candidates[0]
@@ -0,0 +1,142 @@
+"""
+Backend benchmark - time every available backend on the local corpus
+
+Each file is read by every available backend that supports its format, a few
+times over, and the results are summarised per (format, backend) as files/s
+and MB/s along with failures and empty reads (a fast backend that returns
+nothing is no use). The summary is saved as JSON; choose_backend() takes its
+'throughput' table to pick the fastest backend per format, and the drivers
+read it from BENCH_FILE in the working directory when there is one.
+"""
+
+import json
+import statistics
+import time
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .backends import Backend, backends_for
+
+BENCH_FILE = 'backend_bench.json'
+FORMATS = ('.pdf', '.xlsx', '.xls')
+
+
+@dataclass
+class BackendStats:
+    file_format: str
+    backend: str
+    files: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    failures: int = 0
+    empty: int = 0
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.seconds if self.seconds else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes / (1024 * 1024) / self.seconds if self.seconds else 0.0
+
+
+def collect_corpus(sources: Iterable[Path]) -> List[Path]:
+    """Every PDF / spreadsheet under the given files and directories, deduplicated"""
+    found = []
+    for source in sources:
+        if source.is_dir():
+            found.extend(p for p in sorted(source.rglob('*')) if p.suffix.lower() in FORMATS)
+        elif source.suffix.lower() in FORMATS:
+            found.append(source)
+    seen = set()
+    return [p for p in found if not (str(p) in seen or seen.add(str(p)))]
+
+
+def time_read(backend: Backend, path: Path, repeats: int,
+              max_pages: int, max_rows: Optional[int]) -> Dict[str, Any]:
+    """Median seconds for one backend reading one file, and how much it got out"""
+    timings = []
+    size = 0
+    for _ in range(repeats):
+        started = time.perf_counter()
+        if backend.row_reader:
+            size = sum(1 for row in backend.read_rows(path, max_rows) if any(c not in (None, '') for c in row))
+        else:
+            size = len(backend.read_text(path, max_pages).strip())
+        timings.append(time.perf_counter() - started)
+    return {'seconds': statistics.median(timings), 'output': size}
+
+
+def run_bench(paths: List[Path], names: Optional[List[str]] = None, repeats: int = 3,
+              max_pages: int = 20, max_rows: Optional[int] = None,
+              on_result=None) -> List[BackendStats]:
+    stats: Dict[tuple, BackendStats] = {}
+    for path in paths:
+        file_format = path.suffix.lower()
+        try:
+            size = path.stat().st_size
+        except OSError:
+            continue
+        if not size:
+            continue
+        for backend in backends_for(file_format):
+            if names and backend.name not in names:
+                continue
+            entry = stats.setdefault((file_format, backend.name), BackendStats(file_format, backend.name))
+            try:
+                measured = time_read(backend, path, repeats, max_pages, max_rows)
+            except Exception as e:
+                entry.failures += 1
+                if on_result:
+                    on_result(path, backend, None, str(e)[:80])
+                continue
+            entry.files += 1
+            entry.bytes += size
+            entry.seconds += measured['seconds']
+            if not measured['output']:
+                entry.empty += 1
+            if on_result:
+                on_result(path, backend, measured, None)
+    return sorted(stats.values(), key=lambda s: (s.file_format, -s.mb_per_second))
+
+
+def throughput_table(results: List[BackendStats]) -> Dict[str, Dict[str, float]]:
+    """{format: {backend: MB/s}}, scaled down by the share of files a backend failed or read nothing from"""
+    table: Dict[str, Dict[str, float]] = {}
+    for r in results:
+        attempts = r.files + r.failures
+        score = r.mb_per_second * (r.files - r.empty) / attempts if attempts else 0.0
+        table.setdefault(r.file_format, {})[r.backend] = round(score, 3)
+    return table
+
+
+def save_results(results: List[BackendStats], path: Path, corpus_size: int) -> Dict[str, Any]:
+    table = throughput_table(results)
+    report = {
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'files': corpus_size,
+        'results': [{**asdict(r), 'files_per_second': round(r.files_per_second, 3),
+                     'mb_per_second': round(r.mb_per_second, 3)} for r in results],
+        'throughput': table,
+        'best': {fmt: max(scores, key=scores.get) for fmt, scores in table.items() if scores},
+    }
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def load_throughput(path: Path) -> Dict[str, Dict[str, float]]:
+    """The throughput table from a saved bench report ({} if there isn't one)"""
+    try:
+        with open(path) as f:
+            return json.load(f).get('throughput', {})
+    except (OSError, ValueError):
+        return {}
+
+
+@lru_cache(maxsize=None)
+def saved_throughput(path: str = BENCH_FILE) -> Dict[str, Dict[str, float]]:
+    """load_throughput, read once per process - what the drivers choose their readers by"""
+    return load_throughput(Path(path))
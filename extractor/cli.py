@@ -0,0 +1,450 @@
+"""
+Single command-line entry point for the extractors
+
+    python3 -m extractor extract [--engine pdfplumber|pdftotext] [driver options]
+    python3 -m extractor backends
+    python3 -m extractor bench [paths...] [--manifest M] [--backend NAME ...]
+    python3 -m extractor corpus OUT_DIR [--size small|medium|large] [--projects N] [--seed S]
+    python3 -m extractor compare --manifest M [--variant NAME ...] [--reference NAME] [--assert-equal A,B]
+    python3 -m extractor search QUERY [--db PATH] [--kind script|budget|schedule] [--limit N]
+    python3 -m extractor codegen --results training_data_complete.json [--data-dir DIR] [--check]
+    python3 -m extractor calibrate --results training_data_complete.json [--resamples N] [--output report.json]
+    python3 -m extractor comparables [--results R] [--like NAME | --script PDF] [--index DIR] [-k N]
+    python3 -m extractor serve [--socket PATH | --port N] [--workers N] [--page-cache DIR]
+    python3 -m extractor load [paths...] [--manifest M] [--socket PATH | --port N] [--concurrency N] [--cold]
+"""
+
+import argparse
+import importlib
+import json
+import signal
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import comparables
+import cost_calibration
+import extraction_service
+import schedule_patterns
+import ts_codegen
+from json_output import read_json, write_json
+from results_store import STORE_FILE, ResultsStore
+
+from .backends import BACKENDS, choose_backend
+from .bench import BENCH_FILE, collect_corpus, load_throughput, run_bench, save_results
+from .load import LOAD_FILE, run_cold, run_load
+from .regression import EXPECTED, VARIANTS, compare, equivalent
+from .synthetic import SIZES, generate_corpus, spec_for
+
+# --engine -> the driver module whose main() runs the extraction
+ENGINES = {
+    'pdfplumber': 'extract_training_data_final',
+    'pdftotext': 'extract_with_pdftotext',
+}
+
+
+def cmd_extract(args: argparse.Namespace) -> None:
+    driver = importlib.import_module(ENGINES[args.engine])
+    driver_args = args.driver_args
+    if driver_args and driver_args[0] == '--':
+        driver_args = driver_args[1:]
+    driver.main(args.unknown_args + driver_args)
+
+
+def cmd_backends(args: argparse.Namespace) -> None:
+    throughput = load_throughput(args.results)
+    print(f"{'backend':<12} {'formats':<12} {'capabilities':<28} status")
+    for backend in BACKENDS.values():
+        missing = backend.missing()
+        status = '✓' if not missing else f"missing {', '.join(missing)}"
+        print(f"{backend.name:<12} {','.join(sorted(backend.formats)):<12} "
+              f"{','.join(sorted(backend.capabilities)):<28} {status}")
+        print(f"{'':<12} {backend.description}")
+    print()
+    for file_format in ('.pdf', '.xlsx', '.xls'):
+        chosen = choose_backend(file_format, throughput=throughput)
+        basis = 'measured' if throughput.get(file_format) else 'default'
+        print(f"  {file_format:<6} → {chosen.name if chosen else 'none available'} ({basis})")
+
+
+def manifest_files(manifest: Path) -> List[Path]:
+    from extract_training_data_final import plan_project_files
+    with open(manifest) as f:
+        projects = json.load(f).get('projects', [])
+    return [path for project in projects for _, path in plan_project_files(project)]
+
+
+def cmd_bench(args: argparse.Namespace) -> None:
+    paths = collect_corpus(args.paths)
+    if args.manifest:
+        paths += collect_corpus(manifest_files(args.manifest))
+    if not paths:
+        print("No PDF / spreadsheet files to benchmark")
+        return
+    print(f"🏁 Benchmarking {len(paths)} files, {args.repeats} reads each")
+
+    def on_result(path, backend, measured, error):
+        if args.verbose:
+            outcome = f"⚠️  {error}" if error else f"{measured['seconds'] * 1000:.1f}ms"
+            print(f"  {backend.name:<12} {path.name[:50]:<50} {outcome}")
+
+    results = run_bench(paths, args.backend, args.repeats, args.max_pages, args.max_rows, on_result)
+    report = save_results(results, args.output, len(paths))
+
+    print(f"\n{'format':<7} {'backend':<12} {'files':>5} {'files/s':>9} {'MB/s':>8} {'failed':>6} {'empty':>5}")
+    for r in results:
+        print(f"{r.file_format:<7} {r.backend:<12} {r.files:>5} {r.files_per_second:>9.1f} "
+              f"{r.mb_per_second:>8.2f} {r.failures:>6} {r.empty:>5}")
+    print()
+    for file_format, name in report['best'].items():
+        print(f"  {file_format:<6} → {name}")
+    print(f"\n💾 {args.output}")
+
+
+def cmd_corpus(args: argparse.Namespace) -> None:
+    spec = spec_for(args.size, args.projects)
+    manifest = generate_corpus(args.out_dir, spec, args.seed)
+    files = [p for p in args.out_dir.rglob('*') if p.is_file() and p != manifest]
+    size_mb = sum(p.stat().st_size for p in files) / (1024 * 1024)
+    print(f"🧪 {len(files)} files ({size_mb:.1f} MB) for {spec.projects} projects, seed {args.seed}")
+    print(f"💾 {manifest}")
+
+
+def cmd_compare(args: argparse.Namespace) -> None:
+    variants = args.variant or list(VARIANTS)
+    print(f"🔬 Comparing {len(variants)} extractor variants on {args.manifest}")
+
+    def on_variant(name, run):
+        if run.get('available'):
+            print(f"  {name:<15} {run['seconds']:>8.2f}s  {run['peak_rss_mb']:>7.1f} MB")
+        else:
+            print(f"  {name:<15} ⚠️  unavailable: {' '.join(run.get('reason') or ['unknown'])}")
+
+    report = compare(args.manifest, variants, args.reference, args.timeout, on_variant)
+
+    print(f"\n{'variant':<15} {'proj/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'peak MB':>8}   "
+          f"fields matching {args.reference} ({report['projects']} projects)")
+    for name, run in report['variants'].items():
+        if not run.get('available'):
+            continue
+        matches = ', '.join(f"{field} {d['match']}" for field, d in report['diffs'].get(name, {}).items())
+        if name == args.reference:
+            matches = '(reference)'
+        speed = (f"{run['projects_per_sec'] or 0:>8.2f} {run['p50_ms']:>9.1f} {run['p95_ms']:>9.1f} "
+                 f"{run['peak_rss_mb']:>8.1f}" if name != EXPECTED else f"{'':>8} {'':>9} {'':>9} {'':>8}")
+        print(f"{name:<15} {speed}   {matches}")
+    if args.verbose:
+        for name, fields in report['diffs'].items():
+            for field, d in fields.items():
+                for example in d['examples']:
+                    print(f"  {name} {field} {example['project']}: "
+                          f"{example['reference']!r} → {example['value']!r}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"\n💾 {args.output}")
+
+    failed = False
+    for pair in args.assert_equal or []:
+        a, _, b = pair.partition(',')
+        ok, problems = equivalent(report, a, b)
+        print(f"{'✅' if ok else '❌'} {a} == {b}" + ('' if ok else f": {'; '.join(problems)}"))
+        failed |= not ok
+    if failed:
+        sys.exit(1)
+
+
+def cmd_search(args: argparse.Namespace) -> None:
+    if not args.db.exists():
+        sys.exit(f"No results store at {args.db} - run an extraction first (or pass --db)")
+    query = ' '.join(args.query)
+    with ResultsStore(args.db) as store:
+        started = time.perf_counter()
+        try:
+            hits = store.search(query, args.kind or (), args.limit, args.latest)
+        except sqlite3.OperationalError as e:
+            sys.exit(f"Bad query {query!r}: {e}")
+        elapsed = time.perf_counter() - started
+    print(f"🔎 {len(hits)} pages matching {query!r} ({elapsed * 1000:.1f} ms)")
+    for rank, hit in enumerate(hits, 1):
+        print(f"\n{rank:>3}. {hit['project_name']} ({hit['client'] or '?'}) - "
+              f"{hit['kind']} p.{hit['page']}  [{-hit['score']:.2f}]")
+        print(f"     {Path(hit['path']).name}")
+        print(f"     {' '.join(hit['snippet'].split())}")
+
+
+def cmd_codegen(args: argparse.Namespace) -> None:
+    results = read_json(args.results)
+    report = ts_codegen.generate(results, args.data_dir, check=args.check)
+    print(f"🧬 {report['projects']} projects: {report['matched']} extracted + overrides, "
+          f"{report['extracted_only']} extracted only, {report['manual_only']} from overrides only")
+    for name in report['skipped']:
+        print(f"  ⚠️  left out (no budget or shoot days): {name}")
+    patterns = schedule_patterns.generate(results, args.data_dir, check=args.check)
+    print(f"🗓️  {patterns['schedules']} schedules")
+    costs = cost_calibration.generate(results, args.cost_dir, check=args.check)
+    print(f"📐 {costs['projects']} projects calibrated, {len(costs['bands'])} cost bands")
+    key = 'stale' if args.check else 'written'
+    report[key] += patterns[key] + costs[key]
+    if args.check:
+        for path in report['stale']:
+            print(f"❌ out of date: {path}")
+        if report['stale']:
+            sys.exit(1)
+        print("✅ up to date")
+    else:
+        for path in report['written']:
+            print(f"💾 {path}")
+
+
+def cmd_calibrate(args: argparse.Namespace) -> None:
+    results = read_json(args.results)
+    started = time.perf_counter()
+    report = cost_calibration.calibrate(cost_calibration.gather(results), args.resamples, args.seed)
+    elapsed = time.perf_counter() - started
+    for line in cost_calibration.describe(report):
+        print(line)
+    print(f"📐 calibrated in {elapsed:.2f}s")
+    if args.output:
+        write_json(args.output, report)
+        print(f"💾 {args.output}")
+
+
+def cmd_comparables(args: argparse.Namespace) -> None:
+    if args.results:
+        report = comparables.update_index(args.index, read_json(args.results))
+        print(f"🧭 {args.index}: {report['rows']} projects ({report['added']} added, "
+              f"{report['changed']} changed, {report['dropped']} dropped)")
+    if not (args.like or args.script):
+        return
+    index = comparables.ComparablesIndex(args.index)
+    started = time.perf_counter()
+    if args.like:
+        try:
+            matches = index.like(args.like, args.k)
+        except KeyError:
+            sys.exit(f"❌ {args.like!r} is not in {args.index}")
+        target = args.like
+    else:
+        driver = importlib.import_module('extract_training_data_final')
+        features = driver.extract_features_from_script(driver.extract_text_from_pdf(args.script, max_pages=20))
+        started = time.perf_counter()
+        matches = index.for_features(features, args.shoot_type, args.k)
+        target = args.script.name
+    elapsed = time.perf_counter() - started
+    print(f"🧭 {len(matches)} comparables for {target} out of {len(index)} ({elapsed * 1000:.2f} ms)")
+    for rank, match in enumerate(matches, 1):
+        budget = f"£{match['total_gbp']:,.0f}" if match['total_gbp'] else '£?'
+        per_day = f" (£{match['budget_per_day']:,}/day)" if match['budget_per_day'] else ''
+        print(f"{rank:>3}. {match['project_name']} ({match['client'] or '?'}, {match['shoot_type'] or '?'}) "
+              f"{match['similarity']:.3f}  {budget}, {match['shoot_days'] or '?'} days{per_day}")
+    spread = comparables.budget_range(matches)
+    if spread:
+        print(f"     £/day across {spread['samples']}: £{spread['min']:,} - £{spread['median']:,} (median)"
+              f" - £{spread['max']:,}")
+
+
+def service_address(args: argparse.Namespace) -> extraction_service.Address:
+    return str(args.socket) if args.socket else ('127.0.0.1', args.port)
+
+
+def cmd_serve(args: argparse.Namespace) -> None:
+    service = extraction_service.ExtractionService(args.workers, args.page_cache, args.timeout)
+    address = service_address(args)
+    try:
+        server = extraction_service.make_server(service, address, args.verbose)
+    except (OSError, ValueError) as e:
+        service.close()
+        sys.exit(f"❌ {extraction_service.describe_address(address)}: {e}")
+    print(f"🔥 Starting {args.workers} workers...")
+    print(f"   warm in {service.warm_up():.2f}s")
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, stop)
+    print(f"🛰️  Serving on {extraction_service.describe_address(address)} (Ctrl-C to stop)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        if args.socket and args.socket.exists():
+            args.socket.unlink()
+    health = service.health()
+    print(f"\n👋 {health['requests']} requests, {health['errors']} errors")
+
+
+def cmd_load(args: argparse.Namespace) -> None:
+    paths = [p for p in collect_corpus(args.paths) if p.suffix.lower() == '.pdf']
+    if args.manifest:
+        from extract_training_data_final import plan_project_files
+        with open(args.manifest) as f:
+            projects = json.load(f).get('projects', [])
+        paths += [path for project in projects for kind, path in plan_project_files(project)
+                  if kind == 'script' and path.suffix.lower() == '.pdf']
+    if not paths:
+        print("No script PDFs to upload")
+        return
+
+    def on_result(path, latency, error):
+        if args.verbose:
+            print(f"  {path.name[:50]:<50} {latency * 1000:>8.1f}ms" + (f"  ⚠️  {error}" if error else ''))
+
+    if args.cold:
+        print(f"🧊 {args.requests} uploads of {len(paths)} scripts, a fresh interpreter each")
+        report = run_cold(paths, args.requests, on_result)
+    else:
+        address = service_address(args)
+        try:
+            health = extraction_service.ServiceClient(address).health()
+        except OSError as e:
+            sys.exit(f"❌ no service on {extraction_service.describe_address(address)} ({e}) - "
+                     f"start one with 'python3 -m extractor serve'")
+        print(f"🚚 {args.requests} uploads of {len(paths)} scripts, {args.concurrency} clients, "
+              f"{health['workers']} workers")
+        report = run_load(address, paths, args.concurrency, args.requests, on_result)
+
+    print(f"\n{'req/s':>8} {'first ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>6}")
+    print(f"{report['requests_per_sec'] or 0:>8.2f} {report['first_ms'] or 0:>9.1f} {report['p50_ms']:>9.1f} "
+          f"{report['p95_ms']:>9.1f} {report['p99_ms']:>9.1f} {report['max_ms']:>9.1f} {report['errors']:>6}")
+    if report['mode'] == 'service':
+        print(f"   extraction itself: p50 {report['worker_p50_ms']:.1f} ms in the workers")
+    for error in report['error_examples']:
+        print(f"  ⚠️  {error}")
+    if args.output:
+        write_json(args.output, report)
+        print(f"\n💾 {args.output}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python3 -m extractor',
+                                     description='Production data extraction')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    extract = commands.add_parser('extract', help='run an extraction over a manifest')
+    extract.add_argument('--engine', choices=sorted(ENGINES), default='pdfplumber',
+                         help='pdfplumber: staged process-pool pipeline; pdftotext: async subprocess driver')
+    extract.add_argument('driver_args', nargs=argparse.REMAINDER,
+                         help="options passed to the engine (see '--engine X -- --help')")
+    extract.set_defaults(run=cmd_extract)
+
+    backends = commands.add_parser('backends', help='list backends, their capabilities and availability')
+    backends.add_argument('--results', type=Path, default=Path(BENCH_FILE),
+                          help='bench results used to pick per-format backends')
+    backends.set_defaults(run=cmd_backends)
+
+    bench = commands.add_parser('bench', help='compare backends on local files')
+    bench.add_argument('paths', nargs='*', type=Path, help='files or directories to read')
+    bench.add_argument('--manifest', type=Path, help='also read every file a manifest references')
+    bench.add_argument('--backend', action='append', help='only these backends (repeatable)')
+    bench.add_argument('--repeats', type=int, default=3)
+    bench.add_argument('--max-pages', type=int, default=20)
+    bench.add_argument('--max-rows', type=int, default=None)
+    bench.add_argument('--output', type=Path, default=Path(BENCH_FILE))
+    bench.add_argument('-v', '--verbose', action='store_true')
+    bench.set_defaults(run=cmd_bench)
+
+    corpus = commands.add_parser('corpus', help='generate a synthetic document corpus and manifest')
+    corpus.add_argument('out_dir', type=Path)
+    corpus.add_argument('--size', choices=sorted(SIZES), default='medium')
+    corpus.add_argument('--projects', type=int, default=0, help='override the size preset')
+    corpus.add_argument('--seed', type=int, default=0)
+    corpus.set_defaults(run=cmd_corpus)
+
+    regression = commands.add_parser('compare', help='diff and time the extractor variants on one manifest')
+    regression.add_argument('--manifest', type=Path, required=True)
+    regression.add_argument('--variant', action='append', choices=list(VARIANTS),
+                            help='only these variants (repeatable, default all)')
+    regression.add_argument('--reference', default='final', help="variant diffs are against (or 'expected')")
+    regression.add_argument('--assert-equal', action='append', metavar='A,B',
+                            help='exit 1 unless variants A and B agree on every field (repeatable)')
+    regression.add_argument('--timeout', type=float, default=None, help='seconds per variant')
+    regression.add_argument('--output', type=Path, help='write the full report as JSON')
+    regression.add_argument('-v', '--verbose', action='store_true', help='print differing values')
+    regression.set_defaults(run=cmd_compare)
+
+    search = commands.add_parser('search', help='full-text search of extracted script, schedule and budget pages')
+    search.add_argument('query', nargs='+',
+                        help='words (all must match), or an FTS5 query: "russian arm", child OR kid, under*')
+    search.add_argument('--db', type=Path, default=Path(STORE_FILE),
+                        help='results store written by an extraction (OUTPUT_DIR/training_data.sqlite)')
+    search.add_argument('--kind', action='append', choices=['script', 'budget', 'schedule'],
+                        help='only these documents (repeatable)')
+    search.add_argument('--limit', type=int, default=20)
+    search.add_argument('--latest', action='store_true', help='leave out superseded script revisions')
+    search.set_defaults(run=cmd_search)
+
+    codegen = commands.add_parser('codegen', help='regenerate the src/lib/data modules built from results')
+    codegen.add_argument('--results', type=Path, required=True,
+                         help='training_data_complete.json (or .ndjson) from an extraction')
+    codegen.add_argument('--data-dir', type=Path, default=ts_codegen.DATA_DIR,
+                         help=f'where {ts_codegen.TS_FILE} and {ts_codegen.OVERRIDES_FILE} live')
+    codegen.add_argument('--cost-dir', type=Path, default=cost_calibration.COST_DIR,
+                         help=f'where {cost_calibration.TS_FILE} lives')
+    codegen.add_argument('--check', action='store_true', help='write nothing; exit 1 if the files are stale')
+    codegen.set_defaults(run=cmd_codegen)
+
+    calibrate = commands.add_parser('calibrate', help='fit per-day cost bands and drivers to extracted budgets')
+    calibrate.add_argument('--results', type=Path, required=True,
+                           help='training_data_complete.json (or .ndjson) from an extraction')
+    calibrate.add_argument('--resamples', type=int, default=cost_calibration.RESAMPLES,
+                           help='bootstrap resamples for the intervals')
+    calibrate.add_argument('--seed', type=int, default=0)
+    calibrate.add_argument('--output', type=Path, help='write the full report as JSON')
+    calibrate.set_defaults(run=cmd_calibrate)
+
+    similar = commands.add_parser('comparables', help='nearest past projects by script features')
+    similar.add_argument('--index', type=Path, default=Path(comparables.INDEX_DIR),
+                         help='index directory (an extraction with --comparables DIR writes one)')
+    similar.add_argument('--results', type=Path,
+                         help='add / update projects from training_data_complete.json first')
+    query = similar.add_mutually_exclusive_group()
+    query.add_argument('--like', metavar='PROJECT', help='comparables for an indexed project')
+    query.add_argument('--script', type=Path, help='comparables for a new script PDF')
+    similar.add_argument('--shoot-type', choices=comparables.SHOOT_TYPES, help="the new script's shoot type")
+    similar.add_argument('-k', type=int, default=5, help='how many comparables')
+    similar.set_defaults(run=cmd_comparables)
+
+    serve = commands.add_parser('serve', help='serve script extraction from a warm worker pool')
+    where = serve.add_mutually_exclusive_group()
+    where.add_argument('--socket', type=Path, help='listen on this Unix socket')
+    where.add_argument('--port', type=int, default=extraction_service.DEFAULT_PORT,
+                       help='listen on 127.0.0.1:PORT (when no --socket)')
+    serve.add_argument('--workers', type=int, default=2, help='extraction processes kept running')
+    serve.add_argument('--page-cache', type=Path,
+                       help='reuse pages across uploads and revisions (e.g. OUTPUT_DIR/page_cache)')
+    serve.add_argument('--timeout', type=float, default=extraction_service.REQUEST_TIMEOUT,
+                       help='seconds before an upload gets a 504')
+    serve.add_argument('-v', '--verbose', action='store_true', help='log every request')
+    serve.set_defaults(run=cmd_serve)
+
+    load = commands.add_parser('load', help='drive a running service with concurrent uploads')
+    load.add_argument('paths', nargs='*', type=Path, help='script PDFs or directories of them')
+    load.add_argument('--manifest', type=Path, help="also upload every script a manifest references")
+    where = load.add_mutually_exclusive_group()
+    where.add_argument('--socket', type=Path)
+    where.add_argument('--port', type=int, default=extraction_service.DEFAULT_PORT)
+    load.add_argument('--concurrency', type=int, default=4, help='clients posting at once')
+    load.add_argument('--requests', type=int, default=50, help='uploads in total')
+    load.add_argument('--cold', action='store_true',
+                      help='baseline: a fresh interpreter per upload instead of the service')
+    load.add_argument('--output', type=Path, nargs='?', const=Path(LOAD_FILE), help='write the report as JSON')
+    load.add_argument('-v', '--verbose', action='store_true')
+    load.set_defaults(run=cmd_load)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = build_parser()
+    # Options the extract command doesn't know are the engine's
+    args, unknown = parser.parse_known_args(argv)
+    if unknown and args.command != 'extract':
+        parser.error(f"unrecognized arguments: {' '.join(unknown)}")
+    args.unknown_args = unknown
+    args.run(args)
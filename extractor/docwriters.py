@@ -0,0 +1,185 @@
+"""
+Minimal PDF / .xlsx / .xls writers for synthetic test documents
+
+Just enough of each format for the extractors' readers to parse: text and
+image pages in a PDF, one worksheet of strings and numbers in an .xlsx or
+.xls. Standard library only, and byte-for-byte deterministic for the same
+input, so a generated corpus is reproducible across machines.
+"""
+
+import struct
+import zipfile
+import zlib
+from pathlib import Path
+from typing import Any, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+A4 = (595, 842)
+
+
+def _pdf_string(text: str) -> bytes:
+    data = text.encode('latin-1', 'replace')
+    return b'(' + data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+
+
+class PdfWriter:
+    """Pages of Helvetica text and greyscale images (storyboard frames)"""
+
+    def __init__(self, compress: bool = True):
+        self.compress = compress
+        self.pages: List[Tuple[bytes, Optional[Tuple[int, int, bytes]]]] = []
+
+    @staticmethod
+    def _text_ops(lines: Sequence[str], top: int, size: int = 10, leading: int = 12) -> bytes:
+        ops = [f'BT /F1 {size} Tf {leading} TL 50 {top} Td'.encode()]
+        for line in lines:
+            ops.append(_pdf_string(line) + b" Tj T*")
+        ops.append(b'ET')
+        return b'\n'.join(ops)
+
+    def text_page(self, lines: Sequence[str]) -> None:
+        self.pages.append((self._text_ops(lines, A4[1] - 50), None))
+
+    def image_page(self, width: int, height: int, pixels: bytes, caption: Sequence[str] = ()) -> None:
+        """A page with one 8-bit greyscale image (width * height bytes) and a caption"""
+        draw_w = A4[0] - 100
+        draw_h = int(draw_w * height / width)
+        ops = f'q {draw_w} 0 0 {draw_h} 50 {A4[1] - 80 - draw_h} cm /Im1 Do Q'.encode()
+        if caption:
+            ops += b'\n' + self._text_ops(caption, A4[1] - 110 - draw_h)
+        self.pages.append((ops, (width, height, pixels)))
+
+    def _stream(self, data: bytes, extra: str = '') -> bytes:
+        if self.compress:
+            data = zlib.compress(data, 6)
+            extra += ' /Filter /FlateDecode'
+        return f'<< /Length {len(data)}{extra} >>\nstream\n'.encode() + data + b'\nendstream'
+
+    def save(self, path: Path) -> None:
+        objects: List[bytes] = [b'', b'', b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica '
+                                           b'/Encoding /WinAnsiEncoding >>']
+        page_ids = []
+        for content, image in self.pages:
+            content_id = len(objects) + 1
+            objects.append(self._stream(content))
+            xobject = ''
+            if image:
+                width, height, pixels = image
+                image_id = len(objects) + 1
+                objects.append(self._stream(
+                    pixels, f' /Type /XObject /Subtype /Image /Width {width} /Height {height} '
+                            f'/ColorSpace /DeviceGray /BitsPerComponent 8'))
+                xobject = f' /XObject << /Im1 {image_id} 0 R >>'
+            page_ids.append(len(objects) + 1)
+            objects.append(
+                f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {A4[0]} {A4[1]}] '
+                f'/Resources << /Font << /F1 3 0 R >>{xobject} >> /Contents {content_id} 0 R >>'.encode())
+        objects[0] = b'<< /Type /Catalog /Pages 2 0 R >>'
+        kids = ' '.join(f'{i} 0 R' for i in page_ids)
+        objects[1] = f'<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>'.encode()
+
+        out = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(len(out))
+            out += f'{number} 0 obj\n'.encode() + body + b'\nendobj\n'
+        xref = len(out)
+        out += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+        for offset in offsets:
+            out += f'{offset:010d} 00000 n \n'.encode()
+        out += (f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n'
+                f'startxref\n{xref}\n%%EOF\n').encode()
+        Path(path).write_bytes(bytes(out))
+
+
+# --- .xlsx -------------------------------------------------------------------
+
+_XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+        'relationships/officeDocument" Target="xl/workbook.xml"/></Relationships>'),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+        'relationships/worksheet" Target="worksheets/sheet1.xml"/></Relationships>'),
+}
+
+
+def _column_letters(index: int) -> str:
+    letters = ''
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def write_xlsx(path: Path, rows: Sequence[Sequence[Any]], sheet_name: str = 'Sheet1') -> None:
+    """One worksheet; str cells become inline strings, int/float cells numbers, None blanks"""
+    body = []
+    for r, row in enumerate(rows, 1):
+        cells = []
+        for c, value in enumerate(row):
+            ref = f'{_column_letters(c)}{r}'
+            if value is None or value == '':
+                continue
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                cells.append(f'<c r="{ref}"><v>{value!r}</v></c>')
+            else:
+                cells.append(f'<c r="{ref}" t="inlineStr"><is><t>{escape(str(value))}</t></is></c>')
+        body.append(f'<row r="{r}">{"".join(cells)}</row>')
+    sheet = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+             '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+             f'<sheetData>{"".join(body)}</sheetData></worksheet>')
+    workbook = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+                f'<sheets><sheet name="{escape(sheet_name)}" sheetId="1" r:id="rId1"/></sheets></workbook>')
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        # Fixed timestamps keep the zip identical from run to run
+        for name, data in [*_XLSX_PARTS.items(), ('xl/workbook.xml', workbook),
+                           ('xl/worksheets/sheet1.xml', sheet)]:
+            info = zipfile.ZipInfo(name, date_time=(2020, 1, 1, 0, 0, 0))
+            info.compress_type = zipfile.ZIP_DEFLATED
+            archive.writestr(info, data)
+
+
+# --- .xls ---------------------------------------------------------------------
+
+def _biff(record: int, data: bytes) -> bytes:
+    return struct.pack('<HH', record, len(data)) + data
+
+
+def write_xls(path: Path, rows: Sequence[Sequence[Any]]) -> None:
+    """
+    One worksheet as a BIFF2 stream - the oldest .xls dialect, which xlrd,
+    pandas and Excel all still open. Strings are cut to 255 cp1252 bytes.
+    """
+    width = max((len(r) for r in rows), default=0)
+    out = bytearray(_biff(0x0009, struct.pack('<HH', 0x0007, 0x0010)))            # BOF, worksheet
+    out += _biff(0x0042, struct.pack('<H', 1252))                                  # CODEPAGE
+    out += _biff(0x0000, struct.pack('<HHHH', 0, len(rows), 0, width))             # DIMENSIONS
+    for r, row in enumerate(rows):
+        for c, value in enumerate(row):
+            if value is None or value == '':
+                continue
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                out += _biff(0x0003, struct.pack('<HH3sd', r, c, b'\0\0\0', float(value)))   # NUMBER
+            else:
+                text = str(value).encode('cp1252', 'replace')[:255]
+                out += _biff(0x0004, struct.pack('<HH3sB', r, c, b'\0\0\0', len(text)) + text)  # LABEL
+    out += _biff(0x000A, b'')                                                       # EOF
+    Path(path).write_bytes(bytes(out))
@@ -0,0 +1,126 @@
+"""
+Load generator for the extraction service
+
+Concurrent clients, each on its own keep-alive connection, post script PDFs
+to a running `python3 -m extractor serve` round-robin until the requested
+number of uploads is done. Reported per run: throughput, latency
+percentiles (as the client sees them and as the workers spent extracting),
+errors and the first upload's latency, so a cold first request stands out.
+
+With cold=True the same uploads are instead run one fresh interpreter per
+upload - the driver imported and the PDF extracted, then exit - which is
+what the service replaces.
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from extraction_service import Address, ServiceClient, describe_address
+
+LOAD_FILE = 'service_load.json'
+ROOT = Path(__file__).resolve().parent.parent
+COLD_SCRIPT = ('import sys; from pathlib import Path; import extract_training_data_final as d; '
+               'f, t, _ = d.extract_script(Path(sys.argv[1])); d.scene_headings(t)')
+
+
+def _percentile(seconds: List[float], q: float) -> float:
+    return round(sorted(seconds)[int(q * (len(seconds) - 1))] * 1000, 1) if seconds else 0.0
+
+
+def _summary(latencies: List[float], worker_seconds: List[float], errors: List[str],
+             elapsed: float, first: Optional[float]) -> Dict[str, Any]:
+    return {
+        'requests': len(latencies) + len(errors),
+        'errors': len(errors),
+        'error_examples': sorted(set(errors))[:5],
+        'seconds': round(elapsed, 3),
+        'requests_per_sec': round(len(latencies) / elapsed, 2) if elapsed else None,
+        'first_ms': round(first * 1000, 1) if first is not None else None,
+        'p50_ms': _percentile(latencies, 0.5),
+        'p95_ms': _percentile(latencies, 0.95),
+        'p99_ms': _percentile(latencies, 0.99),
+        'max_ms': round(max(latencies) * 1000, 1) if latencies else 0.0,
+        'worker_p50_ms': _percentile(worker_seconds, 0.5),
+    }
+
+
+def run_load(address: Address, paths: List[Path], concurrency: int = 4,
+             requests: int = 50, on_result=None) -> Dict[str, Any]:
+    """Post requests uploads from concurrency clients; latency and throughput summary"""
+    uploads = [path.read_bytes() for path in paths]
+    lock = threading.Lock()
+    latencies: List[float] = []
+    worker_seconds: List[float] = []
+    errors: List[str] = []
+    first: List[float] = []
+    issued = iter(range(requests))
+
+    def client() -> None:
+        connection = ServiceClient(address)
+        try:
+            while True:
+                with lock:
+                    i = next(issued, None)
+                if i is None:
+                    return
+                started = time.perf_counter()
+                try:
+                    status, body = connection.extract(uploads[i % len(uploads)])
+                    error = None if status == 200 else f"{status} {body.get('error', '')}"
+                except OSError as e:
+                    error = f'{type(e).__name__}: {e}'
+                latency = time.perf_counter() - started
+                with lock:
+                    if i == 0:
+                        first.append(latency)
+                    if error:
+                        errors.append(error)
+                    else:
+                        latencies.append(latency)
+                        worker_seconds.append(body['seconds'])
+                if on_result:
+                    on_result(paths[i % len(paths)], latency, error)
+        finally:
+            connection.close()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(max(1, concurrency))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    report = _summary(latencies, worker_seconds, errors, time.perf_counter() - started,
+                      first[0] if first else None)
+    report.update(mode='service', address=describe_address(address), concurrency=concurrency,
+                  files=len(paths))
+    return report
+
+
+def run_cold(paths: List[Path], requests: int = 10, on_result=None) -> Dict[str, Any]:
+    """The same uploads, one at a time, each in a freshly started interpreter"""
+    latencies: List[float] = []
+    errors: List[str] = []
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [str(ROOT), os.environ.get('PYTHONPATH')]))}
+    started = time.perf_counter()
+    for i in range(requests):
+        path = paths[i % len(paths)]
+        began = time.perf_counter()
+        run = subprocess.run([sys.executable, '-c', COLD_SCRIPT, str(path)], env=env,
+                             capture_output=True, text=True)
+        latency = time.perf_counter() - began
+        error = None if run.returncode == 0 else (run.stderr.strip().splitlines() or ['failed'])[-1][:200]
+        if error:
+            errors.append(error)
+        else:
+            latencies.append(latency)
+        if on_result:
+            on_result(path, latency, error)
+    report = _summary(latencies, [], errors, time.perf_counter() - started,
+                      latencies[0] if latencies else None)
+    report.update(mode='cold', concurrency=1, files=len(paths))
+    return report
@@ -0,0 +1,253 @@
+"""
+Cross-version regression and speed harness for the extractor variants
+
+Runs every extractor variant over the same manifest and diffs the results
+project by project on the fields the training data depends on:
+
+    techniques       script_features.techniques (as a set)
+    estimated_shots  script_features.estimated_shots
+    total_gbp        budget_data.total_gbp
+    shoot_days       schedule_data.shoot_days
+
+Each variant runs in its own interpreter, so its wall time and peak RSS are
+its own and legacy scripts that sys.exit() at import (missing libraries)
+just show up as unavailable. Manifests from `python3 -m extractor corpus`
+carry the true values, which are diffed as an extra 'expected' variant.
+
+    python3 -m extractor compare --manifest M [--variant v3 --variant final ...]
+                                 [--reference final] [--assert-equal final,final-pipeline]
+"""
+
+import contextlib
+import importlib
+import inspect
+import io
+import json
+import os
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# name -> (module, executables it shells out to)
+VARIANTS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    'v1': ('extract_training_data', ('pdftotext',)),
+    'v2': ('extract_training_data_v2', ()),
+    'v3': ('extract_training_data_v3', ()),
+    'v4': ('extract_training_data_v4', ()),
+    'final': ('extract_training_data_final', ()),
+    'final-pipeline': ('extract_training_data_final', ()),
+    'pdftotext': ('extract_with_pdftotext', ('pdftotext',)),
+}
+EXPECTED = 'expected'
+
+FIELDS = {
+    'techniques': ('script_features', 'techniques'),
+    'estimated_shots': ('script_features', 'estimated_shots'),
+    'total_gbp': ('budget_data', 'total_gbp'),
+    'shoot_days': ('schedule_data', 'shoot_days'),
+}
+MONEY_TOLERANCE = 0.005
+
+
+def _peak_rss_mb() -> float:
+    # The pipeline variant parses in worker processes - the largest of them counts too
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _run_pipeline_variant(module, projects: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[float]]:
+    from extraction_pipeline import run_pipeline
+    results: List[Optional[Dict[str, Any]]] = [None] * len(projects)
+    seconds = [0.0] * len(projects)
+    started = time.perf_counter()
+    pipeline = run_pipeline(projects, plan=module.plan_project_files, stage=module.copy_to_temp,
+                            parse=module.extract_staged_file, assemble=module.assemble_project_result,
+                            unstage=module.remove_temp_copy)
+    for index, result in pipeline:
+        # Projects overlap in the pipeline - per-project time is time to completion
+        seconds[index] = time.perf_counter() - started
+        results[index] = result
+    return results, seconds
+
+
+def run_variant(name: str, manifest: Path) -> Dict[str, Any]:
+    """Child process: run one variant over the manifest (stdout of the variant is discarded)"""
+    module_name, _ = VARIANTS[name]
+    with open(manifest) as f:
+        projects = json.load(f).get('projects', [])
+
+    baseline = _peak_rss_mb()
+    sink = io.StringIO()
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(sink):
+            module = importlib.import_module(module_name)
+    except SystemExit:
+        return {'available': False, 'reason': sink.getvalue().strip().splitlines()[0:1]}
+
+    import warnings
+    warnings.filterwarnings('ignore')
+    takes_base_path = len(inspect.signature(module.process_project).parameters) > 1
+    base_path = Path(manifest).parent
+
+    try:
+        with contextlib.redirect_stdout(sink):
+            if name == 'final-pipeline':
+                results, seconds = _run_pipeline_variant(module, projects)
+            else:
+                results, seconds = [], []
+                for project in projects:
+                    project_started = time.perf_counter()
+                    try:
+                        if takes_base_path:
+                            result = module.process_project(project, base_path)
+                        else:
+                            result = module.process_project(project)
+                    except Exception as e:
+                        result = {'project_name': project.get('project_name', 'Unknown'), 'error': str(e)}
+                    seconds.append(time.perf_counter() - project_started)
+                    results.append(result)
+    finally:
+        temp_dir = getattr(module, 'TEMP_DIR', None)
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    wall = time.perf_counter() - started
+    return {
+        'available': True,
+        'results': [{k: v for k, v in r.items() if not k.startswith('_')} for r in results],
+        'seconds': round(wall, 3),
+        'projects_per_sec': round(len(projects) / wall, 2) if wall else None,
+        'p50_ms': round(statistics.median(seconds) * 1000, 1) if seconds else 0.0,
+        'p95_ms': round(sorted(seconds)[int(0.95 * (len(seconds) - 1))] * 1000, 1) if seconds else 0.0,
+        'baseline_rss_mb': round(baseline, 1),
+        'peak_rss_mb': round(_peak_rss_mb(), 1),
+    }
+
+
+def launch_variant(name: str, manifest: Path, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Run a variant in a fresh interpreter and collect its report"""
+    _, executables = VARIANTS[name]
+    missing = [e for e in executables if shutil.which(e) is None]
+    if missing:
+        return {'available': False, 'reason': [f"missing {', '.join(missing)}"]}
+    fd, out = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    try:
+        proc = subprocess.run([sys.executable, '-m', 'extractor.regression', name, str(manifest), out],
+                              cwd=REPO_ROOT, capture_output=True, text=True, timeout=timeout)
+        if proc.returncode != 0:
+            return {'available': False, 'reason': proc.stderr.strip().splitlines()[-1:]}
+        with open(out) as f:
+            return json.load(f)
+    except subprocess.TimeoutExpired:
+        return {'available': False, 'reason': [f'timed out after {timeout}s']}
+    finally:
+        os.unlink(out)
+
+
+# --- Diffing ------------------------------------------------------------------
+
+def field_value(result: Dict[str, Any], field: str) -> Any:
+    section, key = FIELDS[field]
+    value = (result.get(section) or {}).get(key)
+    if field == 'techniques':
+        return sorted(value) if value else []
+    return value
+
+
+def values_equal(field: str, a: Any, b: Any) -> bool:
+    if field == 'total_gbp' and isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return abs(a - b) <= MONEY_TOLERANCE
+    return a == b
+
+
+def expected_results(projects: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+    """The 'expected' blocks of a synthetic manifest, shaped like extractor results"""
+    if not projects or not all('expected' in p for p in projects):
+        return None
+    return [{
+        'project_name': p.get('project_name'),
+        'script_features': {'techniques': p['expected']['techniques']},
+        'budget_data': {'total_gbp': p['expected']['total_gbp']},
+        'schedule_data': {'shoot_days': p['expected']['shoot_days']},
+    } for p in projects]
+
+
+def diff_results(reference: List[Dict[str, Any]], other: List[Dict[str, Any]],
+                 fields: List[str], max_examples: int = 5) -> Dict[str, Dict[str, Any]]:
+    """Per field: how many projects match the reference, and the first few that don't"""
+    report = {}
+    for field in fields:
+        matches, examples = 0, []
+        for ref, res in zip(reference, other):
+            a, b = field_value(ref, field), field_value(res, field)
+            if values_equal(field, a, b):
+                matches += 1
+            elif len(examples) < max_examples:
+                examples.append({'project': ref.get('project_name'), 'reference': a, 'value': b})
+        report[field] = {'match': matches, 'differ': len(reference) - matches, 'examples': examples}
+    return report
+
+
+def compare(manifest: Path, variants: List[str], reference: str,
+            timeout: Optional[float] = None, on_variant=None) -> Dict[str, Any]:
+    with open(manifest) as f:
+        projects = json.load(f).get('projects', [])
+
+    runs: Dict[str, Dict[str, Any]] = {}
+    for name in variants:
+        runs[name] = launch_variant(name, manifest, timeout)
+        if on_variant:
+            on_variant(name, runs[name])
+    expected = expected_results(projects)
+    if expected is not None:
+        runs[EXPECTED] = {'available': True, 'results': expected}
+
+    ref_run = runs.get(reference)
+    diffs: Dict[str, Any] = {}
+    if ref_run and ref_run.get('available'):
+        for name, run in runs.items():
+            if name == reference or not run.get('available'):
+                continue
+            # The truth only knows some fields - shot counts differ by design between variants
+            fields = [f for f in FIELDS if f != 'estimated_shots'] if EXPECTED in (name, reference) else list(FIELDS)
+            diffs[name] = diff_results(ref_run['results'], run['results'], fields)
+
+    return {
+        'manifest': str(manifest),
+        'projects': len(projects),
+        'reference': reference,
+        'variants': {name: {k: v for k, v in run.items() if k != 'results'} for name, run in runs.items()},
+        'diffs': diffs,
+        'results': {name: run['results'] for name, run in runs.items() if run.get('available')},
+    }
+
+
+def equivalent(report: Dict[str, Any], a: str, b: str) -> Tuple[bool, List[str]]:
+    """Whether two variants agree on every field for every project (with reasons if not)"""
+    results = report['results']
+    if a not in results or b not in results:
+        return False, [f"{name} did not run" for name in (a, b) if name not in results]
+    problems = []
+    for field, d in diff_results(results[a], results[b], list(FIELDS)).items():
+        if d['differ']:
+            problems.append(f"{field}: {d['differ']} projects differ")
+    return not problems, problems
+
+
+if __name__ == '__main__':
+    # Child mode: python -m extractor.regression VARIANT MANIFEST OUT_JSON
+    variant, manifest_path, out_path = sys.argv[1:4]
+    report = run_variant(variant, Path(manifest_path))
+    with open(out_path, 'w') as f:
+        json.dump(report, f)
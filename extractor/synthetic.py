@@ -0,0 +1,276 @@
+"""
+Synthetic production-document corpus for benchmarks and regression runs
+
+Generates, per project, a script PDF (scene headings, technique keywords,
+storyboard image pages), an APA-style budget (.xlsx, .xls or .pdf) and a
+shoot schedule (.pdf or .xlsx), plus a manifest in the same format as
+training_data_extract.json. Each project in the manifest also carries an
+'expected' block with what was written into its documents (techniques,
+scene count, budget total, shoot days) so outputs can be checked.
+
+Everything is driven by one seeded RNG: the same spec and seed produce the
+same bytes on any machine.
+
+    python3 -m extractor corpus /tmp/corpus --size medium --seed 0
+"""
+
+import json
+import random
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from .docwriters import PdfWriter, write_xls, write_xlsx
+
+LINES_PER_PAGE = 55
+
+
+@dataclass(frozen=True)
+class CorpusSpec:
+    projects: int = 20
+    script_pages: Tuple[int, int] = (3, 12)
+    storyboard_pages: Tuple[int, int] = (0, 4)
+    storyboard_px: Tuple[int, int] = (480, 270)
+    budget_lines: Tuple[int, int] = (40, 160)
+    shoot_days: Tuple[int, int] = (1, 5)
+    budget_formats: Dict[str, float] = field(default_factory=lambda: {'.xlsx': 0.5, '.xls': 0.3, '.pdf': 0.2})
+    schedule_formats: Dict[str, float] = field(default_factory=lambda: {'.pdf': 0.6, '.xlsx': 0.4})
+    revision_rate: float = 0.2    # projects that also get an R2 script with a page rewritten
+    duplicate_rate: float = 0.1   # projects whose budget is a byte-identical "Copy of" another's
+
+
+SIZES = {
+    'small': CorpusSpec(projects=8, script_pages=(2, 5), storyboard_pages=(0, 1),
+                        budget_lines=(20, 60), shoot_days=(1, 2)),
+    'medium': CorpusSpec(),
+    'large': CorpusSpec(projects=60, script_pages=(10, 20), storyboard_pages=(4, 10),
+                        storyboard_px=(960, 540), budget_lines=(150, 600), shoot_days=(3, 15)),
+}
+
+CLIENTS = ['Acme Foods', 'Northwind', 'Brightside Bank', 'Kestrel Motors', 'Lumen Telecom',
+           'Harbour & Vine', 'Pinecrest', 'Orbital Sports', 'Meridian Air', 'Willow Home']
+CAMPAIGNS = ['Summer Launch', 'Brand Refresh', 'Festive', 'Everyday Heroes', 'Night Moves',
+             'Big Idea', 'Hometown', 'Rise', 'Open Road', 'First Light']
+SETTINGS = [('INT', 'KITCHEN'), ('INT', 'OFFICE'), ('EXT', 'BEACH'), ('EXT', 'HIGH STREET'),
+            ('INT', 'WAREHOUSE'), ('EXT', 'ROOFTOP'), ('INT', 'SUPERMARKET'), ('EXT', 'FOREST')]
+# Filler avoids every feature keyword (including substrings like 'car' or 'kid')
+ACTION = [
+    'She turns towards the window and smiles.',
+    'The room falls quiet as the music builds.',
+    'He picks up the phone and listens.',
+    'A slow reveal of the product on the table.',
+    'Friends laugh together around the bench.',
+    'The light shifts to a warm golden tone.',
+    'Close on hands opening the packaging.',
+    'Wide on the skyline as the sun sets.',
+    'VO: Some things are worth the wait.',
+    'Super: Terms apply.',
+]
+TECHNIQUE_LINES = {
+    'moco': 'Motion control move tracks across the table.',
+    'drone': 'Drone shot rises over the scene.',
+    'tracking': 'Tracking shot follows her down the aisle.',
+    'vfx': 'VFX: the logo forms from light.',
+    'night_shoot': 'This is a night exterior.',
+    'underwater': 'Underwater, bubbles drift upward.',
+    'crane': 'Crane shot lifts to reveal the street.',
+    'steadicam': 'Steadicam glides through the crowd.',
+    'handheld': 'Handheld and loose as they run.',
+    'slow_motion': 'Slow motion as the glass tips.',
+    'time_lapse': 'Time lapse of clouds racing past.',
+}
+APA_SECTIONS = [
+    ('A', 'PRE-PRODUCTION', ['Producer', 'Production Manager', 'Location Scout', 'Casting Director']),
+    ('B', 'CREW', ['Director', 'DoP', '1st AD', 'Focus Puller', 'Gaffer', 'Grip', 'Sound Recordist',
+                   'Make-up Artist', 'Stylist', 'Runner']),
+    ('C', 'EQUIPMENT', ['Camera Package', 'Lenses', 'Lighting Package', 'Grip Package', 'Monitors']),
+    ('D', 'STUDIO / LOCATION', ['Studio Hire', 'Location Fee', 'Permits', 'Unit Base', 'Security']),
+    ('E', 'TALENT', ['Lead Artist', 'Supporting Artist', 'Extras', 'Usage Buyout']),
+    ('F', 'POST-PRODUCTION', ['Edit', 'Grade', 'Online', 'Sound Mix', 'Music Licence']),
+]
+
+
+def _weighted(rng: random.Random, weights: Dict[str, float]) -> str:
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def _paginate(lines: List[str]) -> List[List[str]]:
+    return [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+
+
+# --- Scripts ------------------------------------------------------------------
+
+def script_pages(rng: random.Random, spec: CorpusSpec, techniques: List[str]) -> Tuple[List[List[str]], int]:
+    """Text pages of scene headings and action, with one line per chosen technique"""
+    pages = rng.randint(*spec.script_pages)
+    lines: List[str] = []
+    scene = 0
+    while len(lines) < pages * LINES_PER_PAGE:
+        scene += 1
+        interior, place = rng.choice(SETTINGS)
+        lines += ['', f'SCENE {scene}. {interior}. {place} - {rng.choice(["DAY", "DUSK"])}']
+        lines += rng.sample(ACTION, rng.randint(2, 6))
+    # Technique lines replace filler so the scene count doesn't change
+    filler = [i for i, line in enumerate(lines) if line in ACTION]
+    for tech, index in zip(techniques, rng.sample(filler, min(len(techniques), len(filler)))):
+        lines[index] = TECHNIQUE_LINES[tech]
+    lines = lines[:pages * LINES_PER_PAGE]
+    return _paginate(lines), sum(line.startswith('SCENE ') for line in lines)
+
+
+def write_script(path: Path, text_pages: List[List[str]], frames: int,
+                 frame_px: Tuple[int, int], frame_seed: int) -> None:
+    """Script PDF; storyboard frames (noise images) go after the title page, like a treatment deck"""
+    frame_rng = random.Random(frame_seed)
+    pdf = PdfWriter()
+    for number, page in enumerate(text_pages):
+        pdf.text_page(page)
+        if number == 0:
+            width, height = frame_px
+            for frame in range(1, frames + 1):
+                pdf.image_page(width, height, frame_rng.randbytes(width * height),
+                               [f'FRAME {frame}', frame_rng.choice(ACTION)])
+    pdf.save(path)
+
+
+# --- Budgets --------------------------------------------------------------------
+
+def budget_rows(rng: random.Random, spec: CorpusSpec) -> Tuple[List[List[Any]], float]:
+    """APA-style budget: coded line items per section, section subtotals, grand total"""
+    target = rng.randint(*spec.budget_lines)
+    per_section = max(1, target // len(APA_SECTIONS))
+    rows: List[List[Any]] = [['APA PRODUCTION BUDGET', None, None, None, None],
+                             ['Code', 'Description', 'Days', 'Rate', 'Total']]
+    grand = 0.0
+    for letter, title, items in APA_SECTIONS:
+        rows.append([letter, title, None, None, None])
+        subtotal = 0.0
+        for n in range(per_section):
+            days = rng.randint(1, 5)
+            rate = float(rng.randrange(150, 2500, 25))
+            total = days * rate
+            subtotal += total
+            item = items[n % len(items)] + (f' {n // len(items) + 1}' if n >= len(items) else '')
+            rows.append([f'{letter}{n + 1:02d}', item, days, rate, total])
+        rows.append([None, f'Sub Total {letter}', None, None, subtotal])
+        grand += subtotal
+    fee = round(grand * 0.12, 2)
+    rows.append([None, 'Production Fee (12%)', None, None, fee])
+    grand = round(grand + fee, 2)
+    rows.append([None, 'GRAND TOTAL', None, None, grand])
+    return rows, grand
+
+
+def _money(value: Any) -> str:
+    return f'£{value:,.2f}' if isinstance(value, float) else ('' if value is None else str(value))
+
+
+def write_budget(path: Path, rows: List[List[Any]]) -> None:
+    if path.suffix == '.xlsx':
+        write_xlsx(path, rows, 'Budget')
+    elif path.suffix == '.xls':
+        write_xls(path, rows)
+    else:
+        pdf = PdfWriter()
+        lines = ['   '.join(_money(v) for v in row if v is not None) for row in rows]
+        for page in _paginate(lines):
+            pdf.text_page(page)
+        pdf.save(path)
+
+
+# --- Schedules ------------------------------------------------------------------
+
+def schedule_rows(rng: random.Random, spec: CorpusSpec) -> Tuple[List[List[Any]], int]:
+    """Shoot-day blocks: call / wrap times, numbered setups, occasional unit moves"""
+    days = rng.randint(*spec.shoot_days)
+    rows: List[List[Any]] = [['SHOOTING SCHEDULE', None]]
+    for day in range(1, days + 1):
+        call = rng.choice(['06:30', '07:00', '07:30', '08:00'])
+        rows.append([f'SHOOT DAY {day}', f'Call: {call}'])
+        for setup in range(1, rng.randint(3, 9) + 1):
+            interior, place = rng.choice(SETTINGS)
+            rows.append([f'Setup {setup}', f'{interior}. {place.lower()}'])
+            if rng.random() < 0.15:
+                rows.append(['Unit move', f'to {rng.choice(SETTINGS)[1].lower()}'])
+        rows.append(['Wrap', rng.choice(['18:00', '19:00', '20:00'])])
+        rows.append([None, None])
+    return rows, days
+
+
+def write_schedule(path: Path, rows: List[List[Any]]) -> None:
+    if path.suffix == '.xlsx':
+        write_xlsx(path, rows, 'Schedule')
+    else:
+        pdf = PdfWriter()
+        lines = ['   '.join(str(v) for v in row if v is not None) for row in rows]
+        for page in _paginate(lines):
+            pdf.text_page(page)
+        pdf.save(path)
+
+
+# --- Corpus ---------------------------------------------------------------------
+
+def generate_corpus(out_dir: Path, spec: CorpusSpec = CorpusSpec(), seed: int = 0) -> Path:
+    """Write the corpus under out_dir and return the manifest path"""
+    rng = random.Random(seed)
+    out_dir = Path(out_dir).resolve()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    projects: List[Dict[str, Any]] = []
+    budgets: List[Tuple[Path, float]] = []
+
+    for index in range(spec.projects):
+        client = rng.choice(CLIENTS)
+        name = f'{client} {rng.choice(CAMPAIGNS)} {index + 1:03d}'
+        folder = out_dir / f'{index + 1:03d}'
+        folder.mkdir(exist_ok=True)
+        stem = name.replace(' ', '_').replace('&', 'and')
+
+        techniques = sorted(rng.sample(list(TECHNIQUE_LINES), rng.randint(0, 4)))
+        pages, scenes = script_pages(rng, spec, techniques)
+        frames, frame_seed = rng.randint(*spec.storyboard_pages), rng.getrandbits(32)
+        script = folder / f'{stem}_Script_R1.pdf'
+        write_script(script, pages, frames, spec.storyboard_px, frame_seed)
+
+        if budgets and rng.random() < spec.duplicate_rate:
+            source, total = rng.choice(budgets)
+            budget = folder / f'Copy of {source.name}'
+            budget.write_bytes(source.read_bytes())
+        else:
+            rows, total = budget_rows(rng, spec)
+            budget = folder / f'{stem}_Budget{_weighted(rng, spec.budget_formats)}'
+            write_budget(budget, rows)
+            budgets.append((budget, total))
+
+        rows, days = schedule_rows(rng, spec)
+        schedule = folder / f'{stem}_Schedule{_weighted(rng, spec.schedule_formats)}'
+        write_schedule(schedule, rows)
+
+        expected = {'techniques': techniques, 'scenes': scenes, 'total_gbp': total, 'shoot_days': days}
+        files = {
+            'script': {'path': str(script)},
+            'budget': {'path': str(budget)},
+            'schedule': [{'path': str(schedule), 'exists': True}],
+        }
+        projects.append({'project_name': name, 'client': client, 'complete': True,
+                         'files': files, 'expected': expected})
+
+        if rng.random() < spec.revision_rate and len(pages) > 1:
+            # R2: one page rewritten, the rest untouched
+            revised = [list(p) for p in pages]
+            page = rng.randrange(1, len(revised))
+            revised[page] = [line.replace('smiles', 'laughs') for line in revised[page]] + ['REVISED']
+            script_r2 = folder / f'{stem}_Script_R2.pdf'
+            write_script(script_r2, revised, frames, spec.storyboard_px, frame_seed)
+            projects.append({'project_name': f'{name} R2', 'client': client, 'complete': True,
+                             'files': {**files, 'script': {'path': str(script_r2)}},
+                             'expected': expected})
+
+    manifest = out_dir / 'manifest.json'
+    with open(manifest, 'w') as f:
+        json.dump({'generator': {'seed': seed, 'spec': asdict(spec)}, 'projects': projects}, f, indent=2)
+    return manifest
+
+
+def spec_for(size: str, projects: int = 0) -> CorpusSpec:
+    spec = SIZES[size]
+    return replace(spec, projects=projects) if projects else spec
@@ -0,0 +1,112 @@
+"""
+Streaming .xlsx row reader using only the standard library
+
+An .xlsx file is a zip of XML parts. This reads the first worksheet with
+iterparse, one <row> at a time, clearing each row once it has been yielded,
+so memory stays flat however large the sheet is and nothing beyond the rows
+asked for is parsed. Cell styles are ignored: dates come back as Excel
+serial numbers, which is fine for totals and day counting.
+"""
+
+import posixpath
+import re
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from xml.etree.ElementTree import iterparse
+
+_MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_PKG_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+_CELL_REF = re.compile(r'([A-Z]+)')
+
+
+def _column_index(ref: str) -> Optional[int]:
+    match = _CELL_REF.match(ref or '')
+    if not match:
+        return None
+    index = 0
+    for letter in match.group(1):
+        index = index * 26 + (ord(letter) - 64)
+    return index - 1
+
+
+def _first_sheet_path(archive: zipfile.ZipFile) -> str:
+    """Zip path of the first worksheet listed in the workbook"""
+    with archive.open('xl/workbook.xml') as f:
+        sheet = next((el for _, el in iterparse(f) if el.tag == f'{_MAIN}sheet'), None)
+    if sheet is None:
+        raise ValueError('workbook has no sheets')
+    rel_id = sheet.get(f'{_REL}id')
+    with archive.open('xl/_rels/workbook.xml.rels') as f:
+        for _, el in iterparse(f):
+            if el.tag == f'{_PKG_REL}Relationship' and el.get('Id') == rel_id:
+                target = el.get('Target')
+                if target.startswith('/'):
+                    return target.lstrip('/')
+                return posixpath.normpath(posixpath.join('xl', target))
+    raise ValueError(f'no worksheet for relationship {rel_id}')
+
+
+def _shared_strings(archive: zipfile.ZipFile) -> List[str]:
+    try:
+        f = archive.open('xl/sharedStrings.xml')
+    except KeyError:
+        return []
+    strings = []
+    with f:
+        for _, el in iterparse(f):
+            if el.tag == f'{_MAIN}si':
+                strings.append(''.join(t.text or '' for t in el.iter(f'{_MAIN}t')))
+                el.clear()
+    return strings
+
+
+def _cell_value(cell, strings: List[str]) -> Any:
+    kind = cell.get('t', 'n')
+    if kind == 'inlineStr':
+        parts = [t.text or '' for t in cell.iter(f'{_MAIN}t')]
+        return ''.join(parts) if parts else None
+    value = cell.findtext(f'{_MAIN}v')
+    if not value:
+        return None  # blank, or a formula with no cached result
+    if kind == 's':
+        return strings[int(value)]
+    if kind == 'b':
+        return value == '1'
+    if kind in ('str', 'e'):
+        return value
+    number = float(value)
+    return int(number) if number.is_integer() else number
+
+
+def iter_xlsx_rows(path: Path, max_rows: Optional[int] = None) -> Iterator[Tuple[Any, ...]]:
+    """Yield the first worksheet's rows as tuples of cell values (None for blanks, no padding to the sheet width)"""
+    with zipfile.ZipFile(path) as archive:
+        sheet_path = _first_sheet_path(archive)
+        strings = _shared_strings(archive)
+        with archive.open(sheet_path) as f:
+            count = 0
+            expected_row = 1
+            for _, el in iterparse(f):
+                if el.tag != f'{_MAIN}row':
+                    continue
+                # Rows with no cells are left out of the XML - yield them as empty
+                row_number = int(el.get('r', expected_row))
+                while expected_row < row_number:
+                    if max_rows is not None and count >= max_rows:
+                        return
+                    yield ()
+                    count += 1
+                    expected_row += 1
+                if max_rows is not None and count >= max_rows:
+                    return
+                values: Dict[int, Any] = {}
+                for position, cell in enumerate(el.iter(f'{_MAIN}c')):
+                    column = _column_index(cell.get('r'))
+                    values[position if column is None else column] = _cell_value(cell, strings)
+                width = max(values) + 1 if values else 0
+                yield tuple(values.get(i) for i in range(width))
+                count += 1
+                expected_row = row_number + 1
+                el.clear()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Content de-duplication across the manifest
+
+Reference data is full of byte-identical files: "Copy of ..." duplicates,
+"(1)" downloads and the same budget filed under several projects. The index
+gives every file a content key so each unique blob is extracted once and the
+result fanned out to every project that references it.
+
+Only files that share a size with another file are hashed - a file with a
+unique size can't have an identical twin, so it never needs reading here.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def content_digest(path: Path) -> str:
+    """BLAKE2b of the file contents, read in 1 MB chunks"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class DedupReport:
+    references: int      # (kind, file) reads the manifest asks for
+    unique: int          # reads actually needed
+    skipped_bytes: int   # bytes we didn't have to stage and parse
+
+    @property
+    def skipped(self) -> int:
+        return self.references - self.unique
+
+    def describe(self) -> str:
+        return (f"♻️  De-duplicated: {self.skipped} of {self.references} file reads skipped "
+                f"({self.skipped_bytes / (1024 * 1024):.1f} MB)")
+
+
+class DedupIndex:
+    """Content keys for a set of files, hashing only where sizes collide"""
+
+    def __init__(self, paths: Iterable[Path]):
+        self.sizes: Dict[str, int] = {}
+        self.keys: Dict[str, str] = {}
+
+        by_size: Dict[int, List[str]] = {}
+        for path in {str(p) for p in paths}:
+            try:
+                size = Path(path).stat().st_size
+            except OSError:
+                size = -1
+            self.sizes[path] = size
+            by_size.setdefault(size, []).append(path)
+
+        for size, group in by_size.items():
+            for path in group:
+                if len(group) > 1 and size > 0:
+                    try:
+                        self.keys[path] = f'blake2b:{content_digest(Path(path))}'
+                        continue
+                    except OSError:
+                        pass
+                # Unique size (or unreadable / empty): the path is its own key
+                self.keys[path] = f'path:{path}'
+
+    def key(self, path: Path) -> str:
+        return self.keys.get(str(path), f'path:{path}')
+
+    def duplicates(self) -> List[List[str]]:
+        """Groups of paths with identical contents"""
+        groups: Dict[str, List[str]] = {}
+        for path, key in self.keys.items():
+            groups.setdefault(key, []).append(path)
+        return [sorted(g) for g in groups.values() if len(g) > 1]
+
+    def repeated(self, planned: Iterable[Tuple[str, Path]]) -> Set[Tuple[str, str]]:
+        """The (kind, content key) pairs a plan of (kind, path) reads asks for more than once"""
+        seen: Set[Tuple[str, str]] = set()
+        repeated = set()
+        for kind, path in planned:
+            key = (kind, self.key(path))
+            if key in seen:
+                repeated.add(key)
+            seen.add(key)
+        return repeated
+
+    def report(self, planned: Iterable[Tuple[str, Path]]) -> DedupReport:
+        """How much of a plan of (kind, path) reads the index lets us skip"""
+        seen = set()
+        references = 0
+        skipped_bytes = 0
+        for kind, path in planned:
+            references += 1
+            key = (kind, self.key(path))
+            if key in seen:
+                skipped_bytes += max(self.sizes.get(str(path), 0), 0)
+            seen.add(key)
+        return DedupReport(references, len(seen), skipped_bytes)
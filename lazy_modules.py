@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Deferred imports for the heavy parsing libraries
+
+pandas, pdfplumber, openpyxl and xlrd together take the best part of a second
+to import. The extractor modules bind them through lazy_import() instead, so
+importing an extractor (from a worker, a test or a service) costs nothing and
+a run that only reads PDFs never loads pandas. The real import happens on the
+first attribute access.
+"""
+
+import importlib
+import importlib.util
+from types import ModuleType
+from typing import Iterable, List, Optional
+
+
+class LazyModule:
+    """Stand-in for a module that is imported the first time it is used"""
+
+    def __init__(self, name: str):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__['_module']
+        if module is None:
+            module = importlib.import_module(self.__dict__['_name'])
+            self.__dict__['_module'] = module
+        return module
+
+    @property
+    def available(self) -> bool:
+        """True if the module is installed - checked without importing it"""
+        if self.__dict__['_module'] is not None:
+            return True
+        try:
+            return importlib.util.find_spec(self.__dict__['_name']) is not None
+        except (ImportError, ValueError):
+            return False
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__['_module'] is not None
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, value) -> None:
+        setattr(self._load(), attr, value)
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.loaded else 'not loaded'
+        return f"<lazy module '{self.__dict__['_name']}' ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
+
+
+def missing_modules(names: Iterable[str]) -> List[str]:
+    """Which of these modules aren't installed (without importing any of them)"""
+    return [name for name in names if not LazyModule(name).available]
+
+
+def require(names: Iterable[str], install_hint: Optional[str] = None) -> bool:
+    """Print what's missing and return False if any of the modules isn't installed"""
+    missing = missing_modules(names)
+    if missing:
+        print(f"❌ Missing libraries: {', '.join(missing)}")
+        if install_hint:
+            print(f"Run: {install_hint}")
+        return False
+    return True
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Page-level incremental extraction for revised scripts
+
+A new revision of a script usually changes a handful of pages. Each PDF page
+is keyed by a hash of its raw content stream, which is cheap to read compared
+with pdfplumber's layout analysis. Pages whose hash has been seen before -
+in the previous revision or anywhere else - reuse the cached text and feature
+scan; only new or changed pages are laid out and scanned. The per-page scans
+are then merged back into one feature set.
+
+The cache is a directory of small JSON files, so parser worker processes can
+share it without any locking (writes go through a rename).
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from text_index import keep_page
+
+Scan = Dict[str, Any]
+
+
+class PageCache:
+    """Content-hash -> {'text', 'scan'} store, one file per page"""
+
+    def __init__(self, directory: Path, namespace: str):
+        self.directory = Path(directory)
+        self.namespace = namespace
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f'{key}.json'
+
+    def key(self, content_hash: str) -> str:
+        # The namespace changes whenever the scanner does, so old scans aren't reused
+        return hashlib.blake2b(f'{self.namespace}:{content_hash}'.encode(), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(key)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(value, f)
+            os.replace(tmp, path)
+        except OSError:
+            pass  # a cache that can't be written is just a cache miss next time
+
+
+@dataclass
+class PageStats:
+    parsed: int = 0
+    reused: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {'pages_parsed': self.parsed, 'pages_reused': self.reused}
+
+
+def page_content_hash(page: Any) -> Optional[str]:
+    """Hash of a pdfplumber page's raw content streams and page box (None if unreadable)"""
+    try:
+        from pdfminer.pdftypes import resolve1
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr(tuple(page.mediabox)).encode())
+        contents = page.page_obj.contents or []
+        for stream in contents:
+            digest.update(resolve1(stream).get_data())
+        return digest.hexdigest()
+    except Exception:
+        return None
+
+
+def merge_scans(scans: Iterable[Scan]) -> Scan:
+    """Combine per-page scans: lists become ordered unions, flags are OR-ed"""
+    merged: Scan = {}
+    for scan in scans:
+        for key, value in scan.items():
+            if isinstance(value, list):
+                existing = merged.setdefault(key, [])
+                existing.extend(v for v in value if v not in existing)
+            elif isinstance(value, bool):
+                merged[key] = merged.get(key, False) or value
+            else:
+                merged.setdefault(key, value)
+    return merged
+
+
+def extract_pages_incremental(
+    pdf_path: Path,
+    scan: Callable[[str], Scan],
+    cache: Optional[PageCache],
+    max_pages: int = 20,
+    max_chars: int = 50000,
+) -> Tuple[str, Scan, PageStats]:
+    """
+    Read a PDF page by page with pdfplumber, reusing cached text and scans for
+    unchanged pages. Returns (text, merged scan, stats); text matches what
+    extract_text_from_pdf would return for the same limits.
+    """
+    import pdfplumber
+
+    stats = PageStats()
+    texts: List[str] = []
+    scans: List[Scan] = []
+    total = 0
+
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages[:max_pages]:
+            if total > max_chars:
+                break
+            key = None
+            content_hash = page_content_hash(page) if cache else None
+            if content_hash:
+                key = cache.key(content_hash)
+                hit = cache.get(key)
+                if hit is not None:
+                    stats.reused += 1
+                    keep_page(page.page_number, hit['text'])
+                    if hit['text']:
+                        texts.append(hit['text'])
+                        scans.append(hit['scan'])
+                        total += len(hit['text'])
+                    continue
+
+            page_text = page.extract_text() or ''
+            page_scan = scan(page_text) if page_text else {}
+            stats.parsed += 1
+            keep_page(page.page_number, page_text)
+            if key:
+                cache.put(key, {'text': page_text, 'scan': page_scan})
+            if page_text:
+                texts.append(page_text)
+                scans.append(page_scan)
+                total += len(page_text)
+
+    text = '\n'.join(texts)
+    if len(text) > max_chars:
+        # The last page was cut off - its cached scan covers text we don't keep
+        text = text[:max_chars]
+        kept = len('\n'.join(texts[:-1])) + (1 if len(texts) > 1 else 0)
+        scans[-1] = scan(text[kept:])
+
+    return text, merge_scans(scans), stats
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Prometheus textfile exporter for extraction runs
+
+Writes the run's metrics in the Prometheus text exposition format, for the
+node-exporter textfile collector to scrape (point --metrics-textfile at
+<collector dir>/extractor.prom). The file is rewritten while the run goes
+and once more at the end, always through a rename, so a scrape never sees
+half a file:
+
+    extractor_files_total{kind, outcome}          ok / error / duplicate
+    extractor_bytes_read_total, extractor_pages_parsed_total,
+    extractor_cells_scanned_total
+    extractor_stage_duration_seconds{stage}       histogram, one observation per file
+    extractor_page_cache_hit_ratio, extractor_dedup_hit_ratio
+    extractor_run_duration_seconds, extractor_run_in_progress,
+    extractor_run_last_success_timestamp_seconds
+
+Counters start from zero every run; rate() and increase() treat that as a reset.
+"""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from run_metrics import COUNTERS, STAGES, RunReport
+
+PREFIX = 'extractor'
+
+# Seconds - per-file stage times run from sub-millisecond stats to minute-long decks
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = Sequence[Tuple[str, str]]
+
+COUNTER_HELP = {
+    'bytes_read': 'Bytes of source files read',
+    'pages_parsed': 'PDF pages laid out (page cache hits excluded)',
+    'cells_scanned': 'Spreadsheet cells scanned',
+    'subprocesses': 'Subprocesses launched',
+}
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _sample(name: str, value: float, labels: Labels = ()) -> str:
+    label_text = ','.join(f'{k}="{_escape(str(v))}"' for k, v in labels)
+    number = repr(float(value)) if value != int(value) else str(int(value))
+    return f'{name}{{{label_text}}} {number}' if label_text else f'{name} {number}'
+
+
+class _Family:
+    def __init__(self, name: str, kind: str, help_text: str):
+        self.name = f'{PREFIX}_{name}'
+        self.lines = [f'# HELP {self.name} {help_text}', f'# TYPE {self.name} {kind}']
+
+    def add(self, value: float, labels: Labels = (), suffix: str = '') -> None:
+        self.lines.append(_sample(self.name + suffix, value, labels))
+
+
+def _histogram(family: _Family, values: Iterable[float], labels: Labels,
+               buckets: Sequence[float] = STAGE_BUCKETS) -> None:
+    values = list(values)
+    for bound in buckets:
+        family.add(sum(1 for v in values if v <= bound), [*labels, ('le', repr(bound))], '_bucket')
+    family.add(len(values), [*labels, ('le', '+Inf')], '_bucket')
+    family.add(round(sum(values), 6), labels, '_sum')
+    family.add(len(values), labels, '_count')
+
+
+def render(report: RunReport, page_totals: Optional[Dict[str, int]] = None,
+           finished: bool = False, succeeded: bool = True) -> str:
+    """The exposition text for a run so far"""
+    records = report.files()
+    files = [f for f in records if f.duplicate_of is None]
+    families: List[_Family] = []
+
+    outcomes: Dict[Tuple[str, str], int] = {}
+    for record in records:
+        outcome = 'duplicate' if record.duplicate_of else 'error' if record.error else 'ok'
+        outcomes[(record.kind, outcome)] = outcomes.get((record.kind, outcome), 0) + 1
+    family = _Family('files_total', 'counter', 'Files read, by kind and outcome')
+    for (kind, outcome), n in sorted(outcomes.items()):
+        family.add(n, [('kind', kind), ('outcome', outcome)])
+    families.append(family)
+
+    family = _Family('projects_total', 'counter', 'Projects finished')
+    family.add(len(report.projects))
+    families.append(family)
+
+    for counter in COUNTERS:
+        family = _Family(f'{counter}_total', 'counter', COUNTER_HELP.get(counter, counter))
+        family.add(sum(f.counters.get(counter, 0) for f in files))
+        families.append(family)
+
+    family = _Family('stage_duration_seconds', 'histogram', 'Time per file spent in each extraction stage')
+    for stage in STAGES:
+        timings = [f.stages[stage] for f in files if stage in f.stages]
+        if timings:
+            _histogram(family, timings, [('stage', stage)])
+    families.append(family)
+
+    if page_totals is not None:
+        pages = sum(page_totals.values())
+        family = _Family('page_cache_hit_ratio', 'gauge', 'Script pages reused from the page cache')
+        family.add(round(page_totals.get('pages_reused', 0) / pages, 4) if pages else 0)
+        families.append(family)
+    family = _Family('dedup_hit_ratio', 'gauge', 'File references served from an identical file already read')
+    family.add(round((len(records) - len(files)) / len(records), 4) if records else 0)
+    families.append(family)
+
+    family = _Family('run_duration_seconds', 'gauge', 'Seconds since the run started')
+    family.add(round(time.time() - report.started, 3))
+    families.append(family)
+    family = _Family('run_start_timestamp_seconds', 'gauge', 'When the run started')
+    family.add(round(report.started, 3))
+    families.append(family)
+    family = _Family('run_in_progress', 'gauge', '1 while a run is going')
+    family.add(0 if finished else 1)
+    families.append(family)
+    family = _Family('run_peak_rss_megabytes', 'gauge', 'Largest resident set of the run or its parsers')
+    family.add(report.summary()['peak_rss_mb'])
+    families.append(family)
+    if finished and succeeded:
+        family = _Family('run_last_success_timestamp_seconds', 'gauge', 'When the last successful run finished')
+        family.add(round(time.time(), 3))
+        families.append(family)
+
+    return '\n'.join(line for f in families for line in f.lines) + '\n'
+
+
+def write_textfile(path: Path, text: str) -> None:
+    """Replace the file atomically - the collector may read it at any moment"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class TextfileExporter:
+    """Rewrites the textfile at most every `interval` seconds during a run, and at the end"""
+
+    def __init__(self, path: Path, report: RunReport, page_totals: Optional[Dict[str, int]] = None,
+                 interval: float = 30.0):
+        self.path = Path(path)
+        self.report = report
+        self.page_totals = page_totals
+        self.interval = interval
+        self._last = 0.0
+
+    def tick(self) -> None:
+        now = time.monotonic()
+        if now - self._last >= self.interval:
+            self._last = now
+            write_textfile(self.path, render(self.report, self.page_totals))
+
+    def finish(self, succeeded: bool = True) -> None:
+        write_textfile(self.path, render(self.report, self.page_totals, finished=True, succeeded=succeeded))
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+SQLite store of extraction results
+
+The same results as training_data_complete.json, normalised so consumers
+can query instead of loading and filtering the whole array:
+
+    projects    one row per project: client, budget, shoot days, script flags,
+                revision family, plus the full result as JSON
+    files       every file read for a project (kind, path, bytes, error, timings)
+    techniques  (project, technique)
+    locations   (project, location type) from the script features
+    scenes      scene headings from the script (number, INT/EXT, place, time of day)
+    documents, pages, page_text
+                per-page text of every file, full-text indexed (see text_index)
+
+Indexed on client, technique, location type, shoot days and budget, so
+"all MOCO jobs under £300k" is an index lookup. Each project is upserted
+in its own transaction as it finishes, keyed by (project_name, client);
+re-running over the same manifest replaces rows rather than adding them.
+Two projects of one run with the same key would share a row, so the
+driver keeps the first and reports the other.
+"""
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import text_index
+
+STORE_FILE = 'training_data.sqlite'
+SCHEMA_VERSION = 1
+
+# Upper bounds (GBP) of the budget bands used for grouping
+BUDGET_BANDS: Sequence[Tuple[float, str]] = (
+    (100_000, 'under 100k'),
+    (250_000, '100k-250k'),
+    (500_000, '250k-500k'),
+    (1_000_000, '500k-1m'),
+    (float('inf'), '1m+'),
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY,
+    project_name TEXT NOT NULL,
+    client TEXT NOT NULL DEFAULT '',
+    complete INTEGER,
+    total_gbp REAL,
+    budget_band TEXT,
+    budget_method TEXT,
+    shoot_days INTEGER,
+    estimated_shots INTEGER,
+    text_length INTEGER,
+    has_children INTEGER,
+    has_animals INTEGER,
+    has_vehicles INTEGER,
+    revision_family TEXT,
+    superseded_by TEXT,
+    error TEXT,
+    result_json TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    UNIQUE (project_name, client)
+);
+CREATE TABLE IF NOT EXISTS files (
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    path TEXT NOT NULL,
+    bytes INTEGER,
+    seconds REAL,
+    duplicate_of TEXT,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS techniques (
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    technique TEXT NOT NULL,
+    PRIMARY KEY (project_id, technique)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS locations (
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    location_type TEXT NOT NULL,
+    PRIMARY KEY (project_id, location_type)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS scenes (
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    number TEXT,
+    setting TEXT,
+    place TEXT,
+    time_of_day TEXT,
+    location_type TEXT,
+    PRIMARY KEY (project_id, seq)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS projects_client ON projects (client);
+CREATE INDEX IF NOT EXISTS projects_budget ON projects (total_gbp);
+CREATE INDEX IF NOT EXISTS projects_band ON projects (budget_band, total_gbp);
+CREATE INDEX IF NOT EXISTS projects_days ON projects (shoot_days);
+CREATE INDEX IF NOT EXISTS files_project ON files (project_id);
+CREATE INDEX IF NOT EXISTS techniques_technique ON techniques (technique, project_id);
+CREATE INDEX IF NOT EXISTS locations_type ON locations (location_type, project_id);
+CREATE INDEX IF NOT EXISTS scenes_location ON scenes (location_type, project_id);
+"""
+
+
+def budget_band(total_gbp: Optional[float]) -> Optional[str]:
+    if total_gbp is None:
+        return None
+    return next(label for bound, label in BUDGET_BANDS if total_gbp < bound)
+
+
+def _flag(value: Any) -> Optional[int]:
+    return None if value is None else int(bool(value))
+
+
+class ResultsStore:
+    """Per-project upserts into the SQLite store (one writer: the main process)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute('PRAGMA foreign_keys = ON')
+        # WAL lets readers query while a run is writing
+        self.db.execute('PRAGMA journal_mode = WAL')
+        self.db.execute('PRAGMA synchronous = NORMAL')
+        version = self.db.execute('PRAGMA user_version').fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            raise RuntimeError(f'{self.path} has schema version {version}, expected {SCHEMA_VERSION}')
+        with self.db:
+            self.db.executescript(SCHEMA)
+            text_index.create(self.db)
+            self.db.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self) -> 'ResultsStore':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def upsert_project(self, result: Dict[str, Any], files: Iterable[Dict[str, Any]] = (),
+                       scenes: Iterable[Dict[str, Any]] = (),
+                       documents: Iterable[Dict[str, Any]] = ()) -> int:
+        """
+        Insert or replace one project with its files (run_metrics file records),
+        scenes and page text ({'kind', 'path', 'pages'} per file); returns the
+        project id.
+        """
+        features = result.get('script_features') or {}
+        budget = result.get('budget_data') or {}
+        schedule = result.get('schedule_data') or {}
+        revision = result.get('script_revision') or {}
+        total = budget.get('total_gbp')
+        row = {
+            'project_name': result.get('project_name', 'Unknown'),
+            'client': result.get('client') or '',
+            'complete': _flag(result.get('complete')),
+            'total_gbp': total,
+            'budget_band': budget_band(total),
+            'budget_method': budget.get('method'),
+            'shoot_days': schedule.get('shoot_days'),
+            'estimated_shots': features.get('estimated_shots'),
+            'text_length': features.get('text_length'),
+            'has_children': _flag(features.get('has_children')),
+            'has_animals': _flag(features.get('has_animals')),
+            'has_vehicles': _flag(features.get('has_vehicles')),
+            'revision_family': revision.get('family'),
+            'superseded_by': revision.get('superseded_by'),
+            'error': result.get('error'),
+            'result_json': json.dumps(result),
+            'updated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        columns = ', '.join(row)
+        updates = ', '.join(f'{c} = excluded.{c}' for c in row if c not in ('project_name', 'client'))
+        with self.db:
+            project_id = self.db.execute(
+                f'INSERT INTO projects ({columns}) VALUES ({", ".join(":" + c for c in row)}) '
+                f'ON CONFLICT (project_name, client) DO UPDATE SET {updates} RETURNING id', row
+            ).fetchone()[0]
+            for table in ('files', 'techniques', 'locations', 'scenes'):
+                self.db.execute(f'DELETE FROM {table} WHERE project_id = ?', (project_id,))
+            self.db.executemany(
+                'INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(project_id, f['kind'], f['path'], f.get('counters', {}).get('bytes_read'),
+                  round(sum(f.get('stages', {}).values()), 6), f.get('duplicate_of'), f.get('error'))
+                 for f in files])
+            self.db.executemany('INSERT OR IGNORE INTO techniques VALUES (?, ?)',
+                                [(project_id, t) for t in features.get('techniques', [])])
+            self.db.executemany('INSERT OR IGNORE INTO locations VALUES (?, ?)',
+                                [(project_id, l) for l in features.get('locations', [])])
+            self.db.executemany(
+                'INSERT INTO scenes VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(project_id, seq, s.get('number'), s.get('setting'), s.get('place'),
+                  s.get('time_of_day'), s.get('location_type')) for seq, s in enumerate(scenes)])
+            text_index.update_documents(self.db, project_id, documents)
+        return project_id
+
+    def set_revision(self, project_id: int, result: Dict[str, Any]) -> None:
+        """Record a project's script_revision tag (families are known only at the end of a run)"""
+        revision = result.get('script_revision') or {}
+        with self.db:
+            self.db.execute(
+                'UPDATE projects SET revision_family = ?, superseded_by = ?, result_json = ? WHERE id = ?',
+                (revision.get('family'), revision.get('superseded_by'), json.dumps(result), project_id))
+
+    def find_projects(self, technique: Optional[str] = None, client: Optional[str] = None,
+                      location_type: Optional[str] = None, min_budget: Optional[float] = None,
+                      max_budget: Optional[float] = None, min_days: Optional[int] = None,
+                      max_days: Optional[int] = None, include_superseded: bool = True) -> List[sqlite3.Row]:
+        """Projects matching every given filter, cheapest first"""
+        where, params = [], []
+        if technique:
+            where.append('id IN (SELECT project_id FROM techniques WHERE technique = ?)')
+            params.append(technique)
+        if location_type:
+            where.append('(id IN (SELECT project_id FROM locations WHERE location_type = ?) '
+                         'OR id IN (SELECT project_id FROM scenes WHERE location_type = ?))')
+            params += [location_type, location_type]
+        for clause, value in (('client = ?', client), ('total_gbp >= ?', min_budget),
+                              ('total_gbp < ?', max_budget), ('shoot_days >= ?', min_days),
+                              ('shoot_days <= ?', max_days)):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        if not include_superseded:
+            where.append('superseded_by IS NULL')
+        sql = ('SELECT id, project_name, client, total_gbp, budget_band, shoot_days, estimated_shots, '
+               "(SELECT group_concat(technique, ',') FROM techniques WHERE project_id = id) AS techniques "
+               'FROM projects' + (' WHERE ' + ' AND '.join(where) if where else '') +
+               ' ORDER BY total_gbp IS NULL, total_gbp, project_name')
+        return self.db.execute(sql, params).fetchall()
+
+    def search(self, query: str, kinds: Sequence[str] = (), limit: int = 20,
+               latest_only: bool = False) -> List[sqlite3.Row]:
+        return text_index.search(self.db, query, kinds, limit, latest_only)
+
+    def scenes(self, project_id: int) -> List[sqlite3.Row]:
+        return self.db.execute('SELECT * FROM scenes WHERE project_id = ? ORDER BY seq', (project_id,)).fetchall()
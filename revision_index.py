@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+MinHash / LSH index for near-duplicate script revisions
+
+Scripts come in as R1, R2, R3 ... revisions that share most of their text.
+Each extracted script gets a MinHash signature over word 5-grams; signatures
+are cut into bands and bucketed, so a new document is only compared with the
+few documents that share a bucket with it - lookup cost doesn't grow with the
+size of the corpus. Matches are merged into revision families, and the latest
+revision of each family (by filename date / revision tag) is the one to keep.
+"""
+
+import hashlib
+import random
+import re
+import struct
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from candidate_ranking import revision_key
+
+SHINGLE_WORDS = 5
+NUM_PERMUTATIONS = 128
+BANDS = 32  # 32 bands x 4 rows: ~50% hit chance at 0.7 similarity, ~98% at 0.9
+SIMILARITY_THRESHOLD = 0.8
+# Below this many shingles (failed extractions, image-only decks) everything
+# looks alike, so those documents aren't indexed at all
+MIN_SHINGLES = 20
+
+_MERSENNE = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WORD = re.compile(r'[a-z0-9]+')
+
+
+def _shingle_hashes(text: str) -> Set[int]:
+    words = _WORD.findall(text.lower())
+    if len(words) < SHINGLE_WORDS:
+        words = words + [''] * (SHINGLE_WORDS - len(words))
+    hashes = set()
+    for i in range(len(words) - SHINGLE_WORDS + 1):
+        shingle = ' '.join(words[i:i + SHINGLE_WORDS]).encode()
+        hashes.add(struct.unpack('<I', hashlib.blake2b(shingle, digest_size=4).digest())[0])
+    return hashes
+
+
+# Fixed seed: signatures stay comparable across runs and processes
+_rng = random.Random(0x5C219)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE), _rng.randrange(0, _MERSENNE))
+                 for _ in range(NUM_PERMUTATIONS)]
+
+
+def _signature(shingles: Set[int]) -> Tuple[int, ...]:
+    return tuple(
+        min(((a * h + b) % _MERSENNE) & _MAX_HASH for h in shingles)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def minhash(text: str) -> Tuple[int, ...]:
+    """MinHash signature of the text's word 5-gram set"""
+    return _signature(_shingle_hashes(text))
+
+
+def script_signature(text: str) -> Optional[Tuple[int, ...]]:
+    """minhash() for text with enough words to be worth indexing, else None"""
+    shingles = _shingle_hashes(text)
+    if len(shingles) < MIN_SHINGLES:
+        return None
+    return _signature(shingles)
+
+
+def estimated_similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """Fraction of matching signature slots ~ Jaccard similarity of the shingle sets"""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+@dataclass
+class RevisionFamily:
+    family_id: str
+    members: List[str] = field(default_factory=list)  # document ids
+    latest: Optional[str] = None
+
+
+class RevisionIndex:
+    """Streaming near-duplicate index: add() each script as it is extracted"""
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD, bands: int = BANDS):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NUM_PERMUTATIONS // bands
+        self.signatures: Dict[str, Tuple[int, ...]] = {}
+        self.paths: Dict[str, Path] = {}
+        self.buckets: Dict[Tuple[int, Tuple[int, ...]], List[str]] = {}
+        self._parent: Dict[str, str] = {}
+
+    def _find(self, doc_id: str) -> str:
+        while self._parent[doc_id] != doc_id:
+            self._parent[doc_id] = self._parent[self._parent[doc_id]]
+            doc_id = self._parent[doc_id]
+        return doc_id
+
+    def _union(self, a: str, b: str) -> None:
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a != root_b:
+            self._parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    def add(self, doc_id: str, signature: Tuple[int, ...], path: Optional[Path] = None) -> List[Tuple[str, float]]:
+        """
+        Index a document by its minhash() signature (computed wherever the text is -
+        usually a parser worker) and return the already-indexed documents it nearly
+        duplicates, as (doc_id, estimated similarity), most similar first.
+        """
+        candidates: Set[str] = set()
+        for band in range(self.bands):
+            key = (band, signature[band * self.rows:(band + 1) * self.rows])
+            bucket = self.buckets.setdefault(key, [])
+            candidates.update(bucket)
+            bucket.append(doc_id)
+
+        self.signatures[doc_id] = signature
+        self.paths[doc_id] = path or Path(doc_id)
+        self._parent[doc_id] = doc_id
+
+        matches = []
+        for other in candidates:
+            similarity = estimated_similarity(signature, self.signatures[other])
+            if similarity >= self.threshold:
+                matches.append((other, similarity))
+                self._union(doc_id, other)
+        return sorted(matches, key=lambda m: -m[1])
+
+    def family_of(self, doc_id: str) -> str:
+        return self._find(doc_id)
+
+    def families(self) -> List[RevisionFamily]:
+        """All families with more than one member, latest revision picked by filename"""
+        groups: Dict[str, List[str]] = {}
+        for doc_id in self.signatures:
+            groups.setdefault(self._find(doc_id), []).append(doc_id)
+        families = []
+        for root, members in sorted(groups.items()):
+            if len(members) < 2:
+                continue
+            latest = max(members, key=lambda d: revision_key(self.paths[d]))
+            families.append(RevisionFamily(root, sorted(members), latest))
+        return families
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Per-file, per-stage run metrics and the machine-readable run report
+
+Every file a run reads is timed stage by stage:
+
+    stat           stat + size of the source file
+    stage          copy to the temp directory
+    text_extract   PDF -> text (pages laid out by pdfplumber)
+    featurize      text -> script features
+    budget_scan    budget sheet / text -> total
+    schedule_scan  schedule sheet / text -> shoot days
+
+alongside counters for bytes read, pages parsed, cells scanned and
+subprocesses launched, and the reading process's peak RSS.
+
+Parsers call stage('featurize') (or are decorated with @timed) and
+count('pages_parsed', n) wherever the work happens. Both record onto the
+FileMetrics active in the current context (see recording()) and do nothing
+otherwise, so other callers of the parsers pay nothing. Stages nest: a PDF budget's text_extract is taken out of its
+budget_scan, so the stages of a file add up to its total time. Parsing may
+run in worker processes, so FileMetrics travel back as plain dicts.
+
+set_profiler() hooks a stage_profiler.Profiler into recording() and stage();
+set_tracing() makes them keep timestamped spans for trace_events.
+"""
+
+import functools
+import json
+import math
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+REPORT_FILE = 'run_report.json'
+
+STAGES = ['stat', 'stage', 'text_extract', 'featurize', 'budget_scan', 'schedule_scan']
+COUNTERS = ['bytes_read', 'pages_parsed', 'cells_scanned', 'subprocesses']
+
+
+def peak_rss_mb(children: bool = False) -> float:
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # kB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+@dataclass
+class FileMetrics:
+    """Where one file's time went"""
+    kind: str
+    path: str
+    stages: Dict[str, float] = field(default_factory=dict)
+    counters: Dict[str, int] = field(default_factory=dict)
+    peak_rss_mb: float = 0.0          # high-water mark of the process that parsed it
+    duplicate_of: Optional[str] = None  # content already read for another reference
+    error: Optional[str] = None
+    profiles: Dict[str, List[str]] = field(default_factory=dict)  # stage -> files written
+    spans: List[Dict[str, Any]] = field(default_factory=list)      # see make_span (when tracing)
+    _nested: List[float] = field(default_factory=list, repr=False, compare=False)
+
+    @property
+    def seconds(self) -> float:
+        return sum(self.stages.values())
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def add(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def as_dict(self) -> Dict[str, Any]:
+        record = asdict(self)
+        del record['_nested']
+        order = {name: i for i, name in enumerate(STAGES)}
+        record['stages'] = {k: round(self.stages[k], 6)
+                            for k in sorted(self.stages, key=lambda k: order.get(k, len(order)))}
+        record['counters'] = {k: self.counters[k] for k in COUNTERS if k in self.counters}
+        record['peak_rss_mb'] = round(self.peak_rss_mb, 1)
+        for optional in ('duplicate_of', 'error'):
+            if record[optional] is None:
+                del record[optional]
+        if not self.profiles:
+            del record['profiles']
+        if not self.spans:
+            del record['spans']
+        return record
+
+    @classmethod
+    def from_dict(cls, record: Dict[str, Any]) -> 'FileMetrics':
+        return cls(record['kind'], record['path'], dict(record.get('stages', {})),
+                   dict(record.get('counters', {})), record.get('peak_rss_mb', 0.0),
+                   record.get('duplicate_of'), record.get('error'), dict(record.get('profiles', {})),
+                   list(record.get('spans', [])))
+
+
+_current: ContextVar[Optional[FileMetrics]] = ContextVar('file_metrics', default=None)
+
+# A stage_profiler.Profiler while profiling; when None the hooks cost one check
+_profiler = None
+
+
+def set_profiler(profiler: Any) -> None:
+    global _profiler
+    _profiler = profiler
+
+
+_tracing = False
+
+
+def set_tracing(enabled: bool) -> None:
+    global _tracing
+    _tracing = enabled
+
+
+def tracing() -> bool:
+    return _tracing
+
+
+def make_span(category: str, name: str, started: float, seconds: float,
+              thread: Optional[Tuple[int, int, str]] = None) -> Dict[str, Any]:
+    """
+    A timeline span ('file' or 'stage'); started is time.time(). thread is
+    the (pid, thread id, name) it ran on, by default the current one.
+    """
+    if thread is None:
+        current = threading.current_thread()
+        thread = (os.getpid(), current.native_id, current.name)
+    pid, tid, thread_name = thread
+    return {'cat': category, 'name': name, 'ts': started, 'dur': seconds,
+            'pid': pid, 'tid': tid, 'thread': thread_name}
+
+
+@contextmanager
+def recording(kind: str, path: Path) -> Iterator[FileMetrics]:
+    """Collect stage() and count() calls made while reading one file"""
+    metrics = FileMetrics(kind, str(path))
+    token = _current.set(metrics)
+    wall, started = time.time(), time.perf_counter()
+    try:
+        with _profiler.file_scope(metrics) if _profiler is not None else nullcontext():
+            yield metrics
+    finally:
+        _current.reset(token)
+        metrics.peak_rss_mb = peak_rss_mb()
+        if _tracing:
+            metrics.spans.append(make_span('file', f'{kind}: {Path(path).name}', wall,
+                                           time.perf_counter() - started))
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a stage of the file being recorded (its own time - nested stages are left out)"""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    metrics._nested.append(0.0)
+    wall, started = time.time(), time.perf_counter()
+    try:
+        with _profiler.stage_scope(metrics, name) if _profiler is not None else nullcontext():
+            yield
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics.add_stage(name, elapsed - metrics._nested.pop())
+        if metrics._nested:
+            metrics._nested[-1] += elapsed
+        if _tracing:
+            metrics.spans.append(make_span('stage', name, wall, elapsed))
+
+
+def count(name: str, n: int = 1) -> None:
+    """Add to a counter of the file being recorded"""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.add(name, n)
+
+
+def timed(name: str) -> Callable[[Callable], Callable]:
+    """Decorator: the function's calls are timed as stage `name`"""
+    def decorate(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def stat_file(path: Path) -> None:
+    """The 'stat' stage: size up the source file about to be read"""
+    with stage('stat'):
+        count('bytes_read', Path(path).stat().st_size)
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))]
+
+
+class RunReport:
+    """Collects each project's file metrics and writes the run report"""
+
+    def __init__(self, workers: int = 1):
+        self.workers = workers
+        self.started = time.time()
+        self.projects: List[Dict[str, Any]] = []
+
+    def add_project(self, index: int, result: Dict[str, Any]) -> None:
+        """Take a result's '_metrics' (a list of FileMetrics dicts) into the report"""
+        files = result.pop('_metrics', [])
+        self.projects.append({
+            'index': index,
+            'project_name': result.get('project_name', 'Unknown'),
+            'seconds': round(sum(sum(f.get('stages', {}).values()) for f in files), 4),
+            'files': files,
+        })
+
+    def files(self) -> List[FileMetrics]:
+        return [FileMetrics.from_dict(f) for p in self.projects for f in p['files']]
+
+    def summary(self) -> Dict[str, Any]:
+        files = [f for f in self.files() if f.duplicate_of is None]
+        total = sum(f.seconds for f in files)
+        stages = {}
+        for name in STAGES:
+            timings = [f.stages[name] for f in files if name in f.stages]
+            if not timings:
+                continue
+            stages[name] = {
+                'files': len(timings),
+                'seconds': round(sum(timings), 4),
+                'share': round(sum(timings) / total, 4) if total else 0.0,
+                'p50_ms': round(_percentile(timings, 50) * 1000, 2),
+                'p95_ms': round(_percentile(timings, 95) * 1000, 2),
+                'max_ms': round(max(timings) * 1000, 2),
+            }
+        by_kind: Dict[str, Dict[str, Any]] = {}
+        for f in files:
+            kind = by_kind.setdefault(f.kind, {'files': 0, 'seconds': 0.0})
+            kind['files'] += 1
+            kind['seconds'] += f.seconds
+        for kind in by_kind.values():
+            kind['seconds'] = round(kind['seconds'], 4)
+        peak = max([peak_rss_mb(), peak_rss_mb(children=True)] + [f.peak_rss_mb for f in files])
+        return {
+            'projects': len(self.projects),
+            'files': len(files),
+            'duplicate_files': sum(1 for p in self.projects for f in p['files'] if f.get('duplicate_of')),
+            'wall_seconds': round(time.time() - self.started, 3),
+            'file_seconds': round(total, 4),
+            'stages': stages,
+            'by_kind': by_kind,
+            'counters': {name: sum(f.counters.get(name, 0) for f in files) for name in COUNTERS},
+            'peak_rss_mb': round(peak, 1),
+        }
+
+    def describe(self, top: int = 3) -> str:
+        """One line: the stages the time went to"""
+        stages = sorted(self.summary()['stages'].items(), key=lambda s: -s[1]['seconds'])
+        return ', '.join(f"{name} {s['share']:.0%}" for name, s in stages[:top])
+
+    def save(self, path: Path) -> Dict[str, Any]:
+        report = {
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            'workers': self.workers,
+            'summary': self.summary(),
+            # Spans are for the trace timeline (trace_events), not the report
+            'projects': [{**p, 'files': [{k: v for k, v in f.items() if k != 'spans'} for f in p['files']]}
+                         for p in sorted(self.projects, key=lambda p: p['index'])],
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        return report
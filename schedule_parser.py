@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Row-oriented shoot schedule parser
+
+Schedules are read a row at a time - spreadsheet rows straight from a
+streaming reader (openpyxl read-only, xlrd, see extractor.backends), PDF
+text a line at a time - and each row is classified on its own:
+
+    day heading     "SHOOT DAY 2", "Day 3 of 5", "DAY 1 - Monday" at the start of a row
+    call / wrap     "Call: 07:00", "Unit call 7.30", "Wrap 19:00"
+    setup           "Setup 4", "Set-up #12", or any mention of a setup
+    unit move       "Unit move", "Company move"
+
+so a day's call time and setups come from that day's own rows instead of
+from a sheet flattened into one string. Only the day being read is held in
+memory, whatever the size of the sheet; there is no row cap.
+
+parse_days() yields a record per day as the day closes:
+
+    {'day': 2, 'call_time': '07:30', 'wrap_time': '19:00', 'setups': 6, 'unit_moves': 1}
+
+and parse_schedule() folds them into a schedule_data dict for the drivers.
+"""
+
+import datetime
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from extractor.backends import ROWS, TIME_READERS, choose_backend
+from extractor.bench import saved_throughput
+from run_metrics import count
+
+DAY_HEADING = re.compile(r'^\W*(?:shoot(?:ing)?\s+)?day\s*(\d{1,3})\b(?:\s*(?:of|/)\s*(\d{1,3})\b)?')
+DAY_MENTION = re.compile(r'day\s+(\d+)')
+CALL_TIME = re.compile(r'\bcall[:\s]+(\d{1,2})[:.](\d{2})\b')
+WRAP_TIME = re.compile(r'\bwrap[:\s]+(\d{1,2})[:.](\d{2})\b')
+NUMBERED_SETUP = re.compile(r'\bset[\s-]?up\s*#?(\d+)')
+SETUP_MENTION = re.compile(r'setup|set[\s-]up')
+UNIT_MOVE = re.compile(r'\b(?:unit|company)\s+move\b')
+
+
+def cell_text(value: Any) -> str:
+    """A cell as the text a person reads in it (times as HH:MM, whole numbers without .0)"""
+    if value is None:
+        return ''
+    if isinstance(value, (datetime.datetime, datetime.time)):
+        return value.strftime('%H:%M')
+    if isinstance(value, float):
+        if value != value:
+            return ''
+        if value.is_integer():
+            return str(int(value))
+    return str(value).strip()
+
+
+def row_text(row: Sequence[Any]) -> str:
+    return ' '.join(text for text in (cell_text(v) for v in row) if text)
+
+
+def iter_sheet_rows(path: Path) -> Iterator[str]:
+    """The first sheet of a workbook, one line of text per non-empty row"""
+    backend = choose_backend(path.suffix, ROWS, throughput=saved_throughput(), prefer=TIME_READERS)
+    if backend is None:
+        raise ValueError(f'no reader for {path.suffix} installed')
+    for row in backend.read_rows(path):
+        count('cells_scanned', len(row))
+        text = row_text(row)
+        if text:
+            yield text
+
+
+def _clock(match: Optional['re.Match[str]']) -> Optional[str]:
+    if not match:
+        return None
+    hour, minute = int(match.group(1)), int(match.group(2))
+    return f'{hour:02d}:{minute:02d}' if hour < 24 and minute < 60 else None
+
+
+class _Day:
+    __slots__ = ('day', 'call_time', 'wrap_time', 'numbered', 'mentions', 'unit_moves')
+
+    def __init__(self, day: int):
+        self.day = day
+        self.call_time: Optional[str] = None
+        self.wrap_time: Optional[str] = None
+        self.numbered: set = set()
+        self.mentions = 0
+        self.unit_moves = 0
+
+    def record(self) -> Dict[str, Any]:
+        return {'day': self.day, 'call_time': self.call_time, 'wrap_time': self.wrap_time,
+                'setups': len(self.numbered) or self.mentions, 'unit_moves': self.unit_moves}
+
+
+def parse_days(rows: Iterable[str], stats: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Per-day records from a schedule's rows in reading order. A day starts at
+    a heading naming a day number not seen yet (repeated headings on later
+    pages continue it); rows before the first heading that carry a call time
+    or a setup make an implicit day 1. With stats, whole-schedule counters
+    are kept in it as the rows go by.
+    """
+    if stats is None:
+        stats = {}
+    stats.update(rows=0, text_length=0, call_times_found=0, setup_mentions=0, day_headings=0,
+                 declared_days=0, max_day_mentioned=None)
+    current: Optional[_Day] = None
+    seen: set = set()
+    for row in rows:
+        lower = row.lower()
+        stats['rows'] += 1
+        stats['text_length'] += len(row) + (stats['rows'] > 1)
+        for mention in DAY_MENTION.findall(lower):
+            stats['max_day_mentioned'] = max(stats['max_day_mentioned'] or 0, int(mention))
+
+        heading = DAY_HEADING.match(lower)
+        if heading and int(heading.group(1)) not in seen:
+            if current is not None:
+                yield current.record()
+            seen.add(int(heading.group(1)))
+            current = _Day(int(heading.group(1)))
+        if heading:
+            stats['day_headings'] += 1
+            stats['declared_days'] = max(stats['declared_days'], int(heading.group(2) or 0))
+
+        call = CALL_TIME.search(lower)
+        mentions = len(SETUP_MENTION.findall(lower))
+        stats['call_times_found'] += len(CALL_TIME.findall(lower))
+        stats['setup_mentions'] += mentions
+        if current is None:
+            if not (call or mentions):
+                continue
+            seen.add(1)
+            current = _Day(1)
+        if current.call_time is None:
+            current.call_time = _clock(call)
+        current.wrap_time = _clock(WRAP_TIME.search(lower)) or current.wrap_time
+        current.numbered.update(NUMBERED_SETUP.findall(lower))
+        current.mentions += mentions
+        current.unit_moves += len(UNIT_MOVE.findall(lower))
+    if current is not None:
+        yield current.record()
+
+
+def parse_schedule(rows: Iterable[str]) -> Dict[str, Any]:
+    """
+    schedule_data for a schedule: shoot days, the per-day records and the
+    whole-schedule counts. shoot_days is the number of day blocks (or the
+    "of N" a heading declares, if more); a schedule without day headings
+    falls back to the highest "day N" it mentions, as before.
+    """
+    stats: Dict[str, Any] = {}
+    days: List[Dict[str, Any]] = list(parse_days(rows, stats))
+    if stats['day_headings']:
+        shoot_days = max(len(days), stats['declared_days'])
+    else:
+        shoot_days = stats['max_day_mentioned']
+    return {
+        'shoot_days': shoot_days,
+        'call_times_found': stats['call_times_found'],
+        'setup_mentions': stats['setup_mentions'],
+        'text_length': stats['text_length'],
+        'rows_read': stats['rows'],
+        'days': days,
+    }
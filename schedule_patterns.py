@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Schedule patterns aggregated from extracted schedules
+
+extract_from_schedule reports, per schedule, a record for each shoot day
+(call and wrap time, setups, unit moves - see schedule_parser). This pass gathers them across a run's results
+into flat arrays and computes, in one vectorized go:
+
+    CALL_TIME_DISTRIBUTION   call time -> shoot days and share, most common first
+    SCHEDULE_STATS           min / max / avg / median and sample counts for the
+                             call time, shoot days per schedule, setups and unit
+                             moves per day
+
+and rewrites the generated block of src/lib/data/schedule-patterns.ts, so
+the numbers follow the corpus. The hand-written analysis around the block
+(day structures, setup and move timings, recommendations) is left alone.
+Earlier script revisions and failed projects are not counted.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from lazy_modules import lazy_import
+from ts_codegen import DATA_DIR, replace_block, ts_value
+
+np = lazy_import('numpy')
+
+TS_FILE = 'schedule-patterns.ts'
+
+
+def _hours(minutes: float) -> float:
+    return round(minutes / 60, 2)
+
+
+def _clock(minutes: float) -> str:
+    minutes = int(round(minutes))
+    return f'{minutes // 60:02d}:{minutes % 60:02d}'
+
+
+def gather(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Flat arrays of call times (minutes after midnight), setups and moves per day and days per schedule"""
+    calls, setups, moves, days = [], [], [], []
+    schedules = 0
+    for result in results:
+        if result.get('error') or (result.get('script_revision') or {}).get('superseded_by'):
+            continue
+        schedule = result.get('schedule_data') or {}
+        if not schedule.get('days') and not schedule.get('shoot_days'):
+            continue
+        schedules += 1
+        for day in schedule.get('days', []):
+            if day.get('call_time'):
+                hour, minute = day['call_time'].split(':')
+                calls.append(int(hour) * 60 + int(minute))
+            if day.get('setups'):
+                setups.append(day['setups'])
+                moves.append(day.get('unit_moves', 0))
+        if schedule.get('shoot_days'):
+            days.append(schedule['shoot_days'])
+    return {
+        'schedules': schedules,
+        'call_minutes': np.array(calls, dtype=np.int32),
+        'setups_per_day': np.array(setups, dtype=np.int32),
+        'unit_moves_per_day': np.array(moves, dtype=np.int32),
+        'shoot_days': np.array(days, dtype=np.int32),
+    }
+
+
+def _stats(values: Any, metric: str, value: Any = None, scale=float, notes: Optional[str] = None) -> Dict[str, Any]:
+    stats = {
+        'metric': metric,
+        'value': value if value is not None else scale(float(np.median(values))),
+        'min': scale(float(values.min())),
+        'max': scale(float(values.max())),
+        'avg': round(scale(float(values.mean())), 2),
+        'median': scale(float(np.median(values))),
+        'samples': int(values.size),
+    }
+    if notes:
+        stats['notes'] = notes
+    return stats
+
+
+def aggregate(gathered: Dict[str, Any]) -> Dict[str, Any]:
+    """Distribution and summary statistics from gather()'s arrays"""
+    calls = gathered['call_minutes']
+    distribution = []
+    if calls.size:
+        times, counts = np.unique(calls, return_counts=True)
+        shares = np.floor(counts * 100.0 / calls.size + 0.5).astype(np.int32)
+        # Most common first, earlier time breaking ties
+        for i in np.lexsort((times, -counts)):
+            distribution.append({'time': _clock(times[i]), 'count': int(counts[i]), 'percentage': int(shares[i])})
+
+    stats: Dict[str, Dict[str, Any]] = {}
+    if calls.size:
+        stats['call_time'] = _stats(calls, 'Unit call time', value=distribution[0]['time'], scale=_hours,
+                                    notes='hours after midnight; value is the most common call')
+    if gathered['shoot_days'].size:
+        stats['shoot_days'] = _stats(gathered['shoot_days'], 'Shoot days per schedule')
+    if gathered['setups_per_day'].size:
+        stats['setups_per_day'] = _stats(gathered['setups_per_day'], 'Setups per shoot day')
+        stats['unit_moves_per_day'] = _stats(gathered['unit_moves_per_day'], 'Unit moves per shoot day')
+    return {'schedules': gathered['schedules'], 'distribution': distribution, 'stats': stats}
+
+
+def render(aggregated: Dict[str, Any]) -> str:
+    lines = [f"// {aggregated['schedules']} schedules, {sum(d['count'] for d in aggregated['distribution'])} calls",
+             'export const CALL_TIME_DISTRIBUTION: CallTimeShare[] = [']
+    lines += [f'  {ts_value(entry)},' for entry in aggregated['distribution']]
+    lines += ['];', '', 'export const SCHEDULE_STATS: Record<string, SchedulePattern> = {']
+    lines += [f'  {name}: {ts_value(stats)},' for name, stats in aggregated['stats'].items()]
+    lines.append('};')
+    return '\n'.join(lines) + '\n'
+
+
+def generate(results: List[Dict[str, Any]], data_dir: Path = DATA_DIR, check: bool = False) -> Dict[str, Any]:
+    """
+    Regenerate the block in schedule-patterns.ts. A run without any schedule
+    data leaves the file as it is.
+    """
+    aggregated = aggregate(gather(results))
+    path = data_dir / TS_FILE
+    source = path.read_text()
+    if not aggregated['distribution'] and not aggregated['stats']:
+        return {'schedules': 0, 'stale' if check else 'written': []}
+    updated = replace_block(source, render(aggregated), path)
+    changed = [str(path)] if updated != source else []
+    if changed and not check:
+        path.write_text(updated)
+    return {'schedules': aggregated['schedules'], 'stale' if check else 'written': changed}
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Script keyword features - the one copy the drivers share
+
+scan_script_text() is the raw keyword scan of a piece of script text
+(techniques, location types, shot / scene mentions, talent and vehicle
+flags); scans of separate pages merge (page_diff.merge_scans) into the same
+result as one scan of the whole text. script_features_from_scan() turns a
+scan into the script_features record the drivers write, and
+scene_headings() lists the sluglines for the results store and the
+extraction service.
+"""
+
+import re
+from typing import Any, Dict, List
+
+from run_metrics import timed
+
+TECHNIQUE_KEYWORDS = {
+    'moco': ['moco', 'motion control', 'mo-co'],
+    'drone': ['drone', 'aerial', 'uav'],
+    'tracking': ['tracking shot', 'tracking', 'dolly track'],
+    'vfx': ['vfx', 'visual effects', 'green screen', 'greenscreen', 'cgi'],
+    'night_shoot': ['night shoot', 'night exterior', 'night int', 'night ext'],
+    'underwater': ['underwater', 'submerged'],
+    'crane': ['crane shot', 'crane', 'jib'],
+    'steadicam': ['steadicam', 'steadi'],
+    'handheld': ['handheld', 'hand held'],
+    'slow_motion': ['slow motion', 'slow-motion', 'high speed', 'phantom'],
+    'time_lapse': ['time lapse', 'time-lapse', 'timelapse']
+}
+LOCATION_ORDER = ['studio', 'outdoor', 'indoor']
+
+SHOT_PATTERNS = [
+    r'shot\s+\d+',
+    r'scene\s+\d+',
+    r'sc\.\s*\d+',
+    r'\d+\s*\.\s*(?:int|ext)'
+]
+
+# Scene headings ('SCENE 12. INT. KITCHEN - NIGHT', '4 EXT./INT. CAR PARK') -
+# sluglines are upper case, which keeps prose mentioning an interior out
+SCENE_HEADING = re.compile(
+    r'^\s*(?:(?:SCENE|SC\.?)\s*)?(?P<number>\d+[A-Z]?)?\s*[.:)]?\s*'
+    r'(?P<setting>INT\.?\s*/\s*EXT|EXT\.?\s*/\s*INT|I/E|INT|EXT|INTERIOR|EXTERIOR)\.?\s+'
+    r'(?P<place>[^a-z\n]+?)(?:\s+[-\u2013\u2014]+\s*(?P<time>[^a-z\n-]+?))?\s*$',
+    re.MULTILINE)
+
+# Bump when scan_script_text changes, so cached page scans are redone
+SCRIPT_SCAN_VERSION = 'script-scan-1'
+
+@timed('featurize')
+def scan_script_text(text: str) -> Dict[str, Any]:
+    """
+    Raw keyword scan of a piece of script text. Scans of separate pages can be
+    combined with page_diff.merge_scans and give the same features as one scan
+    of the whole text.
+    """
+    text_lower = text.lower()
+    
+    techniques = [tech for tech, keywords in TECHNIQUE_KEYWORDS.items()
+                  if any(kw in text_lower for kw in keywords)]
+    
+    locations = []
+    if 'studio' in text_lower or 'sound stage' in text_lower:
+        locations.append('studio')
+    if any(word in text_lower for word in ['exterior', 'ext.', 'outdoor', 'location']):
+        locations.append('outdoor')
+    if 'interior' in text_lower or 'int.' in text_lower:
+        locations.append('indoor')
+    
+    shots = set()
+    for pattern in SHOT_PATTERNS:
+        shots.update(re.findall(pattern, text_lower))
+    
+    return {
+        'techniques': techniques,
+        'locations': locations,
+        'shots': sorted(shots),
+        'has_children': any(word in text_lower for word in ['child', 'kid', 'baby', 'infant']),
+        'has_animals': any(word in text_lower for word in ['dog', 'cat', 'horse', 'animal']),
+        'has_vehicles': any(word in text_lower for word in ['car', 'vehicle', 'truck', 'motorcycle']),
+    }
+
+def script_features_from_scan(scan: Dict[str, Any], text_length: int) -> Dict[str, Any]:
+    """Turn a (possibly merged) scan into the script_features record"""
+    techniques = set(scan.get('techniques', []))
+    locations = set(scan.get('locations', []))
+    shots = scan.get('shots', [])
+    return {
+        'techniques': [t for t in TECHNIQUE_KEYWORDS if t in techniques],
+        'locations': [l for l in LOCATION_ORDER if l in locations],
+        'estimated_shots': len(set(shots)) if shots else None,
+        'has_children': scan.get('has_children', False),
+        'has_animals': scan.get('has_animals', False),
+        'has_vehicles': scan.get('has_vehicles', False),
+        'text_length': text_length
+    }
+
+def extract_features_from_script(text: str) -> Dict[str, Any]:
+    """Extract key features from script text"""
+    return script_features_from_scan(scan_script_text(text), len(text))
+
+def scene_headings(text: str) -> List[Dict[str, Any]]:
+    """Scene headings in script order: number, INT/EXT, place, time of day and location type"""
+    scenes = []
+    for match in SCENE_HEADING.finditer(text):
+        setting = re.sub(r'[\s.]', '', match['setting'])
+        setting = {'INTERIOR': 'INT', 'EXTERIOR': 'EXT', 'I/E': 'INT/EXT', 'EXT/INT': 'INT/EXT'}.get(setting, setting)
+        place = match['place'].strip(' .-')
+        if 'STUDIO' in place or 'STAGE' in place:
+            location_type = 'studio'
+        else:
+            location_type = {'INT': 'indoor', 'EXT': 'outdoor'}.get(setting, 'mixed')
+        scenes.append({
+            'number': match['number'],
+            'setting': setting,
+            'place': place,
+            'time_of_day': match['time'].strip() if match['time'] else None,
+            'location_type': location_type,
+        })
+    return scenes
@@ -291,6 +291,60 @@ export const UK_PRODUCTION_COSTS: CostBand = {
   ambitious: 250000, // £250k/day - multiple locations, 2nd unit, complex setups (e.g. Gousto)
 };
 
+// ============================================
+// CALIBRATED COST BANDS (from extracted budgets)
+// £/day percentiles per script complexity tier - lean 25th,
+// standard 50th, ambitious 75th - and what each script feature
+// adds per day, refitted on every extraction (cost_calibration.py).
+// Cross-check against the hand-set bands above.
+// ============================================
+
+export interface CalibratedCostBand extends CostBand {
+  samples: number;                                // projects in the tier
+  interval: Record<keyof CostBand, [number, number]>; // bootstrap interval per percentile
+}
+
+export interface CostDriver {
+  leastSquares: number;             // £/day added, least squares fit
+  median: number;                   // £/day added, median regression
+  interval: [number, number];       // bootstrap interval, least squares
+  medianInterval: [number, number]; // bootstrap interval, median regression
+}
+
+// <generated by python3 -m extractor codegen - edit cost_calibration.py, not this block>
+// 0 projects with a budget and shoot days; 90% bootstrap intervals (1000 resamples)
+export const CALIBRATED_COST_BANDS: Record<string, CalibratedCostBand> = {
+};
+
+export const DAY_RATE_DRIVERS: Record<string, CostDriver> = {
+};
+// </generated>
+
+// Script complexity tiers, counted from techniques plus child talent - the
+// drivers cost_calibration.py fits CALIBRATED_COST_BANDS' tiers on
+export type ComplexityTier = 'simple' | 'standard' | 'complex' | 'very_complex';
+
+const COMPLEXITY_STEPS: [number, ComplexityTier][] = [
+  [0, 'simple'],
+  [1, 'standard'],
+  [3, 'complex'],
+  [5, 'very_complex'],
+];
+
+export function getComplexityTier(costDrivers: number): ComplexityTier {
+  return COMPLEXITY_STEPS.filter(([threshold]) => costDrivers >= threshold).pop()![1];
+}
+
+// The calibrated UK band for a tier - the hand-set band until the block
+// above has one (an empty corpus, or too few projects in the tier)
+export function getUKCostBand(tier?: ComplexityTier): CostBand {
+  const calibrated = tier ? CALIBRATED_COST_BANDS[tier] : undefined;
+  if (!calibrated) {
+    return UK_PRODUCTION_COSTS;
+  }
+  return { lean: calibrated.lean, standard: calibrated.standard, ambitious: calibrated.ambitious };
+}
+
 // ============================================
 // POST-PRODUCTION FLOORS
 // ============================================
@@ -416,10 +470,11 @@ export function convertToGBP(localAmount: number, country: EUCountry): number {
 
 export function getCostBandForContext(
   context: 'UK' | 'EU',
-  country?: EUCountry
+  country?: EUCountry,
+  tier?: ComplexityTier
 ): CostBand {
   if (context === 'UK') {
-    return UK_PRODUCTION_COSTS;
+    return getUKCostBand(tier);
   }
 
   if (country && EU_COUNTRY_COSTS[country]) {
@@ -16,6 +16,9 @@ import {
   HOD_RATES,
   HOD_PREP_DAYS,
   getCostBandForContext,
+  getComplexityTier,
+  CALIBRATED_COST_BANDS,
+  DAY_RATE_DRIVERS,
   POST_FLOORS,
   TALENT_BSF_RATES,
   TALENT_ADDITIONAL_FEES,
@@ -273,6 +276,20 @@ function getDayEfficiencyFactor(days: number): number {
   return 1.0;                       // 4+ days: full multi-day rates apply
 }
 
+// ============================================
+// SCRIPT COST DRIVERS
+// What the calibration (cost_calibration.py) fits £/day against.
+// techniques are parseScript's TECHNIQUE_KEYWORDS matches - the same
+// list script_features.py counts in the extraction results
+// ============================================
+function getScriptCostDrivers(input: AssessmentInput): Record<string, number> {
+  return {
+    techniques: input.scriptBreakdown?.techniques?.length || 0,
+    locations: input.scriptBreakdown?.uniqueLocations || 0,
+    children: input.complexity.childrenInvolved ? 1 : 0,
+  };
+}
+
 // ============================================
 // ESTIMATE PRODUCTION COSTS
 // ============================================
@@ -287,8 +304,10 @@ export function estimateProductionCosts(
   const shootDays = input.proposedShootDays || schedule.totalDaysRequired || 1;
   const notes: string[] = [];
 
-  // Get cost band based on context
-  const costPerDay = getCostBandForContext(input.shootingContext, input.euCountry);
+  // Get cost band based on context (UK: calibrated by script complexity when available)
+  const drivers = getScriptCostDrivers(input);
+  const tier = getComplexityTier(drivers.techniques + drivers.children);
+  const costPerDay = getCostBandForContext(input.shootingContext, input.euCountry, tier);
 
   // Apply day-count efficiency factor (1-day shoots are cheaper per day)
   const efficiencyFactor = getDayEfficiencyFactor(shootDays);
@@ -330,6 +349,18 @@ export function estimateProductionCosts(
 
     notes.push('UK (APA-style) production costs');
 
+    // Calibrated from extracted budgets, when the generated block has been filled
+    const calibrated = CALIBRATED_COST_BANDS[tier];
+    if (calibrated) {
+      notes.push(`Day rate calibrated on ${calibrated.samples} ${tier.replace('_', ' ')} projects`);
+    }
+    Object.entries(drivers).forEach(([name, count]) => {
+      const driver = DAY_RATE_DRIVERS[name];
+      if (driver && count > 0) {
+        notes.push(`  ${name} (${count}): ~£${Math.round(driver.median * count).toLocaleString()}/day in past budgets`);
+      }
+    });
+
     // Flag if proposed days differ significantly from required
     if (input.proposedShootDays && schedule.totalDaysRequired > input.proposedShootDays) {
       const deficit = schedule.totalDaysRequired - input.proposedShootDays;
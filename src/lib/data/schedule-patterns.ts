@@ -1,6 +1,8 @@
 // ============================================
 // COMPREHENSIVE SCHEDULE PATTERN DATA
-// Extracted from ALL 30 schedule files
+// Extracted from ALL 30 schedule files; the call-time
+// distribution and SCHEDULE_STATS are regenerated from
+// the extracted schedules (python3 -m extractor codegen)
 // ============================================
 
 export interface SchedulePattern {
@@ -14,20 +16,45 @@ export interface SchedulePattern {
   notes?: string;
 }
 
+export interface CallTimeShare {
+  time: string;
+  count: number;
+  percentage: number;
+}
+
+// ============================================
+// EXTRACTED SCHEDULE STATISTICS
+// ============================================
+
+// <generated by python3 -m extractor codegen - edit schedule_patterns.py, not this block>
+// Not generated yet: empty until extraction results with schedule data are
+// run through python3 -m extractor codegen. Until then the hand-analysed
+// figures below (ANALYSED_CALL_TIMES, SCHEDULE_RECOMMENDATIONS.defaults) apply.
+export const CALL_TIME_DISTRIBUTION: CallTimeShare[] = [
+];
+
+export const SCHEDULE_STATS: Record<string, SchedulePattern> = {
+};
+// </generated>
+
 // ============================================
 // CALL TIME PATTERNS (from 30 schedules)
 // ============================================
 
+// Hand-analysed from the 30 schedule files, used while the generated
+// distribution above is empty
+export const ANALYSED_CALL_TIMES: CallTimeShare[] = [
+  { time: '08:00', count: 7, percentage: 26 },  // Most common - standard
+  { time: '07:30', count: 5, percentage: 19 },  // Early - sunrise/location
+  { time: '07:00', count: 5, percentage: 19 },  // Very early - golden hour
+  { time: '06:30', count: 1, percentage: 4 },   // Pre-dawn - special cases
+  { time: '10:00', count: 1, percentage: 4 },   // Late - studio only
+  { time: '10:30', count: 1, percentage: 4 },   // Late - studio only
+];
+
 export const CALL_TIME_PATTERNS = {
   // Most common call times across all schedules
-  distribution: [
-    { time: '08:00', count: 7, percentage: 26 },  // Most common - standard
-    { time: '07:30', count: 5, percentage: 19 },  // Early - sunrise/location
-    { time: '07:00', count: 5, percentage: 19 },  // Very early - golden hour
-    { time: '06:30', count: 1, percentage: 4 },   // Pre-dawn - special cases
-    { time: '10:00', count: 1, percentage: 4 },   // Late - studio only
-    { time: '10:30', count: 1, percentage: 4 },   // Late - studio only
-  ],
+  distribution: CALL_TIME_DISTRIBUTION.length ? CALL_TIME_DISTRIBUTION : ANALYSED_CALL_TIMES,
   
   // Recommendations based on project type
   recommendations: {
@@ -440,13 +467,14 @@ export const PROJECT_SCHEDULES = {
 
 export const SCHEDULE_RECOMMENDATIONS = {
   // Default values when no specific data
+  // (call time and setups per day follow SCHEDULE_STATS once it is generated)
   defaults: {
-    call_time: '08:00',
+    call_time: String(SCHEDULE_STATS.call_time?.value ?? '08:00'),
     setup_time_minutes: 45,
     move_time_minutes: 30,
     lunch_time: '13:00',
     wrap_time: '19:00',
-    setups_per_day: 6,
+    setups_per_day: Math.round(SCHEDULE_STATS.setups_per_day?.median ?? 6),
   },
   
   // Adjustments by context
@@ -24,6 +24,7 @@ export interface TrainingProject {
 // VERIFIED PROJECT DATA (from PDF/Excel analysis)
 // ============================================
 
+// <generated by python3 -m extractor codegen - edit training-data.overrides.json, not this block>
 export const REAL_PROJECTS: TrainingProject[] = [
   // UK SHOOTS
   {
@@ -90,6 +91,43 @@ export const REAL_PROJECTS: TrainingProject[] = [
     complexity: 'simple',
     verified: false,
   },
+  {
+    projectName: 'IAMS Cat Food',
+    client: 'IAMS',
+    location: 'TBD',
+    shootType: 'UK',  // Assume UK
+    shootDays: 2,  // From schedules "Day 1" and "Day 2"
+    approvedBudget: 126001,
+    budgetPerDay: 63001,
+    keyFeatures: ['Animals', 'Cats', 'Pet food'],
+    complexity: 'simple',
+    verified: false,
+    notes: '2 days, animals involved (unpredictable)',
+  },
+  {
+    projectName: 'C4 Climate',
+    client: 'Channel 4',
+    location: 'TBD',
+    shootType: 'UK',
+    shootDays: 2,
+    approvedBudget: 394103,
+    budgetPerDay: 197052,
+    keyFeatures: ['Climate', 'Channel 4'],
+    complexity: 'standard',
+    verified: false,
+  },
+  {
+    projectName: 'Keane / Tails',
+    client: 'Keane',
+    location: 'TBD',
+    shootType: 'UK',  // Assume UK (British band)
+    shootDays: 2,
+    approvedBudget: 380896,
+    budgetPerDay: 190448,
+    keyFeatures: ['Music', 'Band', 'Tails'],
+    complexity: 'standard',
+    verified: false,
+  },
 
   // EUROPE SHOOTS
   {
@@ -293,19 +331,6 @@ export const REAL_PROJECTS: TrainingProject[] = [
     complexity: 'standard',
     verified: false,
   },
-  {
-    projectName: 'IAMS Cat Food',
-    client: 'IAMS',
-    location: 'TBD',
-    shootType: 'UK',  // Assume UK
-    shootDays: 2,  // From schedules "Day 1" and "Day 2"
-    approvedBudget: 126001,
-    budgetPerDay: 63001,
-    keyFeatures: ['Animals', 'Cats', 'Pet food'],
-    complexity: 'simple',
-    verified: false,
-    notes: '2 days, animals involved (unpredictable)',
-  },
   {
     projectName: 'United Airlines',
     client: 'United Airlines',
@@ -318,31 +343,8 @@ export const REAL_PROJECTS: TrainingProject[] = [
     complexity: 'complex',
     verified: false,
   },
-  {
-    projectName: 'C4 Climate',
-    client: 'Channel 4',
-    location: 'TBD',
-    shootType: 'UK',
-    shootDays: 2,
-    approvedBudget: 394103,
-    budgetPerDay: 197052,
-    keyFeatures: ['Climate', 'Channel 4'],
-    complexity: 'standard',
-    verified: false,
-  },
-  {
-    projectName: 'Keane / Tails',
-    client: 'Keane',
-    location: 'TBD',
-    shootType: 'UK',  // Assume UK (British band)
-    shootDays: 2,
-    approvedBudget: 380896,
-    budgetPerDay: 190448,
-    keyFeatures: ['Music', 'Band', 'Tails'],
-    complexity: 'standard',
-    verified: false,
-  },
 ];
+// </generated>
 
 // ============================================
 // DERIVED STATISTICS FROM REAL DATA
@@ -35,6 +35,22 @@ const TECHNICAL_KEYWORDS = [
   'underwater', 'car mount', 'process trailer', 'green screen', 'blue screen',
 ];
 
+// Production techniques, as script_features.py TECHNIQUE_KEYWORDS detects
+// them in the extraction results - keep the two in step
+const TECHNIQUE_KEYWORDS: Record<string, string[]> = {
+  moco: ['moco', 'motion control', 'mo-co'],
+  drone: ['drone', 'aerial', 'uav'],
+  tracking: ['tracking shot', 'tracking', 'dolly track'],
+  vfx: ['vfx', 'visual effects', 'green screen', 'greenscreen', 'cgi'],
+  night_shoot: ['night shoot', 'night exterior', 'night int', 'night ext'],
+  underwater: ['underwater', 'submerged'],
+  crane: ['crane shot', 'crane', 'jib'],
+  steadicam: ['steadicam', 'steadi'],
+  handheld: ['handheld', 'hand held'],
+  slow_motion: ['slow motion', 'slow-motion', 'high speed', 'phantom'],
+  time_lapse: ['time lapse', 'time-lapse', 'timelapse'],
+};
+
 const HERO_PRODUCT_KEYWORDS = [
   'hero shot', 'product shot', 'pack shot', 'beauty shot', 'pour',
   'splash', 'tabletop', 'macro', 'close-up on product', 'cu product',
@@ -100,6 +116,13 @@ function detectTechnicalComplexity(text: string): boolean {
   return TECHNICAL_KEYWORDS.some((kw) => lowerText.includes(kw));
 }
 
+function detectTechniques(text: string): string[] {
+  const lowerText = text.toLowerCase();
+  return Object.keys(TECHNIQUE_KEYWORDS).filter((technique) =>
+    TECHNIQUE_KEYWORDS[technique].some((kw) => lowerText.includes(kw))
+  );
+}
+
 function detectHeroProduct(text: string): boolean {
   const lowerText = text.toLowerCase();
   return HERO_PRODUCT_KEYWORDS.some((kw) => lowerText.includes(kw));
@@ -324,6 +347,7 @@ export function parseScript(scriptText: string): ScriptBreakdown {
     vfxComplexity,
     hasTechnicalShots,
     hasHeroProduct,
+    techniques: detectTechniques(scriptText),
   };
 }
 
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Opt-in cProfile / tracemalloc profiling of chosen files and stages
+
+With --profile, files whose name matches one of the patterns (all files if
+none are given) are run under cProfile - the whole file, or only the chosen
+run_metrics stages (text_extract, budget_scan, ...). For each profiled file
+and stage this writes, into its own directory under the profile dir:
+
+    <stage>.pstats      python3 -m pstats / snakeviz / gprof2dot
+    <stage>.collapsed   collapsed stacks for flamegraph.pl, speedscope, inferno
+    <stage>.memory.txt  peak traced memory and top allocation sites (--profile-memory)
+
+Hooks are entered from run_metrics.recording() and run_metrics.stage(),
+which skip them entirely when no profiler is installed. A stage repeated
+within a file (featurize per page) accumulates into one profile; stages
+nested in a profiled stage are part of its profile.
+"""
+
+import cProfile
+import fnmatch
+import os
+import pstats
+import re
+import tempfile
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+PROFILE_DIR = 'profiles'
+WHOLE_FILE = 'file'
+TOP_ALLOCATIONS = 25
+
+Func = Tuple[str, int, str]
+
+
+def _frame_name(func: Func) -> str:
+    filename, line, name = func
+    if filename == '~':
+        # Built-ins: '<built-in method builtins.len>' -> builtins.len
+        name = re.sub(r"^<(?:built-in )?(?:method|function) (.*?)(?: of .*)?>$", r'\1', name)
+        return name.replace(';', ',')
+    return f'{name} ({os.path.basename(filename)}:{line})'.replace(';', ',')
+
+
+def collapsed_stacks(stats: pstats.Stats, max_depth: int = 64, min_share: float = 0.0005,
+                     max_frames: int = 200_000) -> List[str]:
+    """
+    Approximate collapsed stacks ('a;b;c <microseconds>') from cProfile's
+    caller/callee totals. cProfile keeps edges, not stacks, so a function's
+    time is split among its callers in proportion to the time each call edge
+    accounts for - exact for tree-shaped call graphs, an estimate otherwise.
+    Branches under min_share of the total are dropped (a flame graph can't
+    show them anyway), which keeps the walk from enumerating every path
+    through a large library's call graph, e.g. an import.
+    """
+    raw: Dict[Func, Any] = stats.stats  # func -> (cc, nc, tt, ct, callers)
+    children: Dict[Func, List[Tuple[Func, float]]] = {}
+    for callee, (_, _, _, _, callers) in raw.items():
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((callee, edge[3]))
+    roots = [func for func, entry in raw.items() if not entry[4]]
+    threshold = max(stats.total_tt * min_share, 1e-6)
+
+    totals: Dict[str, float] = {}
+    budget = [max_frames]
+
+    def walk(func: Func, share: float, path: List[Func]) -> None:
+        budget[0] -= 1
+        stack = path + [func]
+        key = ';'.join(_frame_name(f) for f in stack)
+        totals[key] = totals.get(key, 0.0) + raw[func][2] * share
+        if len(stack) >= max_depth:
+            return
+        for callee, edge_time in children.get(func, []):
+            callee_total = raw[callee][3]
+            if budget[0] <= 0 or callee in stack or not callee_total or share * edge_time < threshold:
+                continue
+            # Recursive functions' totals only count outermost calls - keep shares <= 1
+            walk(callee, share * min(1.0, edge_time / callee_total), stack)
+
+    for root in roots:
+        walk(root, 1.0, [])
+    return [f'{stack} {round(seconds * 1e6)}' for stack, seconds in sorted(totals.items())
+            if round(seconds * 1e6) > 0]
+
+
+class _Capture:
+    """One (file, stage) profile, possibly entered several times"""
+
+    def __init__(self) -> None:
+        self.profile = cProfile.Profile()
+        self.peak_bytes = 0
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+
+
+class Profiler:
+    """
+    Which files and stages to profile, and where the results go. Picklable,
+    so it can be handed to parser worker processes.
+    """
+
+    def __init__(self, directory: Path, stages: Sequence[str] = (), files: Sequence[str] = (),
+                 memory: bool = False):
+        self.directory = Path(directory)
+        self.stages = frozenset(stages)
+        self.files = tuple(files)
+        self.memory = memory
+        self._captures: Optional[Dict[str, _Capture]] = None
+        self._active = False
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {**self.__dict__, '_captures': None, '_active': False}
+
+    def wants_file(self, path: str) -> bool:
+        name = os.path.basename(path)
+        return not self.files or any(fnmatch.fnmatch(name, pattern) for pattern in self.files)
+
+    @contextmanager
+    def _profiled(self, name: str) -> Iterator[None]:
+        capture = self._captures.setdefault(name, _Capture())
+        self._active = True
+        if self.memory:
+            tracemalloc.reset_peak()
+        capture.profile.enable()
+        try:
+            yield
+        finally:
+            capture.profile.disable()
+            self._active = False
+            if self.memory:
+                capture.peak_bytes = max(capture.peak_bytes, tracemalloc.get_traced_memory()[1])
+                capture.snapshot = tracemalloc.take_snapshot()
+
+    @contextmanager
+    def file_scope(self, metrics: Any) -> Iterator[None]:
+        """Around one file's recording: profile it whole, or collect its stage profiles"""
+        if self._captures is not None or not self.wants_file(metrics.path):
+            yield
+            return
+        self._captures = {}
+        started_tracing = self.memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(16)
+        try:
+            if self.stages:
+                yield
+            else:
+                with self._profiled(WHOLE_FILE):
+                    yield
+        finally:
+            captures, self._captures = self._captures, None
+            if started_tracing:
+                tracemalloc.stop()
+            if captures:
+                metrics.profiles = self._write(metrics, captures)
+
+    @contextmanager
+    def stage_scope(self, metrics: Any, name: str) -> Iterator[None]:
+        if self._captures is None or self._active or name not in self.stages:
+            yield
+            return
+        with self._profiled(name):
+            yield
+
+    def _write(self, metrics: Any, captures: Dict[str, _Capture]) -> Dict[str, List[str]]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stem = re.sub(r'[^A-Za-z0-9_.-]+', '_', Path(metrics.path).stem)[:60]
+        out = Path(tempfile.mkdtemp(prefix=f'{metrics.kind}-{stem}-', dir=self.directory))
+        written: Dict[str, List[str]] = {}
+        for name, capture in captures.items():
+            stats = pstats.Stats(capture.profile)
+            paths = [out / f'{name}.pstats', out / f'{name}.collapsed']
+            stats.dump_stats(paths[0])
+            paths[1].write_text('\n'.join(collapsed_stacks(stats)) + '\n')
+            if capture.snapshot is not None:
+                paths.append(out / f'{name}.memory.txt')
+                top = capture.snapshot.statistics('lineno')[:TOP_ALLOCATIONS]
+                lines = [f'peak traced: {capture.peak_bytes / (1024 * 1024):.1f} MB',
+                         f'live at end of stage, top {len(top)} allocation sites:']
+                paths[2].write_text('\n'.join(lines + [str(stat) for stat in top]) + '\n')
+            written[name] = [str(p) for p in paths]
+        return written
+
+
+def profile_index(projects: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Profiles written during a run, by project (from RunReport.projects)"""
+    index = []
+    for project in projects:
+        for record in project['files']:
+            if record.get('profiles'):
+                index.append({'project_name': project['project_name'], 'kind': record['kind'],
+                              'path': record['path'], 'profiles': record['profiles']})
+    return index
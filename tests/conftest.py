@@ -0,0 +1,36 @@
+"""Shared fixtures: the repo root on sys.path and small generated documents"""
+
+import sys
+from pathlib import Path
+from typing import Any, Callable, List, Sequence
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from extractor.docwriters import PdfWriter, write_xlsx  # noqa: E402
+
+
+@pytest.fixture
+def make_pdf(tmp_path: Path) -> Callable[..., Path]:
+    """make_pdf(name, [page lines, ...]) -> a text PDF under tmp_path"""
+    def make(name: str, pages: Sequence[Sequence[str]]) -> Path:
+        writer = PdfWriter()
+        for lines in pages:
+            writer.text_page(lines)
+        path = tmp_path / name
+        writer.save(path)
+        return path
+    return make
+
+
+@pytest.fixture
+def make_xlsx(tmp_path: Path) -> Callable[..., Path]:
+    """make_xlsx(name, rows) -> a one-sheet workbook under tmp_path"""
+    def make(name: str, rows: List[List[Any]]) -> Path:
+        path = tmp_path / name
+        write_xlsx(path, rows)
+        return path
+    return make
@@ -0,0 +1,62 @@
+import asyncio
+import os
+
+from async_pdftotext import _read_capped, gather_projects, pdftotext
+
+
+def _fake_pdftotext(tmp_path, monkeypatch, body):
+    tool = tmp_path / 'bin' / 'pdftotext'
+    tool.parent.mkdir()
+    tool.write_text(f'#!/bin/sh\n{body}\n')
+    tool.chmod(0o755)
+    monkeypatch.setenv('PATH', f"{tool.parent}{os.pathsep}{os.environ['PATH']}")
+
+
+def test_read_capped_stops_at_max_chars_and_decodes_split_characters():
+    async def read():
+        stream = asyncio.StreamReader()
+        data = 'Café '.encode() * 1000
+        # Split inside the two-byte é
+        stream.feed_data(data[:4])
+        stream.feed_data(data[4:])
+        stream.feed_eof()
+        return await _read_capped(stream, 12)
+    assert asyncio.run(read()) == 'Café Café Ca'
+
+
+def test_pdftotext_kills_the_tool_once_it_has_enough_text(tmp_path, monkeypatch):
+    # Never exits by itself
+    _fake_pdftotext(tmp_path, monkeypatch, 'exec yes "INT. KITCHEN - DAY"')
+    text = asyncio.run(pdftotext(tmp_path / 'script.pdf', max_chars=1000, timeout=10))
+    assert len(text) == 1000
+    assert text.startswith('INT. KITCHEN - DAY\n')
+
+
+def test_pdftotext_reports_a_missing_tool_as_failure_text(tmp_path, monkeypatch):
+    monkeypatch.setenv('PATH', str(tmp_path))
+    text = asyncio.run(pdftotext(tmp_path / 'script.pdf'))
+    assert text.startswith('[PDF extraction failed')
+
+
+def test_gather_projects_bounds_concurrency_and_keeps_manifest_order():
+    running, peak = [0], [0]
+
+    async def process(project, semaphore):
+        async with semaphore:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            await asyncio.sleep(0.01 * project['delay'])
+            running[0] -= 1
+        if project['project_name'] == 'bad':
+            raise RuntimeError('no script')
+        return {'project_name': project['project_name']}
+
+    projects = [{'project_name': name, 'delay': delay}
+                for name, delay in [('a', 3), ('bad', 1), ('c', 2), ('d', 1), ('e', 1)]]
+    finished = []
+    results = asyncio.run(gather_projects(projects, process, concurrency=2,
+                                          on_result=lambda i, r: finished.append(i), order=[4, 3, 2, 1, 0]))
+    assert [r['project_name'] for r in results] == ['a', 'bad', 'c', 'd', 'e']
+    assert results[1]['error'] == 'no script'
+    assert peak[0] == 2
+    assert sorted(finished) == [0, 1, 2, 3, 4]
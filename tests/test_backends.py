@@ -0,0 +1,84 @@
+import json
+import os
+from datetime import datetime, time
+
+import xlrd
+
+import extract_training_data_final as driver
+import extract_with_pdftotext as pdftotext_driver
+from extractor.backends import (ROW_READERS, ROWS, TEXT, TIME_READERS, _xlrd_value, choose_backend,
+                                get_backend)
+from extractor.bench import BENCH_FILE, saved_throughput
+from script_features import extract_features_from_script
+
+
+def _fake_pdftotext(tmp_path, monkeypatch, body):
+    tool = tmp_path / 'bin' / 'pdftotext'
+    tool.parent.mkdir()
+    tool.write_text(f'#!/bin/sh\n{body}\n')
+    tool.chmod(0o755)
+    monkeypatch.setenv('PATH', f"{tool.parent}{os.pathsep}{os.environ['PATH']}")
+
+
+def test_measured_throughput_then_prefer_order_then_registration_order():
+    assert choose_backend('.xlsx', ROWS, prefer=('missing', 'pandas')).name == 'pandas'
+    assert choose_backend('.xlsx', ROWS, prefer=ROW_READERS).name == 'openpyxl'
+    measured = {'.xlsx': {'openpyxl': 2.0, 'xlsx-stream': 9.0}}
+    assert choose_backend('.XLSX', ROWS, throughput=measured).name == 'xlsx-stream'
+    assert choose_backend('.xlsx', ROWS, throughput=measured, prefer=ROW_READERS).name == 'xlsx-stream'
+    # Only the preferred backends are in the running, and unmeasured ones keep the order
+    assert choose_backend('.xlsx', ROWS, throughput=measured, prefer=TIME_READERS).name == 'openpyxl'
+    assert choose_backend('.xls', ROWS, throughput=measured, prefer=('pandas', 'xlrd')).name == 'pandas'
+    assert choose_backend('.docx', TEXT) is None
+
+
+def test_drivers_read_with_the_fastest_reader_in_a_saved_bench_report(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    saved_throughput.cache_clear()
+    try:
+        assert driver.reader_for(tmp_path / 'b.xlsx', ROWS, ROW_READERS).name == 'openpyxl'
+        saved_throughput.cache_clear()
+        (tmp_path / BENCH_FILE).write_text(json.dumps({'throughput': {'.xlsx': {'openpyxl': 1.0, 'pandas': 3.0}}}))
+        assert driver.reader_for(tmp_path / 'b.xlsx', ROWS, ROW_READERS).name == 'pandas'
+        assert pdftotext_driver.reader_for(tmp_path / 'b.xlsx', ROWS, ROW_READERS).name == 'pandas'
+    finally:
+        saved_throughput.cache_clear()
+
+
+def test_pdf_reading_falls_back_to_pdfplumber_without_pdftotext(tmp_path, monkeypatch, make_pdf):
+    monkeypatch.setenv('PATH', str(tmp_path))
+    pdf = make_pdf('s.pdf', [['INT. KITCHEN - DAY'], ['EXT. BEACH - NIGHT', 'Drone shot.']])
+    assert choose_backend('.pdf', TEXT, prefer=pdftotext_driver.PDF_READERS).name == 'pdfplumber'
+    assert list(get_backend('pdfplumber').read_pages(pdf, max_pages=1)) == ['INT. KITCHEN - DAY']
+    text = pdftotext_driver.extract_text_from_pdf(pdf)
+    assert 'EXT. BEACH - NIGHT' in text
+    assert driver.extract_text_from_pdf(pdf) == text
+
+
+def test_pdftotext_pages_split_on_form_feeds(tmp_path, monkeypatch):
+    _fake_pdftotext(tmp_path, monkeypatch, r"printf 'page one\fpage two\fpage three\f'")
+    backend = choose_backend('.pdf', TEXT, prefer=pdftotext_driver.PDF_READERS)
+    assert backend.name == 'pdftotext'
+    assert list(backend.read_pages(tmp_path / 'x.pdf', max_pages=2)) == ['page one', 'page two']
+
+
+def test_xlrd_cells_come_back_as_the_other_readers_give_them():
+    assert _xlrd_value(xlrd.sheet.Cell(xlrd.XL_CELL_BLANK, ''), 0) is None
+    assert _xlrd_value(xlrd.sheet.Cell(xlrd.XL_CELL_DATE, 0.375), 0) == time(9, 0)
+    assert _xlrd_value(xlrd.sheet.Cell(xlrd.XL_CELL_DATE, 45000.5), 0) == datetime(2023, 3, 15, 12, 0)
+    assert _xlrd_value(xlrd.sheet.Cell(xlrd.XL_CELL_NUMBER, 45000.0), 0) == 45000.0
+
+
+def test_both_drivers_read_a_budget_sheet_through_the_registry(make_xlsx):
+    budget = make_xlsx('Budget.xlsx', [['Crew', 42000], ['Kit', '£18,500'], ['GRAND TOTAL', 60500]])
+    final = driver.extract_budget(budget)
+    assert (final['total_gbp'], final['label'], final['source']) == (60500, 'grand total', '.xlsx_openpyxl')
+    legacy = pdftotext_driver.extract_budget(budget)
+    assert (legacy['total_gbp'], legacy['source']) == (60500, 'xlsx')
+
+
+def test_pdftotext_driver_scans_with_the_shared_shot_patterns():
+    features = extract_features_from_script('1. INT. KITCHEN - DAY\n2. EXT. BEACH - NIGHT\nA drone shot.')
+    assert pdftotext_driver.extract_features_from_script is extract_features_from_script
+    assert features['techniques'] == ['drone']
+    assert features['estimated_shots'] >= 2
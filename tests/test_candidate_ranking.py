@@ -0,0 +1,59 @@
+from datetime import date
+from pathlib import Path
+
+from candidate_ranking import filename_date, labelled_total, pick_best, revision_key
+
+
+def test_grand_total_beats_a_plain_total_and_subtotals_are_ignored():
+    rows = [
+        ['Crew', '£12,000'],
+        ['Subtotal', 99999],
+        ['Total', '£45,000'],
+        ['GRAND TOTAL', None, 52000.0],
+    ]
+    assert labelled_total(rows) == (52000.0, 'grand total')
+
+
+def test_no_total_row():
+    assert labelled_total([['Crew', 12000], ['Kit', 8000]]) is None
+
+
+def test_filename_dates_in_each_style():
+    assert filename_date('Budget 25.05.23') == date(2023, 5, 25)
+    assert filename_date('budget_2023-06-01') == date(2023, 6, 1)
+    assert filename_date('Schedule 19APR21 v2') == date(2021, 4, 19)
+    assert filename_date('Budget final') is None
+
+
+def test_revision_key_orders_dates_then_revision_numbers_then_copies():
+    keys = {name: revision_key(Path(name)) for name in
+            ['Budget R2.xlsx', 'Budget R3.xlsx', 'Copy of Budget R3.xlsx', 'Budget 01.01.24.xlsx']}
+    assert max(keys, key=keys.get) == 'Budget 01.01.24.xlsx'
+    assert keys['Budget R3.xlsx'] > keys['Copy of Budget R3.xlsx'] > keys['Budget R2.xlsx']
+
+
+def test_pick_best_prefers_a_found_labelled_spreadsheet_total():
+    candidates = [
+        (Path('budget.pdf'), {'total_gbp': 60000.0, 'method': 'label'}),
+        (Path('budget.xlsx'), {'total_gbp': 55000.0, 'method': 'label'}),
+        (Path('budget v9.xlsx'), {'total_gbp': 90000.0, 'method': 'max'}),
+        (Path('budget v10.xlsx'), {'total_gbp': None}),
+    ]
+    best = pick_best('budget', candidates)
+    assert best['total_gbp'] == 55000.0
+    assert best['file'] == 'budget.xlsx'
+    assert best['candidates'] == 4
+
+
+def test_a_single_candidate_is_returned_untagged():
+    assert pick_best('schedule', [(Path('s.pdf'), {'shoot_days': 2})]) == {'shoot_days': 2}
+    assert pick_best('schedule', []) == {}
+
+
+def test_years_and_reference_numbers_on_a_total_row_are_not_amounts():
+    assert labelled_total([['Total 2023'], ['PO 10452 total']]) is None
+    assert labelled_total([['Total 2023 £45,000']]) == (45000.0, 'total')
+    assert labelled_total([['Grand Total (2023) 52,500.00']]) == (52500.0, 'grand total')
+    assert labelled_total([['Total budget', '£61000']]) == (61000.0, 'total budget')
+    # Numeric cells are amounts whatever their shape
+    assert labelled_total([['Total', 48000]]) == (48000.0, 'total')
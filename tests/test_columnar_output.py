@@ -0,0 +1,44 @@
+import pytest
+
+from columnar_output import FIELDS, columns, write_columnar
+
+RESULTS = [
+    {'project_name': 'Spot', 'client': 'Acme', 'complete': 1,
+     'script_features': {'techniques': ['drone', 'moco'], 'estimated_shots': 12.0, 'has_children': 0},
+     'budget_data': {'total_gbp': 120000, 'method': 'label'},
+     'schedule_data': {'shoot_days': 3},
+     'script_revision': {'family': 'f1', 'superseded_by': None}},
+    {'project_name': 'Broken', 'error': 'budget: bad sheet', 'script_features': None, 'budget_data': {}},
+]
+
+
+def test_columns_are_flat_and_coerced_with_nulls_kept():
+    cols = columns(RESULTS)
+    assert list(cols) == [name for name, _, _ in FIELDS]
+    assert all(len(values) == 2 for values in cols.values())
+    assert cols['techniques'] == [['drone', 'moco'], []]
+    assert cols['estimated_shots'] == [12, None] and isinstance(cols['estimated_shots'][0], int)
+    assert cols['total_gbp'] == [120000.0, None] and isinstance(cols['total_gbp'][0], float)
+    assert cols['complete'] == [True, None]
+    assert cols['has_children'] == [False, None]
+    assert cols['budget_per_day'] == [40000.0, None]
+    assert cols['revision_family'] == ['f1', None]
+    assert cols['error'] == [None, 'budget: bad sheet']
+
+
+def test_unknown_suffix_is_refused_before_pyarrow_is_needed(tmp_path):
+    with pytest.raises(ValueError, match='expected one of'):
+        write_columnar(tmp_path / 'out.csv', RESULTS)
+
+
+@pytest.mark.parametrize('name', ['out.parquet', 'out.arrow'])
+def test_tables_round_trip(tmp_path, name):
+    pa = pytest.importorskip('pyarrow')
+    assert write_columnar(tmp_path / name, RESULTS) == 2
+    if name.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        table = pq.read_table(tmp_path / name)
+    else:
+        table = pa.ipc.open_file(pa.memory_map(str(tmp_path / name))).read_all()
+    assert table.column('techniques').to_pylist() == [['drone', 'moco'], []]
+    assert table.schema.field('shoot_days').type == pa.int32()
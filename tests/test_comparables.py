@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from comparables import ComparablesIndex, budget_range, columns, update_index, vector
+
+
+def _result(name, techniques=('drone',), total=100000.0, days=2, client='Acme', **extra):
+    return {'project_name': name, 'client': client, **extra,
+            'script_features': {'techniques': list(techniques), 'estimated_shots': 20},
+            'budget_data': {'total_gbp': total}, 'schedule_data': {'shoot_days': days}}
+
+
+def test_vectors_are_unit_length_and_featureless_ones_zero():
+    v = vector({'techniques': ['drone'], 'has_children': True, 'estimated_shots': 30}, 'UK')
+    assert v.shape == (len(columns()),)
+    assert np.linalg.norm(v) == pytest.approx(1.0)
+    assert not vector({}).any()
+
+
+def test_updates_append_rewrite_in_place_and_drop(tmp_path):
+    first = update_index(tmp_path, [_result('A'), _result('B', techniques=['vfx']), _result('C')], tmp_path)
+    assert first == {'rows': 3, 'added': 3, 'changed': 0, 'dropped': 0}
+    assert update_index(tmp_path, [_result('A')], tmp_path)['changed'] == 0
+
+    # A new budget changes the row; D is appended after it
+    second = update_index(tmp_path, [_result('A', total=300000.0), _result('D')], tmp_path)
+    assert second == {'rows': 4, 'added': 1, 'changed': 1, 'dropped': 0}
+    index = ComparablesIndex(tmp_path)
+    assert [r['project_name'] for r in index.rows] == ['A', 'B', 'C', 'D']
+    assert index.rows[0]['total_gbp'] == 300000.0
+
+    # A failed re-extraction drops the project and rewrites the matrix
+    third = update_index(tmp_path, [_result('B', error='bad pdf')], tmp_path)
+    assert third == {'rows': 3, 'added': 0, 'changed': 0, 'dropped': 1}
+    index = ComparablesIndex(tmp_path)
+    assert [r['project_name'] for r in index.rows] == ['A', 'C', 'D']
+    assert (tmp_path / 'vectors.f32').stat().st_size == 3 * len(columns()) * 4
+
+
+def test_the_same_project_twice_in_one_batch_keeps_the_last(tmp_path):
+    report = update_index(tmp_path, [_result('A', total=1.0), _result('A', total=2.0), _result('B')], tmp_path)
+    assert report == {'rows': 2, 'added': 2, 'changed': 0, 'dropped': 0}
+    update_index(tmp_path, [_result('C'), _result('C', techniques=['vfx'], total=5.0),
+                            _result('A', total=3.0), _result('A', total=4.0)], tmp_path)
+    index = ComparablesIndex(tmp_path)
+    assert [(r['project_name'], r['total_gbp']) for r in index.rows] == [('A', 4.0), ('B', 100000.0), ('C', 5.0)]
+    assert index.matrix[2].tolist() == vector({'techniques': ['vfx'], 'estimated_shots': 20}).tolist()
+
+
+def test_queries_rank_by_similarity_and_leave_the_project_out(tmp_path):
+    update_index(tmp_path, [_result('Drone', total=200000.0), _result('Drone 2', total=300000.0, days=3),
+                            _result('Underwater', techniques=['underwater'])], tmp_path)
+    index = ComparablesIndex(tmp_path)
+    matches = index.like('drone', k=2)
+    assert [m['project_name'] for m in matches] == ['Drone 2', 'Underwater']
+    assert matches[0]['similarity'] == pytest.approx(1.0)
+    assert matches[0]['budget_per_day'] == 100000
+    assert 'digest' not in matches[0]
+    with pytest.raises(KeyError):
+        index.like('Nope')
+    assert budget_range(index.for_features({'techniques': ['drone']}, k=3)) == {
+        'min': 50000, 'median': 100000, 'max': 100000, 'samples': 3}
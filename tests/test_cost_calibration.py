@@ -0,0 +1,106 @@
+import ast
+import re
+import shutil
+
+import pytest
+
+import cost_calibration
+from conftest import ROOT
+from cost_calibration import DRIVERS, calibrate, gather, render
+from script_features import TECHNIQUE_KEYWORDS
+from ts_codegen import BEGIN_MARKER, END_MARKER
+
+TECHNIQUES = ['drone', 'vfx', 'car_rig']
+
+
+def _result(name, per_day, days, techniques=0, locations=1, children=False, **extra):
+    features = {'techniques': TECHNIQUES[:techniques], 'locations': [f'loc {i}' for i in range(locations)],
+                'has_children': children}
+    return {'project_name': name, **extra, 'script_features': features,
+            'budget_data': {'total_gbp': per_day * days}, 'schedule_data': {'shoot_days': days}}
+
+
+# £/day = 100k + 20k a technique + 30k with children + 5k a location, exactly
+RESULTS = [
+    _result(f'P{i}', 100000 + 20000 * t + 30000 * c + 5000 * loc, days, techniques=t, locations=loc, children=c)
+    for i, (t, c, loc, days) in enumerate([
+        (0, False, 1, 1), (0, False, 2, 2), (0, False, 3, 3),
+        (1, False, 1, 2), (1, True, 2, 1), (2, False, 2, 3),
+        (1, False, 3, 1), (2, True, 1, 2), (0, True, 1, 2),
+    ])
+] + [
+    _result('P0 R1', 999999, 1, script_revision={'superseded_by': 'P0'}),
+    _result('Broken', 999999, 1, error='bad sheet'),
+    {'project_name': 'No budget', 'schedule_data': {'shoot_days': 2}},
+]
+
+
+def test_superseded_failed_and_unbudgeted_projects_are_not_counted():
+    gathered = gather(RESULTS)
+    assert gathered['per_day'].size == 9
+    assert gathered['X'].shape == (9, len(DRIVERS))
+    assert gathered['per_day'][0] == 105000
+    assert sorted(set(gathered['tiers'])) == ['complex', 'simple', 'standard']
+
+
+def test_tiers_count_only_the_drivers_the_app_has():
+    # Animal and vehicle talent don't move a project's tier: the estimator has no input for them
+    talent = _result('Farm', 100000, 1, techniques=2)
+    talent['script_features'].update(has_animals=True, has_vehicles=True)
+    assert gather([talent, _result('Kids', 100000, 1, techniques=2, children=True)])['tiers'].tolist() == [
+        'standard', 'complex']
+
+
+def test_the_app_detects_the_techniques_the_calibration_counts():
+    parser = (ROOT / 'src' / 'lib' / 'parser' / 'scriptParser.ts').read_text()
+    block = parser.split('const TECHNIQUE_KEYWORDS: Record<string, string[]> = {')[1].split('};')[0]
+    keywords = {name: ast.literal_eval(values)
+                for name, values in re.findall(r'^\s*(\w+): (\[.*\]),$', block, re.MULTILINE)}
+    assert keywords == TECHNIQUE_KEYWORDS
+
+
+def test_bands_are_tier_percentiles_and_drivers_recover_the_fit():
+    report = calibrate(gather(RESULTS), resamples=200)
+    assert report['projects'] == 9
+    # Three 'simple', five 'standard' and one 'complex' - too few for a band
+    assert set(report['bands']) == {'simple', 'standard'}
+    assert report['too_few'] == {'complex': 1}
+    simple = report['bands']['simple']
+    assert (simple['samples'], simple['standard']) == (3, 110000)
+    assert simple['interval']['lean'][0] <= simple['lean'] <= simple['interval']['lean'][1]
+    drivers = report['drivers']
+    assert report['unobserved'] == ['animals', 'vehicles']
+    assert drivers['techniques']['leastSquares'] == pytest.approx(20000, abs=1)
+    assert drivers['children']['median'] == pytest.approx(30000, abs=100)
+    assert drivers['shootDays']['leastSquares'] == pytest.approx(0, abs=1)
+
+
+def test_a_tier_with_too_few_projects_gets_no_band():
+    report = calibrate(gather(RESULTS[:4]), resamples=50)
+    assert set(report['bands']) == {'simple'}
+    assert report['too_few'] == {'standard': 1}
+    assert report['drivers'] == {}
+
+
+def test_render_rounds_bands_to_the_thousand_and_drivers_to_the_hundred():
+    report = calibrate(gather(RESULTS), resamples=50)
+    block = render(report)
+    assert block.startswith('// 9 projects with a budget and shoot days; 90% bootstrap intervals (50 resamples)\n')
+    assert '  simple: { lean: ' in block
+    assert '  techniques: { leastSquares: 20000, median: 20000,' in block
+
+
+def test_generate_rewrites_only_the_block_of_the_real_file(tmp_path):
+    shutil.copy(ROOT / 'src' / 'lib' / 'cost' / cost_calibration.TS_FILE, tmp_path)
+    path = tmp_path / cost_calibration.TS_FILE
+    before = path.read_text()
+    assert cost_calibration.generate([], tmp_path)['written'] == []
+    assert cost_calibration.generate(RESULTS, tmp_path, check=True, resamples=50)['stale'] == [str(path)]
+    assert path.read_text() == before
+    assert cost_calibration.generate(RESULTS, tmp_path, resamples=50)['written'] == [str(path)]
+    after = path.read_text()
+    assert 'export const CALIBRATED_COST_BANDS: Record<string, CalibratedCostBand> = {\n  simple: ' in after
+    for text in (before, after):
+        assert text.split(BEGIN_MARKER)[0] == before.split(BEGIN_MARKER)[0]
+        assert text.split(END_MARKER)[1] == before.split(END_MARKER)[1]
+    assert cost_calibration.generate(RESULTS, tmp_path, check=True, resamples=50)['stale'] == []
@@ -0,0 +1,73 @@
+from dataclasses import replace
+
+import pytest
+
+import extract_training_data_final as driver
+from extraction_cost import (CostModel, EtaTracker, FileProfile, count_pdf_pages, fit_coefficients,
+                             format_duration, longest_first, project_costs)
+from extractor.synthetic import SIZES, generate_corpus
+
+
+def test_fit_recovers_a_linear_cost():
+    samples = [(mb, pages, 0.5 + 2.0 * mb + 0.1 * pages) for mb, pages in
+               [(1, 2), (2, 5), (3, 1), (4, 8), (0.5, 3)]]
+    a, b, c = fit_coefficients(samples)
+    assert a == pytest.approx(0.5, abs=1e-3)
+    assert b == pytest.approx(2.0, abs=1e-3)
+    assert c == pytest.approx(0.1, abs=1e-3)
+
+
+def test_fit_needs_three_samples():
+    assert fit_coefficients([(1, 1, 1.0), (2, 2, 2.0)]) is None
+
+
+def test_model_learns_from_records_and_round_trips(tmp_path):
+    model = CostModel()
+    for mb in (1, 2, 3, 4):
+        model.record(FileProfile(f'/x/{mb}.xlsx', 'xlsx', mb * 1024 * 1024), 'budget', 1.0 + mb)
+    model.save(tmp_path)
+    loaded = CostModel.load(tmp_path)
+    assert loaded.samples['xlsx'] == 4
+    assert loaded.predict(FileProfile('/y.xlsx', 'xlsx', 10 * 1024 * 1024)) == pytest.approx(11.0, abs=0.01)
+    # Unknown formats and an empty directory fall back to the priors
+    assert CostModel.load(tmp_path / 'missing').samples == {}
+
+
+def test_longest_first_keeps_manifest_order_on_ties():
+    assert longest_first([1.0, 5.0, 1.0, 3.0]) == [1, 3, 0, 2]
+
+
+def test_project_costs_charge_duplicate_content_once(tmp_path):
+    one, two = tmp_path / 'a.pdf', tmp_path / 'b.pdf'
+    for path in (one, two):
+        path.write_bytes(b'%PDF-1.4 /Type /Page /Type /Pages')
+    model = CostModel()
+    costs, profiles = project_costs(model, [[('script', one)], [('script', two)]],
+                                    dedupe_key=lambda path: 'same')
+    assert profiles[str(one)].pages == 1
+    assert costs[0] > 0 and costs[1] == 0
+
+
+def test_count_pdf_pages_ignores_the_pages_tree(tmp_path):
+    path = tmp_path / 'x.pdf'
+    path.write_bytes(b'/Type /Pages /Type /Page /Type/Page')
+    assert count_pdf_pages(path) == 2
+
+
+def test_eta_rescales_by_observed_speed():
+    eta = EtaTracker(100.0, workers=4)
+    assert eta.eta() == 25.0
+    eta.advance(50.0)
+    eta.started -= 10.0
+    assert eta.eta() == pytest.approx(10.0, rel=0.05)
+    assert format_duration(3725) == '1h02m'
+    assert format_duration(65) == '1m05s'
+
+
+def test_a_sequential_run_records_its_timings(tmp_path):
+    manifest = generate_corpus(tmp_path / 'corpus', replace(SIZES['small'], projects=2), seed=1)
+    out = tmp_path / 'out'
+    driver.main(['--manifest', str(manifest), '--output-dir', str(out), '--workers', '1', '--no-store'])
+    model = CostModel.load(out)
+    assert sum(model.samples.values()) >= 4
+    assert {r['kind'] for r in model.records} >= {'script', 'budget'}
@@ -0,0 +1,92 @@
+from pathlib import Path
+
+from extraction_pipeline import run_pipeline, sniff_format
+
+
+def _plan(project):
+    return [(kind, Path(path)) for kind, path in project['files']]
+
+
+def _stage(path):
+    return path
+
+
+def _parse(kind, path):
+    text = path.read_text()
+    if text == 'boom':
+        raise ValueError('bad file')
+    return {'kind': kind, 'text': text}
+
+
+def _assemble(project, outcomes):
+    return {'name': project['name'],
+            'files': [(o.job.path.name, o.data and o.data['text'], o.error, o.duplicate_of) for o in outcomes]}
+
+
+def _files(tmp_path, contents):
+    paths = {}
+    for name, text in contents.items():
+        paths[name] = tmp_path / name
+        paths[name].write_text(text)
+    return paths
+
+
+def test_results_come_back_in_manifest_order_whatever_the_feed_order(tmp_path):
+    paths = _files(tmp_path, {'a.txt': 'a', 'b.txt': 'b', 'c.txt': 'c'})
+    projects = [{'name': name, 'files': [('script', paths[f'{name}.txt'])]} for name in 'abc']
+    results = list(run_pipeline(projects, _plan, _stage, _parse, _assemble,
+                                io_workers=2, cpu_workers=2, order=[2, 0, 1]))
+    assert [index for index, _ in results] == [0, 1, 2]
+    assert [r['files'][0][1] for _, r in results] == ['a', 'b', 'c']
+
+
+def test_a_failing_parser_becomes_an_error_outcome(tmp_path):
+    paths = _files(tmp_path, {'ok.txt': 'fine', 'bad.txt': 'boom'})
+    projects = [{'name': 'p', 'files': [('script', paths['ok.txt']), ('budget', paths['bad.txt'])]}]
+    (_, result), = run_pipeline(projects, _plan, _stage, _parse, _assemble, cpu_workers=1)
+    assert result['files'][0][1:3] == ('fine', None)
+    assert result['files'][1][1] is None
+    assert 'bad file' in result['files'][1][2]
+
+
+def test_duplicate_content_is_parsed_once_and_fanned_out(tmp_path):
+    paths = _files(tmp_path, {'one.txt': 'same', 'two.txt': 'same'})
+    projects = [{'name': 'p1', 'files': [('budget', paths['one.txt'])]},
+                {'name': 'p2', 'files': [('budget', paths['two.txt'])]}]
+    parsed = []
+    results = dict(run_pipeline(projects, _plan, _stage, _parse, _assemble, cpu_workers=1,
+                                on_file=parsed.append, dedupe_key=lambda path: path.read_text()))
+    assert len(parsed) == 1
+    assert results[1]['files'][0][1] == 'same'
+    assert results[1]['files'][0][3] == paths['one.txt']
+
+
+def test_sniff_format(tmp_path):
+    for name, head, expected in [('a.pdf', b'%PDF-1.4', 'pdf'), ('b.xlsx', b'PK\x03\x04xx', 'xlsx'),
+                                 ('c.bin', b'hello', 'unknown'), ('d.pdf', b'', 'empty')]:
+        (tmp_path / name).write_bytes(head)
+        assert sniff_format(tmp_path / name) == expected
+
+
+def _most_held(tmp_path, reorder_window):
+    paths = _files(tmp_path, {f'{i}.txt': str(i) for i in range(16)})
+    projects = [{'name': str(i), 'files': [('script', paths[f'{i}.txt'])]} for i in range(16)]
+    finished, emitted, most = set(), set(), 0
+
+    def on_file(outcome):
+        nonlocal most
+        finished.add(outcome.job.project_index)
+        most = max(most, len(finished - emitted))
+
+    for index, _ in run_pipeline(projects, _plan, _stage, _parse, _assemble, io_workers=1, cpu_workers=1,
+                                 max_pending=1, order=list(range(16))[::-1], on_file=on_file,
+                                 reorder_window=reorder_window):
+        emitted.add(index)
+    assert emitted == set(range(16))
+    return most
+
+
+def test_longest_first_holds_back_a_bounded_number_of_projects(tmp_path):
+    assert _most_held(tmp_path, reorder_window=100) == 16
+    # The window, plus the few files already in flight between the stages
+    assert _most_held(tmp_path, reorder_window=2) <= 2 + 6
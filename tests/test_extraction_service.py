@@ -0,0 +1,73 @@
+import threading
+
+import pytest
+
+from extraction_service import ExtractionService, ServiceClient, make_server
+from extractor.load import _percentile, run_load
+
+SCRIPT = [['SCENE 1. INT. KITCHEN - DAY', 'A child pours cereal.'],
+          ['SCENE 2. EXT. BEACH - NIGHT', 'Drone shot over the waves.']]
+
+
+@pytest.fixture(scope='module')
+def service(tmp_path_factory):
+    root = tmp_path_factory.mktemp('service')
+    service = ExtractionService(workers=2, page_cache=root / 'pages')
+    server = make_server(service, str(root / 's.sock'))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    service.warm_up()
+    yield service, str(root / 's.sock')
+    server.shutdown()
+    server.server_close()
+    service.close()
+
+
+@pytest.fixture
+def script(make_pdf):
+    return make_pdf('script.pdf', SCRIPT)
+
+
+def test_warm_up_starts_every_worker(service):
+    assert len(service[0].health()['worker_pids']) == 2
+
+
+def test_an_upload_comes_back_with_features_and_scenes(service, script):
+    client = ServiceClient(service[1])
+    try:
+        status, body = client.extract(script.read_bytes())
+        assert status == 200
+        assert 'drone' in body['script_features']['techniques']
+        assert len(body['scenes']) == 2
+        assert body['worker'] in service[0].health()['worker_pids']
+        # The same script again: its pages come from the page cache
+        status, body = client.extract(script.read_bytes())
+        assert (status, body['pages']) == (200, {'pages_parsed': 0, 'pages_reused': 2})
+    finally:
+        client.close()
+
+
+def test_bad_uploads_get_an_error_status(service):
+    client = ServiceClient(service[1])
+    try:
+        assert client.extract(b'plain text')[0] == 415
+        status, body = client.extract(b'%PDF-garbage')
+        assert status == 422
+        assert body['error'].startswith('PDF extraction failed')
+        assert client._request('GET', '/nope')[0] == 404
+    finally:
+        client.close()
+
+
+def test_load_reports_latency_over_concurrent_clients(service, script):
+    seen = []
+    report = run_load(service[1], [script], concurrency=3, requests=6,
+                      on_result=lambda path, latency, error: seen.append(error))
+    assert (report['requests'], report['errors'], report['mode']) == (6, 0, 'service')
+    assert seen == [None] * 6
+    assert report['first_ms'] > 0 and report['p50_ms'] <= report['p99_ms'] <= report['max_ms']
+
+
+def test_percentiles_are_in_milliseconds():
+    assert _percentile([], 0.5) == 0.0
+    assert _percentile([0.003, 0.001, 0.002], 0.5) == 2.0
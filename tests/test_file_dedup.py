@@ -0,0 +1,98 @@
+import asyncio
+from pathlib import Path
+
+import extract_training_data_final as driver
+import extract_with_pdftotext as pdftotext_driver
+from file_dedup import DedupIndex
+
+
+def _write(path: Path, data: bytes) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+def test_only_size_collisions_are_hashed(tmp_path):
+    a = _write(tmp_path / 'a.xlsx', b'budget one')
+    copy = _write(tmp_path / 'Copy of a.xlsx', b'budget one')
+    same_size = _write(tmp_path / 'b.xlsx', b'budget two')
+    unique = _write(tmp_path / 'c.xlsx', b'a longer budget')
+    index = DedupIndex([a, copy, same_size, unique])
+    assert index.key(a) == index.key(copy) != index.key(same_size)
+    assert index.key(unique) == f'path:{unique}'
+    assert index.duplicates() == [sorted([str(a), str(copy)])]
+
+
+def test_report_and_repeated_reads(tmp_path):
+    a = _write(tmp_path / 'a.xlsx', b'budget one')
+    copy = _write(tmp_path / 'Copy of a.xlsx', b'budget one')
+    index = DedupIndex([a, copy])
+    planned = [('budget', a), ('budget', copy), ('schedule', a)]
+    report = index.report(planned)
+    assert (report.references, report.unique, report.skipped_bytes) == (3, 2, len(b'budget one'))
+    assert index.repeated(planned) == {('budget', index.key(a))}
+
+
+def test_sequential_driver_reads_shared_content_once(tmp_path, monkeypatch):
+    first = _write(tmp_path / '1' / 'Budget.xlsx', b'same bytes')
+    copy = _write(tmp_path / '2' / 'Copy of Budget.xlsx', b'same bytes')
+    projects = [{'project_name': name, 'files': {'budget': {'path': str(path)}}}
+                for name, path in [('One', first), ('Two', copy)]]
+    reads = []
+
+    def fake_budget(path, staged=False):
+        reads.append(path)
+        return {'total_gbp': 50000.0, 'method': 'label'}
+    monkeypatch.setattr(driver, 'extract_budget', fake_budget)
+
+    dedup = DedupIndex([first, copy])
+    extracted = dict.fromkeys(dedup.repeated(f for p in projects for f in driver.plan_project_files(p)))
+    results = [driver.process_project(p, tmp_path, dedup=dedup, extracted=extracted) for p in projects]
+    assert reads == [first]
+    assert results[1]['budget_data'] == {'total_gbp': 50000.0, 'method': 'label'}
+    assert results[1]['_metrics'][0]['duplicate_of'] == str(first)
+    # Copies are independent of the first read
+    results[1]['budget_data']['total_gbp'] = 1.0
+    assert results[0]['budget_data']['total_gbp'] == 50000.0
+
+
+def test_async_driver_shares_one_read_but_not_its_result(tmp_path, monkeypatch):
+    first = _write(tmp_path / '1' / 'Budget.xlsx', b'same bytes')
+    copy = _write(tmp_path / '2' / 'Copy of Budget.xlsx', b'same bytes')
+    projects = [{'project_name': name, 'files': {'budget': {'path': str(path)}}}
+                for name, path in [('One', first), ('Two', copy)]]
+    reads = []
+
+    async def fake_budget(path):
+        reads.append(path)
+        return {'total_gbp': 50000.0, 'method': 'label'}
+    monkeypatch.setitem(pdftotext_driver.ASYNC_READERS, 'budget', ('budget_data', fake_budget))
+
+    async def run():
+        semaphore, dedup, shared = asyncio.Semaphore(2), DedupIndex([first, copy]), {}
+        return await asyncio.gather(*(pdftotext_driver.process_project_async(
+            p, semaphore, dedup=dedup, shared_reads=shared) for p in projects))
+    results = asyncio.run(run())
+    assert len(reads) == 1
+    results[1]['budget_data']['total_gbp'] = 1.0
+    assert results[0]['budget_data']['total_gbp'] == 50000.0
+
+
+def test_sequential_pdftotext_driver_reads_shared_content_once(tmp_path, monkeypatch):
+    first = _write(tmp_path / '1' / 'Budget.xlsx', b'same bytes')
+    copy = _write(tmp_path / '2' / 'Copy of Budget.xlsx', b'same bytes')
+    projects = [{'project_name': name, 'files': {'budget': {'path': str(path)}}}
+                for name, path in [('One', first), ('Two', copy)]]
+    reads = []
+
+    def fake_budget(path):
+        reads.append(path)
+        return {'total_gbp': 50000.0, 'method': 'label'}
+    monkeypatch.setattr(pdftotext_driver, 'extract_budget', fake_budget)
+
+    dedup = DedupIndex([first, copy])
+    extracted = dict.fromkeys(dedup.repeated([('budget', first), ('budget', copy)]))
+    results = [pdftotext_driver.process_project(p, dedup, extracted) for p in projects]
+    assert reads == [first]
+    results[1]['budget_data']['total_gbp'] = 1.0
+    assert results[0]['budget_data']['total_gbp'] == 50000.0
@@ -0,0 +1,53 @@
+import json
+import math
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import json_output
+from json_output import dumps, read_json, write_json, write_results
+from lazy_modules import lazy_import
+
+RESULTS = [
+    {'project_name': 'Café Crème', 'budget_data': {'total_gbp': 1e20, 'per_day': 0.1 + 0.2},
+     'techniques': ['drone'], 'empty': {}, 'none': None},
+    {'project_name': 'Two', 'shots': np.int64(12), 'days': np.float64(2.5), 'path': Path('/x/a.pdf'),
+     'tags': {'b', 'a'}},
+]
+
+
+def test_pretty_is_byte_identical_to_the_old_json_dump():
+    plain = RESULTS[:1]
+    assert dumps(plain, 'pretty') == json.dumps(plain, indent=2).encode()
+    assert b'Caf\\u00e9' in dumps(plain, 'pretty') and b'1e+20' in dumps(plain, 'pretty')
+
+
+@pytest.mark.parametrize('has_orjson', [True, False])
+def test_compact_formats_parse_the_same_with_either_encoder(tmp_path, monkeypatch, has_orjson):
+    if has_orjson:
+        pytest.importorskip('orjson')
+    else:
+        monkeypatch.setattr(json_output, 'orjson', lazy_import('not_installed_orjson'))
+    assert json_output.orjson.available is has_orjson
+    compact = dumps(RESULTS)
+    assert b'\n' not in compact and 'Café'.encode() in compact
+    expected = json.loads(dumps(RESULTS, 'pretty'))
+    assert json.loads(compact) == expected
+    assert expected[1] == {'project_name': 'Two', 'shots': 12, 'days': 2.5, 'path': '/x/a.pdf',
+                           'tags': ['a', 'b']}
+    paths = write_results(tmp_path, 'out', RESULTS, ['compact', 'ndjson'])
+    assert [p.name for p in paths] == ['out.json', 'out.ndjson']
+    assert read_json(paths[0]) == read_json(paths[1]) == expected
+    assert len(paths[1].read_bytes().splitlines()) == 2
+
+
+def test_writes_are_atomic_and_formats_checked(tmp_path):
+    path = write_json(tmp_path / 'sub' / 'r.json', {'a': 1})
+    with pytest.raises(ValueError, match='unknown JSON format'):
+        write_json(path, {'a': 2}, 'yaml')
+    with pytest.raises(TypeError):
+        write_json(path, {'a': object()})
+    assert read_json(path) == {'a': 1}
+    assert [p.name for p in path.parent.iterdir()] == ['r.json']
+    assert math.isclose(read_json(write_json(path, [0.1 + 0.2], 'compact'))[0], 0.3)
@@ -0,0 +1,24 @@
+import subprocess
+import sys
+
+from conftest import ROOT
+from lazy_modules import lazy_import, missing_modules
+
+
+def test_the_import_happens_on_first_use():
+    module = lazy_import('json')
+    assert not module.loaded and module.available
+    assert module.dumps([1]) == '[1]'
+    assert module.loaded
+
+
+def test_missing_modules_are_reported_without_importing():
+    assert missing_modules(['json', 'no_such_module_here']) == ['no_such_module_here']
+    assert not lazy_import('no_such_module_here').available
+
+
+def test_importing_the_drivers_loads_no_parsing_library():
+    probe = ('import sys, extract_training_data_final, extract_with_pdftotext, extractor; '
+             "print([m for m in ('pandas', 'pdfplumber', 'openpyxl', 'xlrd', 'numpy') if m in sys.modules])")
+    out = subprocess.run([sys.executable, '-c', probe], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == '[]'
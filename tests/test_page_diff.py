@@ -0,0 +1,45 @@
+import extract_training_data_final as driver
+from page_diff import PageCache, extract_pages_incremental, merge_scans
+
+PAGE_1 = ['SCENE 1. INT. KITCHEN - DAY', 'A child pours cereal.']
+PAGE_2 = ['SCENE 2. EXT. BEACH - DUSK', 'Drone shot over the waves.']
+PAGE_2_REVISED = ['SCENE 2. EXT. BEACH - NIGHT', 'A dog runs along the shore.']
+
+
+def test_merge_scans_unions_lists_and_ors_flags():
+    merged = merge_scans([{'techniques': ['drone'], 'has_children': False},
+                          {'techniques': ['vfx', 'drone'], 'has_children': True}])
+    assert merged == {'techniques': ['drone', 'vfx'], 'has_children': True}
+
+
+def test_a_revision_only_parses_its_changed_pages(tmp_path, make_pdf):
+    cache = PageCache(tmp_path / 'cache', driver.SCRIPT_SCAN_VERSION)
+    r1 = make_pdf('r1.pdf', [PAGE_1, PAGE_2])
+    r2 = make_pdf('r2.pdf', [PAGE_1, PAGE_2_REVISED])
+
+    _, _, first = extract_pages_incremental(r1, driver.scan_script_text, cache)
+    text, scan, second = extract_pages_incremental(r2, driver.scan_script_text, cache)
+    assert (first.parsed, first.reused) == (2, 0)
+    assert (second.parsed, second.reused) == (1, 1)
+
+    # Same text and features as reading the revision from scratch
+    assert text == driver.extract_text_from_pdf(r2, max_pages=20)
+    assert (driver.script_features_from_scan(scan, len(text)) ==
+            driver.extract_features_from_script(text))
+
+
+def test_a_new_scanner_version_does_not_reuse_old_scans(tmp_path, make_pdf):
+    r1 = make_pdf('r1.pdf', [PAGE_1])
+    extract_pages_incremental(r1, driver.scan_script_text, PageCache(tmp_path, 'scan-1'))
+    _, _, stats = extract_pages_incremental(r1, driver.scan_script_text, PageCache(tmp_path, 'scan-2'))
+    assert stats.parsed == 1
+
+
+def test_text_is_cut_at_max_chars_and_rescanned(tmp_path, make_pdf):
+    pdf = make_pdf('long.pdf', [PAGE_1, PAGE_2])
+    text, scan, _ = extract_pages_incremental(pdf, driver.scan_script_text, None, max_chars=30)
+    assert len(text) == 30
+    # Page 1 alone is over the limit, so page 2 (the drone) is never read,
+    # and the child is on the part of page 1 that was cut off
+    assert 'drone' not in scan['techniques']
+    assert scan['has_children'] is False
@@ -0,0 +1,55 @@
+from prom_textfile import TextfileExporter, _escape, _sample, render
+from run_metrics import FileMetrics, RunReport
+
+
+def _report():
+    report = RunReport()
+    report.add_project(0, {'project_name': 'One', '_metrics': [
+        FileMetrics('script', 'a.pdf', {'text_extract': 0.3}, {'pages_parsed': 4}).as_dict(),
+        FileMetrics('budget', 'b.xlsx', {'budget_scan': 0.002}, error='bad sheet').as_dict(),
+    ]})
+    report.add_project(1, {'project_name': 'Two', '_metrics': [
+        FileMetrics('budget', 'c.xlsx', duplicate_of='b.xlsx').as_dict(),
+    ]})
+    return report
+
+
+def _samples(text):
+    return dict(line.rsplit(' ', 1) for line in text.splitlines() if not line.startswith('#'))
+
+
+def test_samples_and_label_escaping():
+    assert _sample('x_total', 3.0) == 'x_total 3'
+    assert _sample('x', 0.25, [('path', 'a"b\\c\nd')]) == 'x{path="a\\"b\\\\c\\nd"} 0.25'
+    assert _escape('plain') == 'plain'
+
+
+def test_render_counts_outcomes_and_histograms_per_stage():
+    samples = _samples(render(_report(), page_totals={'pages_parsed': 3, 'pages_reused': 1}))
+    assert samples['extractor_files_total{kind="budget",outcome="duplicate"}'] == '1'
+    assert samples['extractor_files_total{kind="budget",outcome="error"}'] == '1'
+    assert samples['extractor_files_total{kind="script",outcome="ok"}'] == '1'
+    assert samples['extractor_pages_parsed_total'] == '4'
+    assert samples['extractor_stage_duration_seconds_bucket{stage="text_extract",le="0.25"}'] == '0'
+    assert samples['extractor_stage_duration_seconds_bucket{stage="text_extract",le="0.5"}'] == '1'
+    assert samples['extractor_stage_duration_seconds_count{stage="budget_scan"}'] == '1'
+    assert samples['extractor_page_cache_hit_ratio'] == '0.25'
+    assert samples['extractor_dedup_hit_ratio'] == '0.3333'
+    assert samples['extractor_run_in_progress'] == '1'
+    assert 'extractor_run_last_success_timestamp_seconds' not in samples
+
+
+def test_exporter_throttles_ticks_and_marks_success_at_the_end(tmp_path):
+    path = tmp_path / 'collector' / 'extractor.prom'
+    exporter = TextfileExporter(path, _report(), interval=3600)
+    exporter.tick()
+    path.write_text('scraped')
+    exporter.tick()
+    assert path.read_text() == 'scraped'
+    exporter.finish(succeeded=False)
+    assert 'extractor_run_last_success_timestamp_seconds' not in _samples(path.read_text())
+    exporter.finish()
+    samples = _samples(path.read_text())
+    assert samples['extractor_run_in_progress'] == '0'
+    assert 'extractor_run_last_success_timestamp_seconds' in samples
+    assert [p.name for p in path.parent.iterdir()] == ['extractor.prom']
@@ -0,0 +1,58 @@
+from dataclasses import replace
+
+from extractor.regression import (EXPECTED, FIELDS, compare, diff_results, equivalent, expected_results,
+                                  field_value, values_equal)
+from extractor.synthetic import SIZES, generate_corpus
+
+
+def _result(name, techniques=('drone',), total=50000.0, days=2, shots=12):
+    return {'project_name': name,
+            'script_features': {'techniques': list(techniques), 'estimated_shots': shots},
+            'budget_data': {'total_gbp': total},
+            'schedule_data': {'shoot_days': days}}
+
+
+def test_fields_compare_sorted_techniques_and_money_to_the_penny():
+    assert field_value(_result('a', techniques=['vfx', 'drone']), 'techniques') == ['drone', 'vfx']
+    assert field_value({'script_features': None}, 'techniques') == []
+    assert field_value({}, 'total_gbp') is None
+    assert values_equal('total_gbp', 100.0, 100.004)
+    assert not values_equal('total_gbp', 100.0, 100.01)
+    assert not values_equal('total_gbp', 100.0, None)
+
+
+def test_diff_counts_matches_and_keeps_the_first_examples():
+    reference = [_result(str(i)) for i in range(4)]
+    other = [_result('0'), _result('1', days=3), _result('2', days=4), _result('3', total=1.0)]
+    report = diff_results(reference, other, list(FIELDS), max_examples=1)
+    assert report['shoot_days']['match'] == 2
+    assert report['shoot_days']['examples'] == [{'project': '1', 'reference': 2, 'value': 3}]
+    assert report['total_gbp']['differ'] == 1
+    assert report['techniques']['differ'] == report['estimated_shots']['differ'] == 0
+
+
+def test_expected_results_need_a_block_on_every_project():
+    expected = {'techniques': ['vfx'], 'scenes': 3, 'total_gbp': 1.0, 'shoot_days': 1}
+    assert expected_results([{'project_name': 'a'}]) is None
+    assert expected_results([]) is None
+    shaped, = expected_results([{'project_name': 'a', 'expected': expected}])
+    assert field_value(shaped, 'shoot_days') == 1 and field_value(shaped, 'techniques') == ['vfx']
+
+
+def test_equivalent_names_the_fields_that_differ():
+    report = {'results': {'a': [_result('x')], 'b': [_result('x', shots=13)]}}
+    assert equivalent(report, 'a', 'a') == (True, [])
+    assert equivalent(report, 'a', 'b') == (False, ['estimated_shots: 1 projects differ'])
+    assert equivalent(report, 'a', 'c') == (False, ['c did not run'])
+
+
+def test_compare_runs_variants_against_the_corpus_truth(tmp_path, monkeypatch):
+    manifest = generate_corpus(tmp_path / 'corpus', replace(SIZES['small'], projects=2), seed=1)
+    # No pdftotext on PATH: that variant is reported, not run
+    monkeypatch.setenv('PATH', str(tmp_path))
+    report = compare(manifest, ['final', 'pdftotext'], reference=EXPECTED, timeout=120)
+    assert report['variants']['pdftotext'] == {'available': False, 'reason': ['missing pdftotext']}
+    assert report['variants']['final']['available']
+    diffs = report['diffs']['final']
+    assert 'estimated_shots' not in diffs
+    assert all(d['differ'] == 0 for d in diffs.values())
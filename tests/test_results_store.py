@@ -0,0 +1,98 @@
+import json
+import sqlite3
+from dataclasses import replace
+
+import pytest
+
+import extract_training_data_final as driver
+from extractor.synthetic import SIZES, generate_corpus
+from results_store import STORE_FILE, ResultsStore, budget_band
+
+
+def _result(name, client='Acme', total=80_000.0, days=2, techniques=('moco',), locations=('interior',)):
+    return {'project_name': name, 'client': client, 'complete': True,
+            'script_features': {'techniques': list(techniques), 'locations': list(locations),
+                                'estimated_shots': 10, 'has_children': False},
+            'budget_data': {'total_gbp': total, 'method': 'label'},
+            'schedule_data': {'shoot_days': days}}
+
+
+def test_budget_bands():
+    assert budget_band(None) is None
+    assert budget_band(99_999) == 'under 100k'
+    assert budget_band(100_000) == '100k-250k'
+    assert budget_band(5_000_000) == '1m+'
+
+
+def test_upserting_again_replaces_the_project_and_its_rows(tmp_path):
+    with ResultsStore(tmp_path / 'store.sqlite') as store:
+        first = store.upsert_project(_result('Spot', techniques=('moco', 'drone')),
+                                     files=[{'kind': 'script', 'path': 'a.pdf', 'stages': {'featurize': 0.5},
+                                             'counters': {'bytes_read': 10}}],
+                                     scenes=[{'number': '1', 'setting': 'INT', 'place': 'KITCHEN',
+                                              'time_of_day': 'DAY', 'location_type': 'interior'}])
+        again = store.upsert_project(_result('Spot', total=120_000.0, techniques=('drone',)))
+        assert again == first
+        row, = store.db.execute('SELECT * FROM projects').fetchall()
+        assert (row['total_gbp'], row['budget_band'], row['has_children']) == (120_000.0, '100k-250k', 0)
+        assert [r[0] for r in store.db.execute('SELECT technique FROM techniques')] == ['drone']
+        assert store.db.execute('SELECT count(*) FROM files').fetchone()[0] == 0
+        assert store.scenes(first) == []
+
+
+def test_find_projects_filters_and_orders_by_budget(tmp_path):
+    with ResultsStore(tmp_path / 'store.sqlite') as store:
+        store.upsert_project(_result('A', total=400_000.0, techniques=('moco',)))
+        store.upsert_project(_result('B', total=90_000.0, techniques=('moco', 'vfx'), days=1))
+        store.upsert_project(_result('C', client='Other', total=None, techniques=('moco',)))
+        store.upsert_project(_result('D', total=50_000.0, techniques=('drone',), locations=('exterior',)))
+        names = lambda rows: [r['project_name'] for r in rows]
+        assert names(store.find_projects(technique='moco')) == ['B', 'A', 'C']
+        assert names(store.find_projects(technique='moco', max_budget=300_000)) == ['B']
+        assert names(store.find_projects(client='Other')) == ['C']
+        assert names(store.find_projects(location_type='exterior')) == ['D']
+        assert names(store.find_projects(min_days=2, max_budget=100_000)) == ['D']
+        assert store.find_projects(technique='vfx')[0]['techniques'].split(',') == ['moco', 'vfx']
+
+
+def test_revisions_are_recorded_and_can_be_left_out(tmp_path):
+    with ResultsStore(tmp_path / 'store.sqlite') as store:
+        spot = store.upsert_project(_result('Spot'))
+        store.upsert_project(_result('Spot R2'))
+        store.set_revision(spot, {**_result('Spot'), 'script_revision': {'family': 'f1', 'superseded_by': 'Spot R2'}})
+        assert [r['project_name'] for r in store.find_projects(include_superseded=False)] == ['Spot R2']
+
+
+def test_technique_lookups_use_the_index(tmp_path):
+    with ResultsStore(tmp_path / 'store.sqlite') as store:
+        plan = store.db.execute('EXPLAIN QUERY PLAN SELECT project_id FROM techniques WHERE technique = ?',
+                                ('moco',)).fetchall()
+        assert any('techniques_technique' in row['detail'] for row in plan)
+
+
+def test_a_newer_schema_is_refused(tmp_path):
+    path = tmp_path / 'store.sqlite'
+    db = sqlite3.connect(path)
+    db.execute('PRAGMA user_version = 99')
+    db.close()
+    with pytest.raises(RuntimeError, match='schema version 99'):
+        ResultsStore(path)
+
+
+def test_a_run_keeps_the_first_of_two_projects_with_one_name_and_client(tmp_path, capsys):
+    manifest = generate_corpus(tmp_path / 'corpus', replace(SIZES['small'], projects=2, revision_rate=0.0,
+                                                            duplicate_rate=0.0), seed=1)
+    data = json.loads(manifest.read_text())
+    first, other = data['projects'][:2]
+    data['projects'].append({**first, 'files': {**first['files'], 'budget': other['files']['budget']}})
+    manifest.write_text(json.dumps(data))
+    out = tmp_path / 'out'
+    driver.main(['--manifest', str(manifest), '--output-dir', str(out), '--workers', '1'])
+    results = json.loads((out / 'training_data_complete.json').read_text())
+    assert len(results) == len(data['projects'])
+    assert 'has the name and client of project 1' in capsys.readouterr().out
+    with ResultsStore(out / STORE_FILE) as store:
+        rows = store.db.execute('SELECT project_name, total_gbp FROM projects WHERE project_name = ?',
+                                (first['project_name'],)).fetchall()
+        assert [tuple(r) for r in rows] == [(first['project_name'], results[0]['budget_data']['total_gbp'])]
+        assert results[-1]['budget_data']['total_gbp'] != results[0]['budget_data']['total_gbp']
@@ -0,0 +1,45 @@
+import random
+from pathlib import Path
+
+from revision_index import RevisionIndex, estimated_similarity, minhash, script_signature
+
+WORDS = ('kitchen beach car dog child drone night camera runs towards open door light '
+         'smiles turns window rain street table phone music slowly').split()
+
+
+def _script(seed: int, words: int = 400) -> str:
+    rng = random.Random(seed)
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def _revise(text: str, seed: int, changes: int = 8) -> str:
+    rng = random.Random(seed)
+    words = text.split()
+    for _ in range(changes):
+        words[rng.randrange(len(words))] = 'REVISED'
+    return ' '.join(words)
+
+
+def test_signatures_are_stable_and_track_similarity():
+    text = _script(1)
+    assert minhash(text) == minhash(text)
+    assert estimated_similarity(minhash(text), minhash(_revise(text, 2))) > 0.8
+    assert estimated_similarity(minhash(text), minhash(_script(3))) < 0.3
+
+
+def test_short_text_is_not_indexed():
+    assert script_signature('[PDF extraction failed: no such file]') is None
+
+
+def test_revisions_form_a_family_with_the_latest_by_filename():
+    r1 = _script(1)
+    r2 = _revise(r1, 2)
+    index = RevisionIndex()
+    assert index.add('0', minhash(r1), Path('Spot R1.pdf')) == []
+    matches = index.add('1', minhash(r2), Path('Spot R2.pdf'))
+    assert [doc for doc, _ in matches] == ['0']
+    assert index.add('2', minhash(_script(5)), Path('Other.pdf')) == []
+    family, = index.families()
+    assert family.members == ['0', '1']
+    assert family.latest == '1'
+    assert index.family_of('1') == index.family_of('0') != index.family_of('2')
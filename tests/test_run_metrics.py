@@ -0,0 +1,64 @@
+import json
+import time
+
+from run_metrics import (FileMetrics, RunReport, _percentile, count, recording, stage, stat_file,
+                         timed)
+
+
+@timed('featurize')
+def _featurize():
+    count('pages_parsed', 2)
+    time.sleep(0.01)
+
+
+def test_nested_stages_are_taken_out_of_their_parent(tmp_path):
+    path = tmp_path / 'budget.pdf'
+    path.write_bytes(b'x' * 100)
+    with recording('budget', path) as metrics:
+        stat_file(path)
+        with stage('budget_scan'):
+            time.sleep(0.01)
+            with stage('text_extract'):
+                time.sleep(0.03)
+    assert metrics.counters == {'bytes_read': 100}
+    assert 0.03 <= metrics.stages['text_extract'] < metrics.stages['budget_scan'] + 0.03
+    assert metrics.stages['budget_scan'] < 0.03
+    assert metrics.seconds == sum(metrics.stages.values())
+    assert metrics.peak_rss_mb > 0
+
+
+def test_outside_recording_the_hooks_do_nothing():
+    _featurize()
+    with stage('stat'):
+        count('bytes_read')
+
+
+def test_metrics_round_trip_through_dicts():
+    with recording('script', 'a.pdf') as metrics:
+        _featurize()
+    record = metrics.as_dict()
+    assert record['counters'] == {'pages_parsed': 2}
+    assert 'duplicate_of' not in record and 'spans' not in record
+    assert FileMetrics.from_dict(json.loads(json.dumps(record))).as_dict() == record
+
+
+def test_report_summary_leaves_duplicate_reads_out(tmp_path):
+    report = RunReport(workers=2)
+    first = FileMetrics('budget', 'a.xlsx', {'budget_scan': 0.2}, {'cells_scanned': 40}).as_dict()
+    copy = FileMetrics('budget', 'b.xlsx', duplicate_of='a.xlsx').as_dict()
+    script = FileMetrics('script', 'a.pdf', {'text_extract': 0.6, 'featurize': 0.1}).as_dict()
+    report.add_project(1, {'project_name': 'Two', '_metrics': [copy]})
+    report.add_project(0, {'project_name': 'One', '_metrics': [first, script]})
+    summary = report.summary()
+    assert (summary['files'], summary['duplicate_files']) == (2, 1)
+    assert summary['counters']['cells_scanned'] == 40
+    assert summary['stages']['text_extract']['share'] == round(0.6 / 0.9, 4)
+    assert report.describe(top=2) == 'text_extract 67%, budget_scan 22%'
+    saved = report.save(tmp_path / 'out' / 'run_report.json')
+    assert [p['project_name'] for p in saved['projects']] == ['One', 'Two']
+
+
+def test_percentile_is_nearest_rank():
+    assert _percentile([], 95) == 0.0
+    assert _percentile([3.0, 1.0, 2.0], 50) == 2.0
+    assert _percentile([float(v) for v in range(1, 101)], 95) == 95.0
@@ -0,0 +1,68 @@
+from datetime import datetime, time
+
+import extract_training_data_final as driver
+import extract_training_data_v2 as v2
+from schedule_parser import cell_text, iter_sheet_rows, parse_days, parse_schedule, row_text
+
+SCHEDULE = [
+    'Production: Festive Spot',
+    'SHOOT DAY 1 of 3 - Monday',
+    'Unit Call: 07:30',
+    'Set-up #1 kitchen wide',
+    'Set-up #2 kitchen close',
+    'Set-up #2 (cont)',
+    'Company move to beach',
+    'Wrap 19:00',
+    'Day 2',
+    'Call 8.00',
+    'Setup on the pier, setup on the sand',
+    'Shoot Day 1 of 3 (continued page header)',
+    'Wrap 25:00',
+]
+
+
+def test_days_close_with_their_own_call_wrap_setups_and_moves():
+    days = list(parse_days(SCHEDULE))
+    assert days == [
+        {'day': 1, 'call_time': '07:30', 'wrap_time': '19:00', 'setups': 2, 'unit_moves': 1},
+        # Repeated day-1 header continues day 2; an impossible time is ignored
+        {'day': 2, 'call_time': '08:00', 'wrap_time': None, 'setups': 2, 'unit_moves': 0},
+    ]
+
+
+def test_shoot_days_take_the_declared_total_or_fall_back_to_mentions():
+    schedule = parse_schedule(SCHEDULE)
+    assert (schedule['shoot_days'], schedule['call_times_found'], schedule['rows_read']) == (3, 2, len(SCHEDULE))
+    assert schedule['text_length'] == len('\n'.join(SCHEDULE))
+    assert parse_schedule(['Recce notes', 'Contingency for day 4']) == {
+        'shoot_days': 4, 'call_times_found': 0, 'setup_mentions': 0,
+        'text_length': len('Recce notes\nContingency for day 4'), 'rows_read': 2, 'days': []}
+
+
+def test_rows_before_any_heading_make_an_implicit_day_one():
+    days = list(parse_days(['Call 06:45', 'Setup 1', 'Setup 2']))
+    assert days == [{'day': 1, 'call_time': '06:45', 'wrap_time': None, 'setups': 2, 'unit_moves': 0}]
+
+
+def test_cells_read_as_a_person_sees_them():
+    assert cell_text(time(7, 30)) == '07:30'
+    assert cell_text(datetime(2024, 5, 1, 8, 0)) == '08:00'
+    assert cell_text(3.0) == '3' and cell_text(2.5) == '2.5'
+    assert cell_text(float('nan')) == '' and cell_text(None) == ''
+    assert row_text(['Call', None, time(7, 0), '  ']) == 'Call 07:00'
+
+
+def test_sheets_have_no_row_cap(make_xlsx):
+    rows = [['filler', i] for i in range(150)] + [['Shoot Day 1'], ['Call', '07:00'], ['Shoot Day 2']]
+    path = make_xlsx('Schedule.xlsx', rows)
+    lines = list(iter_sheet_rows(path))
+    assert len(lines) == 153
+    assert driver.extract_from_schedule(path)['shoot_days'] == 2
+
+
+def test_legacy_drivers_keep_their_original_parsing(make_xlsx):
+    # v2 flattens the first 100 rows and takes the highest "day N" - the
+    # cross-version compare measures exactly this difference
+    path = make_xlsx('Schedule.xlsx', [['Shoot Day 1'], ['Call', '07:00'], ['Shoot Day 2'], ['Day 2 of 2']])
+    assert 'days' not in v2.extract_from_schedule(path)
+    assert v2.extract_from_schedule(path)['shoot_days'] == 2
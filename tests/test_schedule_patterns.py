@@ -0,0 +1,62 @@
+import shutil
+
+import schedule_patterns
+from conftest import ROOT
+from schedule_patterns import aggregate, gather, render
+from ts_codegen import BEGIN_MARKER, END_MARKER
+
+
+def _result(name, calls, setups=(), days=None, **extra):
+    return {'project_name': name, **extra, 'schedule_data': {
+        'shoot_days': days if days is not None else len(calls),
+        'days': [{'call_time': c, 'setups': s, 'unit_moves': 1} for c, s in
+                 zip(calls, list(setups) + [0] * len(calls))]}}
+
+
+RESULTS = [
+    _result('A', ['08:00', '07:00'], setups=[6, 4]),
+    _result('B', ['08:00', '07:30', '07:00'], setups=[8]),
+    _result('A R1', ['05:00'], script_revision={'superseded_by': 'A'}),
+    _result('Broken', ['05:00'], error='bad sheet'),
+    {'project_name': 'No schedule', 'schedule_data': {}},
+]
+
+
+def test_superseded_failed_and_empty_schedules_are_not_counted():
+    gathered = gather(RESULTS)
+    assert gathered['schedules'] == 2
+    assert sorted(gathered['call_minutes'].tolist()) == [420, 420, 450, 480, 480]
+    assert gathered['setups_per_day'].tolist() == [6, 4, 8]
+    assert gathered['shoot_days'].tolist() == [2, 3]
+
+
+def test_distribution_is_most_common_first_and_adds_up():
+    aggregated = aggregate(gather(RESULTS))
+    assert aggregated['distribution'] == [
+        {'time': '07:00', 'count': 2, 'percentage': 40},
+        {'time': '08:00', 'count': 2, 'percentage': 40},
+        {'time': '07:30', 'count': 1, 'percentage': 20},
+    ]
+    stats = aggregated['stats']
+    assert (stats['call_time']['value'], stats['call_time']['min'], stats['call_time']['samples']) == ('07:00', 7.0, 5)
+    assert (stats['setups_per_day']['median'], stats['setups_per_day']['avg']) == (6.0, 6.0)
+    assert stats['shoot_days']['max'] == 3.0
+    block = render(aggregated)
+    assert block.startswith('// 2 schedules, 5 calls\n')
+    assert "  call_time: { metric: 'Unit call time', value: '07:00'," in block
+
+
+def test_generate_rewrites_only_the_block_of_the_real_file(tmp_path):
+    shutil.copy(ROOT / 'src' / 'lib' / 'data' / schedule_patterns.TS_FILE, tmp_path)
+    path = tmp_path / schedule_patterns.TS_FILE
+    before = path.read_text()
+    assert schedule_patterns.generate([], tmp_path) == {'schedules': 0, 'written': []}
+    assert schedule_patterns.generate(RESULTS, tmp_path, check=True) == {'schedules': 2, 'stale': [str(path)]}
+    assert path.read_text() == before
+    assert schedule_patterns.generate(RESULTS, tmp_path)['written'] == [str(path)]
+    after = path.read_text()
+    assert schedule_patterns.render(aggregate(gather(RESULTS))) in after
+    for text in (before, after):
+        assert text.split(BEGIN_MARKER)[0] == before.split(BEGIN_MARKER)[0]
+        assert text.split(END_MARKER)[1] == before.split(END_MARKER)[1]
+    assert schedule_patterns.generate(RESULTS, tmp_path, check=True)['stale'] == []
@@ -0,0 +1,63 @@
+import cProfile
+import pickle
+import pstats
+
+import run_metrics
+from run_metrics import recording, stage
+from stage_profiler import Profiler, _frame_name, collapsed_stacks, profile_index
+
+
+def _work(n):
+    return sum(i * i for i in range(n))
+
+
+def _read(path, profiler):
+    run_metrics.set_profiler(profiler)
+    try:
+        with recording('script', path) as metrics:
+            with stage('text_extract'):
+                _work(20000)
+            with stage('featurize'):
+                _work(20000)
+            with stage('featurize'):
+                _work(20000)
+        return metrics
+    finally:
+        run_metrics.set_profiler(None)
+
+
+def test_only_the_chosen_stages_of_matching_files_are_profiled(tmp_path):
+    profiler = Profiler(tmp_path / 'profiles', stages=['featurize'], files=['*R2*'])
+    assert _read('Spot_R1.pdf', profiler).profiles == {}
+    metrics = _read('Spot_R2.pdf', profiler)
+    assert list(metrics.profiles) == ['featurize']
+    pstats_path, collapsed = metrics.profiles['featurize']
+    # Both featurize calls land in the one profile
+    calls = [entry[1] for func, entry in pstats.Stats(pstats_path).stats.items() if func[2] == '_work']
+    assert calls == [2]
+    assert any('_work (test_stage_profiler.py' in line for line in open(collapsed))
+
+
+def test_whole_file_profile_with_memory(tmp_path):
+    metrics = _read('a.pdf', Profiler(tmp_path, memory=True))
+    paths = metrics.profiles['file']
+    assert [p.rsplit('.', 1)[-1] for p in paths] == ['pstats', 'collapsed', 'txt']
+    assert open(paths[2]).readline().startswith('peak traced:')
+    index = profile_index([{'project_name': 'P', 'files': [metrics.as_dict()]}])
+    assert index == [{'project_name': 'P', 'kind': 'script', 'path': 'a.pdf', 'profiles': metrics.profiles}]
+
+
+def test_profiler_pickles_without_its_captures(tmp_path):
+    profiler = Profiler(tmp_path, stages=['featurize'])
+    profiler._captures = {}
+    clone = pickle.loads(pickle.dumps(profiler))
+    assert clone._captures is None and clone.stages == frozenset({'featurize'})
+
+
+def test_collapsed_stacks_and_frame_names():
+    assert _frame_name(('~', 0, '<built-in method builtins.len>')) == 'builtins.len'
+    assert _frame_name(('/x/mod.py', 3, 'f;g')) == 'f,g (mod.py:3)'
+    profile = cProfile.Profile()
+    profile.runcall(_work, 50000)
+    lines = collapsed_stacks(pstats.Stats(profile))
+    assert lines and all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
@@ -0,0 +1,67 @@
+import json
+from dataclasses import replace
+
+import extract_training_data_final as driver
+from benchmarks.bench_extract import corpus_files, percentile
+from extractor.backends import get_backend
+from extractor.docwriters import write_xls, write_xlsx
+from extractor.regression import FIELDS, diff_results, expected_results
+from extractor.synthetic import SIZES, generate_corpus, spec_for
+
+SPEC = replace(SIZES['small'], projects=4, revision_rate=0.5, duplicate_rate=0.5)
+
+
+def _files(root):
+    return {p.relative_to(root): p.read_bytes() for p in sorted(root.rglob('*')) if p.is_file()}
+
+
+def test_the_same_seed_writes_the_same_bytes(tmp_path):
+    generate_corpus(tmp_path / 'a', SPEC, seed=7)
+    generate_corpus(tmp_path / 'b', SPEC, seed=7)
+    generate_corpus(tmp_path / 'c', SPEC, seed=8)
+    a = _files(tmp_path / 'a')
+    b = _files(tmp_path / 'b')
+    # The manifest holds absolute paths, so compare it by project
+    manifest = a.pop(next(k for k in a if k.name == 'manifest.json'))
+    b.pop(next(k for k in b if k.name == 'manifest.json'))
+    assert a == b
+    assert _files(tmp_path / 'c') != a
+    assert len(json.loads(manifest)['projects']) >= SPEC.projects
+
+
+def test_the_expected_blocks_are_what_the_final_driver_extracts(tmp_path):
+    manifest = generate_corpus(tmp_path, SPEC, seed=3)
+    projects = json.loads(manifest.read_text())['projects']
+    results = [driver.process_project(p, tmp_path) for p in projects]
+    fields = [f for f in FIELDS if f != 'estimated_shots']
+    report = diff_results(expected_results(projects), results, fields)
+    assert {field: d['differ'] for field, d in report.items()} == dict.fromkeys(fields, 0)
+
+
+def test_revisions_and_copies_share_files(tmp_path):
+    manifest = generate_corpus(tmp_path, SPEC, seed=3)
+    projects = json.loads(manifest.read_text())['projects']
+    revisions = [p for p in projects if p['project_name'].endswith(' R2')]
+    copies = [p for p in projects if '/Copy of ' in p['files']['budget']['path']]
+    assert revisions and copies
+    files = corpus_files(manifest)
+    assert len(files['budget']) == len({p['files']['budget']['path'] for p in projects})
+    assert len(files['script']) == len(projects)
+
+
+def test_written_sheets_read_back_through_every_reader(tmp_path):
+    rows = [['Line', 'Amount'], ['Crew', 1250.5], ['Total', 42000]]
+    write_xlsx(tmp_path / 'b.xlsx', rows)
+    write_xls(tmp_path / 'b.xls', rows)
+    read = {name: list(get_backend(name).read_rows(tmp_path / f'b{ext}'))
+            for name, ext in [('openpyxl', '.xlsx'), ('xlrd', '.xls')]}
+    assert read['openpyxl'] == read['xlrd'] == [tuple(r) for r in rows]
+
+
+def test_spec_sizes_and_percentiles():
+    assert spec_for('small', projects=3).projects == 3
+    assert spec_for('medium') == SIZES['medium']
+    assert percentile([], 50) == 0.0
+    assert percentile([4.0, 1.0, 3.0, 2.0], 50) == 2.0
+    assert percentile(list(range(1, 101)), 95) == 95
+    assert percentile([1.0, 2.0, 3.0], 95) == 3.0
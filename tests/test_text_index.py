@@ -0,0 +1,61 @@
+from results_store import ResultsStore
+from text_index import collecting, collecting_pages, keep_page, match_expression
+
+
+def _store(tmp_path):
+    store = ResultsStore(tmp_path / 'store.sqlite')
+    store.upsert_project({'project_name': 'Bikes', 'client': 'A'}, documents=[
+        {'kind': 'script', 'path': 'bikes.pdf', 'pages': [(1, "INT. HALL - DAY. The child's bike leans on a wall.")]},
+    ])
+    store.upsert_project({'project_name': 'Roads', 'client': 'B'}, documents=[
+        {'kind': 'script', 'path': 'roads.pdf', 'pages': [(1, 'EXT. ROAD - DAY. A child rides a bike to the S bend.'),
+                                                          (2, "Plan S: the Russian Arm car follows.")]},
+        {'kind': 'schedule', 'path': 'roads.xlsx', 'pages': [(1, 'Day 1 Russian Arm unit')]},
+    ])
+    return store
+
+
+def test_match_expression_keeps_apostrophes_inside_terms():
+    assert match_expression('russian arm') == '"russian" "arm"'
+    assert match_expression("child's bike") == '"child\'s" "bike"'
+    assert match_expression('the kid’s dog') == '"the" "kid’s" "dog"'
+    assert match_expression('drone NEAR/3 beach') == 'drone NEAR/3 beach'
+    assert match_expression('under*') == 'under*'
+
+
+def test_a_possessive_only_matches_the_possessive(tmp_path):
+    with _store(tmp_path) as store:
+        assert [r['project_name'] for r in store.search("child's bike")] == ['Bikes']
+        assert sorted(r['project_name'] for r in store.search('child bike')) == ['Bikes', 'Roads']
+
+
+def test_search_filters_by_kind_and_highlights(tmp_path):
+    with _store(tmp_path) as store:
+        rows = store.search('russian arm')
+        assert sorted((r['kind'], r['page']) for r in rows) == [('schedule', 1), ('script', 2)]
+        row, = store.search('russian arm', kinds=['schedule'])
+        assert '[Russian] [Arm]' in row['snippet']
+        # Porter stemming: "riding" finds "rides"
+        assert [r['path'] for r in store.search('riding')] == ['roads.pdf']
+
+
+def test_unchanged_documents_are_left_alone_and_dropped_ones_removed(tmp_path):
+    with _store(tmp_path) as store:
+        ids = {r['path']: r['id'] for r in store.db.execute('SELECT id, path FROM documents')}
+        store.upsert_project({'project_name': 'Roads', 'client': 'B'}, documents=[
+            {'kind': 'script', 'path': 'roads.pdf', 'pages': [(1, 'EXT. ROAD - DAY. A child rides a bike to the S bend.'),
+                                                              (2, "Plan S: the Russian Arm car follows.")]},
+        ])
+        after = {r['path']: r['id'] for r in store.db.execute('SELECT id, path FROM documents')}
+        assert after == {p: ids[p] for p in ('bikes.pdf', 'roads.pdf')}
+        assert store.search('unit') == []
+
+
+def test_pages_are_only_kept_while_collecting():
+    keep_page(1, 'ignored')
+    assert not collecting()
+    with collecting_pages() as pages:
+        assert collecting()
+        keep_page(1, 'INT. KITCHEN')
+        keep_page(2, '   ')
+    assert pages == [(1, 'INT. KITCHEN')]
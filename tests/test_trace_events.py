@@ -0,0 +1,51 @@
+import json
+import time
+
+import run_metrics
+from run_metrics import make_span, recording, stage
+from trace_events import trace_events, write_trace
+
+
+def _project(index, name, spans):
+    return {'index': index, 'project_name': name, 'seconds': 0.1,
+            'files': [{'kind': 'script', 'path': f'{name}.pdf', 'spans': spans}]}
+
+
+def test_spans_become_complete_events_and_projects_async_spans():
+    worker = (4242, 7, 'MainThread')
+    projects = [
+        _project(0, 'One', [make_span('file', 'script: One.pdf', 100.0, 0.5, worker),
+                            make_span('stage', 'text_extract', 100.1, 0.3, worker)]),
+        _project(1, 'Empty', []),
+    ]
+    events = trace_events(projects, started=100.0, main_pid=1)
+    meta = [e for e in events if e['ph'] == 'M']
+    assert {e['args']['name'] for e in meta if e['name'] == 'process_name'} == \
+        {'extractor', 'parser worker 1 (pid 4242)'}
+    spans = [e for e in events if e['ph'] == 'X']
+    assert [(e['name'], e['ts'], e['dur']) for e in spans] == \
+        [('script: One.pdf', 0.0, 500000.0), ('text_extract', 100000.0, 300000.0)]
+    begin, end = [e for e in events if e.get('cat') == 'project']
+    assert (begin['ph'], begin['ts'], end['ph'], end['ts']) == ('b', 0.0, 'e', 500000.0)
+    assert begin['id'] == 0 and begin['args']['files'] == 1
+
+
+def test_recording_keeps_spans_only_while_tracing(tmp_path):
+    with recording('budget', 'a.xlsx') as untraced:
+        with stage('budget_scan'):
+            pass
+    assert untraced.spans == []
+    run_metrics.set_tracing(True)
+    try:
+        started = time.time()
+        with recording('budget', 'a.xlsx') as traced:
+            with stage('budget_scan'):
+                pass
+    finally:
+        run_metrics.set_tracing(False)
+    assert [(s['cat'], s['name']) for s in traced.spans] == [('stage', 'budget_scan'), ('file', 'budget: a.xlsx')]
+    out = tmp_path / 'run' / 'trace.json'
+    written = write_trace(out, [{'index': 0, 'project_name': 'P', 'seconds': 0.0, 'files': [traced.as_dict()]}],
+                          started)
+    trace = json.loads(out.read_text())
+    assert len(trace['traceEvents']) == written and trace['displayTimeUnit'] == 'ms'
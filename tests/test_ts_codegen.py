@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from ts_codegen import (BEGIN_MARKER, END_MARKER, JSON_FILE, OVERRIDES_FILE, TS_FILE, complexity_for,
+                        generate, merge_projects, render_projects, replace_block, ts_value)
+
+
+def _result(name, total=100000.0, days=3, techniques=('drone',), **extra):
+    return {'project_name': name, 'client': 'Acme',
+            'script_features': {'techniques': list(techniques), 'has_children': True},
+            'budget_data': {'total_gbp': total}, 'schedule_data': {'shoot_days': days}, **extra}
+
+
+def test_typescript_literals():
+    assert ts_value("It's a \\ test\n") == "'It\\'s a \\\\ test\\n'"
+    assert ts_value([1.0, 2.5, None, True]) == '[1, 2.5, null, true]'
+    assert ts_value({'a': 1, 'b-c': 'x'}) == "{ a: 1, 'b-c': 'x' }"
+    with pytest.raises(TypeError):
+        ts_value(object())
+
+
+def test_replace_block_keeps_the_markers_and_needs_them(tmp_path):
+    source = f'head\n{BEGIN_MARKER} ...>\nold\n{END_MARKER}\ntail\n'
+    assert replace_block(source, 'new\n', tmp_path) == f'head\n{BEGIN_MARKER} ...>\nnew\n{END_MARKER}\ntail\n'
+    with pytest.raises(ValueError, match='no .* block'):
+        replace_block('no markers', 'x', tmp_path)
+
+
+def test_overrides_win_and_budget_per_day_rounds_half_up():
+    overrides = [
+        {'projectName': 'Spot One', 'aliases': ['Spot 1 (Director Cut)'], 'location': 'London', 'shootType': 'UK',
+         'verified': True, 'comments': {'location': 'from the call sheet'}},
+        {'projectName': 'Manual', 'client': 'X', 'location': 'Paris', 'shootType': 'EU', 'shootDays': 2,
+         'approvedBudget': 5, 'keyFeatures': [], 'complexity': 'simple', 'verified': True},
+    ]
+    results = [
+        _result('spot 1 - director cut', total=100001.0),
+        _result('Old R1', script_revision={'superseded_by': 'Old R2'}),
+        _result('No Budget', total=None),
+        _result('Broken', error='bad pdf'),
+        _result('Fresh', techniques=('moco', 'vfx', 'drone'), days=2, total=3.0),
+    ]
+    projects, report = merge_projects(results, overrides)
+    spot, manual, fresh = projects
+    assert (spot['location'], spot['verified'], spot['approvedBudget'], spot['shootDays']) == ('London', True, 100001, 3)
+    assert spot['budgetPerDay'] == 33334
+    assert manual['budgetPerDay'] == 3
+    assert fresh['budgetPerDay'] == 2 and fresh['complexity'] == 'complex'
+    assert report == {'projects': 3, 'matched': 1, 'manual_only': 1, 'extracted_only': 1, 'skipped': ['No Budget']}
+    ts = render_projects(projects)
+    assert ts.index('// UK SHOOTS') < ts.index('// EUROPE SHOOTS') < ts.index('// OTHER SHOOTS')
+    assert "location: 'London',  // from the call sheet" in ts
+
+
+def test_extracted_values_replace_unverified_guesses_but_not_verified_ones():
+    seeded = {'client': 'Acme', 'location': 'Leeds', 'shootType': 'UK', 'shootDays': 5, 'approvedBudget': 1,
+              'callTime': '06:00', 'keyFeatures': ['Rally driver'], 'complexity': 'simple', 'notes': 'Sunrise',
+              'comments': {'shootDays': 'Estimated from budget context', 'location': 'From the call sheet'}}
+    overrides = [{'projectName': 'Guess', 'verified': False, **seeded},
+                 {'projectName': 'Checked', 'verified': True, **seeded}]
+    guess, checked = merge_projects([_result('Guess'), _result('Checked')], overrides)[0]
+    assert (guess['shootDays'], guess['approvedBudget'], guess['complexity']) == (3, 100000, 'standard')
+    # Nothing extracted for these: the seeded values stand
+    assert (guess['callTime'], guess['keyFeatures'], guess['location'], guess['notes']) == (
+        '06:00', ['Rally driver'], 'Leeds', 'Sunrise')
+    assert guess['comments'] == {'location': 'From the call sheet'}
+    assert (checked['shootDays'], checked['approvedBudget'], checked['complexity']) == (5, 1, 'simple')
+    assert checked['comments'] == seeded['comments']
+
+
+def test_complexity_counts_techniques_and_talent_flags():
+    assert complexity_for({}) == 'simple'
+    assert complexity_for({'techniques': ['drone']}) == 'standard'
+    assert complexity_for({'techniques': ['drone', 'vfx'], 'has_animals': True}) == 'complex'
+
+
+def test_generate_checks_then_writes(tmp_path):
+    (tmp_path / TS_FILE).write_text(f'export interface TrainingProject {{}}\n{BEGIN_MARKER}>\n{END_MARKER}\n')
+    (tmp_path / OVERRIDES_FILE).write_text(json.dumps({'projects': []}))
+    results = [_result('Fresh')]
+    stale = generate(results, tmp_path, check=True)['stale']
+    assert stale == [str(tmp_path / TS_FILE), str(tmp_path / JSON_FILE)]
+    assert generate(results, tmp_path)['written'] == stale
+    assert generate(results, tmp_path, check=True)['stale'] == []
+    assert 'REAL_PROJECTS' in (tmp_path / TS_FILE).read_text()
+    sidecar, = json.loads((tmp_path / JSON_FILE).read_text())
+    assert (sidecar['projectName'], sidecar['budgetPerDay']) == ('Fresh', 33333)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Full-text index of extracted script, schedule and budget pages
+
+Answers "which past jobs had a Russian Arm / underwater / child talent
+scene?" without opening a PDF. Each page of text a run extracts is kept in
+an SQLite FTS5 table next to the results store's tables, with a
+back-reference to its project, document and page number:
+
+    documents   one row per file read for a project: kind, path, page count,
+                hash of its text
+    pages       one row per page: document, page number, text
+    page_text   FTS5 index over pages.text (porter stemming)
+
+Extractors hand pages over with keep_page() while collecting_pages() is
+active in the current context, and do nothing otherwise. The index is
+updated document by document as projects are stored; a document whose text
+hasn't changed since the last run is left alone.
+"""
+
+import hashlib
+import re
+import sqlite3
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+Page = Tuple[int, str]  # (page number, text) - spreadsheets are one page per sheet
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    path TEXT NOT NULL,
+    pages INTEGER NOT NULL,
+    text_hash TEXT NOT NULL,
+    UNIQUE (project_id, path)
+);
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    document_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    page INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_document ON pages (document_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS page_text USING fts5 (
+    text, content = 'pages', content_rowid = 'id', tokenize = 'porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS pages_indexed AFTER INSERT ON pages BEGIN
+    INSERT INTO page_text (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS pages_unindexed AFTER DELETE ON pages BEGIN
+    INSERT INTO page_text (page_text, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+_pages: ContextVar[Optional[List[Page]]] = ContextVar('page_text', default=None)
+
+
+@contextmanager
+def collecting_pages() -> Iterator[List[Page]]:
+    """Collect the pages keep_page() is given while reading one file"""
+    pages: List[Page] = []
+    token = _pages.set(pages)
+    try:
+        yield pages
+    finally:
+        _pages.reset(token)
+
+
+def collecting() -> bool:
+    """Whether anyone wants page text - lets callers skip building it"""
+    return _pages.get() is not None
+
+
+def keep_page(number: int, text: str) -> None:
+    pages = _pages.get()
+    if pages is not None and text and text.strip():
+        pages.append((number, text))
+
+
+def _text_hash(pages: Sequence[Page]) -> str:
+    digest = hashlib.sha1()
+    for number, text in pages:
+        digest.update(f'{number}\0{text}\0'.encode('utf-8', 'surrogatepass'))
+    return digest.hexdigest()
+
+
+def create(db: sqlite3.Connection) -> None:
+    db.executescript(SCHEMA)
+
+
+def update_documents(db: sqlite3.Connection, project_id: int, documents: Iterable[Dict[str, Any]]) -> int:
+    """
+    Bring a project's indexed documents in line with `documents` ({'kind',
+    'path', 'pages'}); call inside the caller's transaction. Returns the
+    number of pages (re)indexed.
+    """
+    existing = {row[1]: (row[0], row[2]) for row in db.execute(
+        'SELECT id, path, text_hash FROM documents WHERE project_id = ?', (project_id,))}
+    indexed = 0
+    for document in documents:
+        pages = [tuple(p) for p in document.get('pages', [])]
+        text_hash = _text_hash(pages)
+        previous = existing.pop(document['path'], None)
+        if previous is not None:
+            if previous[1] == text_hash:
+                continue
+            # Cascades to its pages, whose trigger takes them out of the index
+            db.execute('DELETE FROM documents WHERE id = ?', (previous[0],))
+        document_id = db.execute(
+            'INSERT INTO documents (project_id, kind, path, pages, text_hash) VALUES (?, ?, ?, ?, ?)',
+            (project_id, document['kind'], document['path'], len(pages), text_hash)).lastrowid
+        db.executemany('INSERT INTO pages (document_id, page, text) VALUES (?, ?, ?)',
+                       [(document_id, number, text) for number, text in pages])
+        indexed += len(pages)
+    # Files the project no longer reads
+    for document_id, _ in existing.values():
+        db.execute('DELETE FROM documents WHERE id = ?', (document_id,))
+    return indexed
+
+
+def match_expression(query: str) -> str:
+    """
+    Plain words become an AND of terms ("russian arm" -> "russian" "arm");
+    queries already using FTS5 syntax (quotes, AND/OR/NOT, NEAR, prefix*)
+    are passed through. A word with an apostrophe stays one term ("child's"),
+    which FTS5 tokenizes the way it tokenized the page - child then s, next
+    to each other.
+    """
+    if re.search(r'["*()^:]|\b(?:AND|OR|NOT|NEAR)\b', query):
+        return query
+    return ' '.join(f'"{word}"' for word in re.findall(r"\w+(?:['\u2019]\w+)*", query))
+
+
+def search(db: sqlite3.Connection, query: str, kinds: Sequence[str] = (), limit: int = 20,
+           latest_only: bool = False) -> List[sqlite3.Row]:
+    """Pages matching `query`, best first (bm25), with project, file and a highlighted snippet"""
+    where = ['page_text MATCH ?']
+    params: List[Any] = [match_expression(query)]
+    if kinds:
+        where.append(f"d.kind IN ({', '.join('?' * len(kinds))})")
+        params += list(kinds)
+    if latest_only:
+        where.append('p.superseded_by IS NULL')
+    sql = ("SELECT p.project_name, p.client, d.kind, d.path, pg.page, bm25(page_text) AS score, "
+           "snippet(page_text, 0, '[', ']', ' … ', 12) AS snippet "
+           'FROM page_text JOIN pages pg ON pg.id = page_text.rowid '
+           'JOIN documents d ON d.id = pg.document_id JOIN projects p ON p.id = d.project_id '
+           f"WHERE {' AND '.join(where)} ORDER BY score LIMIT ?")
+    return db.execute(sql, params + [limit]).fetchall()
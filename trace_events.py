@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Trace-event timeline of an extraction run
+
+Turns the spans run_metrics keeps while tracing into the Trace Event JSON
+format that chrome://tracing, Perfetto (ui.perfetto.dev) and speedscope
+open. Every process gets a track per thread:
+
+    extractor        prefetch threads: stat + stage per file
+                     (sequential runs: every file and stage on MainThread)
+    parser worker N  one span per file parsed, its stages nested inside
+
+and each project is an async span from its first file starting to its last
+file finishing, so stragglers, idle workers and I/O vs CPU time show up
+side by side.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+
+def _us(seconds: float) -> float:
+    return round(seconds * 1e6, 1)
+
+
+def trace_events(projects: List[Dict[str, Any]], started: float,
+                 main_pid: int = 0) -> List[Dict[str, Any]]:
+    """Trace events for RunReport.projects (file records carrying 'spans')"""
+    main_pid = main_pid or os.getpid()
+    events: List[Dict[str, Any]] = []
+    threads: Dict[Tuple[int, int], str] = {}
+
+    for project in projects:
+        name = project['project_name']
+        first, last = None, None
+        for record in project['files']:
+            for span in record.get('spans', []):
+                threads.setdefault((span['pid'], span['tid']), span['thread'])
+                # Round the ends, not the duration, so back-to-back spans still nest
+                ts = _us(span['ts'] - started)
+                events.append({
+                    'name': span['name'], 'cat': span['cat'], 'ph': 'X',
+                    'ts': ts, 'dur': round(_us(span['ts'] + span['dur'] - started) - ts, 1),
+                    'pid': span['pid'], 'tid': span['tid'],
+                    'args': {'project': name, 'kind': record['kind'], 'path': record['path']},
+                })
+                end = span['ts'] + span['dur']
+                first = span['ts'] if first is None else min(first, span['ts'])
+                last = end if last is None else max(last, end)
+        if first is None:
+            continue
+        # Async spans may overlap, unlike complete ('X') events on one thread
+        common = {'name': name, 'cat': 'project', 'id': project['index'], 'pid': main_pid, 'tid': 0}
+        events.append({**common, 'ph': 'b', 'ts': _us(first - started),
+                       'args': {'files': len(project['files']), 'seconds': project['seconds']}})
+        events.append({**common, 'ph': 'e', 'ts': _us(last - started)})
+
+    workers = sorted({pid for pid, _ in threads if pid != main_pid})
+    metadata = [{'name': 'process_name', 'ph': 'M', 'pid': main_pid, 'tid': 0,
+                 'args': {'name': 'extractor'}},
+                {'name': 'process_sort_index', 'ph': 'M', 'pid': main_pid, 'tid': 0,
+                 'args': {'sort_index': 0}}]
+    for number, pid in enumerate(workers, 1):
+        metadata.append({'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+                         'args': {'name': f'parser worker {number} (pid {pid})'}})
+        metadata.append({'name': 'process_sort_index', 'ph': 'M', 'pid': pid, 'tid': 0,
+                         'args': {'sort_index': number}})
+    for (pid, tid), thread_name in sorted(threads.items()):
+        metadata.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                         'args': {'name': thread_name}})
+
+    return metadata + sorted(events, key=lambda e: (e['ts'], -e.get('dur', 0)))
+
+
+def write_trace(path: Path, projects: List[Dict[str, Any]], started: float) -> int:
+    """Write the timeline; returns the number of events"""
+    events = trace_events(projects, started)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+    return len(events)
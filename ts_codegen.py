@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+TypeScript data modules generated from extraction results
+
+    python3 -m extractor codegen [--results training_data_complete.json] [--check]
+
+    training-data.ts     REAL_PROJECTS - only the block between the generated
+                         markers; the interface, stats and helpers around it
+                         stay hand-written
+    training-data.json   the same projects, compact, for the app to lazy-load
+
+Each project starts from its extraction result (shoot days, approved budget,
+key features from the script's techniques, a complexity guess) with
+training-data.overrides.json laid over it: hand-entered values win, except
+that an unverified entry's shoot days, budget, call time, complexity and
+daily moves/setups are only a fallback for what extraction found. Override entries that no result
+matches are kept as they are. budgetPerDay
+is always derived - approvedBudget / shootDays, rounded half up - for all
+projects at once.
+"""
+
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from json_output import read_json, write_json
+from lazy_modules import lazy_import
+
+np = lazy_import('numpy')
+
+DATA_DIR = Path(__file__).resolve().parent / 'src' / 'lib' / 'data'
+TS_FILE = 'training-data.ts'
+JSON_FILE = 'training-data.json'
+OVERRIDES_FILE = 'training-data.overrides.json'
+
+BEGIN_MARKER = '// <generated by python3 -m extractor codegen'
+END_MARKER = '// </generated>'
+
+# TrainingProject fields, in the order they are written
+FIELDS = ['projectName', 'client', 'location', 'shootType', 'shootDays', 'approvedBudget', 'budgetPerDay',
+          'callTime', 'keyFeatures', 'complexity', 'unitMovesPerDay', 'setupsPerDay', 'verified', 'notes']
+REQUIRED = ['projectName', 'client', 'location', 'shootType', 'shootDays', 'approvedBudget',
+            'keyFeatures', 'complexity', 'verified']
+# What extraction measures: an unverified override's values for these are guesses
+MEASURED = ['shootDays', 'approvedBudget', 'callTime', 'complexity', 'unitMovesPerDay', 'setupsPerDay']
+SECTIONS = [('UK', 'UK SHOOTS'), ('EU', 'EUROPE SHOOTS'), ('US', 'US SHOOTS'), ('Other', 'OTHER SHOOTS')]
+
+# Worded to match COMPLEXITY_INDICATORS in training-data.ts
+TECHNIQUE_FEATURES = {
+    'moco': 'Motion control (MOCO)',
+    'drone': 'Drone',
+    'tracking': 'Tracking shots',
+    'vfx': 'VFX',
+    'night_shoot': 'Night shoot',
+    'underwater': 'Underwater',
+    'crane': 'Crane',
+    'steadicam': 'Steadicam',
+    'handheld': 'Handheld',
+    'slow_motion': 'Slow motion',
+    'time_lapse': 'Time lapse',
+}
+FLAG_FEATURES = {'has_children': 'Child talent', 'has_animals': 'Animal talent', 'has_vehicles': 'Vehicles'}
+# Cost drivers in the script -> complexity, when nobody has judged it by hand
+COMPLEXITY_STEPS = [(0, 'simple'), (1, 'standard'), (3, 'complex'), (5, 'very_complex')]
+
+
+def ts_value(value: Any) -> str:
+    """A TypeScript literal for a JSON-ish value"""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if value is None:
+        return 'null'
+    if isinstance(value, (int, float)):
+        return str(int(value)) if float(value).is_integer() else repr(float(value))
+    if isinstance(value, str):
+        escaped = value.replace('\\', '\\\\').replace("'", "\\'").replace('\n', '\\n')
+        return f"'{escaped}'"
+    if isinstance(value, (list, tuple)):
+        return '[' + ', '.join(ts_value(v) for v in value) + ']'
+    if isinstance(value, dict):
+        return '{ ' + ', '.join(f'{_ts_key(k)}: {ts_value(v)}' for k, v in value.items()) + ' }'
+    raise TypeError(f'no TypeScript literal for {type(value).__name__}')
+
+
+def _ts_key(key: str) -> str:
+    return key if re.fullmatch(r'[A-Za-z_$][\w$]*', key) else ts_value(key)
+
+
+def replace_block(source: str, block: str, path: Path) -> str:
+    """Swap the text between the generated markers (marker lines kept)"""
+    begin = source.find(BEGIN_MARKER)
+    end = source.find(END_MARKER, begin)
+    if begin < 0 or end < 0:
+        raise ValueError(f'{path}: no {BEGIN_MARKER!r} ... {END_MARKER!r} block to regenerate')
+    begin = source.index('\n', begin) + 1
+    return source[:begin] + block + source[end:]
+
+
+def name_key(name: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '', name.casefold())
+
+
+def complexity_tier(drivers: int) -> str:
+    return [label for threshold, label in COMPLEXITY_STEPS if drivers >= threshold][-1]
+
+
+def complexity_for(features: Dict[str, Any]) -> str:
+    return complexity_tier(len(features.get('techniques', [])) +
+                           sum(bool(features.get(flag)) for flag in FLAG_FEATURES))
+
+
+def project_from_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """The TrainingProject fields an extraction result provides"""
+    features = result.get('script_features') or {}
+    total = (result.get('budget_data') or {}).get('total_gbp')
+    days = (result.get('schedule_data') or {}).get('shoot_days')
+    project = {
+        'projectName': result.get('project_name', 'Unknown'),
+        'client': result.get('client') or 'Unknown',
+        'location': 'TBD',
+        'shootType': 'Other',
+        'keyFeatures': ([TECHNIQUE_FEATURES.get(t, t) for t in features.get('techniques', [])] +
+                        [label for flag, label in FLAG_FEATURES.items() if features.get(flag)]),
+        'complexity': complexity_for(features),
+        'verified': False,
+    }
+    if days:
+        project['shootDays'] = int(days)
+    if total:
+        project['approvedBudget'] = int(total + 0.5)
+    shoot_days = (result.get('schedule_data') or {}).get('days', [])
+    calls = [d['call_time'] for d in shoot_days if d.get('call_time')]
+    if calls:
+        project['callTime'] = min(calls)
+    worked = [d for d in shoot_days if d.get('setups')]
+    if worked:
+        project['setupsPerDay'] = int(sum(d['setups'] for d in worked) / len(worked) + 0.5)
+        project['unitMovesPerDay'] = int(sum(d.get('unit_moves', 0) for d in worked) / len(worked) + 0.5)
+    return project
+
+
+def merge_projects(results: Iterable[Dict[str, Any]],
+                   overrides: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Extraction results with the overrides laid over them. Returns the
+    projects (override order first, then new extractions) and what happened.
+    """
+    by_name: Dict[str, int] = {}
+    for i, override in enumerate(overrides):
+        for name in [override.get('projectName', '')] + list(override.get('aliases', [])):
+            by_name.setdefault(name_key(name), i)
+
+    merged: List[Optional[Dict[str, Any]]] = [None] * len(overrides)
+    extracted, skipped = [], []
+    for result in results:
+        # Earlier script revisions and failed projects aren't training data
+        if result.get('error') or (result.get('script_revision') or {}).get('superseded_by'):
+            continue
+        project = project_from_result(result)
+        index = by_name.get(name_key(project['projectName']))
+        if index is None:
+            if 'shootDays' in project and 'approvedBudget' in project:
+                extracted.append(project)
+            else:
+                skipped.append(project['projectName'])
+            continue
+        if merged[index] is None:
+            merged[index] = project
+    manual = sum(1 for p in merged if p is None)
+
+    projects = []
+    for base, override in zip(merged, overrides):
+        values = {k: v for k, v in override.items() if k not in ('aliases', 'comments')}
+        comments = dict(override.get('comments', {}))
+        if base and not override.get('verified'):
+            for field in MEASURED:
+                if field in base:
+                    values.pop(field, None)
+                    comments.pop(field, None)
+        project = {**(base or {}), **values}
+        if comments:
+            project['comments'] = comments
+        projects.append(project)
+    projects += extracted
+
+    incomplete = [p['projectName'] for p in projects if any(f not in p for f in REQUIRED)]
+    projects = [p for p in projects if all(f in p for f in REQUIRED)]
+    return derive(projects), {
+        'projects': len(projects),
+        'matched': len(overrides) - manual,
+        'manual_only': manual,
+        'extracted_only': len(extracted),
+        'skipped': skipped + incomplete,
+    }
+
+
+def derive(projects: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Fill the derived fields for every project in one pass"""
+    if not projects:
+        return projects
+    budgets = np.array([p['approvedBudget'] for p in projects], dtype=np.float64)
+    days = np.array([p['shootDays'] for p in projects], dtype=np.float64)
+    per_day = np.floor(np.divide(budgets, days, out=np.zeros_like(budgets), where=days > 0) + 0.5)
+    for project, value in zip(projects, per_day.astype(np.int64).tolist()):
+        project['budgetPerDay'] = value
+    return projects
+
+
+def render_projects(projects: List[Dict[str, Any]]) -> str:
+    """The REAL_PROJECTS declaration, grouped by shoot type"""
+    lines = ['export const REAL_PROJECTS: TrainingProject[] = [']
+    for shoot_type, heading in SECTIONS:
+        group = [p for p in projects if p['shootType'] == shoot_type]
+        if not group:
+            continue
+        if len(lines) > 1:
+            lines.append('')
+        lines.append(f'  // {heading}')
+        for project in group:
+            comments = project.get('comments', {})
+            lines.append('  {')
+            for field in FIELDS:
+                if field in project:
+                    comment = f'  // {comments[field]}' if field in comments else ''
+                    lines.append(f'    {field}: {ts_value(project[field])},{comment}')
+            lines.append('  },')
+    lines.append('];')
+    return '\n'.join(lines) + '\n'
+
+
+def generate(results: List[Dict[str, Any]], data_dir: Path = DATA_DIR, check: bool = False) -> Dict[str, Any]:
+    """
+    Regenerate training-data.ts and its JSON sidecar. With check, write
+    nothing and report whether they are out of date.
+    """
+    overrides_path = data_dir / OVERRIDES_FILE
+    overrides = read_json(overrides_path).get('projects', []) if overrides_path.exists() else []
+    projects, report = merge_projects(results, overrides)
+
+    ts_path = data_dir / TS_FILE
+    source = ts_path.read_text()
+    updated = replace_block(source, render_projects(projects), ts_path)
+    sidecar = [{f: p[f] for f in FIELDS if f in p} for p in projects]
+    json_path = data_dir / JSON_FILE
+    stale = [str(ts_path)] if updated != source else []
+    if not json_path.exists() or read_json(json_path) != sidecar:
+        stale.append(str(json_path))
+
+    if not check:
+        if updated != source:
+            ts_path.write_text(updated)
+        write_json(json_path, sidecar, 'compact')
+    return {**report, 'stale' if check else 'written': stale}